@@ -0,0 +1,298 @@
+"""Response cache for read-only Cortex API calls."""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import anyio
+import httpx
+
+from ..config import Config
+from ..routes.table import RouteInfo, RouteTable
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from .shared_cache import SharedResponseCache
+
+logger = get_logger(__name__)
+
+CACHEABLE_METHODS = frozenset({"GET", "HEAD"})
+
+# Spec extension that sets a route's TTL in seconds
+CACHE_TTL_EXTENSION = "x-cortex-mcp-cache-ttl"
+
+# Rough per-entry bookkeeping cost on top of the body, used for the memory bound
+_ENTRY_OVERHEAD_BYTES = 256
+
+CacheKey = tuple[str, str, tuple[tuple[str, str], ...], str]
+
+
+@dataclass
+class CachedResponse:
+    """A stored upstream response."""
+
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    content: bytes
+    expires_at: float
+    size: int
+
+
+@dataclass
+class RouteStats:
+    """Hit and miss counters for one route template."""
+
+    hits: int = 0
+    misses: int = 0
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU cache with per-entry expiry.
+
+    Entries are evicted least-recently-used first once the stored bodies
+    exceed max_bytes. Bodies larger than max_entry_bytes are never stored.
+    """
+
+    # Lookups and stores are quick enough to run on the event loop
+    blocking = False
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.size = 0
+        self.evictions = 0
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._stats: dict[str, RouteStats] = {}
+
+    @classmethod
+    def from_config(cls) -> "ResponseCache":
+        """Create a cache sized from configuration."""
+        return cls(
+            max_bytes=Config.CACHE_MAX_BYTES,
+            max_entry_bytes=Config.CACHE_MAX_ENTRY_BYTES,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey, route: str) -> CachedResponse | None:
+        """Return a live entry and count the lookup against route."""
+        stats = self._stats.setdefault(route, RouteStats())
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        stats.hits += 1
+        return entry
+
+    def put(
+        self,
+        key: CacheKey,
+        status_code: int,
+        headers: list[tuple[bytes, bytes]],
+        content: bytes,
+        ttl: float,
+    ) -> bool:
+        """
+        Store a response for ttl seconds.
+
+        Returns:
+            True if the response was stored
+        """
+        size = entry_size(headers, content)
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = CachedResponse(
+            status_code=status_code,
+            headers=headers,
+            content=content,
+            expires_at=time.monotonic() + ttl,
+            size=size,
+        )
+        self.size += size
+
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+        return True
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        """Return hit/miss counters per route plus overall occupancy."""
+        hits = sum(s.hits for s in self._stats.values())
+        misses = sum(s.misses for s in self._stats.values())
+        return {
+            "hits": hits,
+            "misses": misses,
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "routes": {
+                route: {"hits": s.hits, "misses": s.misses}
+                for route, s in sorted(self._stats.items())
+            },
+        }
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that answers repeated read-only requests from a cache.
+
+    The cache key is the method, path, sorted query string and a hash of the
+    Authorization header, so callers with different Cortex identities never
+    see each other's responses.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        cache: "ResponseCache | SharedResponseCache",
+        route_table: RouteTable,
+        default_ttl: float,
+        route_ttls: dict[str, float] | None = None,
+    ):
+        self._transport = transport
+        self._cache = cache
+        self._route_table = route_table
+        self._default_ttl = default_ttl
+        self._route_ttls = route_ttls or {}
+
+    @property
+    def cache(self) -> "ResponseCache | SharedResponseCache":
+        return self._cache
+
+    def ttl_for(self, route: RouteInfo | None) -> float:
+        """Resolve a route's TTL: config override, then spec extension, then default."""
+        if route is None:
+            return 0
+        if route.template in self._route_ttls:
+            return self._route_ttls[route.template]
+        if CACHE_TTL_EXTENSION in route.extensions:
+            return float(route.extensions[CACHE_TTL_EXTENSION])
+        return self._default_ttl
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in CACHEABLE_METHODS or bypasses_cache(request.headers):
+            return await self._transport.handle_async_request(request)
+
+        route = self._route_table.match(request.method, request.url.path)
+        ttl = self.ttl_for(route)
+        if ttl <= 0:
+            return await self._transport.handle_async_request(request)
+
+        key = cache_key(request)
+        entry = await self._run(self._cache.get, key, route.template)
+        if entry is not None:
+            logger.debug(f"Cache hit: {request.method} {request.url.path}")
+            return httpx.Response(
+                status_code=entry.status_code,
+                headers=entry.headers,
+                content=entry.content,
+                extensions={"cortex_cache": "hit"},
+            )
+
+        response = await self._transport.handle_async_request(request)
+        if response.status_code != 200 or bypasses_cache(response.headers):
+            return response
+
+        # Read the undecoded body so a replay goes through the client's decoding as usual
+        content = await read_raw(response)
+
+        headers = response.headers.raw
+        await self._run(self._cache.put, key, response.status_code, headers, content, ttl)
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            content=content,
+            extensions={"cortex_cache": "miss"},
+        )
+
+    async def _run(self, method, *args):
+        """Call a cache method, in a worker thread if it may wait on I/O or other processes."""
+        if self._cache.blocking:
+            return await anyio.to_thread.run_sync(method, *args)
+        return method(*args)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def create_response_cache() -> "ResponseCache | SharedResponseCache":
+    """
+    Create the configured response cache.
+
+    With CORTEX_CACHE_PATH set the cache is shared through that file by
+    every process on the host. If the file cannot be opened the cache
+    falls back to memory, so a bad path never stops the server.
+    """
+    if Config.CACHE_PATH:
+        import sqlite3
+
+        from .shared_cache import SharedResponseCache
+
+        try:
+            cache = SharedResponseCache.from_config()
+            logger.info(f"Response cache shared through: {Config.CACHE_PATH}")
+            return cache
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not open shared response cache {Config.CACHE_PATH}, caching in memory: {e}")
+    return ResponseCache.from_config()
+
+
+def entry_size(headers: list[tuple[bytes, bytes]], content: bytes) -> int:
+    """Bytes an entry counts against the cache's bound."""
+    return len(content) + sum(len(k) + len(v) for k, v in headers) + _ENTRY_OVERHEAD_BYTES
+
+
+async def read_raw(response: httpx.Response) -> bytes:
+    """Read a transport-level response body without content decoding, then close it."""
+    try:
+        return b"".join([chunk async for chunk in response.stream])
+    finally:
+        await response.aclose()
+
+
+def cache_key(request: httpx.Request) -> CacheKey:
+    """Build the cache key for a request."""
+    query = tuple(sorted(request.url.params.multi_items()))
+    return (request.method, request.url.path, query, auth_identity(request.headers))
+
+
+def auth_identity(headers: httpx.Headers) -> str:
+    """Return a stable, non-reversible identifier for the caller's credentials."""
+    authorization = headers.get("authorization", "")
+    if not authorization:
+        return ""
+    return hashlib.sha256(authorization.encode()).hexdigest()[:32]
+
+
+def bypasses_cache(headers: httpx.Headers) -> bool:
+    """Check for Cache-Control directives that forbid serving or storing from cache."""
+    directives = headers.get("cache-control", "").lower()
+    return "no-store" in directives or "no-cache" in directives
@@ -0,0 +1,649 @@
+"""
+Local index of Cortex catalog entities, kept in sync in the background.
+
+The catalog changes slowly, while listing it and looking entities up are
+most of what tools ask Cortex for. CatalogIndex lists the whole catalog
+once. Every refresh interval after that, it reads the audit log for
+entities and teams created, updated or deleted since the previous sync,
+and fetches only those. It lists the whole catalog again when the audit
+log cannot be read or holds more changes than one page, and every
+FULL_SYNC_INTERVAL to pick up what the audit log does not show, such as
+the listing order of new entities.
+
+CatalogIndexTransport answers from the index:
+
+- GET /api/v1/catalog when every parameter is one the index can evaluate
+  (page, pageSize, groups, owners, types, includeOwners, includeArchived).
+  Other parameters change the shape or selection of the result and go
+  upstream.
+- GET /api/v1/catalog/{tagOrId} and /api/v1/teams/{tagOrId} for indexed
+  entities. Details have a different shape than the summaries the list
+  returns, so they are read through once and kept until a sync shows
+  the entity changed, or for at most the refresh interval.
+
+Only requests made with the server's own token are answered, since the
+index holds what that token can see. Once the last successful sync is
+older than max_staleness, everything goes upstream again.
+"""
+
+import asyncio
+import contextvars
+import dataclasses
+import json
+import math
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from urllib.parse import quote
+
+import httpx
+
+from ..config import Config
+from ..routes.table import RouteTable
+from ..utils.logging import get_logger
+from .cache import CacheKey, ResponseCache, auth_identity, bypasses_cache, read_raw
+
+logger = get_logger(__name__)
+
+LIST_TEMPLATE = "/api/v1/catalog"
+ENTITY_TEMPLATE = "/api/v1/catalog/{tagOrId}"
+TEAM_TEMPLATE = "/api/v1/teams/{tagOrId}"
+AUDIT_LOG_TEMPLATE = "/api/v1/audit-logs"
+
+# Teams are left out of the catalog listing unless asked for by type
+TEAM_TYPE = "team"
+
+# Largest and default page sizes of the catalog list endpoint
+SYNC_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 250
+
+# Seconds before a failed sync is tried again, if the refresh interval is longer
+FAILED_SYNC_DELAY = 30.0
+
+# Seconds between full listings of the catalog while the audit log is read in between
+FULL_SYNC_INTERVAL = 3600.0
+
+# Seconds of the audit log read again by each sync, for entries written after the previous one read it
+CHANGE_FEED_OVERLAP = 60.0
+
+# Audit log object types of catalog entities and teams
+_CHANGE_OBJECT_TYPES = ("CATALOG", "TEAM")
+
+# Fields of an entity's details that its summary in a listing has as well; details call the owners ownersV2
+_SUMMARY_FIELDS = frozenset({
+    "id", "tag", "name", "description", "type", "groups", "isArchived", "lastUpdated",
+    "hierarchy", "git", "links", "slackChannels",
+})
+
+# List parameters the index evaluates itself; any other one sends the request upstream
+_LIST_PARAMS = frozenset({"page", "pageSize", "groups", "owners", "types", "includeOwners", "includeArchived"})
+_ARRAY_PARAMS = ("groups", "owners", "types")
+_BOOLEANS = {"true": True, "false": False}
+
+
+@dataclass(frozen=True)
+class IndexedEntity:
+    """One entity summary as listed by the catalog, with the keys it is indexed by."""
+
+    id: str
+    tag: str
+    type: str
+    groups: frozenset[str]
+    # Tags of the owning teams, which the list endpoint's owners filter matches
+    owners: frozenset[str]
+    archived: bool
+    # Returned by a listing without a types filter
+    listed_by_default: bool
+    position: int
+    # Bumped whenever a sync finds the summary changed
+    revision: int
+    summary: dict[str, Any]
+    json: bytes
+    json_without_owners: bytes
+
+    @classmethod
+    def from_summary(cls, summary: dict[str, Any], listed_by_default: bool, position: int, revision: int) -> "IndexedEntity":
+        owners = summary.get("owners") or {}
+        without_owners = {k: v for k, v in summary.items() if k != "owners"}
+        return cls(
+            id=summary["id"],
+            tag=summary.get("tag", ""),
+            type=summary.get("type", ""),
+            groups=frozenset(summary.get("groups") or ()),
+            owners=frozenset(team["tag"] for team in owners.get("teams") or () if "tag" in team),
+            archived=bool(summary.get("isArchived")),
+            listed_by_default=listed_by_default,
+            position=position,
+            revision=revision,
+            summary=summary,
+            json=_dumps(summary),
+            json_without_owners=_dumps(without_owners),
+        )
+
+
+class CatalogSnapshot:
+    """An immutable view of the catalog as of one sync, indexed by id, tag, type, group and owner."""
+
+    def __init__(self, entities: list[IndexedEntity], synced_at: float):
+        self.synced_at = synced_at
+        self.by_id: dict[str, IndexedEntity] = {}
+        self.by_tag: dict[str, IndexedEntity] = {}
+        self.by_type: dict[str, list[IndexedEntity]] = {TEAM_TYPE: []}
+        self.by_group: dict[str, list[IndexedEntity]] = {}
+        self.by_owner: dict[str, list[IndexedEntity]] = {}
+        self.listed_by_default: list[IndexedEntity] = []
+
+        for entity in entities:
+            self.by_id[entity.id] = entity
+            self.by_tag[entity.tag] = entity
+            self.by_type.setdefault(entity.type, []).append(entity)
+            for group in entity.groups:
+                self.by_group.setdefault(group, []).append(entity)
+            for owner in entity.owners:
+                self.by_owner.setdefault(owner, []).append(entity)
+            if entity.listed_by_default:
+                self.listed_by_default.append(entity)
+
+        # Owner filter values the index can answer: team tags, whether or not they own anything
+        self.known_owners = frozenset(self.by_owner).union(team.tag for team in self.by_type[TEAM_TYPE])
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def resolve(self, tag_or_id: str) -> IndexedEntity | None:
+        return self.by_id.get(tag_or_id) or self.by_tag.get(tag_or_id)
+
+    def select(
+        self,
+        types: set[str],
+        groups: set[str],
+        owners: set[str],
+        include_archived: bool,
+    ) -> list[IndexedEntity] | None:
+        """
+        Return the entities a catalog listing with these filters would, in listing order.
+
+        Values within one filter match any of them; the filters must all
+        match. Returns None for a type the index has never seen, which may
+        be one that is not listed by default, and for an owner that is not
+        a known team tag, such as an individual owner, which only teams
+        are indexed by.
+        """
+        if not types <= self.by_type.keys() or not owners <= self.known_owners:
+            return None
+
+        # Scan the smallest of the index lists that every match must be in
+        if types:
+            candidates = [[self.by_type[t] for t in types]]
+        else:
+            candidates = [[self.listed_by_default]]
+        if groups:
+            candidates.append([self.by_group.get(g, []) for g in groups])
+        if owners:
+            candidates.append([self.by_owner.get(o, []) for o in owners])
+        smallest = min(candidates, key=lambda lists: sum(map(len, lists)))
+
+        seen: set[str] = set()
+        matches = []
+        for entities in smallest:
+            for entity in entities:
+                if entity.id in seen:
+                    continue
+                seen.add(entity.id)
+                if (
+                    (entity.type in types if types else entity.listed_by_default)
+                    and (not groups or not groups.isdisjoint(entity.groups))
+                    and (not owners or not owners.isdisjoint(entity.owners))
+                    and (include_archived or not entity.archived)
+                ):
+                    matches.append(entity)
+
+        if len(smallest) > 1:
+            matches.sort(key=lambda entity: entity.position)
+        return matches
+
+
+class CatalogIndex:
+    """
+    Catalog entities of the server's token, synced from Cortex in the background.
+
+    The sync runs through the client it is bound to, so it is rate limited,
+    retried and traced like any other request. HTTP servers start it with
+    the app (see CatalogIndexLifespan); otherwise it starts with the first
+    request the index sees. It is cancelled when the client closes.
+    """
+
+    def __init__(self, refresh_interval: float, max_staleness: float, detail_max_bytes: int):
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self.details = ResponseCache(detail_max_bytes, detail_max_bytes) if detail_max_bytes > 0 else None
+        self.snapshot: CatalogSnapshot | None = None
+        self.syncs = 0
+        self.full_syncs = 0
+        self.sync_failures = 0
+        self.changed = 0
+        self.removed = 0
+        self.list_hits = 0
+        self.detail_hits = 0
+        self.upstream = 0
+        self.last_sync_seconds = 0.0
+        self._revision = 0
+        # Start of the audit log window the next sync reads, and when the catalog was last listed in full
+        self._changes_since: datetime | None = None
+        self._listed_at = 0.0
+        self._audit_log = True
+        self._client: httpx.AsyncClient | None = None
+        self._identity = ""
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def from_config(cls) -> "CatalogIndex":
+        """Create an index with refresh and size settings from configuration."""
+        return cls(
+            refresh_interval=Config.CATALOG_INDEX_REFRESH,
+            max_staleness=Config.CATALOG_INDEX_MAX_STALENESS,
+            detail_max_bytes=Config.CATALOG_INDEX_DETAIL_MAX_BYTES,
+        )
+
+    def bind(self, client: httpx.AsyncClient) -> None:
+        """Sync through client, and answer only requests made with its default credentials."""
+        self._client = client
+        self._identity = auth_identity(client.headers)
+
+    def start(self) -> None:
+        """Start the background sync if it is not running yet."""
+        if self._task is None and self._client is not None:
+            # A fresh context, so the sync does not inherit the projection or trace of the call that started it
+            self._task = asyncio.create_task(self._run(), context=contextvars.Context())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def current(self, headers: httpx.Headers) -> CatalogSnapshot | None:
+        """Return the snapshot to answer a request with these headers from, if any."""
+        snapshot = self.snapshot
+        if (
+            snapshot is None
+            or time.monotonic() - snapshot.synced_at > self.max_staleness
+            or auth_identity(headers) != self._identity
+        ):
+            return None
+        return snapshot
+
+    async def sync(self) -> None:
+        """
+        Bring the snapshot up to date, reusing unchanged entities.
+
+        Fetches only the entities the audit log shows changed since the
+        previous sync, and lists the whole catalog when there is no
+        snapshot yet, FULL_SYNC_INTERVAL has passed, or the audit log
+        cannot tell what changed.
+        """
+        started = time.monotonic()
+        since = datetime.now(UTC) - timedelta(seconds=CHANGE_FEED_OVERLAP)
+        update = None
+        if (
+            self.snapshot is not None
+            and self._changes_since is not None
+            and started - self._listed_at < FULL_SYNC_INTERVAL
+        ):
+            changes = await self._changes(self._changes_since)
+            if changes is not None:
+                update = await self._fetch_changes(self.snapshot, changes)
+
+        full = update is None
+        entities, changed, removed = await self._list_all() if full else update
+        self.snapshot = CatalogSnapshot(entities, synced_at=time.monotonic())
+        self._changes_since = since
+        if full:
+            self._listed_at = started
+            self.full_syncs += 1
+        self.syncs += 1
+        self.changed += changed
+        self.removed += removed
+        self.last_sync_seconds = time.monotonic() - started
+        logger.info(
+            f"Catalog index synced {len(entities)} entities ({changed} changed, {removed} removed) "
+            f"from {'a full listing' if full else 'the audit log'} in {self.last_sync_seconds:.1f}s"
+        )
+
+    def stats(self) -> dict:
+        """Return index size, sync counters and how reads were answered."""
+        snapshot = self.snapshot
+        return {
+            "ready": snapshot is not None,
+            "entities": len(snapshot) if snapshot is not None else 0,
+            "age_seconds": round(time.monotonic() - snapshot.synced_at, 1) if snapshot is not None else None,
+            "syncs": self.syncs,
+            "full_syncs": self.full_syncs,
+            "sync_failures": self.sync_failures,
+            "last_sync_seconds": round(self.last_sync_seconds, 3),
+            "changed": self.changed,
+            "removed": self.removed,
+            "list_hits": self.list_hits,
+            "detail_hits": self.detail_hits,
+            "upstream": self.upstream,
+            "details": self.details.stats() if self.details is not None else None,
+        }
+
+    def detail_key(self, request: httpx.Request, template: str, entity: IndexedEntity) -> CacheKey:
+        """Key a detail response by entity rather than by tag or id, and by the entity's revision."""
+        query = tuple(sorted(request.url.params.multi_items()))
+        # The credentials are always the index's own, so the revision takes their place
+        return ("GET", template.replace("{tagOrId}", entity.id), query, str(entity.revision))
+
+    async def _run(self) -> None:
+        while True:
+            delay = self.refresh_interval
+            try:
+                await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.sync_failures += 1
+                delay = min(delay, FAILED_SYNC_DELAY)
+                logger.warning(f"Catalog index sync failed, retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+
+    async def _list_all(self) -> tuple[list[IndexedEntity], int, int]:
+        """List the whole catalog; return its entities and how many changed and were removed."""
+        listed: dict[str, dict[str, Any]] = {}
+        listed_by_default: set[str] = set()
+        for entity_type in (None, TEAM_TYPE):
+            async for summary in self._list(entity_type):
+                listed.setdefault(summary["id"], summary)
+                if entity_type is None:
+                    listed_by_default.add(summary["id"])
+
+        previous = self.snapshot.by_id if self.snapshot is not None else {}
+        entities = []
+        changed = 0
+        for position, (entity_id, summary) in enumerate(listed.items()):
+            by_default = entity_id in listed_by_default
+            entity = previous.get(entity_id)
+            if entity is not None and entity.summary == summary and entity.listed_by_default == by_default:
+                entity = dataclasses.replace(entity, position=position)
+            else:
+                self._revision += 1
+                entity = IndexedEntity.from_summary(summary, by_default, position, self._revision)
+                changed += 1
+            entities.append(entity)
+
+        return entities, changed, len(previous.keys() - listed.keys())
+
+    async def _changes(self, since: datetime) -> set[str] | None:
+        """Return the tags or ids the audit log shows changed since, or None if it cannot tell."""
+        if not self._audit_log:
+            return None
+
+        changes: set[str] = set()
+        for object_type in _CHANGE_OBJECT_TYPES:
+            params = {
+                "startTime": since.isoformat(),
+                "objectTypes": object_type,
+                "actions": ["CREATE", "UPDATE", "DELETE"],
+                "page": 0,
+                "pageSize": SYNC_PAGE_SIZE,
+            }
+            response = await self._client.get(AUDIT_LOG_TEMPLATE, params=params, headers={"Cache-Control": "no-cache"})
+            if response.status_code in (403, 404):
+                # Reading the audit log takes a permission the token may not have
+                self._audit_log = False
+                logger.warning(
+                    f"Catalog index cannot read the audit log (HTTP {response.status_code}); "
+                    "every sync lists the whole catalog"
+                )
+                return None
+            response.raise_for_status()
+            body = response.json()
+            if body.get("totalPages", 0) > 1:
+                return None
+            changes.update(log["objectIdentifier"] for log in body["logs"])
+        return changes
+
+    async def _fetch_changes(
+        self, snapshot: CatalogSnapshot, changes: set[str]
+    ) -> tuple[list[IndexedEntity], int, int] | None:
+        """
+        Fetch the changed entities and apply them to snapshot's entities.
+
+        Returns the entities and how many changed and were removed, or None
+        when an entity has a type the index has not seen, since only a
+        listing shows whether that type is listed by default.
+        """
+        identifiers = sorted(changes)
+        details = await asyncio.gather(*(self._details(identifier) for identifier in identifiers))
+
+        default_types = {entity.type for entity in snapshot.listed_by_default}
+        updated: dict[str, IndexedEntity] = {}
+        removed: set[str] = set()
+        position = max((entity.position for entity in snapshot.by_id.values()), default=-1) + 1
+        for identifier, detail in zip(identifiers, details, strict=True):
+            if detail is None:
+                entity = snapshot.resolve(identifier)
+                if entity is not None:
+                    removed.add(entity.id)
+                continue
+            if detail.get("type") not in snapshot.by_type:
+                return None
+
+            previous = snapshot.by_id.get(detail["id"])
+            self._revision += 1
+            if previous is not None:
+                summary = summary_from_details(detail, previous.summary)
+                entity = IndexedEntity.from_summary(summary, previous.listed_by_default, previous.position, self._revision)
+            else:
+                summary = summary_from_details(detail, None)
+                entity = IndexedEntity.from_summary(summary, detail["type"] in default_types, position, self._revision)
+                position += 1
+            updated[entity.id] = entity
+
+        entities = [
+            updated.pop(entity.id, entity) for entity in snapshot.by_id.values() if entity.id not in removed
+        ]
+        entities.extend(updated.values())
+        return entities, len(identifiers) - len(removed), len(removed)
+
+    async def _details(self, tag_or_id: str) -> dict[str, Any] | None:
+        """Return an entity's details, or None if Cortex no longer has it."""
+        response = await self._client.get(
+            f"{LIST_TEMPLATE}/{quote(tag_or_id, safe='')}",
+            params={"includeOwners": "true"},
+            headers={"Cache-Control": "no-cache"},
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def _list(self, entity_type: str | None) -> AsyncIterator[dict[str, Any]]:
+        params: dict[str, Any] = {"includeOwners": "true", "includeArchived": "true", "pageSize": SYNC_PAGE_SIZE}
+        if entity_type is not None:
+            params["types"] = entity_type
+
+        page = 0
+        while True:
+            # no-cache keeps the response cache and this index from answering the sync itself
+            response = await self._client.get(
+                LIST_TEMPLATE, params={**params, "page": page}, headers={"Cache-Control": "no-cache"}
+            )
+            response.raise_for_status()
+            body = response.json()
+            for summary in body["entities"]:
+                yield summary
+            page += 1
+            if page >= body.get("totalPages", 0):
+                return
+
+
+class CatalogIndexTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that answers catalog reads from a CatalogIndex."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, index: CatalogIndex, route_table: RouteTable):
+        self._transport = transport
+        self._index = index
+        self._route_table = route_table
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET" or bypasses_cache(request.headers):
+            return await self._transport.handle_async_request(request)
+
+        route = self._route_table.match(request.method, request.url.path)
+        template = route.template if route is not None else None
+        if template not in (LIST_TEMPLATE, ENTITY_TEMPLATE, TEAM_TEMPLATE):
+            return await self._transport.handle_async_request(request)
+
+        self._index.start()
+        snapshot = self._index.current(request.headers)
+        if snapshot is not None:
+            if template == LIST_TEMPLATE:
+                content = list_response(snapshot, request.url.params)
+                if content is not None:
+                    self._index.list_hits += 1
+                    return _json_response(content)
+            elif self._index.details is not None:
+                entity = snapshot.resolve(request.url.path.rsplit("/", 1)[-1])
+                if entity is not None and (template == ENTITY_TEMPLATE or entity.type == TEAM_TYPE):
+                    return await self._detail(request, template, entity)
+
+        self._index.upstream += 1
+        return await self._transport.handle_async_request(request)
+
+    async def _detail(self, request: httpx.Request, template: str, entity: IndexedEntity) -> httpx.Response:
+        details = self._index.details
+        key = self._index.detail_key(request, template, entity)
+        entry = details.get(key, template)
+        if entry is not None:
+            self._index.detail_hits += 1
+            return httpx.Response(
+                status_code=entry.status_code,
+                headers=entry.headers,
+                content=entry.content,
+                extensions={"cortex_catalog_index": "hit"},
+            )
+
+        self._index.upstream += 1
+        response = await self._transport.handle_async_request(request)
+        if response.status_code != 200 or bypasses_cache(response.headers):
+            return response
+
+        content = await read_raw(response)
+        headers = response.headers.raw
+        # The audit log can miss a change to details alone; a refresh interval bounds how long that lasts
+        ttl = min(self._index.max_staleness, self._index.refresh_interval)
+        details.put(key, response.status_code, headers, content, ttl=ttl)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=headers,
+            content=content,
+            extensions={"cortex_catalog_index": "miss"},
+        )
+
+    async def aclose(self) -> None:
+        await self._index.stop()
+        await self._transport.aclose()
+
+
+class CatalogIndexLifespan:
+    """ASGI middleware starting a CatalogIndex's sync with the app's lifespan and stopping it at shutdown."""
+
+    def __init__(self, app, index: CatalogIndex):
+        self.app = app
+        self.index = index
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "lifespan":
+            await self.app(scope, receive, send)
+            return
+
+        async def receive_and_sync():
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.index.start()
+            elif message["type"] == "lifespan.shutdown":
+                await self.index.stop()
+            return message
+
+        await self.app(scope, receive_and_sync, send)
+
+
+def summary_from_details(details: dict[str, Any], previous: dict[str, Any] | None) -> dict[str, Any]:
+    """
+    Shape an entity's details like its summary in a catalog listing.
+
+    Fields the details leave out, such as team members, keep their values
+    from the previous summary until the next full listing.
+    """
+    summary = dict(previous or {})
+    summary.update((key, value) for key, value in details.items() if key in _SUMMARY_FIELDS)
+    if "ownersV2" in details:
+        summary["owners"] = details["ownersV2"]
+    return summary
+
+
+def list_response(snapshot: CatalogSnapshot, params: httpx.QueryParams) -> bytes | None:
+    """
+    Build the catalog list response body for params from snapshot.
+
+    Returns None when the parameters are ones the index cannot answer,
+    including invalid values, which Cortex should reject itself.
+    """
+    if not params.keys() <= _LIST_PARAMS:
+        return None
+
+    filters: dict[str, set[str]] = {}
+    for name in _ARRAY_PARAMS:
+        # Both repeated parameters and comma separated values are accepted
+        filters[name] = {v.strip() for value in params.get_list(name) for v in value.split(",") if v.strip()}
+
+    scalars = {}
+    for name in ("page", "pageSize", "includeOwners", "includeArchived"):
+        values = params.get_list(name)
+        if len(values) > 1:
+            return None
+        scalars[name] = values[0] if values else None
+
+    try:
+        page = int(scalars["page"] or 0)
+        page_size = int(scalars["pageSize"] or DEFAULT_PAGE_SIZE)
+    except ValueError:
+        return None
+    include_owners = _BOOLEANS.get((scalars["includeOwners"] or "false").lower())
+    include_archived = _BOOLEANS.get((scalars["includeArchived"] or "false").lower())
+    if page < 0 or not 1 <= page_size <= SYNC_PAGE_SIZE or include_owners is None or include_archived is None:
+        return None
+
+    entities = snapshot.select(filters["types"], filters["groups"], filters["owners"], include_archived)
+    if entities is None:
+        return None
+
+    start = page * page_size
+    body = b",".join(
+        entity.json if include_owners else entity.json_without_owners
+        for entity in entities[start:start + page_size]
+    )
+    total = len(entities)
+    return b'{"entities":[%b],"page":%d,"total":%d,"totalPages":%d}' % (
+        body, page, total, math.ceil(total / page_size)
+    )
+
+
+def _json_response(content: bytes) -> httpx.Response:
+    return httpx.Response(
+        status_code=200,
+        headers=[(b"content-type", b"application/json")],
+        content=content,
+        extensions={"cortex_catalog_index": "hit"},
+    )
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode()
@@ -1,9 +1,26 @@
 """Cortex API client configuration."""
 
+from typing import TYPE_CHECKING
+
 import httpx
 
 from ..config import Config
+from ..routes.table import RouteTable
 from ..utils.logging import get_logger
+from ..utils.tracing import Tracer
+from .cache import CachingTransport, ResponseCache
+from .catalog_index import CatalogIndex, CatalogIndexTransport
+from .limits import ResponseLimitTransport
+from .metrics import UpstreamMetrics
+from .pool import TokenPoolTransport, apply_caller_token
+from .projection import ProjectionTransport
+from .ratelimit import OutboundScheduler, RateLimitTransport
+from .retry import RetryPolicy, RetryTransport
+from .singleflight import SingleFlightTransport
+from .tracing import TracingTransport
+
+if TYPE_CHECKING:
+    from .shared_cache import SharedResponseCache
 
 logger = get_logger(__name__)
 
@@ -15,10 +32,27 @@ async def log_request(request: httpx.Request) -> None:
         logger.debug(f"Headers: {dict(request.headers)}")
 
 
-def create_cortex_client() -> httpx.AsyncClient:
+def create_cortex_client(
+    route_table: RouteTable | None = None,
+    response_cache: "ResponseCache | SharedResponseCache | None" = None,
+    scheduler: OutboundScheduler | None = None,
+    retry_policy: RetryPolicy | None = None,
+    upstream_metrics: UpstreamMetrics | None = None,
+    tracer: Tracer | None = None,
+    catalog_index: CatalogIndex | None = None,
+) -> httpx.AsyncClient:
     """
     Create and configure the Cortex API client.
-    
+
+    Args:
+        route_table: Routes of the served spec, used for per-route policies
+        response_cache: Cache for read-only responses; requires route_table
+        scheduler: Rate-limit scheduler that queues requests instead of failing them
+        retry_policy: Retry and hedging policy for idempotent requests
+        upstream_metrics: Metrics recorded from the client's event hooks
+        tracer: Tracer for a client span per request
+        catalog_index: Index answering catalog reads, synced through this client; requires route_table
+
     Returns:
         Configured httpx.AsyncClient instance
     """
@@ -31,20 +65,70 @@ def create_cortex_client() -> httpx.AsyncClient:
     if Config.CORTEX_API_TOKEN:
         headers["Authorization"] = f"Bearer {Config.CORTEX_API_TOKEN}"
 
-    event_hooks = {}
+    event_hooks = {'request': [], 'response': []}
+    if Config.CALLER_TOKENS:
+        event_hooks['request'].append(apply_caller_token)
     if Config.DEBUG:
-        event_hooks['request'] = [log_request]
+        event_hooks['request'].append(log_request)
+    if upstream_metrics is not None:
+        event_hooks['request'].append(upstream_metrics.on_request)
+        event_hooks['response'].append(upstream_metrics.on_response)
+
+    transport: httpx.AsyncBaseTransport = TokenPoolTransport.from_config()
+
+    if Config.RESPONSE_MAX_BYTES or Config.RESPONSE_MAX_ITEMS:
+        transport = ResponseLimitTransport(
+            transport,
+            max_bytes=Config.RESPONSE_MAX_BYTES,
+            max_items=Config.RESPONSE_MAX_ITEMS,
+        )
+
+    if scheduler is not None:
+        transport = RateLimitTransport(transport, scheduler)
+
+    if retry_policy is not None:
+        transport = RetryTransport(transport, retry_policy)
+
+    if Config.SINGLE_FLIGHT_ENABLED:
+        transport = SingleFlightTransport(transport)
+
+    if response_cache is not None and route_table is not None:
+        transport = CachingTransport(
+            transport,
+            cache=response_cache,
+            route_table=route_table,
+            default_ttl=Config.CACHE_DEFAULT_TTL,
+            route_ttls=Config.get_cache_route_ttls(),
+        )
+        logger.info(f"Response cache enabled (default TTL {Config.CACHE_DEFAULT_TTL}s)")
+
+    if catalog_index is not None and route_table is not None:
+        transport = CatalogIndexTransport(transport, catalog_index, route_table)
+        logger.info(f"Catalog index enabled (refresh every {Config.CATALOG_INDEX_REFRESH}s)")
+    else:
+        catalog_index = None
+
+    transport = ProjectionTransport(transport)
+
+    if tracer is not None:
+        transport = TracingTransport(transport, tracer, route_table)
 
     client = httpx.AsyncClient(
         base_url=Config.CORTEX_API_BASE_URL,
         headers=headers,
         event_hooks=event_hooks,
+        transport=transport,
         timeout=httpx.Timeout(30.0),
         follow_redirects=True,
     )
 
+    if catalog_index is not None:
+        catalog_index.bind(client)
+
     logger.info(f"Cortex API client configured for: {Config.CORTEX_API_BASE_URL}")
     if Config.CORTEX_API_TOKEN:
         logger.info(f"Using API token: {Config.get_masked_token()}")
+    if Config.CALLER_TOKENS:
+        logger.info("Using bearer tokens from incoming MCP requests when present")
 
     return client
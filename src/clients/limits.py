@@ -0,0 +1,216 @@
+"""Hard size limits on Cortex API responses, enforced while they stream in."""
+
+import codecs
+import json
+from typing import Any
+
+import httpx
+
+from ..utils.logging import get_logger
+from ..utils.streaming_json import IncrementalDecoder
+
+logger = get_logger(__name__)
+
+# Key added to a truncated response describing what was cut and how to get the rest
+TRUNCATION_KEY = "_truncated"
+
+_DROPPED_HEADERS = frozenset({b"content-length", b"content-encoding"})
+
+# The levels of a decoded document that are written out member by member
+_ENCODE_DEPTH = 2
+
+_encode_value = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+_HINT = (
+    "Only part of the response was returned. Request less at once: select fields "
+    "with `fields`, lower `pageSize`, or narrow the filters."
+)
+_NEXT_HINT = (
+    "Only part of the response was returned. Call again with page={page} and "
+    "pageSize={page_size} for the items after these, or request less at once: "
+    "select fields with `fields` or narrow the filters."
+)
+
+
+class ResponseLimitTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that caps JSON response bodies by bytes and list items.
+
+    With only a byte limit, successful JSON bodies are buffered as they
+    arrive and passed on unchanged. Only a body that runs past max_bytes is
+    decoded: its first max_bytes are parsed incrementally and the part
+    decoded is returned as well-formed JSON with a TRUNCATION_KEY entry
+    explaining the cut. An item limit needs every list counted, so then
+    bodies are decoded as chunks arrive and serialized again, keeping only
+    the decoded value; once a list reaches max_items the upstream stream is
+    closed and the part decoded so far is returned the same way. For paged
+    requests the note names the page that continues right after the items
+    kept, when there is one. A body that has to be decoded but is not valid
+    JSON fails with httpx.DecodingError, which is not retried. A limit of 0
+    disables it.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_bytes: int, max_items: int):
+        self._transport = transport
+        self._max_bytes = max_bytes
+        self._max_items = max_items
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        if not self._applies(response):
+            return response
+
+        try:
+            if self._max_items:
+                content = await self._decode(request, response)
+            else:
+                content = await self._read(request, response)
+        finally:
+            await response.aclose()
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=[(k, v) for k, v in response.headers.raw if k.lower() not in _DROPPED_HEADERS],
+            content=content,
+            extensions=response.extensions,
+        )
+
+    async def _read(self, request: httpx.Request, response: httpx.Response) -> bytes:
+        """Buffer the body as received, decoding only the part within max_bytes if it runs past them."""
+        chunks: list[bytes] = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            received += len(chunk)
+            if self._max_bytes and received > self._max_bytes:
+                break
+            chunks.append(chunk)
+        else:
+            return b"".join(chunks)
+
+        reason = f"more than {self._max_bytes} bytes"
+        decoder = IncrementalDecoder()
+        text = codecs.getincrementaldecoder("utf-8")()
+        try:
+            # Each chunk is released once decoded
+            while chunks:
+                decoder.feed(text.decode(chunks.pop(0)))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise httpx.DecodingError(f"Response exceeded {reason} and is not valid JSON: {e}", request=request) from None
+        return self._truncated(request, decoder.value, reason, received)
+
+    async def _decode(self, request: httpx.Request, response: httpx.Response) -> bytes:
+        """Decode the body as it arrives, stopping at the first list over max_items or at max_bytes."""
+        decoder = IncrementalDecoder(self._max_items)
+        text = codecs.getincrementaldecoder("utf-8")()
+        received = 0
+        reason = None
+
+        try:
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if self._max_bytes and received > self._max_bytes:
+                    reason = f"more than {self._max_bytes} bytes"
+                    break
+                decoder.feed(text.decode(chunk))
+                if decoder.limited:
+                    reason = f"more than {self._max_items} items in a list"
+                    break
+            else:
+                if not received:
+                    return b""
+                decoder.feed(text.decode(b"", final=True))
+                decoder.close()
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise httpx.DecodingError(f"Response is not valid JSON: {e}", request=request) from None
+
+        if decoder.trimmed and reason is None:
+            reason = f"more than {self._max_items} items in a list"
+        if reason is None:
+            return _encode(decoder.value)
+        return self._truncated(request, decoder.value, reason, received)
+
+    def _truncated(self, request: httpx.Request, value: Any, reason: str, received: int) -> bytes:
+        logger.warning(f"Truncated {request.method} {request.url.path}: {reason}")
+        return _encode(_mark_truncated(value, reason, received, request.url.params))
+
+    def _applies(self, response: httpx.Response) -> bool:
+        """Check whether a response could run past a limit."""
+        if not 200 <= response.status_code < 300:
+            return False
+        if "json" not in response.headers.get("content-type", ""):
+            return False
+        if self._max_items:
+            return True
+        # A declared length within the byte limit can't run past it
+        length = response.headers.get("content-length")
+        if length and length.isdigit() and "content-encoding" not in response.headers:
+            return int(length) > self._max_bytes
+        return True
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _encode(value: Any) -> bytes:
+    """
+    Serialize a decoded document compactly.
+
+    The top levels are written member by member and each member is released
+    once written, so the document and its encoding are not both held whole.
+    """
+    pieces: list[bytes] = []
+    _write(value, _ENCODE_DEPTH, pieces)
+    return b"".join(pieces)
+
+
+def _write(value: Any, depth: int, pieces: list[bytes]) -> None:
+    if depth and isinstance(value, list):
+        pieces.append(b"[")
+        for i, item in enumerate(value):
+            if i:
+                pieces.append(b",")
+            _write(item, depth - 1, pieces)
+            value[i] = None
+        pieces.append(b"]")
+    elif depth and isinstance(value, dict):
+        pieces.append(b"{")
+        for i, (key, member) in enumerate(value.items()):
+            if i:
+                pieces.append(b",")
+            pieces.append(_encode_value(key).encode() + b":")
+            _write(member, depth - 1, pieces)
+            value[key] = None
+        pieces.append(b"}")
+    else:
+        pieces.append(_encode_value(value).encode())
+
+
+def _mark_truncated(value: Any, reason: str, received: int, params: httpx.QueryParams) -> dict[str, Any]:
+    """Attach the truncation note, wrapping non-object documents."""
+    note: dict[str, Any] = {"reason": reason, "bytesRead": received, "hint": _HINT}
+    kept = _kept_items(value, params)
+    if kept:
+        note["itemsKept"] = kept
+        page, page_size = int(params.get("page", "0")), int(params["pageSize"])
+        start = page * page_size
+        # With pageSize set to the items kept, a page starts right after them only if they divide the offset
+        if start % kept == 0:
+            note["next"] = {"page": start // kept + 1, "pageSize": kept}
+            note["hint"] = _NEXT_HINT.format(page=start // kept + 1, page_size=kept)
+    if isinstance(value, dict):
+        value[TRUNCATION_KEY] = note
+        return value
+    return {"result": value, TRUNCATION_KEY: note}
+
+
+def _kept_items(value: Any, params: httpx.QueryParams) -> int:
+    """Items kept from the one list of a paged response, or 0 if it is not one."""
+    if not (params.get("page", "0").isdigit() and params.get("pageSize", "").isdigit()):
+        return 0
+    if isinstance(value, list):
+        lists = [value]
+    elif isinstance(value, dict):
+        lists = [v for v in value.values() if isinstance(v, list)]
+    else:
+        return 0
+    return len(lists[0]) if len(lists) == 1 else 0
@@ -0,0 +1,89 @@
+"""Upstream Cortex request metrics recorded from httpx event hooks."""
+
+import time
+from collections.abc import AsyncIterator
+
+import httpx
+
+from ..routes.table import RouteTable
+from ..utils.metrics import Counter, MetricsRegistry
+
+# Request extension holding the time the request was sent
+_STARTED = "cortex_mcp_started"
+
+# Label for requests that match no route in the spec
+_UNKNOWN_ROUTE = "other"
+
+
+class UpstreamMetrics:
+    """
+    Latency, status and byte counts of Cortex API requests by route template.
+
+    Install on_request and on_response as httpx event hooks. The latency is
+    the time until response headers arrived, measured at the client, so
+    cache hits and queueing on rate limits are included. Bodies already
+    in memory are counted whole; streamed ones, such as chunked passthrough
+    responses, are counted as their chunks are sent or read.
+    """
+
+    def __init__(self, registry: MetricsRegistry, route_table: RouteTable | None = None):
+        self._route_table = route_table
+        self._duration = registry.histogram(
+            "upstream_request_duration_seconds",
+            "Cortex API request latency until response headers.",
+            ("route", "method", "status"),
+        )
+        self._bytes_out = registry.counter(
+            "upstream_request_bytes_total", "Request body bytes sent to Cortex.", ("route",)
+        )
+        self._bytes_in = registry.counter(
+            "upstream_response_bytes_total", "Response body bytes received from Cortex.", ("route",)
+        )
+
+    async def on_request(self, request: httpx.Request) -> None:
+        request.extensions[_STARTED] = time.perf_counter()
+        route = self._route(request)
+        if hasattr(request, "_content"):
+            if request.content:
+                self._bytes_out.inc(len(request.content), route)
+        else:
+            request.stream = _CountingStream(request.stream, self._bytes_out, route)
+
+    async def on_response(self, response: httpx.Response) -> None:
+        request = response.request
+        started = request.extensions.pop(_STARTED, None)
+        if started is None:
+            return
+
+        route = self._route(request)
+        self._duration.observe(
+            time.perf_counter() - started, route, request.method, str(response.status_code)
+        )
+        if hasattr(response, "_content"):
+            if response.content:
+                self._bytes_in.inc(len(response.content), route)
+        else:
+            response.stream = _CountingStream(response.stream, self._bytes_in, route)
+
+    def _route(self, request: httpx.Request) -> str:
+        if self._route_table is None:
+            return _UNKNOWN_ROUTE
+        route = self._route_table.match(request.method, request.url.path)
+        return route.template if route is not None else _UNKNOWN_ROUTE
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """Body stream adding the size of each chunk to a byte counter as it passes through."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, counter: Counter, route: str):
+        self._stream = stream
+        self._counter = counter
+        self._route = route
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._counter.inc(len(chunk), self._route)
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
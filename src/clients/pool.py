@@ -0,0 +1,178 @@
+"""Per-token upstream connection pools for multi-tenant deployments."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+
+import httpx
+from fastmcp.exceptions import ToolError
+from fastmcp.server.dependencies import get_http_request
+
+from ..config import Config
+from ..utils.logging import get_logger
+from .cache import auth_identity
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _Pool:
+    """One token's connection pool and its usage bookkeeping."""
+
+    transport: httpx.AsyncBaseTransport
+    last_used: float
+    active: int = 0
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response stream that runs a callback once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Callable[[], None] | None = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if self._release is not None:
+                release, self._release = self._release, None
+                release()
+
+
+class TokenPoolTransport(httpx.AsyncBaseTransport):
+    """
+    Route each Cortex identity through its own pooled upstream transport.
+
+    Pools are kept in an LRU keyed by a hash of the Authorization header, so
+    connections stay warm per tenant without opening a new TLS connection per
+    call. Pools idle for longer than idle_timeout are closed, the least
+    recently used pool is closed once there are more than max_pools, and a
+    semaphore caps concurrent upstream requests across all pools.
+    """
+
+    def __init__(
+        self,
+        max_pools: int,
+        idle_timeout: float,
+        max_connections: int,
+        limits: httpx.Limits,
+        transport_factory: Callable[[httpx.Limits], httpx.AsyncBaseTransport] | None = None,
+    ):
+        self._max_pools = max_pools
+        self._idle_timeout = idle_timeout
+        self._limits = limits
+        self._transport_factory = transport_factory or (
+            lambda pool_limits: httpx.AsyncHTTPTransport(limits=pool_limits)
+        )
+        self._pools: OrderedDict[str, _Pool] = OrderedDict()
+        self._connections = asyncio.Semaphore(max_connections)
+        self._closing: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls) -> "TokenPoolTransport":
+        """Create a pool transport sized from configuration."""
+        return cls(
+            max_pools=Config.CLIENT_POOL_SIZE,
+            idle_timeout=Config.CLIENT_IDLE_TIMEOUT,
+            max_connections=Config.MAX_CONNECTIONS,
+            limits=httpx.Limits(
+                max_connections=Config.MAX_CONNECTIONS_PER_TOKEN,
+                max_keepalive_connections=Config.MAX_CONNECTIONS_PER_TOKEN,
+                keepalive_expiry=Config.CLIENT_IDLE_TIMEOUT,
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self._connections.acquire()
+        pool = self._checkout(auth_identity(request.headers))
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                pool.active -= 1
+                pool.last_used = time.monotonic()
+                self._connections.release()
+
+        try:
+            response = await pool.transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers.raw,
+            stream=_ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+        )
+
+    def _checkout(self, identity: str) -> _Pool:
+        """Return the pool for identity, creating it and evicting stale pools as needed."""
+        now = time.monotonic()
+        pool = self._pools.get(identity)
+        self._evict(now, keep=identity, make_room=pool is None)
+
+        if pool is None:
+            pool = _Pool(self._transport_factory(self._limits), last_used=now)
+            self._pools[identity] = pool
+            logger.debug(f"Opened upstream pool ({len(self._pools)} active)")
+        else:
+            self._pools.move_to_end(identity)
+
+        pool.active += 1
+        pool.last_used = now
+        return pool
+
+    def _evict(self, now: float, keep: str, make_room: bool) -> None:
+        """Close pools that are idle too long or beyond the LRU bound."""
+        overflow = len(self._pools) - self._max_pools + (1 if make_room else 0)
+        for identity, pool in list(self._pools.items()):
+            if pool.active or identity == keep:
+                continue
+            if overflow > 0 or now - pool.last_used > self._idle_timeout:
+                del self._pools[identity]
+                overflow -= 1
+                self._close_later(pool.transport)
+
+    def _close_later(self, transport: httpx.AsyncBaseTransport) -> None:
+        task = asyncio.ensure_future(transport.aclose())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def aclose(self) -> None:
+        pools, self._pools = list(self._pools.values()), OrderedDict()
+        await asyncio.gather(*(pool.transport.aclose() for pool in pools))
+        await asyncio.gather(*self._closing)
+
+
+async def apply_caller_token(request: httpx.Request) -> None:
+    """
+    Use the bearer token of the incoming MCP HTTP request for the upstream call.
+
+    Outside of an HTTP request (stdio, or background work such as the catalog
+    index sync) the server's configured CORTEX_API_TOKEN is left in place. An
+    HTTP caller without a token is refused, so it cannot act as the server's
+    identity, unless CORTEX_CALLER_TOKENS_FALLBACK allows that.
+    """
+    try:
+        incoming = get_http_request()
+    except RuntimeError:
+        return
+
+    authorization = incoming.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer ") and authorization[7:].strip():
+        request.headers["Authorization"] = authorization
+    elif not Config.CALLER_TOKENS_FALLBACK:
+        raise ToolError("This server calls Cortex with the caller's own token; send it as 'Authorization: Bearer <token>'")
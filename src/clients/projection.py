@@ -0,0 +1,70 @@
+"""Response projection applied while Cortex API responses are decoded."""
+
+import json
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import httpx
+
+from ..utils.logging import get_logger
+from ..utils.projection import Projection, project_json
+
+logger = get_logger(__name__)
+
+# Fields requested by the tool call currently being served, if any
+_projection: ContextVar[Projection | None] = ContextVar("cortex_projection", default=None)
+
+_DROPPED_HEADERS = frozenset({b"content-length", b"content-encoding"})
+
+
+@contextmanager
+def projecting(projection: Projection) -> Iterator[None]:
+    """Project every Cortex response received inside this block."""
+    token = _projection.set(projection or None)
+    try:
+        yield
+    finally:
+        _projection.reset(token)
+
+
+class ProjectionTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that trims successful JSON responses to requested fields.
+
+    The projection comes from the surrounding tool call (see projecting()),
+    so cached and coalesced responses below this layer stay complete and
+    can serve calls asking for different fields. The body is read whole
+    before it is projected, so projection shrinks what is passed on to the
+    tool, not what is received from Cortex.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        projection = _projection.get()
+        response = await self._transport.handle_async_request(request)
+        if (
+            projection is None
+            or not 200 <= response.status_code < 300
+            or "json" not in response.headers.get("content-type", "")
+        ):
+            return response
+
+        await response.aread()
+        try:
+            projected = project_json(response.text, projection)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Returning {request.url.path} unprojected: {e}")
+            return response
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=[(k, v) for k, v in response.headers.raw if k.lower() not in _DROPPED_HEADERS],
+            content=json.dumps(projected, separators=(",", ":")).encode(),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
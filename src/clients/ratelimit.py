@@ -0,0 +1,458 @@
+"""Rate-limit-aware scheduling of outbound Cortex API requests."""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any
+
+import anyio
+import httpx
+
+from ..config import Config
+from ..routes.table import RouteTable
+from ..utils.logging import get_logger
+from .cache import auth_identity, read_raw
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from ..utils.shared_db import SharedDatabase
+
+logger = get_logger(__name__)
+
+# Spec extension that sets a route's request rate per token, in requests per second
+RATE_LIMIT_EXTENSION = "x-cortex-mcp-rate-limit"
+
+# Buckets idle this long are dropped once the table grows past _MAX_IDLE_BUCKETS
+_BUCKET_IDLE_SECONDS = 600
+_MAX_IDLE_BUCKETS = 1024
+
+# Seconds between deletions of idle rows from the shared bucket table
+_PRUNE_INTERVAL = 60
+
+# Bucket state shared between processes, in wall-clock seconds
+BUCKET_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    paused_until REAL NOT NULL
+);
+"""
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of blocking.
+
+    Each reservation returns how long the caller must wait, which keeps
+    callers in FIFO order without a lock. A rate of 0 means unlimited, in
+    which case the bucket only enforces pauses from Retry-After.
+    """
+
+    # Plain arithmetic, cheap enough for the event loop
+    blocking = False
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        """Take one token and return the delay before it may be used."""
+        if self.rate <= 0:
+            return max(0.0, self.paused_until - now)
+
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        self.tokens -= 1
+
+        # Refilling restarts at `updated`, which lies in the future while paused
+        delay = self.updated - now
+        if self.tokens < 0:
+            delay += -self.tokens / self.rate
+        return max(0.0, delay)
+
+    def pause(self, until: float) -> None:
+        """Hold every reservation until the given monotonic time."""
+        if until > self.paused_until:
+            self.paused_until = until
+            self.tokens = min(self.tokens, 0)
+            self.updated = max(self.updated, until)
+
+
+class SharedTokenBucket:
+    """
+    TokenBucket whose state lives in a SharedDatabase, so every process draws from it.
+
+    Callers pass and get monotonic times as with TokenBucket. The database
+    holds wall-clock times instead, which processes agree on. Each
+    reservation loads the bucket, applies TokenBucket's arithmetic and
+    stores it again in one write transaction.
+
+    That transaction may wait for other processes' writes, so
+    OutboundScheduler calls these methods from worker threads.
+    """
+
+    blocking = True
+
+    def __init__(self, state: "SharedDatabase", key: str, rate: float, burst: float):
+        self._state = state
+        self._key = key
+        self.rate = rate
+        self.capacity = max(burst, 1)
+
+    def reserve(self, now: float) -> float:
+        """Take one token and return the delay before it may be used."""
+        if self.rate <= 0:
+            # Nothing to take, so only a pause from another process can delay us
+            return max(0.0, self.paused_until - now)
+
+        offset = _wall_clock_offset()
+        with self._state.transaction() as db:
+            bucket = self._load(db, offset)
+            delay = bucket.reserve(now)
+            self._store(db, bucket, offset)
+        return delay
+
+    def pause(self, until: float) -> None:
+        """Hold every reservation, in every process, until the given monotonic time."""
+        offset = _wall_clock_offset()
+        with self._state.transaction() as db:
+            bucket = self._load(db, offset)
+            bucket.pause(until)
+            self._store(db, bucket, offset)
+
+    @property
+    def updated(self) -> float:
+        with self._state.read() as db:
+            return self._load(db, _wall_clock_offset()).updated
+
+    @property
+    def paused_until(self) -> float:
+        with self._state.read() as db:
+            return self._load(db, _wall_clock_offset()).paused_until
+
+    def _load(self, db: "sqlite3.Connection", offset: float) -> TokenBucket:
+        bucket = TokenBucket(self.rate, self.capacity)
+        row = db.execute(
+            "SELECT tokens, updated, paused_until FROM buckets WHERE key = ?", (self._key,)
+        ).fetchone()
+        if row is not None:
+            bucket.tokens = row[0]
+            bucket.updated = row[1] - offset
+            bucket.paused_until = row[2] - offset
+        return bucket
+
+    def _store(self, db: "sqlite3.Connection", bucket: TokenBucket, offset: float) -> None:
+        db.execute(
+            "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+            (self._key, bucket.tokens, bucket.updated + offset, bucket.paused_until + offset),
+        )
+
+
+@dataclass
+class SchedulerCounters:
+    """Counters describing how much the scheduler is queueing."""
+
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    queued_requests: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    throttled_responses: int = 0
+    resent_requests: int = 0
+
+
+class OutboundScheduler:
+    """
+    Per-token and per-route token buckets plus upstream rate-limit feedback.
+
+    Every token gets a bucket at the configured rate, and routes with their own
+    rate (config or the x-cortex-mcp-rate-limit extension) get a bucket per
+    token and route. A 429, or a rate-limit header reporting nothing left,
+    pauses the token's bucket until the upstream says to come back.
+    """
+
+    def __init__(
+        self,
+        route_table: RouteTable,
+        rate: float,
+        burst: float,
+        route_rates: dict[str, float] | None = None,
+        max_wait: float = 60.0,
+        max_resends: int = 3,
+        state: "SharedDatabase | None" = None,
+    ):
+        self._route_table = route_table
+        self._rate = rate
+        self._burst = burst
+        self._route_rates = route_rates or {}
+        self.max_wait = max_wait
+        self.max_resends = max_resends
+        self._state = state
+        self._buckets: dict[tuple[str, str], TokenBucket | SharedTokenBucket] = {}
+        self._next_prune = 0.0
+        self.counters = SchedulerCounters()
+
+    @classmethod
+    def from_config(cls, route_table: RouteTable) -> "OutboundScheduler":
+        """Create a scheduler from configuration."""
+        return cls(
+            route_table,
+            rate=Config.RATE_LIMIT_RPS,
+            burst=Config.RATE_LIMIT_BURST,
+            route_rates=Config.get_rate_limit_routes(),
+            max_wait=Config.RATE_LIMIT_MAX_WAIT,
+            max_resends=Config.RATE_LIMIT_MAX_RESENDS,
+            state=open_bucket_state(Config.RATE_LIMIT_STATE_PATH),
+        )
+
+    def route_rate(self, request: httpx.Request) -> tuple[str, float] | None:
+        """Return the route template and its own rate, if it has one."""
+        route = self._route_table.match(request.method, request.url.path)
+        if route is None:
+            return None
+        if route.template in self._route_rates:
+            return route.template, self._route_rates[route.template]
+        if RATE_LIMIT_EXTENSION in route.extensions:
+            return route.template, float(route.extensions[RATE_LIMIT_EXTENSION])
+        return None
+
+    def buckets_for(self, request: httpx.Request) -> list[TokenBucket | SharedTokenBucket]:
+        """Return the buckets a request must pass, token bucket first."""
+        identity = auth_identity(request.headers)
+        buckets = [self._bucket((identity, ""), self._rate)]
+
+        route_rate = self.route_rate(request)
+        if route_rate is not None:
+            template, rate = route_rate
+            buckets.append(self._bucket((identity, template), rate))
+        return buckets
+
+    async def wait_turn(self, buckets: list[TokenBucket | SharedTokenBucket]) -> float:
+        """
+        Queue until every bucket allows the request through.
+
+        Returns:
+            Seconds spent waiting
+        """
+        await self._prune_shared_buckets()
+        counters = self.counters
+        started = time.monotonic()
+        now = started
+        delay = max([await _off_loop(bucket, bucket.reserve, now) for bucket in buckets])
+
+        if delay > 0:
+            counters.queued_requests += 1
+            counters.queue_depth += 1
+            counters.max_queue_depth = max(counters.max_queue_depth, counters.queue_depth)
+            try:
+                # A pause can be extended while we sleep, so re-check after waking
+                while delay > 0:
+                    await asyncio.sleep(delay)
+                    now = time.monotonic()
+                    paused_until = [await _off_loop(bucket, getattr, bucket, "paused_until") for bucket in buckets]
+                    delay = max(paused_until) - now
+            finally:
+                counters.queue_depth -= 1
+
+        waited = now - started
+        counters.total_wait_seconds += waited
+        counters.max_wait_seconds = max(counters.max_wait_seconds, waited)
+        return waited
+
+    async def observe(
+        self, response: httpx.Response, buckets: list[TokenBucket | SharedTokenBucket]
+    ) -> float | None:
+        """
+        Apply upstream rate-limit feedback from a response.
+
+        Returns:
+            Seconds until the request may be resent if it was throttled, else None
+        """
+        backoff = _retry_after(response.headers)
+        if response.status_code == 429:
+            self.counters.throttled_responses += 1
+            backoff = backoff if backoff is not None else 1.0
+        elif backoff is None:
+            return None
+
+        until = time.monotonic() + backoff
+        await _off_loop(buckets[0], buckets[0].pause, until)
+        return backoff if response.status_code == 429 else None
+
+    def stats(self) -> dict:
+        """Return queue depth, wait time and throttling counters."""
+        return {
+            "queue_depth": self.counters.queue_depth,
+            "max_queue_depth": self.counters.max_queue_depth,
+            "queued_requests": self.counters.queued_requests,
+            "total_wait_seconds": round(self.counters.total_wait_seconds, 3),
+            "max_wait_seconds": round(self.counters.max_wait_seconds, 3),
+            "throttled_responses": self.counters.throttled_responses,
+            "resent_requests": self.counters.resent_requests,
+        }
+
+    def _bucket(self, key: tuple[str, str], rate: float) -> TokenBucket | SharedTokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= _MAX_IDLE_BUCKETS:
+                self._drop_idle_buckets()
+            if self._state is None:
+                bucket = TokenBucket(rate, self._burst)
+            else:
+                bucket = SharedTokenBucket(self._state, json.dumps(key), rate, self._burst)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _drop_idle_buckets(self) -> None:
+        if self._state is not None:
+            # Shared buckets hold no state in this process; their idle rows are pruned on a schedule
+            self._buckets.clear()
+            return
+
+        cutoff = time.monotonic() - _BUCKET_IDLE_SECONDS
+        for key, bucket in list(self._buckets.items()):
+            if bucket.updated < cutoff and bucket.paused_until < cutoff:
+                del self._buckets[key]
+
+    async def _prune_shared_buckets(self) -> None:
+        """Delete rows of shared buckets that every process has left idle, at most once per interval."""
+        if self._state is None or time.monotonic() < self._next_prune:
+            return
+        self._next_prune = time.monotonic() + _PRUNE_INTERVAL
+        await anyio.to_thread.run_sync(self._delete_idle_rows)
+
+    def _delete_idle_rows(self) -> None:
+        # Already imported, since the shared state is open
+        import sqlite3
+
+        cutoff = time.time() - _BUCKET_IDLE_SECONDS
+        try:
+            with self._state.transaction() as db:
+                db.execute("DELETE FROM buckets WHERE updated < ? AND paused_until < ?", (cutoff, cutoff))
+        except sqlite3.Error as e:
+            logger.warning(f"Could not prune shared rate-limit buckets: {e}")
+
+
+def open_bucket_state(path: str) -> "SharedDatabase | None":
+    """
+    Open the database that shares rate-limit buckets between processes.
+
+    Returns:
+        The database, or None when path is empty or cannot be opened, in
+        which case each process keeps its own buckets
+    """
+    if not path:
+        return None
+    # sqlite3 takes a few milliseconds to import; most starts do not need it
+    import sqlite3
+
+    from ..utils.shared_db import SharedDatabase
+
+    try:
+        state = SharedDatabase(path, BUCKET_SCHEMA)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Could not open shared rate-limit state {path}, limiting per process: {e}")
+        return None
+    logger.info(f"Rate-limit buckets shared through: {path}")
+    return state
+
+
+class RateLimitTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that queues requests instead of failing them on rate limits.
+
+    Requests wait for their token and route buckets before going upstream. A
+    429 pauses the token's bucket for the Retry-After period and the request
+    is queued and resent, up to max_resends times and as long as the total
+    wait stays under max_wait. Only then is the 429 returned to the caller.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, scheduler: OutboundScheduler):
+        self._transport = transport
+        self._scheduler = scheduler
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        scheduler = self._scheduler
+        buckets = scheduler.buckets_for(request)
+        waited = 0.0
+        resends = 0
+
+        while True:
+            waited += await scheduler.wait_turn(buckets)
+            response = await self._transport.handle_async_request(request)
+            backoff = await scheduler.observe(response, buckets)
+
+            if (
+                backoff is None
+                or resends >= scheduler.max_resends
+                or waited + backoff > scheduler.max_wait
+            ):
+                return response
+
+            await read_raw(response)
+            resends += 1
+            scheduler.counters.resent_requests += 1
+            logger.info(
+                f"Rate limited on {request.method} {request.url.path}, "
+                f"resending in {backoff:.1f}s"
+            )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+async def _off_loop(bucket: TokenBucket | SharedTokenBucket, function: Any, *args: Any) -> Any:
+    """Call function for bucket, in a worker thread if the bucket lives in a shared database."""
+    if bucket.blocking:
+        return await anyio.to_thread.run_sync(function, *args)
+    return function(*args)
+
+
+def _wall_clock_offset() -> float:
+    """Seconds to add to a monotonic time to get the wall-clock time."""
+    return time.time() - time.monotonic()
+
+
+def _retry_after(headers: httpx.Headers) -> float | None:
+    """
+    Read how long to back off from Retry-After or exhausted rate-limit headers.
+
+    Returns:
+        Seconds to wait, or None if the headers do not ask for a pause
+    """
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    for prefix in ("x-ratelimit-", "ratelimit-"):
+        remaining = headers.get(f"{prefix}remaining")
+        reset = headers.get(f"{prefix}reset")
+        if remaining is None or reset is None:
+            continue
+        try:
+            if float(remaining) > 0:
+                return None
+            reset_value = float(reset)
+        except ValueError:
+            continue
+        # Large values are epoch timestamps, small ones are delta seconds
+        if reset_value > 1_000_000_000:
+            reset_value -= time.time()
+        return max(0.0, reset_value)
+
+    return None
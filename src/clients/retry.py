@@ -0,0 +1,332 @@
+"""Retries and hedged requests for idempotent Cortex API calls."""
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+import httpx
+
+from ..config import Config
+from ..routes.table import RouteTable
+from ..utils.logging import get_logger
+from .cache import read_raw
+from .singleflight import IDEMPOTENT_METHODS
+
+logger = get_logger(__name__)
+
+# Spec extensions that set a route's retry count and minimum hedge delay in seconds
+RETRIES_EXTENSION = "x-cortex-mcp-retries"
+HEDGE_EXTENSION = "x-cortex-mcp-hedge"
+
+RETRYABLE_STATUS_CODES = frozenset({502, 503, 504})
+
+# Latency samples kept per route, and how many are needed before hedging starts
+_LATENCY_WINDOW = 200
+_MIN_LATENCY_SAMPLES = 20
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """How requests to one route are retried and hedged."""
+
+    template: str
+    retries: int
+    hedge_min_delay: float | None = None
+
+
+class RetryBudget:
+    """
+    Cap retries and hedges at a fraction of regular traffic.
+
+    Every request deposits `ratio` tokens and every extra attempt withdraws
+    one, so an upstream outage cannot multiply the load it is already
+    struggling with. The balance starts full so a quiet server can still
+    retry.
+    """
+
+    def __init__(self, ratio: float, capacity: float = 10.0):
+        self.ratio = ratio
+        self.capacity = capacity
+        self.balance = capacity
+
+    def deposit(self) -> None:
+        self.balance = min(self.capacity, self.balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one token for an extra attempt, returning False if none are left."""
+        if self.balance < 1:
+            return False
+        self.balance -= 1
+        return True
+
+
+class LatencyTracker:
+    """Sliding window of response latencies per route template."""
+
+    def __init__(self, window: int = _LATENCY_WINDOW):
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, template: str, seconds: float) -> None:
+        samples = self._samples.get(template)
+        if samples is None:
+            samples = self._samples[template] = deque(maxlen=self._window)
+        samples.append(seconds)
+
+    def p95(self, template: str) -> float | None:
+        """Return the route's 95th percentile latency, or None without enough samples."""
+        samples = self._samples.get(template)
+        if samples is None or len(samples) < _MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def templates(self) -> list[str]:
+        return sorted(self._samples)
+
+
+@dataclass
+class RetryCounters:
+    """Counters describing extra attempts sent upstream."""
+
+    requests: int = 0
+    retries: int = 0
+    hedged_requests: int = 0
+    hedge_wins: int = 0
+    budget_exhausted: int = 0
+
+
+class RetryPolicy:
+    """
+    Retry and hedging settings per route plus the state they share.
+
+    Routes take their retry count and minimum hedge delay from config
+    overrides, then the x-cortex-mcp-retries and x-cortex-mcp-hedge spec
+    extensions, then the defaults. Hedging waits for the route's p95
+    latency, so it only starts once enough responses have been observed.
+    """
+
+    def __init__(
+        self,
+        route_table: RouteTable,
+        retries: int,
+        base_delay: float,
+        max_delay: float,
+        attempt_timeout: float,
+        budget: RetryBudget,
+        route_retries: dict[str, float] | None = None,
+        hedge_routes: dict[str, float] | None = None,
+        hedge_min_delay: float | None = None,
+    ):
+        self._route_table = route_table
+        self._retries = retries
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self.budget = budget
+        self._route_retries = route_retries or {}
+        self._hedge_routes = hedge_routes or {}
+        self._hedge_min_delay = hedge_min_delay
+        self.latencies = LatencyTracker()
+        self.counters = RetryCounters()
+
+    @classmethod
+    def from_config(cls, route_table: RouteTable) -> "RetryPolicy":
+        """Create a retry policy from configuration."""
+        return cls(
+            route_table,
+            retries=Config.RETRY_MAX_RETRIES,
+            base_delay=Config.RETRY_BASE_DELAY,
+            max_delay=Config.RETRY_MAX_DELAY,
+            attempt_timeout=Config.RETRY_ATTEMPT_TIMEOUT,
+            budget=RetryBudget(Config.RETRY_BUDGET_RATIO),
+            route_retries=Config.get_retry_routes(),
+            hedge_routes=Config.get_hedge_routes(),
+            hedge_min_delay=Config.HEDGE_MIN_DELAY if Config.HEDGE_ENABLED else None,
+        )
+
+    def for_request(self, request: httpx.Request) -> RoutePolicy | None:
+        """Return the policy for an idempotent request to a known route, else None."""
+        if request.method not in IDEMPOTENT_METHODS:
+            return None
+        route = self._route_table.match(request.method, request.url.path)
+        if route is None:
+            return None
+
+        if route.template in self._route_retries:
+            retries = self._route_retries[route.template]
+        else:
+            retries = route.extensions.get(RETRIES_EXTENSION, self._retries)
+
+        if route.template in self._hedge_routes:
+            hedge = self._hedge_routes[route.template]
+        else:
+            hedge = route.extensions.get(HEDGE_EXTENSION, self._hedge_min_delay)
+
+        return RoutePolicy(
+            template=route.template,
+            retries=max(0, int(retries)),
+            hedge_min_delay=None if hedge is None else float(hedge),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Return a full-jitter exponential backoff for the given retry number."""
+        return random.uniform(0, min(self._max_delay, self._base_delay * 2**attempt))
+
+    def hedge_delay(self, route: RoutePolicy) -> float | None:
+        """Return how long to wait before hedging, or None to not hedge."""
+        if route.hedge_min_delay is None:
+            return None
+        p95 = self.latencies.p95(route.template)
+        if p95 is None:
+            return None
+        return max(route.hedge_min_delay, p95)
+
+    def withdraw(self) -> bool:
+        """Take budget for an extra attempt, counting refusals."""
+        if self.budget.withdraw():
+            return True
+        self.counters.budget_exhausted += 1
+        return False
+
+    def stats(self) -> dict:
+        """Return retry and hedge counters plus the p95 latency per route."""
+        p95s = {template: self.latencies.p95(template) for template in self.latencies.templates()}
+        return {
+            **asdict(self.counters),
+            "budget": round(self.budget.balance, 2),
+            "p95_ms": {
+                template: round(p95 * 1000, 1) for template, p95 in p95s.items() if p95 is not None
+            },
+        }
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that retries and hedges idempotent requests.
+
+    GET and HEAD requests that fail with a transport error, time out, or
+    return 502/503/504 are retried after a jittered exponential backoff.
+    When an attempt timeout is set, every attempt but the last is bounded
+    by it, so one stuck connection does not hold a call for the full client
+    timeout.
+    Routes with hedging enabled send a second attempt once the first has
+    taken longer than the route's p95 latency and use whichever answers
+    first. Retries and hedges both draw from a shared RetryBudget.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy: RetryPolicy):
+        self._transport = transport
+        self._policy = policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        policy = self._policy
+        route = policy.for_request(request)
+        if route is None:
+            return await self._transport.handle_async_request(request)
+
+        policy.counters.requests += 1
+        policy.budget.deposit()
+
+        attempt = 0
+        while True:
+            last = attempt >= route.retries
+            try:
+                response = await self._send(request, route, last)
+            except httpx.TransportError as exc:
+                if last or not policy.withdraw():
+                    raise
+                reason = type(exc).__name__
+            else:
+                if last or response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+                if not policy.withdraw():
+                    return response
+                await read_raw(response)
+                reason = str(response.status_code)
+
+            delay = policy.backoff(attempt)
+            attempt += 1
+            policy.counters.retries += 1
+            logger.info(
+                f"Retrying {request.method} {request.url.path} after {reason} "
+                f"(attempt {attempt + 1}) in {delay:.2f}s"
+            )
+            await asyncio.sleep(delay)
+
+    async def _send(self, request: httpx.Request, route: RoutePolicy, last: bool) -> httpx.Response:
+        """Send one attempt, hedging it if the route allows."""
+        policy = self._policy
+        timeout = None if last or policy.attempt_timeout <= 0 else policy.attempt_timeout
+        first = asyncio.ensure_future(self._attempt(request, route, timeout))
+
+        hedge_delay = policy.hedge_delay(route)
+        if hedge_delay is None:
+            return await first
+
+        try:
+            done, _ = await asyncio.wait({first}, timeout=hedge_delay)
+        except BaseException:
+            _discard(first)
+            raise
+        if done or not policy.withdraw():
+            return await first
+
+        policy.counters.hedged_requests += 1
+        logger.debug(f"Hedging {request.method} {request.url.path} after {hedge_delay:.3f}s")
+        second = asyncio.ensure_future(self._attempt(request, route, timeout))
+        return await self._first_success(first, second)
+
+    async def _attempt(
+        self, request: httpx.Request, route: RoutePolicy, timeout: float | None
+    ) -> httpx.Response:
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(self._transport.handle_async_request(request), timeout)
+        except TimeoutError:
+            raise httpx.ReadTimeout(
+                f"No response within the {timeout}s attempt timeout", request=request
+            ) from None
+        if response.status_code < 500:
+            self._policy.latencies.record(route.template, time.monotonic() - started)
+        return response
+
+    async def _first_success(
+        self, first: asyncio.Future[httpx.Response], second: asyncio.Future[httpx.Response]
+    ) -> httpx.Response:
+        """Return the first attempt to produce a response and discard the other."""
+        pending = {first, second}
+        winner: asyncio.Future[httpx.Response] | None = None
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        if task is second:
+                            self._policy.counters.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Both attempts can finish in the same wait; close whichever response is not returned
+            for task in (first, second):
+                if task is not winner:
+                    _discard(task)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _discard(task: asyncio.Future[httpx.Response]) -> None:
+    """Cancel a losing attempt, closing its response if it already arrived."""
+
+    def close(task: asyncio.Future[httpx.Response]) -> None:
+        if not task.cancelled() and task.exception() is None:
+            asyncio.ensure_future(task.result().aclose())
+
+    task.cancel()
+    task.add_done_callback(close)
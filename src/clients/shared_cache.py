@@ -0,0 +1,242 @@
+"""
+Response cache shared by every server process on a host.
+
+With the stdio transport each agent session is its own process, so the
+in-process ResponseCache starts empty every time. The relationship types,
+scorecard definitions and metric definitions are fetched again by every
+session, though they rarely change.
+
+SharedResponseCache keeps the same entries in a SharedDatabase instead,
+which every process on the host can open at once. Expiry uses
+wall-clock time, since monotonic clocks are not comparable across
+processes. Once the stored entries exceed max_bytes, expired entries go
+first and then the least recently used.
+
+Hit and miss counters are kept per process. Entries, bytes and evictions
+are read from the database and cover every process.
+
+A cache that cannot be read or written never fails a request: the lookup
+is treated as a miss and the response is not stored.
+
+Lookups and stores may wait up to the database's busy timeout for another
+process's write, so CachingTransport runs them in worker threads rather
+than on the event loop.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+from ..config import Config
+from ..utils.logging import get_logger
+from ..utils.shared_db import SharedDatabase
+from .cache import CachedResponse, CacheKey, RouteStats, entry_size
+
+logger = get_logger(__name__)
+
+# Hits only refresh an entry's last use when it is older than this, so most hits do not write
+ACCESS_RESOLUTION = 1.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    status_code INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    -- Last, so reading the other columns never walks a large body's overflow pages
+    content BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters VALUES ('bytes', 0), ('evictions', 0);
+-- Summing sizes on every write would take longer the more entries there are
+CREATE TRIGGER IF NOT EXISTS responses_insert AFTER INSERT ON responses BEGIN
+    UPDATE counters SET value = value + NEW.size WHERE name = 'bytes';
+END;
+CREATE TRIGGER IF NOT EXISTS responses_delete AFTER DELETE ON responses BEGIN
+    UPDATE counters SET value = value - OLD.size WHERE name = 'bytes';
+END;
+"""
+
+
+class SharedResponseCache:
+    """
+    Byte-bounded cache with per-entry expiry, stored in a SQLite file.
+
+    A drop-in replacement for ResponseCache that every process opening the
+    same path shares.
+    """
+
+    # Lookups and stores may wait on other processes, so callers run them off the event loop
+    blocking = True
+
+    def __init__(self, path: str, max_bytes: int, max_entry_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._stats: dict[str, RouteStats] = {}
+        # Lookups run in several threads at once
+        self._stats_lock = threading.Lock()
+        self._db = SharedDatabase(path, _SCHEMA)
+
+    @classmethod
+    def from_config(cls) -> "SharedResponseCache":
+        """Create a cache at the configured path, sized from configuration."""
+        return cls(
+            path=Config.CACHE_PATH,
+            max_bytes=Config.CACHE_MAX_BYTES,
+            max_entry_bytes=Config.CACHE_MAX_ENTRY_BYTES,
+        )
+
+    def __len__(self) -> int:
+        with self._db.read() as db:
+            return db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        with self._db.read() as db:
+            return _counter(db, "bytes")
+
+    def get(self, key: CacheKey, route: str) -> CachedResponse | None:
+        """Return a live entry and count the lookup against route."""
+        now = time.time()
+        try:
+            with self._db.read() as db:
+                row = db.execute(
+                    "SELECT size, expires_at, accessed_at, status_code, headers, content"
+                    " FROM responses WHERE key = ? AND expires_at > ?",
+                    (_encode_key(key), now),
+                ).fetchone()
+                if row is not None and row[2] < now - ACCESS_RESOLUTION:
+                    # A single statement, so it commits on its own
+                    db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, _encode_key(key)))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache lookup failed: {e}")
+            row = None
+
+        with self._stats_lock:
+            stats = self._stats.setdefault(route, RouteStats())
+            if row is None:
+                stats.misses += 1
+            else:
+                stats.hits += 1
+        if row is None:
+            return None
+
+        size, expires_at, _, status_code, headers, content = row
+        return CachedResponse(
+            status_code=status_code,
+            headers=_decode_headers(headers),
+            content=content,
+            # Callers only compare expiry with the monotonic clock
+            expires_at=time.monotonic() + expires_at - now,
+            size=size,
+        )
+
+    def put(
+        self,
+        key: CacheKey,
+        status_code: int,
+        headers: list[tuple[bytes, bytes]],
+        content: bytes,
+        ttl: float,
+    ) -> bool:
+        """
+        Store a response for ttl seconds.
+
+        Returns:
+            True if the response was stored
+        """
+        size = entry_size(headers, content)
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            return False
+
+        now = time.time()
+        try:
+            with self._db.transaction() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (_encode_key(key), size, now + ttl, now, status_code, _encode_headers(headers), content),
+                )
+                self._evict(db, now)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed: {e}")
+            return False
+        return True
+
+    def clear(self) -> None:
+        """Drop every entry, for every process."""
+        with self._db.transaction() as db:
+            db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        self._db.close()
+
+    def stats(self) -> dict:
+        """Return this process's hit/miss counters per route plus the shared occupancy."""
+        with self._stats_lock:
+            routes = {
+                route: {"hits": s.hits, "misses": s.misses}
+                for route, s in sorted(self._stats.items())
+            }
+        hits = sum(s["hits"] for s in routes.values())
+        misses = sum(s["misses"] for s in routes.values())
+        try:
+            with self._db.read() as db:
+                entries = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                size = _counter(db, "bytes")
+                evictions = _counter(db, "evictions")
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache stats failed: {e}")
+            entries = size = evictions = 0
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "evictions": evictions,
+            "path": self.path,
+            "routes": routes,
+        }
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        """Bring the stored size under max_bytes; runs inside the caller's write transaction."""
+        if _counter(db, "bytes") <= self.max_bytes:
+            return
+
+        # Expired entries go first, whoever used them last; like ResponseCache, they are not evictions
+        db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        excess = _counter(db, "bytes") - self.max_bytes
+        if excess <= 0:
+            return
+
+        keys = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM responses WHERE key = ?", keys)
+        db.execute("UPDATE counters SET value = value + ? WHERE name = 'evictions'", (len(keys),))
+
+
+def _counter(db: sqlite3.Connection, name: str) -> int:
+    row = db.execute("SELECT value FROM counters WHERE name = ?", (name,)).fetchone()
+    return row[0] if row else 0
+
+
+def _encode_key(key: CacheKey) -> str:
+    return json.dumps(key, separators=(",", ":"))
+
+
+def _encode_headers(headers: list[tuple[bytes, bytes]]) -> str:
+    return json.dumps([[k.decode("latin-1"), v.decode("latin-1")] for k, v in headers], separators=(",", ":"))
+
+
+def _decode_headers(headers: str) -> list[tuple[bytes, bytes]]:
+    return [(k.encode("latin-1"), v.encode("latin-1")) for k, v in json.loads(headers)]
@@ -0,0 +1,88 @@
+"""Request coalescing for identical in-flight Cortex API calls."""
+
+import asyncio
+from dataclasses import dataclass
+
+import httpx
+
+from ..utils.logging import get_logger
+from .cache import CacheKey, cache_key, read_raw
+
+logger = get_logger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD"})
+
+
+@dataclass(frozen=True)
+class SharedResponse:
+    """An upstream response captured so several callers can each get a copy."""
+
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    content: bytes
+
+    def to_response(self, shared: bool) -> httpx.Response:
+        return httpx.Response(
+            status_code=self.status_code,
+            headers=self.headers,
+            content=self.content,
+            extensions={"cortex_coalesced": shared},
+        )
+
+
+class SingleFlightTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that shares one upstream request between identical callers.
+
+    While a GET or HEAD is in flight, any identical request (same method,
+    path, query and credentials) waits for it instead of going upstream,
+    and every caller receives its own copy of the response. The upstream
+    call runs in its own task, so a caller being cancelled does not fail
+    the others waiting on it.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self._in_flight: dict[CacheKey, asyncio.Future[SharedResponse]] = {}
+        self.upstream_requests = 0
+        self.coalesced_requests = 0
+
+    def stats(self) -> dict:
+        """Return upstream and coalesced request counters."""
+        return {
+            "upstream": self.upstream_requests,
+            "coalesced": self.coalesced_requests,
+            "in_flight": len(self._in_flight),
+        }
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in IDEMPOTENT_METHODS:
+            return await self._transport.handle_async_request(request)
+
+        key = cache_key(request)
+        flight = self._in_flight.get(key)
+        shared = flight is not None
+
+        if shared:
+            self.coalesced_requests += 1
+            logger.debug(f"Coalescing: {request.method} {request.url.path}")
+        else:
+            self.upstream_requests += 1
+            flight = asyncio.ensure_future(self._fetch(key, request))
+            # Mark the outcome as retrieved even if every waiter was cancelled
+            flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._in_flight[key] = flight
+
+        result = await asyncio.shield(flight)
+        return result.to_response(shared)
+
+    async def _fetch(self, key: CacheKey, request: httpx.Request) -> SharedResponse:
+        try:
+            response = await self._transport.handle_async_request(request)
+            content = await read_raw(response)
+            return SharedResponse(response.status_code, response.headers.raw, content)
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
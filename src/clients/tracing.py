@@ -0,0 +1,47 @@
+"""Client spans for Cortex API requests, with trace context sent upstream."""
+
+import httpx
+
+from ..routes.table import RouteTable
+from ..utils.tracing import SPAN_KIND_CLIENT, TRACEPARENT_HEADER, Tracer
+
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that opens a client span per Cortex API request.
+
+    It is the outermost layer, so the span covers cache lookups, queueing
+    on rate limits and retries below it. The span's traceparent header is
+    sent upstream so Cortex-side traces can join the tool call's trace.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        tracer: Tracer,
+        route_table: RouteTable | None = None,
+    ):
+        self._transport = transport
+        self._tracer = tracer
+        self._route_table = route_table
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        route = self._route_table.match(request.method, request.url.path) if self._route_table else None
+        template = route.template if route is not None else request.url.path
+        attributes = {
+            "http.request.method": request.method,
+            "http.route": template,
+            "url.path": request.url.path,
+            "server.address": request.url.host,
+        }
+
+        with self._tracer.span(f"{request.method} {template}", SPAN_KIND_CLIENT, attributes) as span:
+            request.headers[TRACEPARENT_HEADER] = span.traceparent
+            response = await self._transport.handle_async_request(request)
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 400:
+                span.set_error(f"HTTP {response.status_code}")
+            return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
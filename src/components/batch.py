@@ -0,0 +1,150 @@
+"""Batch tools that fetch many Cortex entities in one tool call."""
+
+import asyncio
+from typing import Annotated, Any
+from urllib.parse import quote
+
+import httpx
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+from fastmcp.tools import Tool
+from pydantic import Field
+
+from ..config import Config
+from ..middleware.projection import FIELDS_ARGUMENT, fields_schema
+from ..routes.mappers import is_mcp_enabled
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Single-entity GET routes that get a batch variant, keyed by their only path parameter
+BATCH_TEMPLATES = (
+    "/api/v1/catalog/{tagOrId}",
+    "/api/v1/teams/{tagOrId}",
+    "/api/v1/scorecards/{tag}",
+)
+
+BATCH_SUFFIX = "Batch"
+
+
+def register_batch_tools(
+    mcp_server: FastMCP,
+    spec: dict[str, Any],
+    client: httpx.AsyncClient,
+) -> list[str]:
+    """
+    Add a batch variant of every MCP-enabled route in BATCH_TEMPLATES.
+
+    Args:
+        mcp_server: Server to add the tools to
+        spec: OpenAPI spec the server was built from
+        client: Shared Cortex API client
+
+    Returns:
+        Names of the tools added
+    """
+    names = []
+    for template in BATCH_TEMPLATES:
+        operation = spec.get("paths", {}).get(template, {}).get("get")
+        if operation is None or not is_mcp_enabled(operation):
+            logger.debug(f"No MCP-enabled GET {template}, skipping its batch tool")
+            continue
+
+        name = f"{operation.get('operationId') or _name_from_template(template)}{BATCH_SUFFIX}"
+        fetcher = BatchFetcher(client, template, Config.BATCH_CONCURRENCY, Config.BATCH_MAX_KEYS)
+        mcp_server.add_tool(_batch_tool(name, operation, fetcher))
+        names.append(name)
+
+    logger.info(f"Registered {len(names)} batch tools")
+    return names
+
+
+class BatchFetcher:
+    """
+    Fetch one route for many path values concurrently.
+
+    At most `concurrency` requests are in flight per call. Duplicate keys
+    are fetched once, and a failing key is reported next to the others
+    instead of failing the whole call.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, template: str, concurrency: int, max_keys: int):
+        self._client = client
+        self._template = template
+        self._parameter = template[template.rindex("{") + 1:template.rindex("}")]
+        self.concurrency = max(1, concurrency)
+        self.max_keys = max_keys
+
+    async def fetch(self, keys: list[str]) -> dict[str, Any]:
+        """Return {"results": {key: body}, "errors": {key: error}} for every key."""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            raise ToolError("At least one tag is required")
+        if self.max_keys and len(keys) > self.max_keys:
+            raise ToolError(f"At most {self.max_keys} tags can be fetched in one call, got {len(keys)}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results: dict[str, Any] = {}
+        errors: dict[str, Any] = {}
+
+        async def fetch_one(key: str) -> None:
+            async with semaphore:
+                try:
+                    results[key] = await self._get(key)
+                except httpx.HTTPStatusError as e:
+                    errors[key] = {"status": e.response.status_code, "error": _error_detail(e.response)}
+                except httpx.HTTPError as e:
+                    errors[key] = {"error": f"{type(e).__name__}: {e}"}
+
+        await asyncio.gather(*(fetch_one(key) for key in keys))
+
+        # Report in request order rather than completion order
+        return {
+            "results": {key: results[key] for key in keys if key in results},
+            "errors": {key: errors[key] for key in keys if key in errors},
+        }
+
+    async def _get(self, key: str) -> Any:
+        path = self._template.replace(f"{{{self._parameter}}}", quote(key, safe=""))
+        response = await self._client.get(path)
+        response.raise_for_status()
+        return response.json()
+
+
+def _batch_tool(name: str, operation: dict[str, Any], fetcher: BatchFetcher) -> Tool:
+    summary = operation.get("x-cortex-mcp-description") or operation.get("summary") or name
+    description = (
+        f"Batch version of {name.removesuffix(BATCH_SUFFIX)}: {summary.rstrip('.')}. "
+        f"Fetches up to {fetcher.max_keys} tags in one call and returns "
+        f"`results` and `errors`, both keyed by tag."
+    )
+
+    async def batch(
+        tags: Annotated[list[str], Field(description="Tags or ids to fetch")],
+    ) -> dict[str, Any]:
+        return await fetcher.fetch(tags)
+
+    tool = Tool.from_function(
+        batch,
+        name=name,
+        description=description,
+        tags={"cortex-api", "batch"},
+        output_schema=None,
+    )
+    # Served by ProjectionMiddleware, which applies it to every entity in the batch
+    tool.parameters = {
+        **tool.parameters,
+        "properties": {**tool.parameters["properties"], FIELDS_ARGUMENT: fields_schema()},
+    }
+    return tool
+
+
+def _name_from_template(template: str) -> str:
+    return "get" + "".join(part.title() for part in template.split("/") if part and "{" not in part)
+
+
+def _error_detail(response: httpx.Response) -> Any:
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
@@ -7,6 +7,14 @@ from fastmcp.server.openapi import (
     OpenAPITool,
 )
 
+from ..config import Config
+from ..middleware.pagination import (
+    ALL_PAGES_ARGUMENT,
+    PAGE_PARAMETER,
+    all_pages_schema,
+    is_paginated,
+)
+from ..middleware.projection import FIELDS_ARGUMENT, fields_schema
 from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -80,6 +88,11 @@ def customize_components(
                 component.output_schema = new_output
                 logger.debug(f"  After modification: '$defs' in output_schema = {'$defs' in component.output_schema}")
 
+        if isinstance(getattr(component, "parameters", None), dict):
+            _add_fields_argument(component)
+            if is_paginated(route):
+                _add_all_pages_argument(component)
+
     elif isinstance(component, OpenAPIResource):
         # Resources are collections, emphasize listing/querying
         if not custom_description:
@@ -100,6 +113,32 @@ def customize_components(
     logger.debug(f"Final tags: {component.tags}")
 
 
+def _add_fields_argument(tool: OpenAPITool) -> None:
+    """Offer field projection on a tool, served by ProjectionMiddleware."""
+    properties = tool.parameters.get("properties", {})
+    if FIELDS_ARGUMENT in properties:
+        logger.debug(f"  {tool.name} already takes '{FIELDS_ARGUMENT}', not adding projection")
+        return
+    tool.parameters = {
+        **tool.parameters,
+        "properties": {**properties, FIELDS_ARGUMENT: fields_schema()},
+    }
+
+
+def _add_all_pages_argument(tool: OpenAPITool) -> None:
+    """Offer auto-pagination on a paged list tool, served by PaginationMiddleware."""
+    # Copy rather than mutate: resolved schemas share subtrees between operations
+    parameters = dict(tool.parameters)
+    properties = dict(parameters.get("properties", {}))
+    properties[ALL_PAGES_ARGUMENT] = all_pages_schema(
+        Config.PAGINATION_MAX_ITEMS, Config.PAGINATION_MAX_BYTES
+    )
+    parameters["properties"] = properties
+    if PAGE_PARAMETER in parameters.get("required", []):
+        parameters["required"] = [n for n in parameters["required"] if n != PAGE_PARAMETER]
+    tool.parameters = parameters
+
+
 def _format_tool_description(route: HTTPRoute, original: str) -> str:
     """Format description for tool components."""
     method = route.method.upper()
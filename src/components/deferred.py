@@ -0,0 +1,77 @@
+"""Tools built in the background while the server already answers requests."""
+
+import threading
+import time
+from collections.abc import Callable
+
+import anyio
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import Tool, ToolResult
+from mcp import McpError
+from mcp.types import INTERNAL_ERROR, ErrorData
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class DeferredTools(Middleware):
+    """
+    Build a server's tools in a worker thread and hold tool requests until they exist.
+
+    initialize needs no tools. So a stdio client gets its response while
+    the spec is still loading, instead of after the whole registry is
+    built. tools/list and tools/call wait for the build. If it failed,
+    they fail with its error.
+    """
+
+    def __init__(self, build: Callable[[], None]):
+        self._build = build
+        self._done = threading.Event()
+        self._error: BaseException | None = None
+        self.seconds: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def start(self) -> None:
+        """Start building; call once, after the rest of the server is set up."""
+        threading.Thread(target=self._run, name="cortex-mcp-tools", daemon=True).start()
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        try:
+            self._build()
+        except BaseException as e:
+            self._error = e
+            logger.error(f"Building tools failed: {e}", exc_info=True)
+        finally:
+            self.seconds = time.perf_counter() - started
+            self._done.set()
+        if self._error is None:
+            logger.info(f"Tools ready after {self.seconds * 1000:.1f} ms")
+
+    async def wait(self) -> None:
+        """Return once the tools exist; raise if building them failed."""
+        if not self._done.is_set():
+            await anyio.to_thread.run_sync(self._done.wait)
+        if self._error is not None:
+            raise McpError(ErrorData(code=INTERNAL_ERROR, message=f"Tools are unavailable: {self._error}"))
+
+    async def on_list_tools(
+        self,
+        context: MiddlewareContext[mt.ListToolsRequest],
+        call_next: CallNext[mt.ListToolsRequest, list[Tool]],
+    ) -> list[Tool]:
+        await self.wait()
+        return await call_next(context)
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        await self.wait()
+        return await call_next(context)
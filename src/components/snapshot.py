@@ -0,0 +1,165 @@
+"""
+Tool registry snapshots.
+
+FastMCP.from_openapi parses every route of the compiled spec into HTTPRoute
+models and derives each tool's input schema and description from them.
+customize_components then rewrites every tool. This takes most of the time a
+start spends on its tools, yet it yields the same tools whenever the spec
+is unchanged.
+
+A snapshot holds those final tools: names, descriptions, tags, input schemas
+and the request template each tool sends, which is its route without the
+responses and schema definitions that only feed the description. Restoring
+a tool validates its route model and calls the OpenAPITool constructor.
+
+A snapshot is only used when its key matches the current start: the source
+spec hash, the fastmcp version, the code of the modules that shape tools,
+and the settings baked into their schemas. Otherwise the tools are built in
+full and the snapshot is written again.
+"""
+
+import hashlib
+import json
+import os
+from collections.abc import Iterable
+from typing import Any
+
+import fastmcp
+import httpx
+from fastmcp.server.openapi import OpenAPITool
+from fastmcp.utilities.openapi import HTTPRoute
+from mcp.types import ToolAnnotations
+
+from ..config import Config
+from ..middleware import pagination, projection
+from ..routes import mappers
+from ..utils import openapi_resolver, schema_minifier, spec_compiler
+from ..utils.logging import get_logger
+from . import customizers
+
+logger = get_logger(__name__)
+
+# Bump when the snapshot layout changes so old snapshots are rebuilt
+FORMAT_VERSION = 1
+
+# Modules whose code decides what the tools look like; editing one invalidates snapshots
+TOOL_SHAPING_MODULES = (
+    customizers, mappers, pagination, projection, spec_compiler, openapi_resolver, schema_minifier
+)
+
+# Route fields used only to build descriptions and output schemas, never to send a request
+BUILD_ONLY_ROUTE_FIELDS = {"responses", "schema_definitions"}
+
+
+def snapshot_path(cache_dir: str, spec_hash: str) -> str:
+    """Return the snapshot location for a given source spec hash."""
+    return os.path.join(cache_dir, f"tools-{spec_hash[:16]}.json")
+
+
+def snapshot_key(spec_hash: str) -> dict[str, Any]:
+    """Return everything a snapshot must have been built with to be reused."""
+    code = hashlib.sha256()
+    for module in TOOL_SHAPING_MODULES:
+        with open(module.__file__, "rb") as f:
+            code.update(f.read())
+
+    return {
+        "format_version": FORMAT_VERSION,
+        "source_sha256": spec_hash,
+        "fastmcp_version": fastmcp.__version__,
+        "code_sha256": code.hexdigest(),
+        "settings": {
+            "pagination_max_items": Config.PAGINATION_MAX_ITEMS,
+            "pagination_max_bytes": Config.PAGINATION_MAX_BYTES,
+            "schema_max_bytes": Config.OPENAPI_SCHEMA_MAX_BYTES,
+        },
+    }
+
+
+def dump_tool(tool: OpenAPITool) -> dict[str, Any]:
+    """Return the JSON form of a built OpenAPI tool."""
+    return {
+        "name": tool.name,
+        "description": tool.description,
+        "tags": sorted(tool.tags),
+        "parameters": tool.parameters,
+        "output_schema": tool.output_schema,
+        "annotations": tool.annotations.model_dump(mode="json") if tool.annotations else None,
+        "timeout": tool._timeout,
+        "route": tool._route.model_dump(mode="json", by_alias=True, exclude=BUILD_ONLY_ROUTE_FIELDS),
+    }
+
+
+def restore_tool(entry: dict[str, Any], client: httpx.AsyncClient) -> OpenAPITool:
+    """Rebuild a tool from dump_tool() output, sending its requests through client."""
+    annotations = entry["annotations"]
+    return OpenAPITool(
+        client=client,
+        route=HTTPRoute.model_validate(entry["route"]),
+        name=entry["name"],
+        description=entry["description"],
+        parameters=entry["parameters"],
+        output_schema=entry["output_schema"],
+        tags=set(entry["tags"]),
+        timeout=entry["timeout"],
+        annotations=ToolAnnotations.model_validate(annotations) if annotations else None,
+    )
+
+
+def read_snapshot(path: str, key: dict[str, Any]) -> list[dict[str, Any]] | None:
+    """
+    Read a snapshot if it exists and was built with key.
+
+    Returns:
+        The dumped tools, or None if the snapshot is missing, stale or unreadable
+    """
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable tool snapshot {path}: {e}")
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get("key") != key:
+        logger.info(f"Tool snapshot {path} is stale, rebuilding")
+        return None
+
+    return snapshot.get("tools")
+
+
+def load_tools(cache_dir: str, spec_hash: str, client: httpx.AsyncClient) -> list[OpenAPITool] | None:
+    """
+    Restore the tools snapshotted for spec_hash.
+
+    Returns:
+        The tools, or None when there is no usable snapshot
+    """
+    path = snapshot_path(cache_dir, spec_hash)
+    entries = read_snapshot(path, snapshot_key(spec_hash))
+    if entries is None:
+        return None
+
+    try:
+        tools = [restore_tool(entry, client) for entry in entries]
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"Ignoring malformed tool snapshot {path}: {e}")
+        return None
+
+    logger.info(f"Restored {len(tools)} tools from snapshot: {path}")
+    return tools
+
+
+def save_tools(cache_dir: str, spec_hash: str, tools: Iterable[OpenAPITool]) -> None:
+    """Write the snapshot of tools built for spec_hash."""
+    path = snapshot_path(cache_dir, spec_hash)
+    try:
+        spec_compiler.write_json_atomic(path, {
+            "key": snapshot_key(spec_hash),
+            "tools": [dump_tool(tool) for tool in tools],
+        })
+        logger.info(f"Tool snapshot written to: {path}")
+    except OSError as e:
+        # Like the compiled spec, a read-only cache must not stop the server from starting
+        logger.warning(f"Could not write tool snapshot to {path}: {e}")
@@ -0,0 +1,116 @@
+"""
+Precomputed tools/list responses.
+
+FastMCP converts every tool to its MCP form again for each tools/list,
+copying its inlined input schema. The tools only change when the registry
+does, and short-lived agent sessions ask for them first thing. So
+ToolListCache takes over the tools/list handler and builds the result once
+per set of tools. It still runs FastMCP's middleware chain (which is how
+deferred servers hold tools/list until their tools exist) and compares the
+tools it returns with the ones the cached result was built from.
+
+Every result carries an ETag, a hash of the serialized tools, in its _meta.
+A client that sends the ETag it already has as `ifNoneMatch` in the
+request's _meta gets an empty list marked `notModified` instead of the
+whole list again. HTTP transports also serve the same list as JSON at
+GET /tools, honouring If-None-Match, so proxies can cache it.
+
+Only added, removed, replaced, enabled or disabled tools are noticed.
+Editing a registered tool in place does not invalidate the cache.
+"""
+
+import hashlib
+import json
+from typing import Any
+
+import mcp.types as mt
+from fastmcp import FastMCP
+from fastmcp.tools import Tool
+
+from ..utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Keys in the _meta of tools/list requests and results
+ETAG = "etag"
+IF_NONE_MATCH = "ifNoneMatch"
+NOT_MODIFIED = "notModified"
+
+
+class ToolListCache:
+    """Serve tools/list from a result built once per set of tools."""
+
+    def __init__(self, mcp_server: FastMCP):
+        self._server = mcp_server
+        self._tools: list[Tool] = []
+        self._result: mt.ListToolsResult | None = None
+        self.body = b""
+        self.etag = ""
+        self._builds = 0
+        self._hits = 0
+        self._not_modified = 0
+
+    def install(self) -> "ToolListCache":
+        """Replace the server's tools/list handler with this cache."""
+        # FastMCP registers _mcp_list_tools on the low-level server; registering again replaces it
+        self._server._mcp_server.list_tools()(self.handle)
+        return self
+
+    async def handle(self, request: mt.ListToolsRequest) -> mt.ListToolsResult:
+        """Answer a tools/list request, or tell the client its copy is current."""
+        # The annotation tells the low-level server to pass the request; it passes None for its own lookups
+        result = await self.current()
+        if self.etag and _request_meta(request).get(IF_NONE_MATCH) == self.etag:
+            self._not_modified += 1
+            return mt.ListToolsResult(tools=[], _meta={ETAG: self.etag, NOT_MODIFIED: True})
+        return result
+
+    async def current(self) -> mt.ListToolsResult:
+        """Return the result for the server's current tools, rebuilding it if they changed."""
+        # The same call FastMCP's own handler makes, middleware included
+        tools = await self._server._list_tools()
+        if self._result is not None and _same(tools, self._tools):
+            self._hits += 1
+            return self._result
+
+        self._build(tools)
+        return self._result
+
+    def _build(self, tools: list[Tool]) -> None:
+        listed = [
+            tool.to_mcp_tool(name=tool.key, include_fastmcp_meta=self._server.include_fastmcp_meta)
+            for tool in tools
+        ]
+        serialized = [tool.model_dump(by_alias=True, mode="json", exclude_none=True) for tool in listed]
+        self.etag = hashlib.sha256(
+            json.dumps(serialized, separators=(",", ":"), sort_keys=True).encode()
+        ).hexdigest()[:16]
+        self.body = json.dumps({"tools": serialized, "_meta": {ETAG: self.etag}}, separators=(",", ":")).encode()
+
+        self._result = mt.ListToolsResult(tools=listed, _meta={ETAG: self.etag})
+        self._tools = list(tools)
+        self._builds += 1
+        logger.info(f"Built tools/list for {len(tools)} tools: {len(self.body)} bytes, ETag {self.etag}")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "etag": self.etag,
+            "tools": len(self._tools),
+            "bytes": len(self.body),
+            "builds": self._builds,
+            "hits": self._hits,
+            "not_modified": self._not_modified,
+        }
+
+
+def _same(tools: list[Tool], cached: list[Tool]) -> bool:
+    # Holding on to the cached tools keeps their ids from being reused
+    return len(tools) == len(cached) and all(a is b for a, b in zip(tools, cached, strict=True))
+
+
+def _request_meta(request: mt.ListToolsRequest | None) -> dict[str, Any]:
+    # The low-level server passes None when it lists tools to validate a call's arguments
+    if request is None or request.params is None:
+        return {}
+    meta = request.params.meta
+    return meta.model_dump() if meta is not None else {}
@@ -9,16 +9,105 @@ class Config:
     CORTEX_API_TOKEN: str = os.getenv("CORTEX_API_TOKEN", "")
     CORTEX_API_BASE_URL: str = os.getenv("CORTEX_API_BASE_URL", "https://api.getcortexapp.com")
 
+    # Use the bearer token of each incoming MCP HTTP request instead of CORTEX_API_TOKEN
+    CALLER_TOKENS: bool = os.getenv("CORTEX_CALLER_TOKENS", "false").lower() == "true"
+    # Let HTTP callers without a bearer token act as CORTEX_API_TOKEN instead of refusing them
+    CALLER_TOKENS_FALLBACK: bool = os.getenv("CORTEX_CALLER_TOKENS_FALLBACK", "false").lower() == "true"
+
+    # Upstream Connection Pools (one per Cortex token)
+    CLIENT_POOL_SIZE: int = int(os.getenv("CORTEX_CLIENT_POOL_SIZE", "32"))
+    CLIENT_IDLE_TIMEOUT: float = float(os.getenv("CORTEX_CLIENT_IDLE_TIMEOUT", "300"))
+    MAX_CONNECTIONS: int = int(os.getenv("CORTEX_MAX_CONNECTIONS", "100"))
+    MAX_CONNECTIONS_PER_TOKEN: int = int(os.getenv("CORTEX_MAX_CONNECTIONS_PER_TOKEN", "20"))
+
     # Server Configuration
     HOST: str = os.getenv("MCP_HOST", "0.0.0.0")
     PORT: int = int(os.getenv("MCP_PORT", "8000"))
     TRANSPORT: str = os.getenv("MCP_TRANSPORT", "streamable-http")
+    # Processes serving the streamable-http transport, forked once the tools are built
+    WORKERS: int = int(os.getenv("MCP_WORKERS", "1"))
 
     # OpenAPI Configuration
     OPENAPI_SPEC_PATH: str = os.getenv(
         "OPENAPI_SPEC_PATH",
         "./swagger.json"
     )
+    # Compiled spec artifacts keyed by source hash; empty disables persistence
+    OPENAPI_CACHE_DIR: str = os.getenv("OPENAPI_CACHE_DIR", "./.openapi-cache")
+    # Budget for each tool's parameter and request body schemas; deeper branches are collapsed to fit (0 disables)
+    OPENAPI_SCHEMA_MAX_BYTES: int = int(os.getenv("OPENAPI_SCHEMA_MAX_BYTES", "4096"))
+
+    # Response Cache Configuration
+    CACHE_ENABLED: bool = os.getenv("CORTEX_CACHE_ENABLED", "false").lower() == "true"
+    CACHE_DEFAULT_TTL: float = float(os.getenv("CORTEX_CACHE_DEFAULT_TTL", "30"))
+    # Comma separated "<path template>=<seconds>" overrides, e.g. "/api/v1/relationship-types=300"
+    CACHE_ROUTE_TTLS: str = os.getenv("CORTEX_CACHE_ROUTE_TTLS", "")
+    CACHE_MAX_BYTES: int = int(os.getenv("CORTEX_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    CACHE_MAX_ENTRY_BYTES: int = int(os.getenv("CORTEX_CACHE_MAX_ENTRY_BYTES", str(4 * 1024 * 1024)))
+    # SQLite file shared by every server process on the host; empty keeps the cache in memory
+    CACHE_PATH: str = os.getenv("CORTEX_CACHE_PATH", "")
+
+    # In-memory index of catalog entities that answers catalog list and detail reads; needs CORTEX_API_TOKEN
+    CATALOG_INDEX_ENABLED: bool = os.getenv("CORTEX_CATALOG_INDEX_ENABLED", "false").lower() == "true"
+    # Seconds between catalog index syncs, which read the audit log for changes; also caps how long details are kept
+    CATALOG_INDEX_REFRESH: float = float(os.getenv("CORTEX_CATALOG_INDEX_REFRESH", "300"))
+    # Reads go upstream again once the last successful sync is older than this
+    CATALOG_INDEX_MAX_STALENESS: float = float(os.getenv("CORTEX_CATALOG_INDEX_MAX_STALENESS", "3600"))
+    # Size bound for entity and team details kept with the index (0 sends detail reads upstream)
+    CATALOG_INDEX_DETAIL_MAX_BYTES: int = int(os.getenv("CORTEX_CATALOG_INDEX_DETAIL_MAX_BYTES", str(32 * 1024 * 1024)))
+
+    # Outbound Rate Limiting (0 requests per second means no proactive limit)
+    RATE_LIMIT_RPS: float = float(os.getenv("CORTEX_RATE_LIMIT_RPS", "0"))
+    RATE_LIMIT_BURST: float = float(os.getenv("CORTEX_RATE_LIMIT_BURST", "10"))
+    # Comma separated "<path template>=<requests per second>" per-token route limits
+    RATE_LIMIT_ROUTES: str = os.getenv("CORTEX_RATE_LIMIT_ROUTES", "")
+    RATE_LIMIT_MAX_WAIT: float = float(os.getenv("CORTEX_RATE_LIMIT_MAX_WAIT", "60"))
+    RATE_LIMIT_MAX_RESENDS: int = int(os.getenv("CORTEX_RATE_LIMIT_MAX_RESENDS", "3"))
+    # SQLite file sharing buckets and pauses between server processes; empty keeps them per process
+    RATE_LIMIT_STATE_PATH: str = os.getenv("CORTEX_RATE_LIMIT_STATE_PATH", "")
+
+    # Retries and Hedging for idempotent (GET/HEAD) requests
+    RETRY_MAX_RETRIES: int = int(os.getenv("CORTEX_RETRY_MAX_RETRIES", "2"))
+    RETRY_BASE_DELAY: float = float(os.getenv("CORTEX_RETRY_BASE_DELAY", "0.1"))
+    RETRY_MAX_DELAY: float = float(os.getenv("CORTEX_RETRY_MAX_DELAY", "2"))
+    # Bound on every attempt but the last, which only has the client timeout (0 disables)
+    RETRY_ATTEMPT_TIMEOUT: float = float(os.getenv("CORTEX_RETRY_ATTEMPT_TIMEOUT", "0"))
+    # Extra attempts allowed per request, averaged over traffic
+    RETRY_BUDGET_RATIO: float = float(os.getenv("CORTEX_RETRY_BUDGET_RATIO", "0.2"))
+    # Comma separated "<path template>=<retries>" overrides
+    RETRY_ROUTES: str = os.getenv("CORTEX_RETRY_ROUTES", "")
+    HEDGE_ENABLED: bool = os.getenv("CORTEX_HEDGE_ENABLED", "false").lower() == "true"
+    HEDGE_MIN_DELAY: float = float(os.getenv("CORTEX_HEDGE_MIN_DELAY", "0.05"))
+    # Comma separated "<path template>=<minimum hedge delay seconds>" routes to hedge
+    HEDGE_ROUTES: str = os.getenv("CORTEX_HEDGE_ROUTES", "")
+
+    # Hard limits on a single upstream JSON response (0 disables a limit)
+    RESPONSE_MAX_BYTES: int = int(os.getenv("CORTEX_RESPONSE_MAX_BYTES", str(16 * 1024 * 1024)))
+    RESPONSE_MAX_ITEMS: int = int(os.getenv("CORTEX_RESPONSE_MAX_ITEMS", "0"))
+
+    # Auto-pagination (allPages argument of paged list tools)
+    PAGINATION_CONCURRENCY: int = int(os.getenv("CORTEX_PAGINATION_CONCURRENCY", "4"))
+    PAGINATION_MAX_ITEMS: int = int(os.getenv("CORTEX_PAGINATION_MAX_ITEMS", "5000"))
+    PAGINATION_MAX_BYTES: int = int(os.getenv("CORTEX_PAGINATION_MAX_BYTES", str(1024 * 1024)))
+
+    # Batch tools (getEntityDetailsBatch and friends)
+    BATCH_CONCURRENCY: int = int(os.getenv("CORTEX_BATCH_CONCURRENCY", "8"))
+    BATCH_MAX_KEYS: int = int(os.getenv("CORTEX_BATCH_MAX_KEYS", "100"))
+
+    # Share one upstream call between identical concurrent GET requests
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("CORTEX_SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+
+    # Prometheus metrics at GET /metrics on HTTP transports
+    METRICS_ENABLED: bool = os.getenv("MCP_METRICS_ENABLED", "true").lower() == "true"
+
+    # Append tool call traces to this file as OTLP/JSON lines; empty disables tracing
+    TRACING_FILE: str = os.getenv("MCP_TRACING_FILE", "")
+    TRACING_SERVICE_NAME: str = os.getenv("MCP_TRACING_SERVICE_NAME", "cortex-mcp")
+
+    # Write a JSON report of startup phases to this directory; empty only logs the summary line
+    STARTUP_PROFILE_DIR: str = os.getenv("MCP_STARTUP_PROFILE_DIR", "")
+    # "cprofile" or "tracemalloc" to add a profile dump or allocation sizes to the report
+    STARTUP_PROFILE_MODE: str = os.getenv("MCP_STARTUP_PROFILE_MODE", "")
 
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
@@ -36,9 +125,54 @@ class Config:
         if not os.path.exists(cls.OPENAPI_SPEC_PATH):
             errors.append(f"OpenAPI spec file not found at: {cls.OPENAPI_SPEC_PATH}")
 
+        parsers = (
+            cls.get_cache_route_ttls,
+            cls.get_rate_limit_routes,
+            cls.get_retry_routes,
+            cls.get_hedge_routes,
+        )
+        for parse in parsers:
+            try:
+                parse()
+            except ValueError as e:
+                errors.append(str(e))
+
+        if cls.STARTUP_PROFILE_MODE not in ("", "cprofile", "tracemalloc"):
+            errors.append(
+                f"MCP_STARTUP_PROFILE_MODE must be cprofile or tracemalloc, got {cls.STARTUP_PROFILE_MODE!r}"
+            )
+        elif cls.STARTUP_PROFILE_MODE and not cls.STARTUP_PROFILE_DIR:
+            errors.append("MCP_STARTUP_PROFILE_MODE requires MCP_STARTUP_PROFILE_DIR")
+
+        if cls.WORKERS < 1:
+            errors.append(f"MCP_WORKERS must be at least 1, got {cls.WORKERS}")
+
+        if cls.CATALOG_INDEX_ENABLED and cls.CATALOG_INDEX_REFRESH <= 0:
+            errors.append(f"CORTEX_CATALOG_INDEX_REFRESH must be positive, got {cls.CATALOG_INDEX_REFRESH}")
+
         if errors:
             raise ValueError("Configuration errors:\n" + "\n".join(errors))
 
+    @classmethod
+    def get_cache_route_ttls(cls) -> dict[str, float]:
+        """Parse per-route cache TTL overrides keyed by path template."""
+        return parse_route_values(cls.CACHE_ROUTE_TTLS, "CORTEX_CACHE_ROUTE_TTLS")
+
+    @classmethod
+    def get_rate_limit_routes(cls) -> dict[str, float]:
+        """Parse per-route rate limits keyed by path template."""
+        return parse_route_values(cls.RATE_LIMIT_ROUTES, "CORTEX_RATE_LIMIT_ROUTES")
+
+    @classmethod
+    def get_retry_routes(cls) -> dict[str, float]:
+        """Parse per-route retry counts keyed by path template."""
+        return parse_route_values(cls.RETRY_ROUTES, "CORTEX_RETRY_ROUTES")
+
+    @classmethod
+    def get_hedge_routes(cls) -> dict[str, float]:
+        """Parse per-route minimum hedge delays keyed by path template."""
+        return parse_route_values(cls.HEDGE_ROUTES, "CORTEX_HEDGE_ROUTES")
+
     @classmethod
     def get_masked_token(cls) -> str:
         """Return a masked version of the API token for logging."""
@@ -49,3 +183,20 @@ class Config:
             return "***"
 
         return f"{cls.CORTEX_API_TOKEN[:4]}...{cls.CORTEX_API_TOKEN[-4:]}"
+
+
+def parse_route_values(raw: str, name: str) -> dict[str, float]:
+    """Parse a comma separated "<path template>=<number>" setting."""
+    values = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        template, sep, value = item.rpartition("=")
+        if not sep or not template.strip():
+            raise ValueError(f"Invalid {name} entry: {item!r}")
+        try:
+            values[template.strip()] = float(value)
+        except ValueError:
+            raise ValueError(f"Invalid {name} entry: {item!r}") from None
+    return values
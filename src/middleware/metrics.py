@@ -0,0 +1,49 @@
+"""Tool call latency and concurrency metrics."""
+
+import time
+
+import mcp.types as mt
+from fastmcp.exceptions import NotFoundError
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from ..utils.metrics import MetricsRegistry
+
+# Label for calls to tools the server doesn't have; their names come from the client
+UNKNOWN_TOOL = "unknown"
+
+
+class MetricsMiddleware(Middleware):
+    """
+    Record the latency and outcome of every tool call.
+
+    Added before other middleware so the histogram covers the whole call,
+    including every page fetched for allPages. Calls to unregistered tools
+    share the "unknown" label, so clients can't add series at will.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self._duration = registry.histogram(
+            "tool_call_duration_seconds", "MCP tool call latency.", ("tool", "outcome")
+        )
+        self._in_flight = registry.gauge("tool_calls_in_flight", "MCP tool calls being served.")
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        tool, outcome = context.message.name, "error"
+        started = time.perf_counter()
+        self._in_flight.inc()
+        try:
+            result = await call_next(context)
+            outcome = "ok"
+            return result
+        except NotFoundError:
+            # FastMCP's own lookup, innermost in the chain, found no such enabled tool
+            tool = UNKNOWN_TOOL
+            raise
+        finally:
+            self._in_flight.dec()
+            self._duration.observe(time.perf_counter() - started, tool, outcome)
@@ -0,0 +1,301 @@
+"""Fetch every page of a paged Cortex list in a single tool call."""
+
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import mcp.types as mt
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from ..clients.limits import TRUNCATION_KEY
+from ..config import Config
+from ..utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from fastmcp.server.openapi import HTTPRoute
+
+logger = get_logger(__name__)
+
+ALL_PAGES_ARGUMENT = "allPages"
+PAGE_PARAMETER = "page"
+PAGE_SIZE_PARAMETER = "pageSize"
+
+# Fetches one page and returns its result, structured content and payload size
+_FetchPage = Callable[[int], Awaitable[tuple[ToolResult, Any, int]]]
+
+
+def is_paginated(route: "HTTPRoute") -> bool:
+    """Check whether a route takes page and pageSize query parameters."""
+    names = {p.name for p in route.parameters if p.location == "query"}
+    return PAGE_PARAMETER in names and PAGE_SIZE_PARAMETER in names
+
+
+def all_pages_schema(max_items: int, max_bytes: int) -> dict[str, Any]:
+    """JSON schema of the argument that turns on auto-pagination."""
+    return {
+        "type": "boolean",
+        "default": False,
+        "description": (
+            f"Fetch every page and return the merged list instead of a single page. "
+            f"`{PAGE_PARAMETER}` is ignored. Results stop at {max_items} items or "
+            f"{max_bytes // 1024} KiB; `truncated` is true when a limit was hit."
+        ),
+    }
+
+
+@dataclass
+class _Collected:
+    """Pages fetched so far, keyed by page number."""
+
+    pages: dict[int, list[Any]] = field(default_factory=dict)
+    sizes: dict[int, int] = field(default_factory=dict)
+    items: int = 0
+    bytes: int = 0
+    complete: bool = False
+    # First page that came back cut off by the response limits; later pages are not merged
+    cut_at: int | None = None
+
+    def add(self, page: int, content: dict[str, Any], items: list[Any], size: int) -> None:
+        self.pages[page] = items
+        self.sizes[page] = size
+        self.items += len(items)
+        self.bytes += size
+        if TRUNCATION_KEY in content and (self.cut_at is None or page < self.cut_at):
+            self.cut_at = page
+
+    def wants(self, page: int) -> bool:
+        return self.cut_at is None or page < self.cut_at
+
+
+@dataclass
+class PaginationCounters:
+    """Counters describing allPages calls."""
+
+    calls: int = 0
+    pages_fetched: int = 0
+    truncated_results: int = 0
+
+
+class PaginationMiddleware(Middleware):
+    """
+    Serve the allPages argument of paged list tools.
+
+    Page 0 is fetched with the caller's other arguments. If it reports
+    totalPages, the remaining pages are fetched concurrently with at most
+    `concurrency` requests in flight; otherwise pages are read one after
+    another until a short page comes back. Items are merged in page order
+    and cut off at max_items or max_bytes of page payload.
+
+    A page that ResponseLimitTransport cut off ends the merged list after
+    the items it kept, and the result is marked truncated. The per-page
+    `_truncated` notes are dropped, since their continuation hints describe
+    single pages.
+
+    A later page that fails, or comes back without the list, ends the
+    merged list there and marks it truncated; the pages before it are
+    still returned.
+    """
+
+    def __init__(self, concurrency: int, max_items: int, max_bytes: int):
+        self.concurrency = max(1, concurrency)
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.counters = PaginationCounters()
+
+    @classmethod
+    def from_config(cls) -> "PaginationMiddleware":
+        """Create the middleware from configuration."""
+        return cls(
+            concurrency=Config.PAGINATION_CONCURRENCY,
+            max_items=Config.PAGINATION_MAX_ITEMS,
+            max_bytes=Config.PAGINATION_MAX_BYTES,
+        )
+
+    def stats(self) -> dict:
+        """Return allPages call, page and truncation counters."""
+        return asdict(self.counters)
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        arguments = context.message.arguments or {}
+        if ALL_PAGES_ARGUMENT not in arguments:
+            return await call_next(context)
+
+        arguments = dict(arguments)
+        all_pages = arguments.pop(ALL_PAGES_ARGUMENT)
+        if not all_pages:
+            return await call_next(_with_arguments(context, arguments))
+
+        return await self._fetch_all(context, call_next, arguments)
+
+    async def _fetch_all(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+        arguments: dict[str, Any],
+    ) -> ToolResult:
+        self.counters.calls += 1
+
+        async def fetch(page: int) -> tuple[ToolResult, Any, int]:
+            page_arguments = {**arguments, PAGE_PARAMETER: page}
+            result = await call_next(_with_arguments(context, page_arguments))
+            self.counters.pages_fetched += 1
+            return result, result.structured_content, _result_size(result)
+
+        result, first, size = await fetch(0)
+        items_key = _items_key(first)
+        if items_key is None:
+            logger.warning(f"Cannot merge pages of {context.message.name}, returning the first page")
+            return result
+
+        collected = _Collected()
+        collected.add(0, first, first[items_key], size)
+        page_size = len(first[items_key])
+        total_pages = first.get("totalPages")
+
+        # Nothing after a cut-off first page could be merged, and its length is not the page size
+        if not page_size:
+            collected.complete = True
+        elif isinstance(total_pages, int) and collected.cut_at is None:
+            await self._fetch_concurrently(fetch, items_key, total_pages, page_size, collected)
+        elif collected.cut_at is None:
+            await self._fetch_sequentially(fetch, items_key, page_size, collected)
+
+        return ToolResult(structured_content=self._merge(first, items_key, collected))
+
+    async def _fetch_concurrently(
+        self,
+        fetch: _FetchPage,
+        items_key: str,
+        total_pages: int,
+        page_size: int,
+        collected: _Collected,
+    ) -> None:
+        wanted = min(total_pages, -(-self.max_items // page_size))
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch_page(page: int) -> None:
+            async with semaphore:
+                if self._full(collected) or not collected.wants(page):
+                    return
+                try:
+                    _, content, size = await fetch(page)
+                except Exception as e:
+                    logger.warning(f"Page {page} failed, merging the pages before it: {e}")
+                    return
+                items = _page_items(content, items_key)
+                if items is None:
+                    logger.warning(f"Page {page} has no {items_key!r} list, merging the pages before it")
+                    return
+                collected.add(page, content, items, size)
+
+        await asyncio.gather(*(fetch_page(page) for page in range(1, wanted)))
+        collected.complete = len(collected.pages) >= total_pages
+
+    async def _fetch_sequentially(
+        self, fetch: _FetchPage, items_key: str, page_size: int, collected: _Collected
+    ) -> None:
+        page = 1
+        while not self._full(collected):
+            try:
+                _, content, size = await fetch(page)
+            except Exception as e:
+                logger.warning(f"Page {page} failed, merging the pages before it: {e}")
+                return
+            items = _page_items(content, items_key)
+            if items is None:
+                logger.warning(f"Page {page} has no {items_key!r} list, merging the pages before it")
+                return
+            collected.add(page, content, items, size)
+            if not collected.wants(page + 1):
+                return
+            if len(items) < page_size:
+                collected.complete = True
+                break
+            page += 1
+
+    def _full(self, collected: _Collected) -> bool:
+        return collected.items >= self.max_items or collected.bytes >= self.max_bytes
+
+    def _merge(
+        self,
+        first: dict[str, Any],
+        items_key: str,
+        collected: _Collected,
+    ) -> dict[str, Any]:
+        """Join pages in order, stopping at the first missing or cut-off page and at the limits."""
+        items: list[Any] = []
+        budget = self.max_bytes
+        trimmed = False
+        pages = 0
+        while pages in collected.pages and not trimmed:
+            page_items = collected.pages[pages]
+            size = collected.sizes[pages]
+            if size > budget:
+                page_items = _within_bytes(page_items, budget)
+                trimmed = True
+            items.extend(page_items)
+            budget -= size
+            pages += 1
+            if pages - 1 == collected.cut_at:
+                break
+
+        truncated = (
+            not collected.complete
+            or collected.cut_at is not None
+            or trimmed
+            or len(items) > self.max_items
+        )
+        items = items[:self.max_items]
+
+        merged = {k: v for k, v in first.items() if k not in (PAGE_PARAMETER, TRUNCATION_KEY)}
+        merged[items_key] = items
+        merged["pagesFetched"] = pages
+        merged["truncated"] = truncated
+        if truncated:
+            self.counters.truncated_results += 1
+        return merged
+
+
+def _with_arguments(
+    context: MiddlewareContext[mt.CallToolRequestParams], arguments: dict[str, Any]
+) -> MiddlewareContext[mt.CallToolRequestParams]:
+    message = context.message.model_copy(update={"arguments": arguments})
+    return context.copy(message=message)
+
+
+def _items_key(content: Any) -> str | None:
+    """Return the key of the only list in a page, or None if there is not exactly one."""
+    if not isinstance(content, dict):
+        return None
+    keys = [key for key, value in content.items() if isinstance(value, list)]
+    return keys[0] if len(keys) == 1 else None
+
+
+def _page_items(content: Any, items_key: str) -> list[Any] | None:
+    """Return a later page's items, or None if the page does not have the first page's list."""
+    if not isinstance(content, dict):
+        return None
+    items = content.get(items_key)
+    return items if isinstance(items, list) else None
+
+
+def _within_bytes(items: list[Any], budget: int) -> list[Any]:
+    """Return the leading items whose compact JSON fits in budget bytes."""
+    kept = []
+    for item in items:
+        budget -= len(json.dumps(item, separators=(",", ":"))) + 1
+        if budget < 0:
+            break
+        kept.append(item)
+    return kept
+
+
+def _result_size(result: ToolResult) -> int:
+    return sum(len(getattr(block, "text", "")) for block in result.content)
@@ -0,0 +1,67 @@
+"""The fields argument that trims tool responses to the requested paths."""
+
+from typing import Any
+
+import mcp.types as mt
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from ..clients.limits import TRUNCATION_KEY
+from ..clients.projection import projecting
+from ..utils.projection import parse_fields
+from .pagination import ALL_PAGES_ARGUMENT
+
+FIELDS_ARGUMENT = "fields"
+
+# Pagination needs the page count to fetch the remaining pages concurrently
+_PAGINATION_FIELDS = ("totalPages",)
+
+
+def fields_schema() -> dict[str, Any]:
+    """JSON schema of the argument that selects response fields."""
+    return {
+        "type": "string",
+        "description": (
+            "Comma separated field paths to return instead of the full response, "
+            "e.g. `entities.tag,entities.name,total`. Lists are traversed "
+            "implicitly. Omit to return everything."
+        ),
+    }
+
+
+class ProjectionMiddleware(Middleware):
+    """
+    Serve the fields argument of Cortex API tools.
+
+    The argument is removed before the tool runs and the parsed projection
+    is handed to ProjectionTransport, which applies it while decoding each
+    upstream response.
+    """
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        arguments = context.message.arguments or {}
+        if FIELDS_ARGUMENT not in arguments:
+            return await call_next(context)
+
+        arguments = dict(arguments)
+        fields = arguments.pop(FIELDS_ARGUMENT)
+        try:
+            projection = parse_fields(fields or "")
+        except ValueError as e:
+            raise ToolError(str(e)) from None
+
+        if projection:
+            # A cut-off response must say so even when the note was not asked for
+            projection.setdefault(TRUNCATION_KEY, {})
+            if arguments.get(ALL_PAGES_ARGUMENT):
+                for key in _PAGINATION_FIELDS:
+                    projection.setdefault(key, {})
+
+        message = context.message.model_copy(update={"arguments": arguments})
+        with projecting(projection):
+            return await call_next(context.copy(message=message))
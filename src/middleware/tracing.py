@@ -0,0 +1,39 @@
+"""Server spans for MCP tool calls."""
+
+import mcp.types as mt
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from fastmcp.tools.tool import ToolResult
+
+from ..utils.tracing import SPAN_KIND_SERVER, TRACEPARENT_HEADER, Tracer
+
+
+class TracingMiddleware(Middleware):
+    """
+    Open a span around every tool call.
+
+    Cortex API requests made during the call become its children. A
+    traceparent header on the incoming MCP HTTP request is continued, so
+    the call shows up inside the caller's trace.
+    """
+
+    def __init__(self, tracer: Tracer):
+        self._tracer = tracer
+
+    async def on_call_tool(
+        self,
+        context: MiddlewareContext[mt.CallToolRequestParams],
+        call_next: CallNext[mt.CallToolRequestParams, ToolResult],
+    ) -> ToolResult:
+        name = context.message.name
+        attributes = {
+            "mcp.method.name": "tools/call",
+            "mcp.tool.name": name,
+            "mcp.tool.arguments": ",".join(sorted(context.message.arguments or {})),
+        }
+        traceparent = get_http_headers().get(TRACEPARENT_HEADER)
+
+        with self._tracer.span(f"tools/call {name}", SPAN_KIND_SERVER, attributes, traceparent) as span:
+            result = await call_next(context)
+            span.set_attribute("mcp.tool.result_blocks", len(result.content))
+            return result
@@ -0,0 +1,77 @@
+"""Custom HTTP endpoints served next to the MCP endpoint on HTTP transports."""
+
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from ..utils.metrics import CONTENT_TYPE, MetricsRegistry
+
+if TYPE_CHECKING:
+    from ..components.tool_list import ToolListCache
+
+
+def register_stats_route(
+    mcp_server: FastMCP,
+    name: str,
+    stats: Callable[[], dict],
+) -> None:
+    """
+    Expose a component's counters as JSON at GET /<name>/stats.
+
+    Args:
+        mcp_server: Server whose HTTP app serves the route
+        name: Path segment identifying the component, e.g. "cache"
+        stats: Callable returning the current counters
+    """
+
+    async def stats_endpoint(request: Request) -> JSONResponse:
+        return JSONResponse(stats())
+
+    mcp_server.custom_route(f"/{name}/stats", methods=["GET"])(stats_endpoint)
+
+
+def register_metrics_route(mcp_server: FastMCP, registry: MetricsRegistry) -> None:
+    """
+    Expose metrics in the Prometheus text format at GET /metrics.
+
+    Args:
+        mcp_server: Server whose HTTP app serves the route
+        registry: Registry to render on every scrape
+    """
+
+    async def metrics_endpoint(request: Request) -> Response:
+        return Response(registry.render(), media_type=CONTENT_TYPE)
+
+    mcp_server.custom_route("/metrics", methods=["GET"])(metrics_endpoint)
+
+
+def register_tools_route(mcp_server: FastMCP, tool_list: "ToolListCache") -> None:
+    """
+    Expose the tools/list result as JSON at GET /tools, with an ETag.
+
+    A request whose If-None-Match holds the current ETag gets an empty 304.
+
+    Args:
+        mcp_server: Server whose HTTP app serves the route
+        tool_list: Cache holding the serialized result
+    """
+
+    async def tools_endpoint(request: Request) -> Response:
+        await tool_list.current()
+        etag = f'"{tool_list.etag}"'
+        # Clients may cache the list, but must check it is still current before using it
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(tool_list.body, media_type="application/json", headers=headers)
+
+    mcp_server.custom_route("/tools", methods=["GET"])(tools_endpoint)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
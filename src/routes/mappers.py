@@ -1,13 +1,31 @@
 """Route mapping logic for MCP server."""
 
-from fastmcp.server.openapi import HTTPRoute, MCPType
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
 
 from ..utils.logging import get_logger
 
+# fastmcp's OpenAPI support is slow to import and only needed to build tools,
+# which stdio servers do after answering initialize
+if TYPE_CHECKING:
+    from fastmcp.server.openapi import HTTPRoute, MCPType
+
 logger = get_logger(__name__)
 
+MCP_ENABLED_EXTENSION = "x-cortex-mcp-enabled"
+
+
+def is_mcp_enabled(extensions: Mapping[str, Any]) -> bool:
+    """
+    Check whether an operation opts in to being exposed as an MCP tool.
+
+    Accepts either an HTTPRoute's extensions or a raw OpenAPI operation
+    object, since both carry the extension as a top-level key.
+    """
+    return extensions.get(MCP_ENABLED_EXTENSION) == "true"
+
 
-def custom_route_mapper(route: HTTPRoute, mcp_type: MCPType) -> MCPType | None:
+def custom_route_mapper(route: "HTTPRoute", mcp_type: "MCPType") -> "MCPType | None":
     """
     Map OpenAPI routes to MCP types based on custom logic.
     
@@ -21,12 +39,14 @@ def custom_route_mapper(route: HTTPRoute, mcp_type: MCPType) -> MCPType | None:
     Returns:
         MCPType or None to use default mapping
     """
+    from fastmcp.server.openapi import MCPType
+
     logger.debug(f"Evaluating route: {route.method} {route.path}")
     logger.debug(f"Tags: {route.tags}")
 
-    if route.extensions.get("x-cortex-mcp-enabled") == "false":
+    if route.extensions.get(MCP_ENABLED_EXTENSION) == "false":
         return MCPType.EXCLUDE
-    elif route.extensions.get("x-cortex-mcp-enabled") == "true":
+    elif is_mcp_enabled(route.extensions):
         return MCPType.TOOL
     
     return MCPType.EXCLUDE  # TODO UNDO THIS.
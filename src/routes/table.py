@@ -0,0 +1,107 @@
+"""Lookup of OpenAPI route templates for outgoing Cortex API requests."""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..utils.logging import get_logger
+from ..utils.openapi_resolver import HTTP_METHODS
+
+logger = get_logger(__name__)
+
+_PARAM_PATTERN = re.compile(r"\{[^/{}]+\}")
+
+# Per-route policy extensions that the transports read as numbers
+_NUMERIC_EXTENSIONS = frozenset({
+    "x-cortex-mcp-cache-ttl",
+    "x-cortex-mcp-rate-limit",
+    "x-cortex-mcp-retries",
+    "x-cortex-mcp-hedge",
+})
+
+
+@dataclass(frozen=True)
+class RouteInfo:
+    """An OpenAPI operation that a request path resolved to."""
+
+    method: str
+    template: str
+    extensions: dict[str, Any] = field(default_factory=dict)
+
+
+class RouteTable:
+    """
+    Map concrete request paths back to the OpenAPI route they came from.
+
+    Per-route policies (cache TTLs and similar) are configured against path
+    templates such as /api/v1/catalog/{tagOrId}, while the client only sees
+    the expanded path. Literal segments win over parameters, so
+    /api/v1/catalog/descriptors never matches /api/v1/catalog/{tagOrId}.
+    """
+
+    def __init__(self, routes: list[RouteInfo], base_path: str = ""):
+        self._base_path = base_path.rstrip("/")
+        self._routes: dict[tuple[str, int], list[tuple[re.Pattern[str], RouteInfo]]] = {}
+
+        def specificity(route: RouteInfo) -> int:
+            return len(_PARAM_PATTERN.findall(route.template))
+
+        for route in sorted(routes, key=specificity):
+            key = (route.method, route.template.count("/"))
+            pattern = re.compile(_template_regex(route.template))
+            self._routes.setdefault(key, []).append((pattern, route))
+
+    @classmethod
+    def from_spec(cls, spec: dict[str, Any], base_path: str = "") -> "RouteTable":
+        """
+        Build a route table from the operations in an OpenAPI spec.
+
+        Numeric policy extensions that are not numbers are logged and left
+        out, so the route falls back to the configured default.
+
+        Args:
+            spec: OpenAPI specification dictionary
+            base_path: Path prefix of the API base URL, stripped before matching
+
+        Returns:
+            RouteTable covering every operation in the spec
+        """
+        routes = []
+        for template, path_item in spec.get("paths", {}).items():
+            for method, operation in path_item.items():
+                if method not in HTTP_METHODS:
+                    continue
+                extensions = {
+                    k: v for k, v in operation.items()
+                    if k.startswith("x-") and _valid_extension(method, template, k, v)
+                }
+                routes.append(RouteInfo(method.upper(), template, extensions))
+        return cls(routes, base_path)
+
+    def match(self, method: str, path: str) -> RouteInfo | None:
+        """Return the route a request belongs to, or None if it is unknown."""
+        if self._base_path and path.startswith(self._base_path):
+            path = path[len(self._base_path):]
+
+        for pattern, route in self._routes.get((method.upper(), path.count("/")), ()):
+            if pattern.fullmatch(path):
+                return route
+        return None
+
+
+def _valid_extension(method: str, template: str, name: str, value: Any) -> bool:
+    """Check that a policy extension the transports convert with float() is a number."""
+    if name not in _NUMERIC_EXTENSIONS:
+        return True
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring {name}={value!r} on {method.upper()} {template}: not a number")
+        return False
+    return True
+
+
+def _template_regex(template: str) -> str:
+    """Translate an OpenAPI path template into a regular expression."""
+    parts = _PARAM_PATTERN.split(template)
+    return "[^/]+".join(re.escape(part) for part in parts)
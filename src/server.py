@@ -1,26 +1,55 @@
 """Main entry point for Cortex MCP server."""
+import argparse
+import asyncio
 import json
-from typing import Any
+import tempfile
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any
 
+import httpx
 from fastmcp import FastMCP
 
+from .clients.cache import create_response_cache
+from .clients.catalog_index import CatalogIndex, CatalogIndexLifespan
 from .clients.cortex import create_cortex_client
-from .components.customizers import customize_components
+from .clients.metrics import UpstreamMetrics
+from .clients.ratelimit import OutboundScheduler
+from .clients.retry import RetryPolicy
+from .components.batch import register_batch_tools
+from .components.deferred import DeferredTools
+from .components.tool_list import ToolListCache
 from .config import Config
+from .middleware.metrics import MetricsMiddleware
+from .middleware.pagination import PaginationMiddleware
+from .middleware.projection import ProjectionMiddleware
+from .middleware.tracing import TracingMiddleware
 from .routes.mappers import custom_route_mapper
+from .routes.table import RouteTable
 from .utils.logging import setup_logging
-from .utils.openapi_resolver import resolve_refs
+from .utils.metrics import MetricsRegistry
+from .utils.profiling import StartupCompleteMiddleware, StartupProfiler, phase, timed
+from .utils.spec_compiler import compile_spec_file, hash_spec_file, load_compiled_spec
+from .utils.tracing import FileSpanExporter, Tracer
+
+if TYPE_CHECKING:
+    from fastmcp.server.openapi import OpenAPITool
 
 logger = setup_logging()
 
 
 def load_openapi_spec() -> dict[str, Any]:
-    """Load the OpenAPI specification from file."""
+    """
+    Load the OpenAPI specification, compiled down to MCP-enabled operations.
+
+    Uses the compiled artifact when it matches the source spec hash and
+    rebuilds it otherwise.
+    """
     logger.info(f"Loading OpenAPI spec from: {Config.OPENAPI_SPEC_PATH}")
 
     try:
-        with open(Config.OPENAPI_SPEC_PATH) as f:
-            spec = json.load(f)
+        spec = load_compiled_spec(
+            Config.OPENAPI_SPEC_PATH, Config.OPENAPI_CACHE_DIR, Config.OPENAPI_SCHEMA_MAX_BYTES
+        )
 
         logger.info("OpenAPI spec loaded successfully")
         return spec
@@ -33,56 +62,281 @@ def load_openapi_spec() -> dict[str, Any]:
         raise
 
 
-def create_mcp_server() -> FastMCP:
-    """Create and configure the MCP server."""
-    Config.validate()
+def create_mcp_server(defer_tools: bool = False, http_middleware: list | None = None) -> FastMCP:
+    """
+    Create and configure the MCP server.
 
-    openapi_spec = load_openapi_spec()
+    With defer_tools the server is returned before its tools exist, and
+    they are built in a worker thread (see DeferredTools). A stdio session
+    then answers initialize without waiting for the spec to load or for
+    FastMCP.from_openapi. A deferred server has no HTTP routes or metrics,
+    which only HTTP transports serve.
 
-    # Workaround to resolve all $ref references since FastMCP cannot resolve complex reference chains
-    logger.info("Resolving OpenAPI $ref references...")
-    openapi_spec = resolve_refs(openapi_spec)
-    logger.info("OpenAPI $ref references resolved")
+    http_middleware, if given, receives the ASGI middleware an HTTP
+    transport must serve the server with, such as the one starting the
+    catalog index sync with the app.
+    """
+    with phase("validate_config"):
+        Config.validate()
 
-    client = create_cortex_client()
+    tracer = None
+    if Config.TRACING_FILE:
+        tracer = Tracer(FileSpanExporter(Config.TRACING_FILE, Config.TRACING_SERVICE_NAME))
+        logger.info(f"Writing traces to {Config.TRACING_FILE}")
 
-    mcp_server = FastMCP.from_openapi(
-        openapi_spec=openapi_spec,
-        client=client,
-        name=Config.APP_NAME,
-        route_map_fn=custom_route_mapper,
-        mcp_component_fn=customize_components,
-    )
+    deferred = None
+    if defer_tools:
+        metrics = None
+        mcp_server = FastMCP(name=Config.APP_NAME)
+        deferred = DeferredTools(lambda: _add_tools(mcp_server, tracer))
+        mcp_server.add_middleware(deferred)
+        stats = {}
+    else:
+        metrics = MetricsRegistry() if Config.METRICS_ENABLED else None
+        mcp_server, stats, catalog_index = build_openapi_server(metrics, tracer)
+
+    pagination = PaginationMiddleware.from_config()
+
+    # Tracing and metrics wrap the whole call; projection runs before pagination so it still sees allPages
+    if tracer is not None:
+        mcp_server.add_middleware(TracingMiddleware(tracer))
+    if metrics is not None:
+        mcp_server.add_middleware(MetricsMiddleware(metrics))
+    mcp_server.add_middleware(ProjectionMiddleware())
+    mcp_server.add_middleware(pagination)
+
+    tool_list = ToolListCache(mcp_server).install()
+
+    if not defer_tools:
+        from starlette.middleware import Middleware
+
+        from .routes.http import (
+            register_metrics_route,
+            register_stats_route,
+            register_tools_route,
+        )
+
+        if catalog_index is not None and http_middleware is not None:
+            http_middleware.append(Middleware(CatalogIndexLifespan, index=catalog_index))
+
+        register_tools_route(mcp_server, tool_list)
+        stats["pagination"] = pagination.stats
+        stats["tools"] = tool_list.stats
+        for name, component_stats in stats.items():
+            register_stats_route(mcp_server, name, component_stats)
+            if metrics is not None:
+                metrics.add_stats(name, component_stats)
+        if metrics is not None:
+            register_metrics_route(mcp_server, metrics)
+
+    if deferred is not None:
+        deferred.start()
 
     logger.info(f"MCP server '{Config.APP_NAME}' created successfully")
 
     return mcp_server
 
 
-def main() -> None:
+def build_openapi_server(
+    metrics: MetricsRegistry | None = None,
+    tracer: Tracer | None = None,
+) -> tuple[FastMCP, dict[str, Callable[[], dict]], CatalogIndex | None]:
+    """
+    Load the spec and build the Cortex client and a server holding its tools.
+
+    Returns:
+        The server, the stats callables of the client's components by name,
+        and the client's catalog index, if it has one
+    """
+    # $refs are resolved at compile time since FastMCP cannot resolve complex reference chains
+    with phase("load_spec"):
+        openapi_spec = load_openapi_spec()
+
+    with phase("create_client"):
+        route_table = RouteTable.from_spec(
+            openapi_spec, base_path=httpx.URL(Config.CORTEX_API_BASE_URL).path
+        )
+        response_cache = create_response_cache() if Config.CACHE_ENABLED else None
+        scheduler = OutboundScheduler.from_config(route_table)
+        retry_policy = RetryPolicy.from_config(route_table)
+        catalog_index = None
+        if Config.CATALOG_INDEX_ENABLED and Config.CORTEX_API_TOKEN:
+            catalog_index = CatalogIndex.from_config()
+        elif Config.CATALOG_INDEX_ENABLED:
+            logger.warning("The catalog index syncs with CORTEX_API_TOKEN, which is not set; catalog reads go upstream")
+
+        client = create_cortex_client(
+            route_table,
+            response_cache,
+            scheduler,
+            retry_policy,
+            upstream_metrics=UpstreamMetrics(metrics, route_table) if metrics else None,
+            tracer=tracer,
+            catalog_index=catalog_index,
+        )
+
+    mcp_server = FastMCP(name=Config.APP_NAME)
+    for tool in build_openapi_tools(openapi_spec, client, Config.OPENAPI_CACHE_DIR):
+        mcp_server.add_tool(tool)
+
+    with phase("batch_tools"):
+        register_batch_tools(mcp_server, openapi_spec, client)
+
+    stats = {"ratelimit": scheduler.stats, "retry": retry_policy.stats}
+    if response_cache is not None:
+        stats["cache"] = response_cache.stats
+    if catalog_index is not None:
+        stats["catalog"] = catalog_index.stats
+    return mcp_server, stats, catalog_index
+
+
+def build_openapi_tools(
+    openapi_spec: dict[str, Any],
+    client: httpx.AsyncClient,
+    cache_dir: str,
+) -> list["OpenAPITool"]:
+    """
+    Build the tools of the spec's MCP-enabled operations.
+
+    Restores them from their snapshot in cache_dir when it matches the
+    spec, and otherwise builds them with FastMCP.from_openapi and writes
+    the snapshot. An empty cache_dir always builds them in full.
+    """
+    # fastmcp's OpenAPI support takes ~100 ms to import; deferred servers load it in their build thread
+    from fastmcp.server.openapi import OpenAPITool
+
+    from .components.customizers import customize_components
+    from .components.snapshot import load_tools, save_tools
+
+    spec_hash = None
+    if cache_dir:
+        with phase("restore_tools"):
+            spec_hash = hash_spec_file(Config.OPENAPI_SPEC_PATH)
+            tools = load_tools(cache_dir, spec_hash, client)
+        if tools is not None:
+            return tools
+
+    tools = []
+
+    def customize(route, component):
+        try:
+            customize_components(route, component)
+        finally:
+            # FastMCP registers a component even when customizing it fails
+            if isinstance(component, OpenAPITool):
+                tools.append(component)
+
+    with phase("from_openapi"):
+        FastMCP.from_openapi(
+            openapi_spec=openapi_spec,
+            client=client,
+            route_map_fn=timed("route_map_fn", custom_route_mapper),
+            mcp_component_fn=timed("mcp_component_fn", customize),
+        )
+
+    if spec_hash is not None:
+        with phase("save_tools"):
+            save_tools(cache_dir, spec_hash, tools)
+    return tools
+
+
+def _add_tools(mcp_server: FastMCP, tracer: Tracer | None) -> None:
+    """Build the tools in a server of their own and move them onto mcp_server."""
+    built, _, _ = build_openapi_server(tracer=tracer)
+    # Runs in the build thread, which has no event loop of its own
+    for tool in asyncio.run(built.get_tools()).values():
+        mcp_server.add_tool(tool)
+
+
+def compile_openapi_spec(output_dir: str | None = None) -> None:
+    """Compile the OpenAPI spec and snapshot its tools, so that later starts can load both directly."""
+    Config.validate()
+
+    cache_dir = output_dir or Config.OPENAPI_CACHE_DIR
+    if not cache_dir:
+        raise ValueError("An output directory is required when OPENAPI_CACHE_DIR is empty")
+
+    compile_spec_file(Config.OPENAPI_SPEC_PATH, cache_dir, Config.OPENAPI_SCHEMA_MAX_BYTES)
+
+    # Snapshot the tools as well, so the first start skips FastMCP.from_openapi too
+    openapi_spec = load_compiled_spec(Config.OPENAPI_SPEC_PATH, cache_dir, Config.OPENAPI_SCHEMA_MAX_BYTES)
+    # The client only builds the tools here and never sends a request
+    client = httpx.AsyncClient()
+    try:
+        build_openapi_tools(openapi_spec, client, cache_dir)
+    finally:
+        asyncio.run(client.aclose())
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=Config.APP_NAME)
+    subparsers = parser.add_subparsers(dest="command")
+
+    compile_parser = subparsers.add_parser(
+        "compile-spec",
+        help="Write the compiled OpenAPI spec artifact and exit",
+    )
+    compile_parser.add_argument(
+        "--output-dir",
+        help="Artifact directory (defaults to OPENAPI_CACHE_DIR)",
+    )
+
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
     """Main entry point for the application."""
+    args = parse_args(argv)
+
+    if args.command == "compile-spec":
+        compile_openapi_spec(args.output_dir)
+        return
+
+    if Config.WORKERS > 1 and Config.TRANSPORT in ("stdio", "sse"):
+        logger.warning(f"MCP_WORKERS only applies to streamable-http; serving {Config.TRANSPORT} from one process")
+    elif Config.WORKERS > 1:
+        # Workers need the caches and rate limits in files they all open, created before the server is built
+        with tempfile.TemporaryDirectory(prefix="cortex-mcp-") as state_dir:
+            run_workers(state_dir)
+        return
+
+    profiler = StartupProfiler.from_config().start()
+
     try:
-        mcp_server = create_mcp_server()
+        # stdio sessions are short-lived processes; answer initialize before the tools are built
+        http_middleware = []
+        mcp_server = create_mcp_server(defer_tools=Config.TRANSPORT == "stdio", http_middleware=http_middleware)
 
         logger.info(f"Starting server with transport: {Config.TRANSPORT}")
         logger.info(f"Host: {Config.HOST}, Port: {Config.PORT}")
 
         if Config.TRANSPORT == "stdio":
-            # Standard I/O transport (for Claude Desktop)
+            # Standard I/O transport (for Claude Desktop); nothing to bind
+            profiler.finish()
             mcp_server.run()
-        elif Config.TRANSPORT == "sse":
+            return
+
+        from starlette.middleware import Middleware
+
+        # HTTP startup ends once the app has started, right before uvicorn binds
+        profiler.begin("transport")
+        started = [Middleware(StartupCompleteMiddleware, on_complete=profiler.finish), *http_middleware]
+        if Config.TRANSPORT == "sse":
             # Server-Sent Events transport (deprecated)
             logger.warning("SSE transport is deprecated, consider using streamable-http")
             mcp_server.run(
                 transport="sse",
                 host=Config.HOST,
-                port=Config.PORT
+                port=Config.PORT,
+                middleware=started,
             )
         else:
             mcp_server.run(
                 transport="streamable-http",
                 host=Config.HOST,
-                port=Config.PORT
+                port=Config.PORT,
+                middleware=started,
             )
 
     except KeyboardInterrupt:
@@ -92,5 +346,32 @@ def main() -> None:
         raise
 
 
+def run_workers(state_dir: str) -> None:
+    """Build the server once, then serve streamable-http from Config.WORKERS forked processes."""
+    from .utils.workers import serve_workers, share_state
+
+    share_state(state_dir)
+    profiler = StartupProfiler.from_config().start()
+    http_middleware = []
+    mcp_server = create_mcp_server(http_middleware=http_middleware)
+
+    # Consecutive requests of a session may reach different workers, so none may keep session state
+    app = mcp_server.http_app(transport="http", stateless_http=True, middleware=http_middleware)
+    logger.warning(
+        "MCP_WORKERS > 1 serves MCP without sessions: requests from the server to the client "
+        "(sampling, elicitation), notifications outside a call's own response and resumable "
+        "streams are not available"
+    )
+    logger.info(f"Starting {Config.WORKERS} workers with transport: {Config.TRANSPORT}")
+    logger.info(f"Host: {Config.HOST}, Port: {Config.PORT}")
+    profiler.finish()
+
+    try:
+        serve_workers(app, Config.HOST, Config.PORT, Config.WORKERS, log_level=Config.LOG_LEVEL.lower())
+    except Exception as e:
+        logger.error(f"Server error: {e}", exc_info=True)
+        raise
+
+
 if __name__ == "__main__":
     main()
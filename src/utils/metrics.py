@@ -0,0 +1,192 @@
+"""
+Minimal metrics registry rendered in the Prometheus text exposition format.
+
+Recording is a dict lookup and an addition, so instruments can sit on the
+request path. Everything else (cumulative buckets, formatting, stats
+callables of other components) happens when /metrics is scraped.
+"""
+
+import os
+import sys
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+
+# Seconds; covers cache hits through slow paged Cortex lists
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = tuple[str, ...]
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        # Unlabelled metrics report 0 before their first update
+        self._values: dict[LabelValues, float] = {} if labels else {(): 0}
+
+    def inc(self, amount: float = 1, *label_values: str) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self) -> Iterable[tuple[str, LabelValues, float]]:
+        for label_values, value in self._values.items():
+            yield "", label_values, value
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1, *label_values: str) -> None:
+        self.inc(-amount, *label_values)
+
+
+class Histogram:
+    """Histogram with fixed upper bounds, one series per label combination."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # Per series: a count per bucket (the last one is +Inf) and the sum
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def samples(self) -> Iterable[tuple[str, LabelValues, float]]:
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for label_values, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(bounds, counts, strict=True):
+                cumulative += count
+                yield "_bucket", (*label_values, bound), cumulative
+            yield "_sum", label_values, total[0]
+            yield "_count", label_values, cumulative
+
+
+Metric = Counter | Gauge | Histogram
+
+
+class MetricsRegistry:
+    """
+    Instruments plus the stats callables of other components.
+
+    Stats callables are the same ones served at /<name>/stats; their
+    top-level numeric values are exported as cortex_mcp_<name>_<key>.
+    """
+
+    def __init__(self, prefix: str = "cortex_mcp"):
+        self.prefix = prefix
+        self._metrics: list[Metric] = []
+        self._stats: dict[str, Callable[[], dict]] = {}
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._add(Counter(f"{self.prefix}_{name}", help, labels))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = ()) -> Gauge:
+        return self._add(Gauge(f"{self.prefix}_{name}", help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._add(Histogram(f"{self.prefix}_{name}", help, labels, buckets))
+
+    def add_stats(self, name: str, stats: Callable[[], dict]) -> None:
+        """Export a component's stats dictionary on every scrape."""
+        self._stats[name] = stats
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            _render_metric(lines, metric.name, metric.type, metric.help, metric.labels, metric.samples())
+
+        for name, stats in self._stats.items():
+            for key, value in stats().items():
+                if isinstance(value, bool) or not isinstance(value, int | float):
+                    continue
+                metric_name = f"{self.prefix}_{name}_{key}"
+                _render_metric(lines, metric_name, "untyped", f"{key} from /{name}/stats", (), [("", (), value)])
+
+        rss = resident_memory_bytes()
+        if rss is not None:
+            _render_metric(
+                lines, "process_resident_memory_bytes", "gauge",
+                "Resident memory size in bytes.", (), [("", (), rss)],
+            )
+        return "\n".join(lines) + "\n"
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+def resident_memory_bytes() -> int | None:
+    """Return the current RSS, or the peak RSS where the current one is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, OSError, ValueError):
+        return None
+    # Bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _render_metric(
+    lines: list[str],
+    name: str,
+    type_: str,
+    help: str,
+    labels: tuple[str, ...],
+    samples: Iterable[tuple[str, LabelValues, float]],
+) -> None:
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {type_}")
+    for suffix, label_values, value in samples:
+        names = labels + ("le",) if suffix == "_bucket" else labels
+        if names:
+            pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, label_values, strict=True))
+            lines.append(f"{name}{suffix}{{{pairs}}} {_format_value(value)}")
+        else:
+            lines.append(f"{name}{suffix} {_format_value(value)}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
@@ -6,15 +6,91 @@ This script replaces ALL $ref in the entire OpenAPI spec with inline schema defi
 
 Since customizers.py currently hides output schemas, $ref resolutions are only visible in INPUT schemas.
 
-Performance note: Currently processes all ~800 endpoints but only ~20 become MCP tools.
+Performance note: Only ~30 of the spec's operations become MCP tools. filter_operations
+drops the rest, and every component schema they alone reach, before anything is
+dereferenced, so neither the resolver nor FastMCP ever walks the excluded routes.
 The dereferencing work is only visible in PointInTimeMetrics tool, since it's the only
 MCP-enabled endpoint with $ref chains in its input schema (output schemas are hidden).
-
-TODO: Optimize to only process MCP-enabled paths
 """
 
+from collections.abc import Callable
 from typing import Any
 
+SCHEMA_REF_PREFIX = "#/components/schemas/"
+
+HTTP_METHODS = frozenset(
+    {"get", "put", "post", "delete", "options", "head", "patch", "trace"}
+)
+
+
+def filter_operations(
+    spec: dict[str, Any],
+    include: Callable[[dict[str, Any]], bool],
+) -> dict[str, Any]:
+    """
+    Keep only the operations selected by include, and the schemas they reach.
+
+    Args:
+        spec: OpenAPI specification dictionary
+        include: Predicate called with each raw operation object
+
+    Returns:
+        Spec with excluded operations, empty paths and unreachable component
+        schemas removed
+    """
+    paths: dict[str, Any] = {}
+    for path, path_item in spec.get("paths", {}).items():
+        operations = {
+            method: operation
+            for method, operation in path_item.items()
+            if method in HTTP_METHODS and include(operation)
+        }
+        if not operations:
+            continue
+        # Keep path-level fields such as shared parameters
+        shared = {k: v for k, v in path_item.items() if k not in HTTP_METHODS}
+        paths[path] = {**shared, **operations}
+
+    spec = spec.copy()
+    spec["paths"] = paths
+    return prune_components(spec)
+
+
+def prune_components(spec: dict[str, Any]) -> dict[str, Any]:
+    """
+    Drop component schemas that nothing outside components/schemas reaches.
+
+    Args:
+        spec: OpenAPI specification dictionary
+
+    Returns:
+        Spec whose components/schemas holds only reachable schemas
+    """
+    components = spec.get("components")
+    if not components or "schemas" not in components:
+        return spec
+
+    schemas = components["schemas"]
+    roots = [v for k, v in spec.items() if k != "components"]
+    roots += [v for k, v in components.items() if k != "schemas"]
+
+    reachable: set[str] = set()
+    pending = list(_schema_refs(roots))
+    while pending:
+        name = pending.pop()
+        if name in reachable or name not in schemas:
+            continue
+        reachable.add(name)
+        pending.extend(_schema_refs(schemas[name]))
+
+    pruned = {k: v for k, v in components.items() if k != "schemas"}
+    if reachable:
+        pruned["schemas"] = {name: schemas[name] for name in schemas if name in reachable}
+
+    spec = spec.copy()
+    spec["components"] = pruned
+    return spec
+
 
 def resolve_refs(spec: dict[str, Any]) -> dict[str, Any]:
     """
@@ -23,6 +99,10 @@ def resolve_refs(spec: dict[str, Any]) -> dict[str, Any]:
     This is a workaround for FastMCP's issue with $ref handling where it
     doesn't properly include schema definitions when creating tool input schemas.
 
+    Each component schema is resolved once and the result is shared by every
+    place that references it, and subtrees without refs are reused from the
+    input rather than copied. Treat the returned spec as read-only.
+
     Args:
         spec: OpenAPI specification dictionary
 
@@ -35,54 +115,167 @@ def resolve_refs(spec: dict[str, Any]) -> dict[str, Any]:
     # Get the components/schemas section for reference resolution
     schemas = spec.get("components", {}).get("schemas", {})
 
-    def resolve_schema(obj: Any, visited: set[str] | None = None) -> Any:
-        """Recursively resolve $ref in an object."""
-        if visited is None:
-            visited = set()
+    # Resolve refs in all paths
+    if "paths" in spec:
+        spec["paths"] = _SchemaResolver(schemas).resolve(spec["paths"])
 
-        if isinstance(obj, dict):
-            # Check if this is a $ref
-            if "$ref" in obj and len(obj) == 1:
-                ref_path = obj["$ref"]
+    return spec
 
-                # Prevent infinite recursion
-                if ref_path in visited:
-                    # Return the ref as-is to avoid infinite loop
+
+class _SchemaResolver:
+    """
+    Memoizing $ref resolver for component schemas.
+
+    Schemas that take part in a reference cycle are found up front. A ref
+    into a cycle is expanded until it would revisit a schema already being
+    expanded, at which point the $ref is left in place. That expansion only
+    depends on the schema the cycle was entered through, so it is cached
+    per entry schema just like acyclic schemas are.
+    """
+
+    def __init__(self, schemas: dict[str, Any]):
+        self._schemas = schemas
+        self._cycles = _find_cyclic_schemas(schemas)
+        self._resolved: dict[str, Any] = {}
+
+    def resolve(self, obj: Any) -> Any:
+        """Resolve refs under obj, outside of any reference cycle."""
+        return self._walk(obj, None, frozenset())
+
+    def _component(self, name: str) -> Any:
+        """Return the resolved form of a component schema, computing it once."""
+        if name not in self._resolved:
+            self._resolved[name] = self._walk(
+                self._schemas[name], self._cycles.get(name), frozenset((name,))
+            )
+        return self._resolved[name]
+
+    def _walk(self, obj: Any, cycle: int | None, expanding: frozenset[str]) -> Any:
+        """Resolve refs under obj, sharing unchanged subtrees with the input."""
+        if isinstance(obj, dict):
+            ref = obj.get("$ref")
+            if ref is not None and len(obj) == 1:
+                name = _schema_name(ref)
+                if name is None or name not in self._schemas:
+                    # If we can't resolve, return as-is
                     return obj
+                if cycle is None or self._cycles.get(name) != cycle:
+                    return self._component(name)
+                if name in expanding:
+                    # Return the ref as-is to avoid infinite recursion
+                    return obj
+                return self._walk(self._schemas[name], cycle, expanding | {name})
 
-                visited.add(ref_path)
-
-                # Extract schema name from reference
-                if ref_path.startswith("#/components/schemas/"):
-                    schema_name = ref_path.split("/")[-1]
-                    if schema_name in schemas:
-                        # Recursively resolve the referenced schema
-                        resolved = resolve_schema(schemas[schema_name].copy(), visited)
-                        visited.remove(ref_path)
-                        return resolved
-
-                # If we can't resolve, return as-is
-                visited.remove(ref_path)
-                return obj
-            else:
-                # Recursively process all values in the dict
-                result = {}
-                for key, value in obj.items():
-                    result[key] = resolve_schema(value, visited)
-                return result
+            result = None
+            for key, value in obj.items():
+                resolved = self._walk(value, cycle, expanding)
+                if resolved is not value:
+                    if result is None:
+                        result = dict(obj)
+                    result[key] = resolved
+            return obj if result is None else result
 
         elif isinstance(obj, list):
-            # Recursively process all items in the list
-            return [resolve_schema(item, visited) for item in obj]
-        else:
-            # Return primitive values as-is
-            return obj
+            items = None
+            for i, item in enumerate(obj):
+                resolved = self._walk(item, cycle, expanding)
+                if resolved is not item:
+                    if items is None:
+                        items = list(obj)
+                    items[i] = resolved
+            return obj if items is None else items
 
-    # Resolve refs in all paths
-    if "paths" in spec:
-        spec["paths"] = resolve_schema(spec["paths"])
+        # Return primitive values as-is
+        return obj
 
-    return spec
+
+def _schema_name(ref: Any) -> str | None:
+    """Extract the component schema name from a $ref, if it points at one."""
+    if isinstance(ref, str) and ref.startswith(SCHEMA_REF_PREFIX):
+        return ref.split("/")[-1]
+    return None
+
+
+def _schema_refs(obj: Any) -> set[str]:
+    """Collect the names of component schemas referenced anywhere under obj."""
+    names = set()
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            name = _schema_name(node.get("$ref"))
+            if name is not None:
+                names.add(name)
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return names
+
+
+def _find_cyclic_schemas(schemas: dict[str, Any]) -> dict[str, int]:
+    """
+    Find the component schemas that take part in a reference cycle.
+
+    Uses an iterative Tarjan strongly-connected-components pass over the
+    schema reference graph, so deep chains cannot hit the recursion limit.
+
+    Returns:
+        Mapping of schema name to the id of the cycle it belongs to
+    """
+    graph = {
+        name: [ref for ref in sorted(_schema_refs(schema)) if ref in schemas]
+        for name, schema in schemas.items()
+    }
+
+    index: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    cycles: dict[str, int] = {}
+    cycle_id = 0
+
+    for root in graph:
+        if root in index:
+            continue
+
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+
+            if child is not None:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(graph[child])))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in graph[node]:
+                    for member in component:
+                        cycles[member] = cycle_id
+                    cycle_id += 1
+
+    return cycles
 
 
 # Use if context becomes too large for inline definitions
@@ -0,0 +1,319 @@
+"""
+Startup phase profiling.
+
+main() starts a StartupProfiler before anything else happens. Code along
+the startup path marks its phases with phase(), and wraps callbacks that
+FastMCP calls once per route with timed(). Both do nothing when no
+profiler is active, so create_mcp_server() costs the same in tests and
+benchmarks. They also do nothing off the thread that started the
+profiler, such as in a deferred tool build. Each phase records its wall
+time and the change in resident memory. Phases may nest.
+
+When the server is about to serve, finish() logs a one-line summary. If a
+report directory is configured, it also writes the full report as JSON.
+Two modes add detail at a cost:
+- "tracemalloc" traces allocations. It adds allocated and peak bytes to
+  every phase, and lists the top allocation sites.
+- "cprofile" profiles the whole startup into a .prof file, for
+  python -m pstats or snakeviz.
+"""
+
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+from ..config import Config
+from .logging import get_logger
+from .metrics import resident_memory_bytes
+
+logger = get_logger(__name__)
+
+# Allocation sites listed in a tracemalloc report
+TOP_ALLOCATIONS = 25
+
+_active: "StartupProfiler | None" = None
+
+
+@dataclass
+class Phase:
+    """One timed step of startup."""
+
+    name: str
+    parent: str | None
+    started: float
+    rss_start: int | None
+    seconds: float | None = None
+    rss_delta: int | None = None
+    # Only with tracemalloc: bytes still allocated at the end, and the high-water mark, both relative to the start
+    allocated: int | None = None
+    peak: int | None = None
+    _traced_start: int = 0
+    _traced_peak: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        report = {
+            "name": self.name,
+            "parent": self.parent,
+            "seconds": round(self.seconds or 0.0, 6),
+            "rss_delta_bytes": self.rss_delta,
+        }
+        if self.allocated is not None:
+            report["allocated_bytes"] = self.allocated
+            report["peak_bytes"] = self.peak
+        return report
+
+
+class StartupProfiler:
+    """Time and measure the phases of one server start."""
+
+    def __init__(self, mode: str = "", report_dir: str = ""):
+        self.mode = mode
+        self.report_dir = report_dir
+        self.phases: list[Phase] = []
+        self.callbacks: dict[str, list[float]] = {}
+        self._open: list[Phase] = []
+        self._started = 0.0
+        self._before_start: float | None = None
+        self._report: dict[str, Any] | None = None
+        self._cprofile: cProfile.Profile | None = None
+        self._owns_tracemalloc = False
+        self._thread: int | None = None
+
+    @classmethod
+    def from_config(cls) -> "StartupProfiler":
+        return cls(Config.STARTUP_PROFILE_MODE, Config.STARTUP_PROFILE_DIR)
+
+    @property
+    def tracing_allocations(self) -> bool:
+        # Also true when PYTHONTRACEMALLOC started tracing first, which covers imports too
+        return self.mode == "tracemalloc" and tracemalloc.is_tracing()
+
+    def start(self) -> "StartupProfiler":
+        """Make this the active profiler and start the clock."""
+        global _active
+        _active = self
+        self._thread = threading.get_ident()
+        self._before_start = process_uptime()
+        if self.mode == "tracemalloc" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        if self.mode == "cprofile":
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._started = time.perf_counter()
+        return self
+
+    def begin(self, name: str) -> Phase:
+        """Open a phase; it ends with end(), or with finish() if still open then."""
+        entry = Phase(
+            name=name,
+            parent=self._open[-1].name if self._open else None,
+            started=time.perf_counter(),
+            rss_start=resident_memory_bytes(),
+        )
+        if self.tracing_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            # Resetting the peak for this phase must not lose the peak seen so far by the enclosing ones
+            for outer in self._open:
+                outer._traced_peak = max(outer._traced_peak, peak)
+            tracemalloc.reset_peak()
+            entry._traced_start = entry._traced_peak = current
+        self._open.append(entry)
+        self.phases.append(entry)
+        return entry
+
+    def end(self, entry: Phase) -> None:
+        if entry not in self._open:
+            return
+        # Phases left open inside this one end with it
+        while self._open:
+            inner = self._open.pop()
+            self._close(inner)
+            if inner is entry:
+                break
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[Phase]:
+        entry = self.begin(name)
+        try:
+            yield entry
+        finally:
+            self.end(entry)
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """Wrap fn to add its calls and total time to the report under name."""
+        totals = self.callbacks.setdefault(name, [0, 0.0])
+
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                totals[0] += 1
+                totals[1] += time.perf_counter() - started
+
+        return wrapper
+
+    def finish(self) -> dict[str, Any]:
+        """
+        End every open phase, log the summary and write the report.
+
+        Only the first call does anything; later calls return the same report.
+        """
+        global _active
+        if self._report is not None:
+            return self._report
+
+        while self._open:
+            self._close(self._open.pop())
+        total = time.perf_counter() - self._started
+        if _active is self:
+            _active = None
+
+        report: dict[str, Any] = {
+            "pid": os.getpid(),
+            "finished_at": datetime.now(UTC).isoformat(),
+            "mode": self.mode,
+            "before_start_seconds": round(self._before_start, 6) if self._before_start is not None else None,
+            "total_seconds": round(total, 6),
+            "rss_bytes": resident_memory_bytes(),
+            "phases": [p.to_dict() for p in self.phases],
+            "callbacks": {
+                name: {"calls": int(calls), "seconds": round(seconds, 6)}
+                for name, (calls, seconds) in self.callbacks.items()
+            },
+        }
+
+        if self.tracing_allocations:
+            report["top_allocations"] = _top_allocations()
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            if self.report_dir:
+                path = self._path("prof")
+                self._cprofile.dump_stats(path)
+                report["cprofile"] = path
+
+        self._report = report
+        logger.info(summarize(report))
+        if self.report_dir:
+            path = self._path("json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            logger.info(f"Startup profile written to {path}")
+        return report
+
+    def _close(self, entry: Phase) -> None:
+        entry.seconds = time.perf_counter() - entry.started
+        rss = resident_memory_bytes()
+        if rss is not None and entry.rss_start is not None:
+            entry.rss_delta = rss - entry.rss_start
+        if self.tracing_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            entry._traced_peak = max(entry._traced_peak, peak)
+            entry.allocated = current - entry._traced_start
+            entry.peak = entry._traced_peak - entry._traced_start
+            for outer in self._open:
+                outer._traced_peak = max(outer._traced_peak, entry._traced_peak)
+
+    def _path(self, extension: str) -> str:
+        os.makedirs(self.report_dir, exist_ok=True)
+        return os.path.join(self.report_dir, f"startup-{os.getpid()}.{extension}")
+
+
+class StartupCompleteMiddleware:
+    """
+    ASGI middleware calling on_complete once the app's lifespan has started.
+
+    Uvicorn binds its socket right after lifespan startup, so this marks
+    the point where an HTTP server is about to accept connections.
+    """
+
+    def __init__(self, app, on_complete: Callable[[], Any]):
+        self.app = app
+        self.on_complete = on_complete
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "lifespan":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_and_notify(message):
+            await send(message)
+            if message["type"] == "lifespan.startup.complete":
+                self.on_complete()
+
+        await self.app(scope, receive, send_and_notify)
+
+
+def _profiler() -> "StartupProfiler | None":
+    profiler = _active
+    if profiler is None or profiler._thread != threading.get_ident():
+        return None
+    return profiler
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the block as a startup phase of the active profiler, if any."""
+    profiler = _profiler()
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
+
+
+def timed(name: str, fn: Callable) -> Callable:
+    """Return fn wrapped for the active profiler, or fn itself when none is active."""
+    profiler = _profiler()
+    return profiler.timed(name, fn) if profiler is not None else fn
+
+
+def summarize(report: dict[str, Any]) -> str:
+    """One line naming the time of every top-level phase."""
+    phases = ", ".join(
+        f"{p['name']} {p['seconds'] * 1000:.1f} ms" for p in report["phases"] if p["parent"] is None
+    )
+    line = f"Startup took {report['total_seconds'] * 1000:.1f} ms"
+    if report["before_start_seconds"] is not None:
+        line += f" after {report['before_start_seconds'] * 1000:.0f} ms of interpreter start and imports"
+    line += f": {phases}"
+    if report["rss_bytes"] is not None:
+        line += f"; RSS {report['rss_bytes'] / 1024 / 1024:.1f} MiB"
+    return line
+
+
+def process_uptime() -> float | None:
+    """Seconds since this process started, where /proc is available."""
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name may contain spaces; fields after it are space separated
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _top_allocations() -> list[dict[str, Any]]:
+    snapshot = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+    return [
+        {"site": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+    ]
@@ -0,0 +1,210 @@
+"""
+Field projection for JSON responses.
+
+A projection is a comma separated list of dotted paths such as
+"entities.tag,entities.owners.teams.tag,total". Lists are traversed
+implicitly, so "entities.tag" selects the tag of every entity. JSONPath and
+JMESPath spellings of the same thing ("$.entities[*].tag",
+"entities[].tag") are accepted too.
+
+project_json() applies a projection while decoding the text: requested
+subtrees are decoded by the C JSON scanner and everything else is skipped
+(see _Projector.skip). This avoids building the full document before
+trimming it, but the text itself is held whole, and a skipped object is
+still decoded before it is dropped.
+"""
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any
+
+# A projection tree maps keys to sub-projections; an empty tree selects the whole value
+Projection = dict[str, "Projection"]
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR = re.compile(r"[^,\]}\s]*")
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_PATH_NOISE = re.compile(r"\[\*?\]")
+
+
+def parse_fields(fields: str | list[str]) -> Projection:
+    """
+    Parse field paths into a projection tree.
+
+    Args:
+        fields: Comma separated paths, or a list of paths
+
+    Returns:
+        Projection tree; empty if no paths were given
+
+    Raises:
+        ValueError: If a path has an empty segment
+    """
+    paths = fields.split(",") if isinstance(fields, str) else fields
+    tree: Projection = {}
+    for path in paths:
+        path = _PATH_NOISE.sub("", path.strip())
+        if path.startswith("$"):
+            path = path[1:].lstrip(".")
+        if not path:
+            continue
+
+        segments = path.split(".")
+        if not all(segments):
+            raise ValueError(f"Invalid field path: {path!r}")
+
+        node = tree
+        for i, segment in enumerate(segments):
+            child = node.get(segment)
+            if child is not None and not child:
+                # A shorter path already selects this whole subtree
+                break
+            if i == len(segments) - 1:
+                node[segment] = {}
+            else:
+                node = node.setdefault(segment, {})
+    return tree
+
+
+def project(value: Any, projection: Projection) -> Any:
+    """Apply a projection to an already decoded value."""
+    if not projection:
+        return value
+    if isinstance(value, list):
+        return [project(item, projection) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: project(value[key], sub)
+            for key, sub in projection.items()
+            if key in value
+        }
+    return value
+
+
+def project_json(text: str, projection: Projection) -> Any:
+    """
+    Decode a JSON document, keeping only the projected fields.
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON
+    """
+    return _Projector(text).decode(projection)
+
+
+class _Projector:
+    """Single-use decoder over one document."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.scan_once = json.JSONDecoder().scan_once
+
+    def decode(self, projection: Projection) -> Any:
+        text = self.text
+        value, end = self.value(_WHITESPACE.match(text, 0).end(), projection)
+        end = _WHITESPACE.match(text, end).end()
+        if end != len(text):
+            raise json.JSONDecodeError("Extra data", text, end)
+        return value
+
+    def value(self, pos: int, projection: Projection) -> tuple[Any, int]:
+        """Decode the value at pos (which must not be whitespace)."""
+        text = self.text
+        char = text[pos:pos + 1]
+        if projection and char == "{":
+            return self.object(pos + 1, projection)
+        if projection and char == "[":
+            return self.array(pos + 1, projection)
+        return self.scan(pos)
+
+    def object(self, pos: int, projection: Projection) -> tuple[dict[str, Any], int]:
+        text = self.text
+        result: dict[str, Any] = {}
+        pos = _WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] == "}":
+            return result, pos + 1
+
+        while True:
+            if text[pos:pos + 1] != '"':
+                raise json.JSONDecodeError("Expecting property name", text, pos)
+            key, pos = scanstring(text, pos + 1)
+            pos = _WHITESPACE.match(text, pos).end()
+            if text[pos:pos + 1] != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+            pos = _WHITESPACE.match(text, pos + 1).end()
+
+            sub = projection.get(key)
+            if sub is None:
+                pos = self.skip(pos)
+            else:
+                result[key], pos = self.value(pos, sub)
+
+            pos = _WHITESPACE.match(text, pos).end()
+            char = text[pos:pos + 1]
+            if char == "}":
+                return result, pos + 1
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+            pos = _WHITESPACE.match(text, pos + 1).end()
+
+    def array(self, pos: int, projection: Projection) -> tuple[list[Any], int]:
+        text = self.text
+        result: list[Any] = []
+        pos = _WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] == "]":
+            return result, pos + 1
+
+        while True:
+            item, pos = self.value(pos, projection)
+            result.append(item)
+            pos = _WHITESPACE.match(text, pos).end()
+            char = text[pos:pos + 1]
+            if char == "]":
+                return result, pos + 1
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+            pos = _WHITESPACE.match(text, pos + 1).end()
+
+    def skip(self, pos: int) -> int:
+        """
+        Return the end of the value at pos without keeping it.
+
+        Strings and numbers are only matched. Objects are decoded whole by
+        the C scanner and dropped at once, which is as fast as json.loads;
+        arrays, which are what grows in API responses, are walked one item
+        at a time so a large skipped list is never alive as a whole.
+        """
+        text = self.text
+        char = text[pos:pos + 1]
+        if char == "[":
+            return self.skip_items(pos + 1)
+        if char == "{":
+            return self.scan(pos)[1]
+        match = (_STRING if char == '"' else _SCALAR).match(text, pos)
+        if match is None or match.end() == pos:
+            raise json.JSONDecodeError("Expecting value", text, pos)
+        return match.end()
+
+    def skip_items(self, pos: int) -> int:
+        """Return the end of the array whose items start at pos."""
+        text = self.text
+        pos = _WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] == "]":
+            return pos + 1
+
+        while True:
+            pos = self.skip(pos)
+            pos = _WHITESPACE.match(text, pos).end()
+            char = text[pos:pos + 1]
+            if char == "]":
+                return pos + 1
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+            pos = _WHITESPACE.match(text, pos + 1).end()
+
+    def scan(self, pos: int) -> tuple[Any, int]:
+        """Decode the value at pos with the C scanner."""
+        try:
+            return self.scan_once(self.text, pos)
+        except StopIteration:
+            raise json.JSONDecodeError("Expecting value", self.text, pos) from None
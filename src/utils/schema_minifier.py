@@ -0,0 +1,243 @@
+"""
+Input schema minification for compiled specs.
+
+resolve_refs inlines every referenced schema in full. The inputSchema of a
+tool like queryPointInTimeMetrics therefore carries everything the spec
+says about those schemas: examples, discriminators, int32/int64 formats,
+and descriptions repeated on an array and on its items. That schema is
+sent again with every tools/list.
+
+minify_spec drops keywords that do not help a client build arguments. It
+can also hold each operation's inputs to a byte budget. To do that it
+collapses the deepest nested schemas into bare {"type", "description"}
+stubs, one level at a time, until the inputs fit. Top-level arguments are
+never collapsed.
+
+Identical subtrees are not moved into shared definitions. FastMCP cannot
+follow $ref chains through $defs, which is why resolve_refs inlines them
+and customize_components strips any $defs left in a tool's schema.
+"""
+
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .openapi_resolver import HTTP_METHODS
+
+# OpenAPI and JSON Schema keywords that only document or annotate a schema
+NON_ESSENTIAL_KEYWORDS = frozenset(
+    {"example", "examples", "discriminator", "externalDocs", "xml", "title", "$comment"}
+)
+
+# Formats that restate the type; date-time, uuid and the like still tell a client what to send
+NUMERIC_FORMATS = frozenset({"int32", "int64", "float", "double"})
+
+# Keywords holding a schema, a list of schemas, or a map of names to schemas
+SCHEMA_KEYWORDS = ("items", "additionalProperties", "not")
+SCHEMA_LIST_KEYWORDS = ("allOf", "anyOf", "oneOf", "prefixItems")
+SCHEMA_MAP_KEYWORDS = ("properties", "patternProperties")
+
+# What a collapsed schema keeps
+STUB_KEYWORDS = ("type", "description", "nullable")
+
+
+@dataclass
+class SchemaSize:
+    """Input schema size of one operation before and after minification."""
+
+    tool: str
+    before: int
+    after: int
+    # Nested schemas at this depth and below were collapsed to fit the budget
+    collapsed_depth: int | None = None
+
+
+def minify_spec(spec: dict[str, Any], max_bytes: int = 0) -> tuple[dict[str, Any], list[SchemaSize]]:
+    """
+    Minify the input schemas of every operation in a resolved spec.
+
+    Args:
+        spec: Spec with $refs resolved; it is not modified
+        max_bytes: Budget for each operation's parameters and request body (0 disables)
+
+    Returns:
+        The minified spec, and the input size of every operation
+    """
+    paths: dict[str, Any] = {}
+    sizes: list[SchemaSize] = []
+    for path, path_item in spec.get("paths", {}).items():
+        paths[path] = dict(path_item)
+        for method, operation in path_item.items():
+            if method not in HTTP_METHODS:
+                continue
+            paths[path][method], size = minify_operation(operation, max_bytes)
+            size.tool = operation.get("operationId") or f"{method.upper()} {path}"
+            sizes.append(size)
+
+    spec = spec.copy()
+    spec["paths"] = paths
+    return spec, sizes
+
+
+def minify_operation(operation: dict[str, Any], max_bytes: int = 0) -> tuple[dict[str, Any], SchemaSize]:
+    """Minify one operation's parameter and request body schemas, collapsing them to max_bytes if set."""
+    before = input_size(operation)
+    minified = _map_input_schemas(operation, lambda schema, depth: minify_schema(schema))
+    size = SchemaSize(tool="", before=before, after=input_size(minified))
+    if not max_bytes or size.after <= max_bytes:
+        return minified, size
+
+    depths = []
+    _map_input_schemas(minified, lambda schema, depth: depths.append(_max_depth(schema, depth)))
+    collapsed = minified
+    deepest = max(depths, default=-1)
+    for limit in range(deepest, 0, -1):
+        collapsed = _map_input_schemas(
+            minified, lambda schema, depth, limit=limit: collapse_schema(schema, limit, depth)
+        )
+        size.collapsed_depth = limit
+        if input_size(collapsed) <= max_bytes:
+            break
+
+    size.after = input_size(collapsed)
+    return collapsed, size
+
+
+def minify_schema(schema: Any, inherited_description: str | None = None) -> Any:
+    """
+    Return schema without non-essential keywords.
+
+    Args:
+        schema: JSON schema; it is not modified
+        inherited_description: Description of the enclosing array, dropped if items repeat it
+    """
+    if not isinstance(schema, dict) or "$ref" in schema:
+        return schema
+
+    result = {}
+    for key, value in schema.items():
+        if key in NON_ESSENTIAL_KEYWORDS:
+            continue
+        if key == "format" and value in NUMERIC_FORMATS:
+            continue
+        if key == "description" and value == inherited_description:
+            continue
+
+        if key in SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            value = {name: minify_schema(child) for name, child in value.items()}
+        elif key in SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            value = [minify_schema(child) for child in value]
+        elif key == "items":
+            value = minify_schema(value, schema.get("description"))
+        elif key in SCHEMA_KEYWORDS:
+            value = minify_schema(value)
+        result[key] = value
+    return result
+
+
+def collapse_schema(schema: Any, limit: int, depth: int = 0) -> Any:
+    """Replace every nested schema at depth limit or deeper by a stub of its type and description."""
+    if not isinstance(schema, dict) or "$ref" in schema:
+        return schema
+    if _is_leaf(schema):
+        return schema
+    if depth >= limit:
+        return {key: schema[key] for key in STUB_KEYWORDS if key in schema}
+
+    result = dict(schema)
+    for key, value in schema.items():
+        if key in SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            result[key] = {name: collapse_schema(child, limit, depth + 1) for name, child in value.items()}
+        elif key in SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            result[key] = [collapse_schema(child, limit, depth + 1) for child in value]
+        elif key in SCHEMA_KEYWORDS:
+            result[key] = collapse_schema(value, limit, depth + 1)
+    return result
+
+
+def input_size(operation: dict[str, Any]) -> int:
+    """Compact JSON size in bytes of an operation's parameters and request body."""
+    inputs = [operation.get("parameters"), operation.get("requestBody")]
+    return len(json.dumps(inputs, separators=(",", ":"), ensure_ascii=False).encode())
+
+
+def format_schema_sizes(sizes: list[SchemaSize], max_bytes: int = 0) -> str:
+    """Render per-tool sizes as a table, largest first, with a total line."""
+    width = max((len(size.tool) for size in sizes), default=4)
+    lines = []
+    for size in sorted(sizes, key=lambda s: s.before, reverse=True):
+        line = f"{size.tool:<{width}}  {size.before:>7} -> {size.after:>7} bytes  {_change(size.before, size.after)}"
+        if size.collapsed_depth is not None:
+            line += f"  collapsed from depth {size.collapsed_depth}"
+        if max_bytes and size.after > max_bytes:
+            line += "  over budget"
+        lines.append(line)
+
+    before = sum(size.before for size in sizes)
+    after = sum(size.after for size in sizes)
+    lines.append(f"{'total':<{width}}  {before:>7} -> {after:>7} bytes  {_change(before, after)}")
+    return "\n".join(lines)
+
+
+def _change(before: int, after: int) -> str:
+    return f"{(after - before) / before:+.0%}" if before else ""
+
+
+def _map_input_schemas(operation: dict[str, Any], fn: Callable[[Any, int], Any]) -> dict[str, Any]:
+    """
+    Return operation with fn(schema, depth) applied to every input schema.
+
+    A request body's properties become top-level tool arguments, like
+    parameters, so the body schema is at depth 0 and parameter schemas at 1.
+    """
+    result = dict(operation)
+    if isinstance(operation.get("parameters"), list):
+        result["parameters"] = [
+            {**parameter, "schema": fn(parameter["schema"], 1)}
+            if isinstance(parameter, dict) and "schema" in parameter
+            else parameter
+            for parameter in operation["parameters"]
+        ]
+
+    body = operation.get("requestBody")
+    if isinstance(body, dict) and isinstance(body.get("content"), dict):
+        result["requestBody"] = {
+            **body,
+            "content": {
+                media_type: {**media, "schema": fn(media["schema"], 0)}
+                if isinstance(media, dict) and "schema" in media
+                else media
+                for media_type, media in body["content"].items()
+            },
+        }
+    return result
+
+
+def _subschemas(schema: dict[str, Any]) -> list[Any]:
+    children = []
+    for key, value in schema.items():
+        if key in SCHEMA_MAP_KEYWORDS and isinstance(value, dict):
+            children.extend(value.values())
+        elif key in SCHEMA_LIST_KEYWORDS and isinstance(value, list):
+            children.extend(value)
+        elif key in SCHEMA_KEYWORDS:
+            children.append(value)
+    return children
+
+
+def _max_depth(schema: Any, depth: int) -> int:
+    """Depth of the deepest schema under schema that still has nested schemas, or -1 if none does."""
+    if not isinstance(schema, dict) or "$ref" in schema or _is_leaf(schema):
+        return -1
+    return max(depth, *(_max_depth(child, depth + 1) for child in _subschemas(schema)))
+
+
+def _is_leaf(schema: dict[str, Any]) -> bool:
+    """True for schemas without nested schemas, and for arrays of those."""
+    children = _subschemas(schema)
+    if not children:
+        return True
+    # A stub would only drop the item type of an array of scalars, which is worth its few bytes
+    items = schema.get("items")
+    return len(children) == 1 and children[0] is items and isinstance(items, dict) and not _subschemas(items)
@@ -0,0 +1,82 @@
+"""
+SQLite files shared by several server processes.
+
+Stdio sessions on one host and the workers of a multi-worker HTTP server
+are separate processes. SharedDatabase gives each of them its own
+connection to the same file. WAL mode lets any number of them read while
+one writes, and a busy timeout makes writers wait for each other instead
+of failing.
+
+A SQLite connection must not be used in a process forked after it was
+opened, so a forked child opens a fresh one on first use. The parent's
+connection is left open, as closing it from the child could release the
+parent's locks.
+"""
+
+import os
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Seconds a process waits for another one's write to finish
+BUSY_TIMEOUT = 5.0
+
+
+class SharedDatabase:
+    """A SQLite file with a schema, opened once per process."""
+
+    def __init__(self, path: str, schema: str):
+        self.path = path
+        self._schema = schema
+        # Threads of one process share its connection, one at a time
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._inherited: list[sqlite3.Connection] = []
+        # Open right away so an unusable path fails at startup
+        self._db = connect(path, schema)
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Hold the connection for statements that do not write."""
+        with self._lock:
+            yield self._connection()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Hold the connection for a write transaction, committed on exit and rolled back on error."""
+        with self._lock:
+            db = self._connection()
+            # Take the write lock up front, so a transaction that reads before writing cannot deadlock
+            db.execute("BEGIN IMMEDIATE")
+            with db:
+                yield db
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            self._inherited.append(self._db)
+            self._db = connect(self.path, self._schema)
+            self._pid = os.getpid()
+        return self._db
+
+
+def connect(path: str, schema: str) -> sqlite3.Connection:
+    """Open path for use by several processes, creating it with schema if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # The files may hold API responses; SQLite gives its WAL and shared-memory files the same mode
+    os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+
+    db = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+    db.execute("PRAGMA journal_mode = WAL")
+    # WAL commits stay atomic without an fsync each; a crash may only lose the latest writes
+    db.execute("PRAGMA synchronous = NORMAL")
+    # So rows that INSERT OR REPLACE deletes fire delete triggers
+    db.execute("PRAGMA recursive_triggers = ON")
+    db.executescript(schema)
+    return db
@@ -0,0 +1,204 @@
+"""
+Compiled OpenAPI spec artifacts.
+
+Every process start used to parse and resolve the full swagger.json even though
+only the operations marked x-cortex-mcp-enabled become MCP tools. With the stdio
+transport each agent session is a fresh process, so that work is repeated for
+every session.
+
+A compiled artifact holds only the MCP-enabled operations, with their $refs
+already resolved and their input schemas minified, plus the component schemas
+they still reference. It is stored under the SHA-256 of the source spec bytes,
+so an edited spec never picks up a stale artifact: the hash no longer matches
+and the artifact is rebuilt. So is an artifact built with another schema budget.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any
+
+from ..routes.mappers import is_mcp_enabled
+from .logging import get_logger
+from .openapi_resolver import filter_operations, prune_components, resolve_refs
+from .profiling import phase
+from .schema_minifier import SchemaSize, format_schema_sizes, minify_spec
+
+logger = get_logger(__name__)
+
+# Bump when the compiled layout changes so old artifacts are rebuilt
+FORMAT_VERSION = 2
+
+
+def hash_spec_bytes(raw: bytes) -> str:
+    """Return the content hash used to key compiled artifacts."""
+    return hashlib.sha256(raw).hexdigest()
+
+
+def hash_spec_file(spec_path: str) -> str:
+    """Return the content hash of the spec file at spec_path."""
+    with open(spec_path, "rb") as f:
+        return hash_spec_bytes(f.read())
+
+
+def artifact_path(cache_dir: str, spec_hash: str) -> str:
+    """Return the artifact location for a given source spec hash."""
+    return os.path.join(cache_dir, f"openapi-{spec_hash[:16]}.json")
+
+
+def compile_spec(spec: dict[str, Any], schema_max_bytes: int = 0) -> dict[str, Any]:
+    """
+    Reduce an OpenAPI spec to the parts the MCP server actually uses.
+
+    Excluded operations are dropped before dereferencing, and schemas left
+    unreferenced once refs are inlined are dropped afterwards. The input
+    schemas are then minified (see schema_minifier).
+
+    Args:
+        spec: Full OpenAPI specification dictionary
+        schema_max_bytes: Input schema budget of each operation (0 disables)
+
+    Returns:
+        Spec containing only MCP-enabled operations with $refs resolved
+    """
+    filtered = filter_operations(spec, is_mcp_enabled)
+    with phase("resolve_refs"):
+        resolved = resolve_refs(filtered)
+    with phase("minify_schemas"):
+        minified, sizes = minify_spec(prune_components(resolved), schema_max_bytes)
+    _log_schema_sizes(sizes, schema_max_bytes)
+    return minified
+
+
+def read_artifact(path: str, spec_hash: str, schema_max_bytes: int = 0) -> dict[str, Any] | None:
+    """
+    Read a compiled artifact if it exists and matches the source spec.
+
+    Returns:
+        The compiled spec, or None if the artifact is missing, stale or unreadable
+    """
+    try:
+        with open(path) as f:
+            artifact = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable compiled spec {path}: {e}")
+        return None
+
+    if (
+        not isinstance(artifact, dict)
+        or artifact.get("format_version") != FORMAT_VERSION
+        or artifact.get("source_sha256") != spec_hash
+        or artifact.get("schema_max_bytes") != schema_max_bytes
+    ):
+        logger.info(f"Compiled spec {path} is stale, rebuilding")
+        return None
+
+    return artifact.get("spec")
+
+
+def write_artifact(path: str, spec_hash: str, compiled: dict[str, Any], schema_max_bytes: int = 0) -> None:
+    """Atomically write a compiled artifact so concurrent readers never see partial files."""
+    write_json_atomic(path, {
+        "format_version": FORMAT_VERSION,
+        "source_sha256": spec_hash,
+        "schema_max_bytes": schema_max_bytes,
+        "spec": compiled,
+    })
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """Write data as compact JSON through a temporary file renamed over path."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def compile_spec_file(spec_path: str, cache_dir: str, schema_max_bytes: int = 0) -> str:
+    """
+    Compile the spec at spec_path and write its artifact unconditionally.
+
+    Returns:
+        Path of the written artifact
+    """
+    with open(spec_path, "rb") as f:
+        raw = f.read()
+
+    spec_hash = hash_spec_bytes(raw)
+    path = artifact_path(cache_dir, spec_hash)
+    write_artifact(path, spec_hash, compile_spec(json.loads(raw), schema_max_bytes), schema_max_bytes)
+
+    logger.info(f"Compiled OpenAPI spec written to: {path}")
+    return path
+
+
+def load_compiled_spec(spec_path: str, cache_dir: str, schema_max_bytes: int = 0) -> dict[str, Any]:
+    """
+    Load the compiled spec for spec_path, rebuilding the artifact when stale.
+
+    Args:
+        spec_path: Path to the source OpenAPI spec
+        cache_dir: Directory holding compiled artifacts; empty disables persistence
+        schema_max_bytes: Input schema budget of each operation (0 disables)
+
+    Returns:
+        Compiled OpenAPI specification dictionary
+    """
+    with phase("read_spec"):
+        with open(spec_path, "rb") as f:
+            raw = f.read()
+        spec_hash = hash_spec_bytes(raw)
+
+    if not cache_dir:
+        return _parse_and_compile(raw, schema_max_bytes)
+
+    path = artifact_path(cache_dir, spec_hash)
+    with phase("read_artifact"):
+        compiled = read_artifact(path, spec_hash, schema_max_bytes)
+    if compiled is not None:
+        logger.info(f"Using compiled OpenAPI spec: {path}")
+        return compiled
+
+    compiled = _parse_and_compile(raw, schema_max_bytes)
+
+    try:
+        with phase("write_artifact"):
+            write_artifact(path, spec_hash, compiled, schema_max_bytes)
+        logger.info(f"Compiled OpenAPI spec written to: {path}")
+    except OSError as e:
+        # A read-only filesystem should not stop the server from starting
+        logger.warning(f"Could not write compiled spec to {path}: {e}")
+
+    return compiled
+
+
+def _parse_and_compile(raw: bytes, schema_max_bytes: int) -> dict[str, Any]:
+    with phase("parse_spec"):
+        spec = json.loads(raw)
+    with phase("compile_spec"):
+        return compile_spec(spec, schema_max_bytes)
+
+
+def _log_schema_sizes(sizes: list[SchemaSize], schema_max_bytes: int) -> None:
+    before = sum(size.before for size in sizes)
+    after = sum(size.after for size in sizes)
+    logger.info(f"Input schemas of {len(sizes)} operations minified from {before} to {after} bytes")
+    for size in sizes:
+        if size.collapsed_depth is not None:
+            logger.info(
+                f"Collapsed the input schema of {size.tool} from depth {size.collapsed_depth} "
+                f"to fit {schema_max_bytes} bytes: {size.before} -> {size.after} bytes"
+            )
+        if schema_max_bytes and size.after > schema_max_bytes:
+            logger.warning(f"Input schema of {size.tool} is {size.after} bytes, over the {schema_max_bytes} byte budget")
+    logger.debug("Input schema sizes:\n" + format_schema_sizes(sizes, schema_max_bytes))
@@ -0,0 +1,234 @@
+"""Incremental JSON decoding that can be cut off and still yield valid JSON."""
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Any
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_START = frozenset("-0123456789")
+_NUMBER_CHARS = re.compile(r"[-+0-9.eE]*")
+
+# The document and its direct children are always walked, so top-level lists
+# are capped item by item even when the whole body arrives in one chunk
+_OPEN_DEPTH = 2
+
+# Consumed input is dropped from the buffer once this much has piled up
+_COMPACT_AFTER = 64 * 1024
+
+_MISSING = object()
+
+
+@dataclass
+class _Frame:
+    """A container that is still open, and what the decoder expects next in it."""
+
+    container: dict[str, Any] | list[Any]
+    expect: str
+    key: str | None = None
+    # Containers below the open depth join their parent only once complete
+    attached: bool = True
+
+
+class IncrementalDecoder:
+    """
+    Decode a JSON document fed in chunks, keeping memory bounded.
+
+    Complete values are decoded by the C scanner in one go. Only the top two
+    levels and containers that run past the end of the data received so far
+    are walked member by member, so Python-level parsing is limited to the
+    path currently crossing the chunk boundary. Decoded input is dropped
+    from the buffer as it is consumed.
+
+    The value built so far is always well-formed. The top two levels are
+    visible while still open; anything deeper appears only once complete, so
+    a cut-off document never holds a half-read list item. Once an array reaches max_items the decoder stops
+    and `limited` is set; anything after it in the document is not read.
+    """
+
+    def __init__(self, max_items: int = 0):
+        self.max_items = max_items
+        self.limited = False
+        self.trimmed = False
+        self._scan_once = json.JSONDecoder().scan_once
+        self._buffer = ""
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._root: Any = _MISSING
+        # Buffer length to wait for before retrying an incomplete scalar
+        self._retry_at = 0
+
+    @property
+    def done(self) -> bool:
+        return self._root is not _MISSING and not self._stack
+
+    @property
+    def value(self) -> Any:
+        """The document decoded so far, or None if nothing is complete yet."""
+        return None if self._root is _MISSING else self._root
+
+    def feed(self, text: str) -> None:
+        """
+        Decode as much as possible of the document with text appended.
+
+        Raises:
+            json.JSONDecodeError: If the document is invalid
+        """
+        self._buffer += text
+        self._parse(final=False)
+
+    def close(self) -> Any:
+        """
+        Finish decoding at the end of input.
+
+        Returns:
+            The decoded document
+
+        Raises:
+            json.JSONDecodeError: If the document is invalid or incomplete
+        """
+        self._parse(final=True)
+        if not self.done and not self.limited:
+            raise json.JSONDecodeError("Unexpected end of data", self._buffer, self._pos)
+        return self._root
+
+    def _parse(self, final: bool) -> None:
+        buffer = self._buffer
+        while not self.limited:
+            pos = _WHITESPACE.match(buffer, self._pos).end()
+            self._pos = pos
+            if pos == len(buffer):
+                break
+            if self.done:
+                raise json.JSONDecodeError("Extra data", buffer, pos)
+            if not self._step(buffer, pos, final):
+                break
+
+        if self._pos > _COMPACT_AFTER:
+            self._retry_at = max(0, self._retry_at - self._pos)
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+
+    def _step(self, buffer: str, pos: int, final: bool) -> bool:
+        """Consume one token or value at pos; return False if more data is needed."""
+        frame = self._stack[-1] if self._stack else None
+        expect = frame.expect if frame else "value"
+        char = buffer[pos]
+
+        if expect in ("first", "comma") and char in "]}":
+            if char != ("]" if isinstance(frame.container, list) else "}"):
+                raise self._error("Mismatched closing bracket", pos)
+            if not frame.attached:
+                # Attach before popping so a full parent list leaves the frame to retry
+                if not self._attach(frame.container, parent=-2):
+                    return False
+            self._stack.pop()
+            self._pos = pos + 1
+            self._after_value()
+            return True
+
+        if expect == "comma":
+            if char != ",":
+                raise self._error("Expecting ',' delimiter", pos)
+            frame.expect = "key" if isinstance(frame.container, dict) else "value"
+            self._pos = pos + 1
+            return True
+
+        if isinstance(frame.container if frame else None, dict) and expect in ("first", "key"):
+            if char != '"':
+                raise self._error("Expecting property name", pos)
+            if not final and len(buffer) < self._retry_at:
+                return False
+            try:
+                key, end = json.decoder.scanstring(buffer, pos + 1)
+            except json.JSONDecodeError:
+                return self._incomplete(buffer, pos, final)
+            frame.key = key
+            frame.expect = "colon"
+            self._pos = end
+            return True
+
+        if expect == "colon":
+            if char != ":":
+                raise self._error("Expecting ':' delimiter", pos)
+            frame.expect = "value"
+            self._pos = pos + 1
+            return True
+
+        return self._value(buffer, pos, final)
+
+    def _value(self, buffer: str, pos: int, final: bool) -> bool:
+        char = buffer[pos]
+        if char in "{[":
+            try:
+                if len(self._stack) < _OPEN_DEPTH:
+                    raise StopIteration(pos)
+                value, end = self._scan_once(buffer, pos)
+            except (StopIteration, json.JSONDecodeError):
+                # Near the top, or running past the data received so far: walk its members
+                container: dict[str, Any] | list[Any] = {} if char == "{" else []
+                attached = len(self._stack) < _OPEN_DEPTH
+                if not (self._attach(container) if attached else self._has_room()):
+                    return False
+                self._stack.append(_Frame(container, expect="first", attached=attached))
+                self._pos = pos + 1
+                return True
+            if isinstance(value, list) and self.max_items and len(value) > self.max_items:
+                del value[self.max_items:]
+                self.trimmed = True
+        else:
+            if not final and len(buffer) < self._retry_at:
+                return False
+            # A number running up to the end of the buffer may continue in the next chunk
+            if not final and char in _NUMBER_START and _NUMBER_CHARS.match(buffer, pos).end() == len(buffer):
+                return self._incomplete(buffer, pos, final)
+            try:
+                value, end = self._scan_once(buffer, pos)
+            except (StopIteration, json.JSONDecodeError):
+                return self._incomplete(buffer, pos, final)
+
+        if not self._attach(value):
+            return False
+        self._pos = end
+        self._after_value()
+        return True
+
+    def _attach(self, value: Any, parent: int = -1) -> bool:
+        """Add a complete value, or a newly opened container, to its parent."""
+        if len(self._stack) < -parent:
+            self._root = value
+            return True
+        if not self._has_room(parent):
+            return False
+        frame = self._stack[parent]
+        if isinstance(frame.container, list):
+            frame.container.append(value)
+        else:
+            frame.container[frame.key] = value
+        return True
+
+    def _has_room(self, parent: int = -1) -> bool:
+        """Check the parent can take another item, setting `limited` if not."""
+        if len(self._stack) < -parent:
+            return True
+        container = self._stack[parent].container
+        if self.max_items and isinstance(container, list) and len(container) >= self.max_items:
+            self.limited = True
+            return False
+        return True
+
+    def _after_value(self) -> None:
+        self._retry_at = 0
+        if self._stack:
+            self._stack[-1].expect = "comma"
+
+    def _incomplete(self, buffer: str, pos: int, final: bool) -> bool:
+        if final:
+            raise self._error("Unexpected end of data", pos)
+        # Wait until the pending text has doubled, so long strings are rescanned
+        # a logarithmic number of times rather than once per chunk
+        self._retry_at = len(buffer) + max(len(buffer) - pos, 1)
+        return False
+
+    def _error(self, message: str, pos: int) -> json.JSONDecodeError:
+        return json.JSONDecodeError(message, self._buffer, pos)
@@ -0,0 +1,253 @@
+"""
+Lightweight tracing with W3C trace context and OTLP/JSON file export.
+
+Spans nest through a context variable, so a span opened inside another
+(in the same task or in tasks it starts) becomes its child. When the
+outermost local span of a trace ends, the whole tree is handed to the
+exporter at once. The file exporter writes one OTLP/JSON
+ExportTraceServiceRequest per line, the format read by the OpenTelemetry
+Collector's otlpjsonfile receiver, so traces can be inspected offline or
+replayed into any OTLP backend. Lines are written by a background thread,
+so a slow or failing disk never holds up the call being traced.
+"""
+
+import atexit
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Protocol
+
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Traces waiting to be written before new ones are dropped
+MAX_PENDING_TRACES = 10_000
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+_current: ContextVar["Span | None"] = ContextVar("cortex_span", default=None)
+
+
+@dataclass
+class Span:
+    """One timed operation in a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    kind: int
+    start_ns: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+    end_ns: int | None = None
+    status: int = 0
+    status_message: str = ""
+    # Finished spans of the local tree, shared by every span in it
+    finished: list["Span"] = field(default_factory=list, repr=False)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = message
+
+    @property
+    def traceparent(self) -> str:
+        """W3C traceparent header naming this span as the parent."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_otlp(self) -> dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: list[Span]) -> None: ...
+
+
+class FileSpanExporter:
+    """Append finished traces to a file as OTLP/JSON lines, from a writer thread."""
+
+    def __init__(self, path: str, service_name: str):
+        self.path = path
+        self.dropped = 0
+        self._resource = {
+            "attributes": [_otlp_attribute("service.name", service_name)],
+        }
+        self._queue: queue.Queue[list[Span]] = queue.Queue(MAX_PENDING_TRACES)
+        self._lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+        self._pid = os.getpid()
+
+    def export(self, spans: list[Span]) -> None:
+        """Queue a finished trace for writing; drops it if the writer is too far behind."""
+        self._start_writer()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Wait until every queued trace has been written."""
+        if self._writer is not None and self._pid == os.getpid():
+            self._queue.join()
+
+    def _start_writer(self) -> None:
+        with self._lock:
+            # Threads do not survive a fork, so a forked worker starts its own with a fresh queue
+            if self._writer is not None and self._pid != os.getpid():
+                self._writer = None
+                self._queue = queue.Queue(MAX_PENDING_TRACES)
+                self._pid = os.getpid()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_forever, name="span-exporter", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_forever(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                self._write(spans)
+            except Exception as e:
+                logger.warning(f"Could not write trace to {self.path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, spans: list[Span]) -> None:
+        request = {
+            "resourceSpans": [{
+                "resource": self._resource,
+                "scopeSpans": [{
+                    "scope": {"name": "cortex-mcp"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request, separators=(",", ":")) + "\n")
+
+
+class Tracer:
+    """Create spans and export each trace when its local root span ends."""
+
+    def __init__(self, exporter: SpanExporter):
+        self._exporter = exporter
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: dict[str, Any] | None = None,
+        traceparent: str | None = None,
+    ) -> Iterator[Span]:
+        """
+        Open a span for the duration of the block.
+
+        Args:
+            name: Span name
+            kind: One of the SPAN_KIND_* constants
+            attributes: Initial span attributes
+            traceparent: Remote parent to continue when no span is active
+
+        Exceptions escaping the block mark the span as failed.
+        """
+        parent = _current.get()
+        if parent is not None:
+            trace_id, parent_id, finished = parent.trace_id, parent.span_id, parent.finished
+        else:
+            remote = parse_traceparent(traceparent)
+            trace_id, parent_id = remote or (_random_id(128), None)
+            finished = []
+
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=_random_id(64),
+            parent_id=parent_id,
+            kind=kind,
+            start_ns=time.time_ns(),
+            attributes=dict(attributes or {}),
+            finished=finished,
+        )
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            if not span.status:
+                span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current.reset(token)
+            span.end_ns = time.time_ns()
+            finished.append(span)
+            if parent is None:
+                # Losing a trace must never fail the traced call
+                try:
+                    self._exporter.export(finished)
+                except Exception as e:
+                    logger.warning(f"Could not export trace {trace_id}: {e}")
+
+
+def current_span() -> Span | None:
+    """Return the innermost open span of the current context."""
+    return _current.get()
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str] | None:
+    """Return (trace id, parent span id) from a W3C traceparent header, if valid."""
+    if not header:
+        return None
+    match = _TRACEPARENT.match(header.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2)
+
+
+def _random_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+def _otlp_attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
@@ -0,0 +1,126 @@
+"""
+Pre-fork worker processes for the streamable-http transport.
+
+A single uvicorn process encodes and decodes every session's JSON on one
+core. serve_workers() binds the listening socket in the parent, after the
+server and its tools have been built, and forks that many workers to
+accept connections from it. Each worker starts with the parent's tools in
+copy-on-write memory instead of building its own.
+
+The kernel hands each connection to whichever worker accepts it first, so
+consecutive requests of one MCP session may reach different workers.
+Workers therefore serve the MCP endpoint statelessly: no session state is
+kept between requests, so any worker can answer any request of a session.
+State that must hold across requests lives in SQLite files that every
+worker opens (see share_state).
+
+The parent only supervises. It restarts workers that exit, and on SIGINT
+or SIGTERM it stops them all and returns.
+"""
+
+import gc
+import os
+import signal
+import socket
+import time
+from typing import Any
+
+import uvicorn
+
+from ..config import Config
+from .logging import get_logger
+
+logger = get_logger(__name__)
+
+# A worker that exits sooner than this after starting is restarted only after the same delay
+RESTART_DELAY = 1.0
+
+STOP_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+
+def share_state(directory: str) -> None:
+    """
+    Point the response cache and rate-limit buckets at files in directory.
+
+    Paths already configured are kept. Must run before the server is built.
+    """
+    if Config.CACHE_ENABLED and not Config.CACHE_PATH:
+        Config.CACHE_PATH = os.path.join(directory, "responses.db")
+    if not Config.RATE_LIMIT_STATE_PATH:
+        Config.RATE_LIMIT_STATE_PATH = os.path.join(directory, "ratelimit.db")
+
+
+def serve_workers(app: Any, host: str, port: int, workers: int, log_level: str = "info") -> None:
+    """
+    Serve app from workers forked processes sharing one listening socket.
+
+    Returns once the workers have stopped after SIGINT or SIGTERM.
+    """
+    config = uvicorn.Config(app, host=host, port=port, lifespan="on", timeout_graceful_shutdown=0, log_level=log_level)
+    sock = config.bind_socket()
+
+    # Keep the garbage collector from touching everything built so far, which would copy its pages into each worker
+    gc.collect()
+    gc.freeze()
+
+    children: dict[int, tuple[int, float]] = {}
+    stopping = False
+
+    def spawn(index: int) -> None:
+        # Until the child has reset its handlers, a signal would run the parent's stop() in it
+        signal.pthread_sigmask(signal.SIG_BLOCK, STOP_SIGNALS)
+        pid = os.fork()
+        if pid == 0:
+            _run_worker(config, sock)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+        children[pid] = (index, time.monotonic())
+
+    def stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    previous = {sig: signal.signal(sig, stop) for sig in STOP_SIGNALS}
+    try:
+        for index in range(workers):
+            spawn(index)
+        logger.info(f"Started {workers} workers on http://{host}:{port}")
+
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            index, started = children.pop(pid)
+            if stopping:
+                continue
+
+            logger.warning(f"Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+            if time.monotonic() - started < RESTART_DELAY:
+                time.sleep(RESTART_DELAY)
+            spawn(index)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        sock.close()
+        logger.info("All workers stopped")
+
+
+def _run_worker(config: uvicorn.Config, sock: socket.socket) -> None:
+    """Serve in a forked child until uvicorn exits, then leave without running the parent's cleanup."""
+    code = 0
+    try:
+        for sig in STOP_SIGNALS:
+            signal.signal(sig, signal.SIG_DFL)
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, STOP_SIGNALS)
+        # uvicorn installs its own handlers for a graceful shutdown
+        uvicorn.Server(config).run(sockets=[sock])
+    except BaseException:
+        logger.exception(f"Worker {os.getpid()} failed")
+        code = 1
+    finally:
+        os._exit(code)
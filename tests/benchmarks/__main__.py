@@ -0,0 +1,61 @@
+"""
+Run the benchmark suite.
+
+    python -m tests.benchmarks --output bench.json
+    python -m tests.benchmarks --compare bench.json --output new.json
+
+With --compare, exits with status 1 if any measurement got worse than the
+baseline by more than --threshold.
+"""
+
+import argparse
+import os
+import sys
+
+# Before anything imports src.config, which reads the environment once
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from . import results  # noqa: E402
+from .suite import BENCHMARKS  # noqa: E402
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m tests.benchmarks", description=__doc__.splitlines()[1])
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for smoke testing")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a previous results file")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="Relative change counted as a regression (default: 0.1, i.e. 10%%)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    measurements = []
+    for name in args.only or BENCHMARKS:
+        benchmark, full, quick = BENCHMARKS[name]
+        print(f"Running {name}...", file=sys.stderr)
+        measurements.extend(benchmark(*(quick if args.quick else full)))
+
+    if args.output:
+        results.save(args.output, measurements)
+
+    comparisons = None
+    if args.compare:
+        comparisons = results.compare(results.load(args.compare), measurements, args.threshold)
+
+    print(results.format_table(measurements, comparisons))
+
+    regressions = [c.name for c in comparisons or [] if c.regressed]
+    if regressions:
+        print(f"\n{len(regressions)} regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
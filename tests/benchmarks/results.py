@@ -0,0 +1,108 @@
+"""Benchmark result files and comparison between runs."""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Measurement:
+    """One number produced by a benchmark."""
+
+    name: str
+    value: float
+    unit: str
+    lower_is_better: bool = True
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """A measurement in two runs."""
+
+    name: str
+    unit: str
+    baseline: float
+    current: float
+    change: float
+    regressed: bool
+
+
+def environment() -> dict[str, Any]:
+    """Describe where the results came from, so unlike runs are not compared blindly."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "argv": sys.argv[1:],
+    }
+
+
+def save(path: str, measurements: list[Measurement]) -> None:
+    data = {
+        "version": FORMAT_VERSION,
+        "environment": environment(),
+        "measurements": {m.name: {k: v for k, v in asdict(m).items() if k != "name"} for m in measurements},
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load(path: str) -> list[Measurement]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported benchmark results version in {path}: {data.get('version')}")
+    return [Measurement(name, **fields) for name, fields in data["measurements"].items()]
+
+
+def compare(
+    baseline: list[Measurement], current: list[Measurement], threshold: float
+) -> list[Comparison]:
+    """
+    Compare measurements present in both runs.
+
+    A measurement regresses when it got worse by more than threshold, a
+    fraction of the baseline value (0.1 is 10%).
+    """
+    previous = {m.name: m for m in baseline}
+    comparisons = []
+    for m in current:
+        base = previous.get(m.name)
+        if base is None:
+            continue
+        change = (m.value - base.value) / base.value if base.value else 0.0
+        worse = change if m.lower_is_better else -change
+        comparisons.append(Comparison(m.name, m.unit, base.value, m.value, change, worse > threshold))
+    return comparisons
+
+
+def format_table(measurements: list[Measurement], comparisons: list[Comparison] | None = None) -> str:
+    """Render results, with changes against a baseline when given."""
+    by_name = {c.name: c for c in comparisons or []}
+    width = max((len(m.name) for m in measurements), default=10)
+    lines = []
+    for m in measurements:
+        line = f"{m.name:<{width}}  {m.value:>12.3f} {m.unit:<8}"
+        c = by_name.get(m.name)
+        if c is not None:
+            flag = "  REGRESSION" if c.regressed else ""
+            line += f" {c.baseline:>12.3f}  {c.change:+7.1%}{flag}"
+        lines.append(line)
+    return "\n".join(lines)
@@ -0,0 +1,48 @@
+"""In-process stand-in for the Cortex API."""
+
+import asyncio
+import json
+
+import httpx
+
+# Roughly the size and shape of a real entity details response
+ENTITY = {
+    "tag": "",
+    "name": "",
+    "type": "service",
+    "description": "Handles payments for the storefront. " * 4,
+    "groups": ["payments", "tier-1", "pci"],
+    "owners": {
+        "teams": [{"tag": "payments-team", "name": "Payments", "inheritance": "NONE"}],
+        "individuals": [{"email": f"owner{i}@example.com", "description": None} for i in range(3)],
+    },
+    "links": [{"name": f"link-{i}", "type": "documentation", "url": f"https://docs.example.com/{i}"} for i in range(5)],
+    "metadata": [{"key": f"key-{i}", "value": {"nested": [i, i + 1]}} for i in range(10)],
+    "hierarchy": {"parents": [], "children": []},
+    "isArchived": False,
+    "lastUpdated": "2024-01-01T00:00:00Z",
+}
+
+
+class StubCortex:
+    """
+    Answer Cortex API requests from memory.
+
+    Every GET returns ENTITY with the last path segment as its tag, after
+    `latency` seconds.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        tag = request.url.path.rsplit("/", 1)[-1]
+        body = json.dumps({**ENTITY, "tag": tag, "name": tag.title()}).encode()
+        return httpx.Response(200, headers={"Content-Type": "application/json"}, content=body)
+
+    def transport(self) -> httpx.AsyncBaseTransport:
+        return httpx.MockTransport(self)
@@ -0,0 +1,331 @@
+"""The benchmarks. Each returns the measurements it produced."""
+
+import asyncio
+import copy
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import Any
+from unittest import mock
+
+from .results import Measurement
+from .stub import StubCortex
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SPEC_PATH = os.path.join(REPO_ROOT, "swagger.json")
+
+# Tool called by the throughput benchmark
+TOOL_NAME = "getEntityDetails"
+
+_STARTUP_SCRIPT = """
+import time
+started = time.perf_counter()
+from src.server import create_mcp_server
+create_mcp_server()
+print(time.perf_counter() - started)
+"""
+
+
+@contextmanager
+def stubbed_cortex(stub: StubCortex):
+    """Serve the Cortex client's requests from stub instead of the network."""
+    from src.clients.pool import TokenPoolTransport
+
+    def from_config():
+        return TokenPoolTransport(
+            max_pools=4,
+            idle_timeout=300,
+            max_connections=1000,
+            limits=None,
+            transport_factory=lambda limits: stub.transport(),
+        )
+
+    with mock.patch.object(TokenPoolTransport, "from_config", from_config):
+        yield
+
+
+def build_server(stub: StubCortex, cache_dir: str):
+    """Create the MCP server from the real spec, talking to stub."""
+    from src.config import Config
+    from src.server import create_mcp_server
+
+    with mock.patch.multiple(
+        Config,
+        OPENAPI_SPEC_PATH=SPEC_PATH,
+        OPENAPI_CACHE_DIR=cache_dir,
+        CACHE_ENABLED=False,
+        TRACING_FILE="",
+    ), stubbed_cortex(stub):
+        return create_mcp_server()
+
+
+def bench_startup(runs: int) -> list[Measurement]:
+    """Import and create_mcp_server time in a fresh interpreter, without and with a compiled spec."""
+    env = {**os.environ, "OPENAPI_SPEC_PATH": SPEC_PATH, "LOG_LEVEL": "WARNING"}
+
+    def start(cache_dir: str) -> float:
+        result = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT],
+            cwd=REPO_ROOT,
+            env={**env, "OPENAPI_CACHE_DIR": cache_dir},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return float(result.stdout.strip().splitlines()[-1])
+
+    cold = []
+    for _ in range(runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold.append(start(cache_dir))
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start(cache_dir)
+        warm = [start(cache_dir) for _ in range(runs)]
+
+    return [
+        Measurement("startup.cold", statistics.median(cold) * 1000, "ms"),
+        Measurement("startup.warm", statistics.median(warm) * 1000, "ms"),
+    ]
+
+
+def bench_stdio(runs: int) -> list[Measurement]:
+    """Time from spawning a stdio server to its initialize and tools/list responses, with a compiled spec."""
+    env = {
+        **os.environ,
+        "OPENAPI_SPEC_PATH": SPEC_PATH,
+        "MCP_TRANSPORT": "stdio",
+        "CORTEX_API_TOKEN": os.environ.get("CORTEX_API_TOKEN") or "benchmark-token",
+        "LOG_LEVEL": "WARNING",
+    }
+    initialize = {
+        "jsonrpc": "2.0", "id": 1, "method": "initialize",
+        "params": {"protocolVersion": "2025-06-18", "capabilities": {}, "clientInfo": {"name": "bench", "version": "1"}},
+    }
+    messages = [{"jsonrpc": "2.0", "method": "notifications/initialized"}, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"}]
+
+    def session(cache_dir: str) -> tuple[float, float]:
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, "server.py"],
+            cwd=REPO_ROOT,
+            env={**env, "OPENAPI_CACHE_DIR": cache_dir},
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        try:
+            process.stdin.write(json.dumps(initialize) + "\n")
+            process.stdin.flush()
+            process.stdout.readline()
+            initialized = time.perf_counter() - started
+            process.stdin.write("".join(json.dumps(m) + "\n" for m in messages))
+            process.stdin.flush()
+            process.stdout.readline()
+            return initialized, time.perf_counter() - started
+        finally:
+            process.kill()
+            process.wait()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        session(cache_dir)
+        times = [session(cache_dir) for _ in range(runs)]
+
+    return [
+        Measurement("stdio.initialize", statistics.median(t[0] for t in times) * 1000, "ms"),
+        Measurement("stdio.tools_list", statistics.median(t[1] for t in times) * 1000, "ms"),
+    ]
+
+
+def bench_resolve(runs: int) -> list[Measurement]:
+    """Time and peak memory of dereferencing the full spec."""
+    from src.utils.openapi_resolver import resolve_refs, resolve_refs_with_defs
+
+    with open(SPEC_PATH, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    measurements = []
+    for name, resolve in (("resolve_refs", resolve_refs), ("resolve_refs_with_defs", resolve_refs_with_defs)):
+        times = []
+        for _ in range(runs):
+            # Resolvers may share or mutate input subtrees; give each run a fresh spec
+            fresh = copy.deepcopy(spec)
+            started = time.perf_counter()
+            resolve(fresh)
+            times.append(time.perf_counter() - started)
+
+        fresh = copy.deepcopy(spec)
+        tracemalloc.start()
+        resolve(fresh)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        measurements.append(Measurement(f"{name}.time", statistics.median(times) * 1000, "ms"))
+        measurements.append(Measurement(f"{name}.peak_memory", peak / 1024 / 1024, "MiB"))
+    return measurements
+
+
+def bench_tools_list(runs: int) -> list[Measurement]:
+    """Time of a tools/list request over the in-memory transport, and its payload size."""
+    from fastmcp import Client
+
+    async def run(server) -> tuple[list[float], int]:
+        times = []
+        async with Client(server) as client:
+            for _ in range(runs):
+                started = time.perf_counter()
+                tools = await client.list_tools()
+                times.append(time.perf_counter() - started)
+        size = len(json.dumps([tool.model_dump(mode="json", exclude_none=True) for tool in tools]))
+        return times, size
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        server = build_server(StubCortex(), cache_dir)
+        times, size = asyncio.run(run(server))
+
+    return [
+        Measurement("tools_list.time", statistics.median(times) * 1000, "ms"),
+        Measurement("tools_list.size", size / 1024, "KiB"),
+    ]
+
+
+def bench_tool_calls(calls: int, concurrency_levels: tuple[int, ...] = (1, 16)) -> list[Measurement]:
+    """Tool call latency percentiles and throughput against the in-process stub."""
+    from fastmcp import Client
+
+    async def run(server, concurrency: int) -> tuple[list[float], float]:
+        latencies: list[float] = []
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with Client(server) as client:
+            async def call(i: int) -> None:
+                async with semaphore:
+                    started = time.perf_counter()
+                    await client.call_tool(TOOL_NAME, {"tagOrId": f"svc-{i}"})
+                    latencies.append(time.perf_counter() - started)
+
+            await asyncio.gather(*(call(i) for i in range(min(calls, 20))))  # warm up
+            latencies.clear()
+            started = time.perf_counter()
+            await asyncio.gather(*(call(i) for i in range(calls)))
+            return latencies, time.perf_counter() - started
+
+    measurements = []
+    with tempfile.TemporaryDirectory() as cache_dir:
+        server = build_server(StubCortex(), cache_dir)
+        for concurrency in concurrency_levels:
+            latencies, elapsed = asyncio.run(run(server, concurrency))
+            prefix = f"tool_calls.c{concurrency}"
+            for p in (50, 95, 99):
+                measurements.append(Measurement(f"{prefix}.p{p}", percentile(latencies, p) * 1000, "ms"))
+            measurements.append(Measurement(f"{prefix}.throughput", calls / elapsed, "calls/s", lower_is_better=False))
+    return measurements
+
+
+def bench_workers(calls: int, sessions: int = 16) -> list[Measurement]:
+    """
+    Tool call throughput over streamable-http with MCP_WORKERS at 1, 2, 4... up to the core count.
+
+    The server runs as a subprocess against the fake Cortex API, also a
+    subprocess, and the load comes from this process. Throughput can only
+    scale with workers while there are cores to spare for them.
+    """
+    import httpx
+
+    from tests.manual.client import Call, CallSource, run_load
+
+    def serve(args: list[str], env: dict[str, str], ready_url: str) -> subprocess.Popen:
+        """Start a server and wait until it answers ready_url with anything."""
+        process = subprocess.Popen(
+            [sys.executable, *args], cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            try:
+                httpx.get(ready_url, timeout=1)
+                return process
+            except httpx.HTTPError:
+                time.sleep(0.2)
+        process.kill()
+        raise RuntimeError(f"{' '.join(args)} did not start")
+
+    cortex_port, mcp_port = free_port(), free_port()
+    cortex = serve(
+        ["-m", "tests.fake_cortex", "--port", str(cortex_port)], dict(os.environ),
+        f"http://127.0.0.1:{cortex_port}/",
+    )
+    env = {
+        **os.environ,
+        "OPENAPI_SPEC_PATH": SPEC_PATH,
+        "MCP_HOST": "127.0.0.1",
+        "MCP_PORT": str(mcp_port),
+        "CORTEX_API_BASE_URL": f"http://127.0.0.1:{cortex_port}",
+        "CORTEX_API_TOKEN": "benchmark-token",
+        # Every call should reach the fake API rather than be answered from the cache
+        "CORTEX_CACHE_ENABLED": "false",
+        "LOG_LEVEL": "WARNING",
+    }
+    source = CallSource(mix=[(Call(TOOL_NAME, {"tagOrId": "payments"}), 1)])
+
+    measurements = []
+    try:
+        for workers in worker_counts():
+            server = serve(
+                ["server.py"], {**env, "MCP_WORKERS": str(workers)}, f"http://127.0.0.1:{mcp_port}/tools"
+            )
+            try:
+                url = f"http://127.0.0.1:{mcp_port}/mcp"
+                asyncio.run(run_load(url, sessions, source, max_calls=sessions * 2))  # warm up
+                report = asyncio.run(run_load(url, sessions, source, max_calls=calls))
+            finally:
+                server.terminate()
+                server.wait()
+            summary = report.summary()
+            measurements.append(Measurement(
+                f"workers.w{workers}.throughput", summary["throughput_per_s"], "calls/s", lower_is_better=False
+            ))
+            measurements.append(Measurement(f"workers.w{workers}.p95", summary["p95_ms"], "ms"))
+    finally:
+        cortex.terminate()
+        cortex.wait()
+    return measurements
+
+
+def worker_counts() -> list[int]:
+    """1, 2, 4... up to the number of cores, and at least up to 2."""
+    counts = [1]
+    while counts[-1] * 2 <= max(2, os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, round(p / 100 * len(ordered)) - 1))]
+
+
+# name -> (benchmark, arguments for a full run, arguments for --quick)
+BENCHMARKS: dict[str, tuple[Callable[..., list[Measurement]], tuple[Any, ...], tuple[Any, ...]]] = {
+    "startup": (bench_startup, (5,), (1,)),
+    "stdio": (bench_stdio, (5,), (1,)),
+    "resolve": (bench_resolve, (5,), (1,)),
+    "tools_list": (bench_tools_list, (20,), (3,)),
+    "tool_calls": (bench_tool_calls, (500,), (50,)),
+    "workers": (bench_workers, (2000,), (200,)),
+}
@@ -28,6 +28,7 @@ def sample_route():
     route.path = "/api/v1/resources"
     route.method = "GET"
     route.tags = ["api", "resources"]
+    route.parameters = []
     route.extensions = {"x-cortex-mcp-enabled": "true"}
     return route
 
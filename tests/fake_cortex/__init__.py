@@ -0,0 +1,10 @@
+"""
+Local fake of the Cortex API for load and latency testing.
+
+    python -m tests.fake_cortex --port 8100 --latency lognormal:40:0.5 --error-rate 0.01
+    CORTEX_API_BASE_URL=http://127.0.0.1:8100 CORTEX_API_TOKEN=fake python server.py
+"""
+
+from .app import Delay, FakeCortex, FakeCortexSettings, create_app
+
+__all__ = ["Delay", "FakeCortex", "FakeCortexSettings", "create_app"]
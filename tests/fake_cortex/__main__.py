@@ -0,0 +1,58 @@
+"""Serve the fake Cortex API over HTTP."""
+
+import argparse
+import json
+import os
+
+import uvicorn
+
+from .app import Delay, FakeCortexSettings, create_app
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    defaults = FakeCortexSettings()
+    parser = argparse.ArgumentParser(prog="python -m tests.fake_cortex", description=__doc__)
+    parser.add_argument("--spec", default=os.path.join(REPO_ROOT, "swagger.json"), help="OpenAPI spec to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--list-size", type=int, default=defaults.list_size, help="Items in top-level lists")
+    parser.add_argument(
+        "--total-items", type=int, default=defaults.total_items, help="Items behind paged lists"
+    )
+    parser.add_argument("--nested-list-size", type=int, default=defaults.nested_list_size)
+    parser.add_argument("--string-length", type=int, default=defaults.string_length)
+    parser.add_argument(
+        "--latency", type=Delay.parse, default=Delay(),
+        help="none, constant:MS, uniform:LOW:HIGH, exponential:MEAN or lognormal:MEDIAN:SIGMA",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument(
+        "--error-status", default="503",
+        help="Comma separated statuses injected failures pick from (429 adds Retry-After)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    with open(args.spec, encoding="utf-8") as f:
+        spec = json.load(f)
+
+    settings = FakeCortexSettings(
+        list_size=args.list_size,
+        total_items=args.total_items,
+        nested_list_size=args.nested_list_size,
+        string_length=args.string_length,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_status.split(",")),
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(spec, settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""ASGI stand-in for the Cortex API, generated from swagger.json."""
+
+import asyncio
+import json
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from src.routes.mappers import is_mcp_enabled
+from src.routes.table import RouteTable
+from src.utils.openapi_resolver import filter_operations
+
+from .payloads import SchemaFaker
+
+PAGE_PARAMETER = "page"
+PAGE_SIZE_PARAMETER = "pageSize"
+
+
+@dataclass(frozen=True)
+class Delay:
+    """
+    Distribution of injected response latency, in milliseconds.
+
+    Parsed from "none", "constant:<ms>", "uniform:<low>:<high>",
+    "exponential:<mean>" or "lognormal:<median>:<sigma>". Lognormal gives
+    the long tail typical of real API latency.
+    """
+
+    kind: str = "none"
+    params: tuple[float, ...] = ()
+
+    @classmethod
+    def parse(cls, text: str) -> "Delay":
+        kind, *raw = text.strip().split(":")
+        arity = {"none": 0, "constant": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+        if kind not in arity or len(raw) != arity[kind]:
+            raise ValueError(f"Invalid latency distribution: {text!r}")
+        try:
+            return cls(kind, tuple(float(p) for p in raw))
+        except ValueError:
+            raise ValueError(f"Invalid latency distribution: {text!r}") from None
+
+    def sample(self, rng: random.Random) -> float:
+        """Return one delay in seconds."""
+        p = self.params
+        if self.kind == "constant":
+            ms = p[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(p[0], p[1])
+        elif self.kind == "exponential":
+            ms = rng.expovariate(1 / p[0]) if p[0] else 0.0
+        elif self.kind == "lognormal":
+            ms = rng.lognormvariate(math.log(p[0]), p[1]) if p[0] else 0.0
+        else:
+            ms = 0.0
+        return ms / 1000
+
+
+@dataclass
+class FakeCortexSettings:
+    """Payload size, latency and error injection of a fake Cortex API."""
+
+    # Items in top-level lists, and total items behind paged lists
+    list_size: int = 20
+    total_items: int = 100
+    nested_list_size: int = 2
+    string_length: int = 16
+    latency: Delay = field(default_factory=Delay)
+    error_rate: float = 0.0
+    error_statuses: tuple[int, ...] = (503,)
+    seed: int = 0
+
+
+class FakeCortex:
+    """
+    Serve every MCP-enabled operation of a spec with generated payloads.
+
+    Payloads are generated once per operation and page, from a fixed seed,
+    and replayed as bytes, so the fake itself costs little under load and
+    runs are reproducible. Paged operations honour page and pageSize
+    against settings.total_items and fill in page, total and totalPages.
+    """
+
+    def __init__(self, spec: dict[str, Any], settings: FakeCortexSettings | None = None):
+        self.settings = settings or FakeCortexSettings()
+        self._spec = filter_operations(spec, is_mcp_enabled)
+        self._routes = RouteTable.from_spec(self._spec)
+        self._faker = SchemaFaker(
+            spec,
+            seed=self.settings.seed,
+            nested_list_size=self.settings.nested_list_size,
+            string_length=self.settings.string_length,
+        )
+        self._rng = random.Random(self.settings.seed)
+        self._bodies: dict[tuple[str, str, int, int], bytes] = {}
+        self.requests = 0
+
+    async def handle(self, request: Request) -> Response:
+        self.requests += 1
+        route = self._routes.match(request.method, request.url.path)
+        if route is None:
+            return JSONResponse({"message": f"No route for {request.method} {request.url.path}"}, 404)
+
+        settings = self.settings
+        delay = settings.latency.sample(self._rng)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if settings.error_rate and self._rng.random() < settings.error_rate:
+            status = self._rng.choice(settings.error_statuses)
+            headers = {"Retry-After": "1"} if status == 429 else None
+            return JSONResponse({"message": "Injected failure"}, status, headers=headers)
+
+        operation = self._spec["paths"][route.template][route.method.lower()]
+        page, page_size = _paging(operation, request)
+        key = (route.method, route.template, page, page_size)
+        body = self._bodies.get(key)
+        if body is None:
+            body = self._bodies[key] = self._generate(operation, page, page_size)
+        return Response(body, media_type="application/json")
+
+    def _generate(self, operation: dict[str, Any], page: int, page_size: int) -> bytes:
+        schema = _response_schema(operation)
+        if schema is None:
+            return b"{}"
+
+        total = self.settings.total_items
+        if page_size:
+            items = max(0, min(page_size, total - page * page_size))
+        else:
+            items = self.settings.list_size
+        value = self._faker.value(schema, top_list_size=items)
+
+        if page_size and isinstance(value, dict):
+            paging = {"page": page, "total": total, "totalPages": math.ceil(total / page_size)}
+            for name, number in paging.items():
+                if name in value:
+                    value[name] = number
+        return json.dumps(value, separators=(",", ":")).encode()
+
+
+def create_app(spec: dict[str, Any], settings: FakeCortexSettings | None = None) -> Starlette:
+    """Create the ASGI app serving a fake Cortex API for spec."""
+    fake = FakeCortex(spec, settings)
+    methods = ["GET", "POST", "PUT", "PATCH", "DELETE"]
+    app = Starlette(routes=[Route("/{path:path}", fake.handle, methods=methods)])
+    app.state.fake = fake
+    return app
+
+
+def _response_schema(operation: dict[str, Any]) -> dict[str, Any] | None:
+    """Return the JSON schema of the first success response, if it has one."""
+    for status, response in sorted(operation.get("responses", {}).items()):
+        if status.startswith("2"):
+            content = response.get("content", {}).get("application/json", {})
+            return content.get("schema")
+    return None
+
+
+def _paging(operation: dict[str, Any], request: Request) -> tuple[int, int]:
+    """Return (page, pageSize) for paged operations, or (0, 0)."""
+    names = {p.get("name") for p in operation.get("parameters", []) if p.get("in") == "query"}
+    if PAGE_SIZE_PARAMETER not in names:
+        return 0, 0
+    try:
+        page = max(0, int(request.query_params.get(PAGE_PARAMETER, 0)))
+        page_size = max(1, int(request.query_params.get(PAGE_SIZE_PARAMETER, 250)))
+    except ValueError:
+        return 0, 0
+    return page, page_size
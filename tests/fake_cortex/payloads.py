@@ -0,0 +1,168 @@
+"""Synthetic values that satisfy OpenAPI 3.0 schemas."""
+
+import random
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from src.utils.openapi_resolver import SCHEMA_REF_PREFIX
+
+_WORDS = (
+    "payments", "checkout", "search", "ledger", "gateway", "inventory", "auth",
+    "billing", "catalog", "events", "metrics", "orders", "profile", "shipping",
+)
+_EPOCH = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+class SchemaFaker:
+    """
+    Generate values for OpenAPI 3.0 schemas of one spec.
+
+    $refs are followed into components/schemas. Below max_depth only
+    required properties are filled in and arrays are left at their minimum
+    length, which ends most recursive schemas. A schema that requires
+    itself has no finite value; at twice max_depth such objects lose their
+    object and array properties. The outermost arrays (the
+    response itself, or a list directly inside it) get top_list_size items;
+    deeper ones get nested_list_size.
+    """
+
+    def __init__(
+        self,
+        spec: dict[str, Any],
+        seed: int = 0,
+        nested_list_size: int = 2,
+        string_length: int = 16,
+        max_depth: int = 6,
+    ):
+        self._schemas = spec.get("components", {}).get("schemas", {})
+        self._rng = random.Random(seed)
+        self.nested_list_size = nested_list_size
+        self.string_length = string_length
+        self.max_depth = max_depth
+
+    def value(self, schema: dict[str, Any], top_list_size: int = 3) -> Any:
+        """Generate one value for schema."""
+        return self._value(schema, 0, top_list_size)
+
+    def _value(self, schema: dict[str, Any], depth: int, top_list_size: int | None) -> Any:
+        schema = self._deref(schema)
+        if "allOf" in schema:
+            schema = self._merge_all_of(schema)
+
+        if "oneOf" in schema or "anyOf" in schema:
+            return self._variant(schema, depth, top_list_size)
+        if "enum" in schema:
+            return self._rng.choice(schema["enum"])
+
+        kind = self._kind(schema)
+        if kind == "object":
+            return self._object(schema, depth, top_list_size)
+        if kind == "array":
+            return self._array(schema, depth, top_list_size)
+        if kind == "integer":
+            return self._rng.randint(int(schema.get("minimum", 0)), int(schema.get("maximum", 1000)))
+        if kind == "number":
+            return round(self._rng.uniform(schema.get("minimum", 0), schema.get("maximum", 1000)), 3)
+        if kind == "boolean":
+            return self._rng.random() < 0.5
+        return self._string(schema)
+
+    @staticmethod
+    def _kind(schema: dict[str, Any]) -> str | None:
+        return schema.get("type") or ("object" if "properties" in schema else "array" if "items" in schema else None)
+
+    def _deref(self, schema: dict[str, Any]) -> dict[str, Any]:
+        while "$ref" in schema:
+            ref = schema["$ref"]
+            if not ref.startswith(SCHEMA_REF_PREFIX):
+                raise ValueError(f"Unsupported $ref: {ref}")
+            schema = self._schemas[ref[len(SCHEMA_REF_PREFIX):]]
+        return schema
+
+    def _merge_all_of(self, schema: dict[str, Any]) -> dict[str, Any]:
+        merged: dict[str, Any] = {k: v for k, v in schema.items() if k != "allOf"}
+        properties = dict(merged.get("properties", {}))
+        required = list(merged.get("required", []))
+        for part in schema["allOf"]:
+            part = self._deref(part)
+            if "allOf" in part:
+                part = self._merge_all_of(part)
+            properties.update(part.get("properties", {}))
+            required.extend(r for r in part.get("required", []) if r not in required)
+            for key, value in part.items():
+                # A polymorphic base lists its subtypes, which are what is being built here
+                if key not in ("properties", "required", "oneOf", "anyOf", "discriminator"):
+                    merged.setdefault(key, value)
+        if properties:
+            merged["properties"] = properties
+            merged.setdefault("type", "object")
+        if required:
+            merged["required"] = required
+        return merged
+
+    def _variant(self, schema: dict[str, Any], depth: int, top_list_size: int | None) -> Any:
+        variants = schema.get("oneOf") or schema.get("anyOf")
+        chosen = self._rng.choice(variants)
+        value = self._value(chosen, depth, top_list_size)
+
+        # The discriminator sits on the oneOf, or on a base schema the variant extends
+        discriminator = schema.get("discriminator")
+        if discriminator is None:
+            bases = (self._deref(part) for part in self._deref(chosen).get("allOf", ()))
+            discriminator = next((b["discriminator"] for b in bases if "discriminator" in b), None)
+        if discriminator and isinstance(value, dict):
+            name = chosen.get("$ref", "").rsplit("/", 1)[-1]
+            mapping = discriminator.get("mapping", {})
+            tag = next((key for key, ref in mapping.items() if ref == chosen.get("$ref")), name)
+            value[discriminator["propertyName"]] = tag
+        return value
+
+    def _object(self, schema: dict[str, Any], depth: int, top_list_size: int | None) -> dict[str, Any]:
+        properties = schema.get("properties", {})
+        required = set(schema.get("required", ()))
+        shallow = depth < self.max_depth
+        # Past this depth the schema recurses through required properties; drop those
+        cyclic = depth > 2 * self.max_depth
+
+        result = {}
+        for name, prop in properties.items():
+            if cyclic and self._kind(self._deref(prop)) in ("object", "array"):
+                continue
+            if shallow or name in required:
+                result[name] = self._value(prop, depth + 1, top_list_size if depth == 0 else None)
+
+        extra = schema.get("additionalProperties")
+        if isinstance(extra, dict) and not properties and shallow:
+            for i in range(self.nested_list_size):
+                result[f"{self._rng.choice(_WORDS)}-{i}"] = self._value(extra, depth + 1, None)
+        return result
+
+    def _array(self, schema: dict[str, Any], depth: int, top_list_size: int | None) -> list[Any]:
+        minimum = schema.get("minItems", 0)
+        if depth >= self.max_depth:
+            size = minimum
+        elif depth <= 1 and top_list_size is not None:
+            size = top_list_size
+        else:
+            size = self.nested_list_size
+        size = max(minimum, min(size, schema.get("maxItems", size)))
+        return [self._value(schema.get("items", {}), depth + 1, None) for _ in range(size)]
+
+    def _string(self, schema: dict[str, Any]) -> str:
+        fmt = schema.get("format")
+        rng = self._rng
+        if fmt == "date-time":
+            return (_EPOCH + timedelta(seconds=rng.randrange(86400 * 365))).strftime("%Y-%m-%dT%H:%M:%SZ")
+        if fmt == "date":
+            return (_EPOCH + timedelta(days=rng.randrange(365))).strftime("%Y-%m-%d")
+        if fmt == "uuid":
+            return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        if fmt in ("uri", "uri-reference", "url"):
+            return f"https://example.com/{rng.choice(_WORDS)}"
+        if fmt == "email":
+            return f"{rng.choice(_WORDS)}@example.com"
+
+        length = max(schema.get("minLength", 0), min(self.string_length, schema.get("maxLength", self.string_length)))
+        text = "-".join(rng.choice(_WORDS) for _ in range(length // 6 + 1))
+        return text[:length].rstrip("-").ljust(length, "x")
@@ -1,69 +1,360 @@
 #!/usr/bin/env python3
 """
-Simple FastMCP Client Test
-Uses FastMCP's built-in Client to test your server
+FastMCP client for manual testing and load generation.
+
+    python -m tests.manual.client localhost:8000/mcp
+    python -m tests.manual.client localhost:8000/mcp --sessions 20 --duration 60 --mix mix.json
+    python -m tests.manual.client localhost:8000/mcp --sessions 20 --trace calls.jsonl
+
+Without --sessions, lists the server's tools and resources. With it, runs
+that many concurrent MCP sessions replaying a mix of tool calls and reports
+throughput, latency percentiles, error rate and server RSS over time.
+
+A mix is a JSON list of {"tool", "arguments", "weight"} objects; each
+session draws calls from it at random by weight until --duration or
+--calls runs out. A trace is a JSON lines file of {"tool", "arguments",
+"at"} objects, "at" being seconds since the start of the recording; its
+calls are shared out between sessions in order, at their recorded times
+scaled by --speed (0 replays as fast as possible). --record writes the
+calls of any run as a trace.
 """
 
+import argparse
 import asyncio
+import json
+import os
+import random
+import re
 import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
 
+import httpx
 from fastmcp import Client
 
+from tests.benchmarks.suite import percentile
+
+_RSS_METRIC = re.compile(r"^process_resident_memory_bytes\s+(\S+)$", re.MULTILINE)
+
+
+@dataclass
+class Call:
+    """One tool call of a mix or trace."""
+
+    tool: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+    at: float | None = None
+
+
+@dataclass
+class Sample:
+    """Progress at one point of a run."""
+
+    elapsed: float
+    calls: int
+    errors: int
+    rss: int | None
+
+
+@dataclass
+class LoadReport:
+    """Everything measured during one run."""
+
+    sessions: int
+    elapsed: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+    tools: Counter = field(default_factory=Counter)
+    timeline: list[Sample] = field(default_factory=list)
+
+    @property
+    def calls(self) -> int:
+        return len(self.latencies)
+
+    def summary(self) -> dict[str, Any]:
+        calls = self.calls
+        rss = [s.rss for s in self.timeline if s.rss is not None]
+        summary = {
+            "sessions": self.sessions,
+            "calls": calls,
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_per_s": round(calls / self.elapsed, 1) if self.elapsed else 0.0,
+            "error_rate": round(sum(self.errors.values()) / calls, 4) if calls else 0.0,
+            "errors": dict(self.errors),
+        }
+        for p in (50, 95, 99):
+            summary[f"p{p}_ms"] = round(percentile(self.latencies, p) * 1000, 2) if calls else None
+        if rss:
+            summary.update(rss_start_mib=_mib(rss[0]), rss_peak_mib=_mib(max(rss)), rss_end_mib=_mib(rss[-1]))
+        return summary
+
+
+class CallSource:
+    """Hand out calls to sessions, from a weighted mix or in trace order."""
+
+    def __init__(self, mix: list[tuple[Call, float]] | None = None, trace: list[Call] | None = None, seed: int = 0):
+        if bool(mix) == bool(trace):
+            raise ValueError("Give either a non-empty mix or a non-empty trace")
+        self._mix = mix
+        self._trace = iter(trace or ())
+        self._rng = random.Random(seed)
+
+    @property
+    def replaying(self) -> bool:
+        return self._mix is None
+
+    def next(self) -> Call | None:
+        """Return the next call, or None once a trace is exhausted."""
+        if self._mix is None:
+            return next(self._trace, None)
+        calls, weights = zip(*self._mix, strict=True)
+        return self._rng.choices(calls, weights)[0]
+
+
+class RssProbe:
+    """Read the server's resident memory from /proc, or from its /metrics endpoint."""
+
+    def __init__(self, pid: int | None = None, metrics_url: str | None = None):
+        self.pid = pid
+        self.metrics_url = metrics_url
+
+    async def read(self, http: httpx.AsyncClient) -> int | None:
+        if self.pid is not None:
+            try:
+                with open(f"/proc/{self.pid}/statm") as f:
+                    return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            except (OSError, ValueError, IndexError):
+                return None
+        if self.metrics_url is None:
+            return None
+        try:
+            response = await http.get(self.metrics_url)
+        except httpx.HTTPError:
+            return None
+        return parse_rss(response.text) if response.status_code == 200 else None
+
+
+def parse_rss(metrics_text: str) -> int | None:
+    """Return process_resident_memory_bytes from a Prometheus text exposition."""
+    match = _RSS_METRIC.search(metrics_text)
+    return int(float(match.group(1))) if match else None
+
+
+def load_mix(path: str) -> list[tuple[Call, float]]:
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    return [(Call(e["tool"], e.get("arguments", {})), float(e.get("weight", 1))) for e in entries]
+
+
+def load_trace(path: str) -> list[Call]:
+    with open(path, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return [Call(e["tool"], e.get("arguments", {}), e.get("at")) for e in entries]
+
+
+async def run_load(
+    target: Any,
+    sessions: int,
+    source: CallSource,
+    duration: float | None = None,
+    max_calls: int | None = None,
+    speed: float = 1.0,
+    probe: RssProbe | None = None,
+    sample_interval: float = 1.0,
+    record: list[Call] | None = None,
+) -> LoadReport:
+    """
+    Run concurrent MCP sessions against target until the calls run out.
 
-async def test_server(server_url):
-    """Test your FastMCP server"""
+    Args:
+        target: Server URL, or anything else fastmcp.Client accepts
+        sessions: Number of concurrent sessions
+        source: Where each session takes its next call from
+        duration: Stop starting new calls after this many seconds
+        max_calls: Stop after this many calls in total
+        speed: Trace replay speed; 0 ignores recorded times
+        probe: Where to read server RSS from
+        sample_interval: Seconds between timeline samples
+        record: Appended with every call made, timed from the start
+
+    Returns:
+        The report of the run
+    """
+    if duration is None and max_calls is None and not source.replaying:
+        raise ValueError("A weighted mix needs a duration or a call limit")
+
+    report = LoadReport(sessions=sessions)
+    clients = [Client(target) for _ in range(sessions)]
+    started = 0.0
+    issued = 0
+
+    def take() -> Call | None:
+        nonlocal issued
+        if max_calls is not None and issued >= max_calls:
+            return None
+        if duration is not None and time.perf_counter() - started >= duration:
+            return None
+        call = source.next()
+        if call is not None:
+            issued += 1
+        return call
+
+    async def session(client: Client) -> None:
+        while (call := take()) is not None:
+            if source.replaying and speed and call.at is not None:
+                delay = started + call.at / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            sent = time.perf_counter()
+            if record is not None:
+                record.append(Call(call.tool, call.arguments, round(sent - started, 3)))
+            try:
+                result = await client.call_tool(call.tool, call.arguments, raise_on_error=False)
+                if result.is_error:
+                    report.errors["tool_error"] += 1
+            except Exception as e:
+                report.errors[type(e).__name__] += 1
+            report.latencies.append(time.perf_counter() - sent)
+            report.tools[call.tool] += 1
+
+    async def sample(http: httpx.AsyncClient) -> None:
+        rss = await probe.read(http) if probe else None
+        report.timeline.append(
+            Sample(time.perf_counter() - started, report.calls, sum(report.errors.values()), rss)
+        )
+
+    async def sampler(http: httpx.AsyncClient) -> None:
+        while True:
+            await asyncio.sleep(sample_interval)
+            await sample(http)
+
+    async with httpx.AsyncClient(timeout=5) as http:
+        for client in clients:
+            await client.__aenter__()
+        try:
+            started = time.perf_counter()
+            await sample(http)
+            sampling = asyncio.create_task(sampler(http))
+            try:
+                await asyncio.gather(*(session(client) for client in clients))
+            finally:
+                sampling.cancel()
+            report.elapsed = time.perf_counter() - started
+            await sample(http)
+        finally:
+            for client in clients:
+                await client.__aexit__(None, None, None)
+    return report
+
+
+def format_report(report: LoadReport) -> str:
+    summary = report.summary()
+    lines = [f"{key:>18}  {value}" for key, value in summary.items() if key != "errors" and value is not None]
+    for kind, count in report.errors.most_common():
+        lines.append(f"{'error ' + kind:>18}  {count}")
+
+    lines.append("")
+    lines.append(f"{'t (s)':>8}  {'calls/s':>9}  {'errors':>6}  {'RSS (MiB)':>9}")
+    previous = None
+    for s in report.timeline:
+        if previous is not None and s.elapsed > previous.elapsed:
+            rate = (s.calls - previous.calls) / (s.elapsed - previous.elapsed)
+            rss = f"{_mib(s.rss):9.1f}" if s.rss is not None else f"{'-':>9}"
+            lines.append(f"{s.elapsed:8.1f}  {rate:9.1f}  {s.errors - previous.errors:6d}  {rss}")
+        previous = s
+    return "\n".join(lines)
+
+
+async def list_server(server_url: str) -> None:
+    """Print the server's tools and resources."""
     print(f"Testing server: {server_url}")
 
     async with Client(server_url) as client:
         print("✅ Connected!")
 
-
-
         tools = await client.list_tools()
-
         resources = await client.list_resources()
         resource_templates = await client.list_resource_templates()
+
         print(f"\n📦 Found {len(tools)} tools:")
+        for tool in tools:
+            print(f"  🔧 {tool.name}: {tool.description}")
 
         print(f"\n📦 Found {len(resources)} resources:")
-
-        print(f"\n📦 Found {len(resource_templates)} resource templates:")
-
         for resource in resources:
             print(f"  📄 {resource.name}: {resource.description}")
 
-        for tool in tools:
-            print(f"  🔧 {tool.name}: {tool}")
-
-        # Test the first tool with empty args
-        # if tools:
-        #     tool = tools[0]
-        #     print(f"\n🧪 Testing '{tool.name}'...")
-        #
-        #     # Provide sample arguments based on tool name
-        #     args = {}
-        #     if tool.name == "process_data":
-        #         args = {"uri": "https://example.com/sample.txt"}
-        #
-        #     try:
-        #         result = await client.call_tool(tool.name, args)
-        #         print("✅ Success!")
-        #         for content in result:
-        #             print(f"   📄 {content}")
-        #     except Exception as e:
-        #         print(f"⚠️  Error: {e}")
+        print(f"\n📦 Found {len(resource_templates)} resource templates:")
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python client.py <host:port>")
-        print("Example: python client.py localhost:8000")
-        print("Example: python client.py http://localhost:8000")
-        sys.exit(1)
 
-    server_url = sys.argv[1]
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m tests.manual.client", description=__doc__.splitlines()[1])
+    parser.add_argument("server", help="Server URL, e.g. localhost:8000/mcp")
+    parser.add_argument("--sessions", type=int, help="Concurrent MCP sessions; omit to only list tools")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--mix", help="JSON file of weighted tool calls")
+    source.add_argument("--trace", help="JSON lines file of recorded tool calls to replay")
+    parser.add_argument("--duration", type=float, help="Seconds to run for")
+    parser.add_argument("--calls", type=int, help="Total calls to make")
+    parser.add_argument("--speed", type=float, default=1.0, help="Trace replay speed; 0 for as fast as possible")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for drawing calls from a mix")
+    parser.add_argument("--server-pid", type=int, help="Read server RSS from /proc instead of /metrics")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between timeline samples")
+    parser.add_argument("--record", help="Write the calls made to this trace file")
+    parser.add_argument("--output", help="Write the summary and timeline to this JSON file")
+    return parser.parse_args(argv)
+
 
-    # Add http:// if not present
-    if not server_url.startswith(('http://', 'https://', 'ws://', 'wss://')):
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    server_url = args.server
+    if not server_url.startswith(("http://", "https://")):
         server_url = f"http://{server_url}"
 
-    asyncio.run(test_server(server_url))
+    if args.sessions is None:
+        asyncio.run(list_server(server_url))
+        return 0
+    if not (args.mix or args.trace):
+        print("--sessions needs --mix or --trace", file=sys.stderr)
+        return 2
+
+    source = CallSource(mix=load_mix(args.mix)) if args.mix else CallSource(trace=load_trace(args.trace))
+    origin = "{0.scheme}://{0.netloc}".format(urlsplit(server_url))
+    probe = RssProbe(pid=args.server_pid, metrics_url=f"{origin}/metrics")
+    record: list[Call] | None = [] if args.record else None
+
+    report = asyncio.run(run_load(
+        server_url,
+        args.sessions,
+        source,
+        duration=args.duration,
+        max_calls=args.calls,
+        speed=args.speed,
+        probe=probe,
+        sample_interval=args.sample_interval,
+        record=record,
+    ))
+    print(format_report(report))
+
+    if args.record:
+        with open(args.record, "w", encoding="utf-8") as f:
+            for call in record:
+                f.write(json.dumps({"at": call.at, "tool": call.tool, "arguments": call.arguments}) + "\n")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "summary": report.summary(),
+                "timeline": [vars(s) for s in report.timeline],
+            }, f, indent=2)
+    return 0
+
+
+def _mib(value: int) -> float:
+    return round(value / 1024 / 1024, 1)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
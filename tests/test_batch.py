@@ -0,0 +1,156 @@
+"""Tests for batch entity lookup tools."""
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from src.clients.projection import ProjectionTransport
+from src.components.batch import BatchFetcher, register_batch_tools
+from src.middleware.projection import ProjectionMiddleware
+
+
+def get_operation(operation_id, parameter, enabled="true"):
+    return {
+        "get": {
+            "operationId": operation_id,
+            "x-cortex-mcp-enabled": enabled,
+            "summary": f"Get {parameter}",
+            "parameters": [
+                {"name": parameter, "in": "path", "required": True, "schema": {"type": "string"}},
+            ],
+            "responses": {"200": {"description": "OK"}},
+        }
+    }
+
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/api/v1/catalog/{tagOrId}": get_operation("getEntityDetails", "tagOrId"),
+        "/api/v1/teams/{tagOrId}": get_operation("getTeamDetails", "tagOrId"),
+        "/api/v1/scorecards/{tag}": get_operation("getScorecard", "tag", enabled="false"),
+    },
+}
+
+
+class EntityUpstream:
+    """Cortex stand-in serving entities, tracking concurrency."""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.paths = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request):
+        self.paths.append(request.url.raw_path.decode())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        tag = request.url.path.rsplit("/", 1)[1]
+        if tag in self.missing:
+            return httpx.Response(404, json={"message": f"{tag} not found"})
+        return httpx.Response(200, json={"tag": tag, "name": tag.title(), "owners": {"teams": []}})
+
+
+def make_client(upstream):
+    transport = ProjectionTransport(httpx.MockTransport(upstream))
+    return httpx.AsyncClient(base_url="https://cortex.test", transport=transport)
+
+
+def make_server(upstream):
+    server = FastMCP("test")
+    server.add_middleware(ProjectionMiddleware())
+    register_batch_tools(server, SPEC, make_client(upstream))
+    return server
+
+
+async def call(server, name, arguments):
+    async with Client(server) as client:
+        result = await client.call_tool(name, arguments, raise_on_error=False)
+    return json.loads(result.content[0].text)
+
+
+class TestBatchTools:
+    """Test suite for batch tools."""
+
+    @pytest.mark.asyncio
+    async def test_registers_enabled_routes(self):
+        """Test that batch tools are registered for the enabled detail routes."""
+        async with Client(make_server(EntityUpstream())) as client:
+            tools = {tool.name: tool for tool in await client.list_tools()}
+
+        assert set(tools) == {"getEntityDetailsBatch", "getTeamDetailsBatch"}
+        schema = tools["getEntityDetailsBatch"].inputSchema
+        assert schema["properties"]["tags"]["type"] == "array"
+        assert "fields" in schema["properties"]
+
+    @pytest.mark.asyncio
+    async def test_results_and_errors(self):
+        """Test that failing tags are reported alongside the others."""
+        upstream = EntityUpstream(missing={"gone"})
+        result = await call(make_server(upstream), "getEntityDetailsBatch", {
+            "tags": ["a", "gone", "b", "a"],
+        })
+
+        assert list(result["results"]) == ["a", "b"]
+        assert result["results"]["a"]["name"] == "A"
+        assert result["errors"] == {"gone": {"status": 404, "error": {"message": "gone not found"}}}
+        assert sorted(upstream.paths) == ["/api/v1/catalog/a", "/api/v1/catalog/b", "/api/v1/catalog/gone"]
+
+    @pytest.mark.asyncio
+    async def test_fields_apply_to_every_entity(self):
+        """Test that the fields argument is applied to each entity."""
+        result = await call(make_server(EntityUpstream()), "getTeamDetailsBatch", {
+            "tags": ["a", "b"], "fields": "tag",
+        })
+        assert result["results"] == {"a": {"tag": "a"}, "b": {"tag": "b"}}
+
+
+class TestBatchFetcher:
+    """Test suite for BatchFetcher."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test that no more than the configured number of requests are in flight."""
+        upstream = EntityUpstream()
+        async with make_client(upstream) as client:
+            fetcher = BatchFetcher(client, "/api/v1/catalog/{tagOrId}", concurrency=3, max_keys=100)
+            result = await fetcher.fetch([f"svc-{i}" for i in range(20)])
+
+        assert len(result["results"]) == 20
+        assert upstream.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_transport_errors_are_reported(self):
+        """Test that transport errors are reported per tag."""
+        def upstream(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=httpx.MockTransport(upstream)) as client:
+            result = await BatchFetcher(client, "/api/v1/teams/{tagOrId}", 2, 10).fetch(["a"])
+
+        assert result["results"] == {}
+        assert result["errors"]["a"]["error"].startswith("ConnectError")
+
+    @pytest.mark.asyncio
+    async def test_too_many_tags(self):
+        """Test that a batch over the tag limit is rejected."""
+        async with make_client(EntityUpstream()) as client:
+            fetcher = BatchFetcher(client, "/api/v1/teams/{tagOrId}", 2, max_keys=2)
+            with pytest.raises(ToolError):
+                await fetcher.fetch(["a", "b", "c"])
+
+    @pytest.mark.asyncio
+    async def test_tags_are_escaped(self):
+        """Test that tags are escaped in the request path."""
+        upstream = EntityUpstream()
+        async with make_client(upstream) as client:
+            await BatchFetcher(client, "/api/v1/catalog/{tagOrId}", 1, 10).fetch(["a/b"])
+        assert upstream.paths == ["/api/v1/catalog/a%2Fb"]
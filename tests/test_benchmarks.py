@@ -0,0 +1,48 @@
+"""Tests for benchmark result files and comparison."""
+from tests.benchmarks.results import Measurement, compare, format_table, load, save
+from tests.benchmarks.suite import percentile
+
+
+class TestBenchmarkResults:
+    """Test suite for benchmark results."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that saved measurements load back unchanged."""
+        path = str(tmp_path / "bench.json")
+        measurements = [
+            Measurement("startup.cold", 1200.5, "ms"),
+            Measurement("tool_calls.c1.throughput", 190.0, "calls/s", lower_is_better=False),
+        ]
+        save(path, measurements)
+        assert load(path) == measurements
+
+    def test_compare_flags_regressions_in_either_direction(self):
+        """Test that regressions are flagged by each measurement's direction."""
+        baseline = [
+            Measurement("latency", 100.0, "ms"),
+            Measurement("throughput", 200.0, "calls/s", lower_is_better=False),
+            Measurement("size", 50.0, "KiB"),
+            Measurement("removed", 1.0, "ms"),
+        ]
+        current = [
+            Measurement("latency", 115.0, "ms"),
+            Measurement("throughput", 150.0, "calls/s", lower_is_better=False),
+            Measurement("size", 40.0, "KiB"),
+            Measurement("added", 1.0, "ms"),
+        ]
+
+        comparisons = {c.name: c for c in compare(baseline, current, threshold=0.1)}
+
+        assert set(comparisons) == {"latency", "throughput", "size"}
+        assert comparisons["latency"].regressed
+        assert comparisons["throughput"].regressed
+        assert not comparisons["size"].regressed
+        assert round(comparisons["size"].change, 2) == -0.2
+        assert "REGRESSION" in format_table(current, list(comparisons.values()))
+
+    def test_percentile(self):
+        """Test that percentiles are taken by nearest rank."""
+        samples = list(range(1, 101))
+        assert percentile(samples, 50) == 50
+        assert percentile(samples, 99) == 99
+        assert percentile([3.0], 95) == 3.0
@@ -0,0 +1,153 @@
+"""Tests for the read-only response cache."""
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.clients.cache import CachingTransport, ResponseCache, cache_key
+from src.routes.table import RouteTable
+
+
+@pytest.fixture
+def route_table():
+    """Route table with a cached read route and a write route."""
+    return RouteTable.from_spec({
+        "paths": {
+            "/api/v1/catalog/{tagOrId}": {"get": {}},
+            "/api/v1/relationship-types": {"get": {"x-cortex-mcp-cache-ttl": 300}},
+            "/api/v1/scorecards": {"get": {}},
+            "/api/v1/metrics": {"post": {}},
+        }
+    })
+
+
+def make_client(route_table, cache, calls, route_ttls=None, status_code=200):
+    """Build a client whose upstream counts requests and echoes the path."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(status_code, json={"path": request.url.path, "n": len(calls)})
+
+    transport = CachingTransport(
+        httpx.MockTransport(handler),
+        cache=cache,
+        route_table=route_table,
+        default_ttl=30,
+        route_ttls=route_ttls,
+    )
+    return httpx.AsyncClient(base_url="https://cortex.test", transport=transport)
+
+
+class TestResponseCache:
+    """Test suite for ResponseCache bookkeeping."""
+
+    def test_expired_entries_miss(self):
+        """Test that entries are not served past their TTL."""
+        cache = ResponseCache(max_bytes=10_000, max_entry_bytes=10_000)
+        key = ("GET", "/a", (), "")
+        cache.put(key, 200, [], b"body", ttl=10)
+
+        assert cache.get(key, "/a") is not None
+        with patch("src.clients.cache.time.monotonic", return_value=time.monotonic() + 11):
+            assert cache.get(key, "/a") is None
+
+        assert cache.stats()["routes"]["/a"] == {"hits": 1, "misses": 1}
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        """Test that the byte bound evicts the least recently used entry."""
+        cache = ResponseCache(max_bytes=1000, max_entry_bytes=1000)
+        first, second, third = (("GET", f"/{n}", (), "") for n in "abc")
+
+        cache.put(first, 200, [], b"x" * 200, ttl=60)
+        cache.put(second, 200, [], b"x" * 200, ttl=60)
+        cache.get(first, "/a")
+        cache.put(third, 200, [], b"x" * 200, ttl=60)
+
+        assert cache.get(first, "/a") is not None
+        assert cache.get(second, "/b") is None
+        assert cache.size <= 1000
+        assert cache.evictions == 1
+
+    def test_oversized_entry_rejected(self):
+        """Test that bodies above the entry limit are not stored."""
+        cache = ResponseCache(max_bytes=10_000, max_entry_bytes=500)
+
+        assert not cache.put(("GET", "/a", (), ""), 200, [], b"x" * 1000, ttl=60)
+        assert len(cache) == 0
+
+
+class TestCachingTransport:
+    """Test suite for CachingTransport."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_get_served_from_cache(self, route_table):
+        """Test that identical GETs hit upstream once."""
+        cache = ResponseCache(max_bytes=10_000, max_entry_bytes=10_000)
+        calls = []
+        async with make_client(route_table, cache, calls) as client:
+            first = await client.get("/api/v1/catalog/svc", params={"b": "2", "a": "1"})
+            second = await client.get("/api/v1/catalog/svc", params={"a": "1", "b": "2"})
+
+        assert len(calls) == 1
+        assert first.json() == second.json()
+        assert cache.stats()["routes"]["/api/v1/catalog/{tagOrId}"] == {"hits": 1, "misses": 1}
+
+    @pytest.mark.asyncio
+    async def test_key_includes_auth_identity(self, route_table):
+        """Test that different tokens never share entries."""
+        cache = ResponseCache(max_bytes=10_000, max_entry_bytes=10_000)
+        calls = []
+        async with make_client(route_table, cache, calls) as client:
+            await client.get("/api/v1/scorecards", headers={"Authorization": "Bearer a"})
+            await client.get("/api/v1/scorecards", headers={"Authorization": "Bearer b"})
+
+        assert len(calls) == 2
+        assert "Bearer a" not in repr(cache_key(calls[0]))
+
+    @pytest.mark.asyncio
+    async def test_non_idempotent_and_errors_not_cached(self, route_table):
+        """Test that POSTs and error responses always go upstream."""
+        cache = ResponseCache(max_bytes=10_000, max_entry_bytes=10_000)
+        calls = []
+        async with make_client(route_table, cache, calls) as client:
+            await client.post("/api/v1/metrics", json={})
+            await client.post("/api/v1/metrics", json={})
+        assert len(calls) == 2
+
+        calls = []
+        async with make_client(route_table, cache, calls, status_code=500) as client:
+            await client.get("/api/v1/scorecards")
+            await client.get("/api/v1/scorecards")
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_route_ttl_precedence(self, route_table):
+        """Test that config overrides beat spec extensions, which beat the default."""
+        cache = ResponseCache(max_bytes=10_000, max_entry_bytes=10_000)
+        transport = CachingTransport(
+            httpx.MockTransport(lambda request: httpx.Response(200)),
+            cache=cache,
+            route_table=route_table,
+            default_ttl=30,
+            route_ttls={"/api/v1/scorecards": 0},
+        )
+
+        assert transport.ttl_for(route_table.match("GET", "/api/v1/relationship-types")) == 300
+        assert transport.ttl_for(route_table.match("GET", "/api/v1/catalog/x")) == 30
+        assert transport.ttl_for(route_table.match("GET", "/api/v1/scorecards")) == 0
+        assert transport.ttl_for(None) == 0
+
+    @pytest.mark.asyncio
+    async def test_zero_ttl_bypasses_cache(self, route_table):
+        """Test that routes configured with a zero TTL are never cached."""
+        cache = ResponseCache(max_bytes=10_000, max_entry_bytes=10_000)
+        calls = []
+        async with make_client(
+            route_table, cache, calls, route_ttls={"/api/v1/scorecards": 0}
+        ) as client:
+            await client.get("/api/v1/scorecards")
+            await client.get("/api/v1/scorecards")
+
+        assert len(calls) == 2
+        assert cache.stats()["misses"] == 0
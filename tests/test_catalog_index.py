@@ -0,0 +1,422 @@
+"""Tests for the background-synced catalog index."""
+import asyncio
+import time
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+
+from src.clients.catalog_index import (
+    CatalogIndex,
+    CatalogIndexLifespan,
+    CatalogIndexTransport,
+)
+from src.config import Config
+from src.routes.table import RouteTable
+
+SERVER_AUTH = {"Authorization": "Bearer server-token"}
+
+
+def entity(tag, type="service", groups=(), owners=(), archived=False, updated="2024-01-01T00:00:00Z"):
+    """Catalog listing entry as Cortex returns it."""
+    return {
+        "id": f"en-{tag}",
+        "tag": tag,
+        "name": tag.title(),
+        "type": type,
+        "groups": list(groups),
+        "owners": {"teams": [{"id": f"en-{o}", "tag": o, "name": o, "isArchived": False} for o in owners], "individuals": []},
+        "isArchived": archived,
+        "lastUpdated": updated,
+    }
+
+
+class FakeCatalog:
+    """Upstream serving a catalog listing, entity details and an audit log, recording every request."""
+
+    def __init__(self, entities):
+        self.entities = entities
+        self.requests = []
+        self.fail = False
+        # Audit log entries, or None for a token that may not read the audit log
+        self.audit = None
+
+    def change(self, action, tag, object_type="CATALOG"):
+        """Record a change to an entity in the audit log."""
+        self.audit.append({
+            "action": action,
+            "objectIdentifier": tag,
+            "objectType": object_type,
+            "timestamp": datetime.now(UTC).isoformat(),
+        })
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.fail:
+            return httpx.Response(503)
+
+        path = request.url.path
+        if path == "/api/v1/audit-logs":
+            if self.audit is None:
+                return httpx.Response(403, json={"message": "forbidden"})
+            params = request.url.params
+            since = datetime.fromisoformat(params["startTime"])
+            logs = [
+                log for log in self.audit
+                if log["objectType"] == params["objectTypes"] and datetime.fromisoformat(log["timestamp"]) >= since
+            ]
+            return httpx.Response(200, json={"logs": logs, "page": 0, "total": len(logs), "totalPages": 1})
+
+        if path == "/api/v1/catalog":
+            params = request.url.params
+            types = params.get_list("types")
+            listed = [
+                e for e in self.entities
+                if (e["type"] in types if types else e["type"] != "team")
+                and (params.get("includeArchived") == "true" or not e["isArchived"])
+            ]
+            if not params.get("page", "0").isdigit():
+                return httpx.Response(400, json={"message": "invalid page"})
+            page, page_size = int(params.get("page", 0)), int(params.get("pageSize", 250))
+            return httpx.Response(200, json={
+                "entities": listed[page * page_size:(page + 1) * page_size],
+                "page": page,
+                "total": len(listed),
+                "totalPages": -(-len(listed) // page_size),
+            })
+
+        tag_or_id = path.rsplit("/", 1)[-1]
+        for e in self.entities:
+            if tag_or_id in (e["id"], e["tag"]):
+                details = {k: v for k, v in e.items() if k != "owners"}
+                return httpx.Response(200, json={**details, "ownersV2": e["owners"], "n": len(self.requests)})
+        return httpx.Response(404, json={"message": "not found"})
+
+    def reads(self):
+        """Requests other than the index's own syncs."""
+        return [r for r in self.requests if "no-cache" not in r.headers.get("cache-control", "")]
+
+
+@pytest.fixture
+def route_table():
+    """Route table with the catalog and team routes."""
+    return RouteTable.from_spec({
+        "paths": {
+            "/api/v1/catalog": {"get": {}},
+            "/api/v1/catalog/{tagOrId}": {"get": {}},
+            "/api/v1/catalog/descriptors": {"get": {}},
+            "/api/v1/teams/{tagOrId}": {"get": {}},
+        }
+    })
+
+
+@pytest.fixture
+def upstream():
+    """Catalog of services, a resource, an archived service and a team."""
+    return FakeCatalog([
+        entity("payments", groups=["tier-1", "backend"], owners=["core"]),
+        entity("ledger", groups=["backend"], owners=["core", "finance"]),
+        entity("web", groups=["frontend"], owners=["growth"]),
+        entity("postgres", type="resource", groups=["backend"]),
+        entity("legacy", groups=["backend"], archived=True),
+        entity("core", type="team"),
+    ])
+
+
+def make_client(route_table, upstream, headers=SERVER_AUTH, **settings):
+    """Client whose transport answers from a fresh index over the fake catalog."""
+    index = CatalogIndex(**{"refresh_interval": 300, "max_staleness": 3600, "detail_max_bytes": 100_000, **settings})
+    transport = CatalogIndexTransport(httpx.MockTransport(upstream.handler), index, route_table)
+    client = httpx.AsyncClient(base_url="https://cortex.test", headers=headers, transport=transport)
+    index.bind(client)
+    return client, index
+
+
+def tags(response):
+    """Tags of the entities in a listing response."""
+    return [e["tag"] for e in response.json()["entities"]]
+
+
+class TestCatalogList:
+    """Test suite for catalog listings answered from the index."""
+
+    @pytest.mark.asyncio
+    async def test_filters_match_upstream_semantics(self, route_table, upstream):
+        """Test that listing filters combine the way Cortex applies them."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+
+            listing = await client.get("/api/v1/catalog")
+            assert listing.extensions["cortex_catalog_index"] == "hit"
+            assert tags(listing) == ["payments", "ledger", "web", "postgres"]
+            assert "owners" not in listing.json()["entities"][0]
+
+            assert tags(await client.get("/api/v1/catalog", params={"groups": "backend,frontend", "types": "service"})) == [
+                "payments", "ledger", "web"
+            ]
+            assert tags(await client.get("/api/v1/catalog", params={"owners": ["finance", "growth"]})) == ["ledger", "web"]
+            assert tags(await client.get("/api/v1/catalog", params={"groups": "backend", "owners": "core"})) == [
+                "payments", "ledger"
+            ]
+            assert tags(await client.get("/api/v1/catalog", params={"types": "team"})) == ["core"]
+
+            archived = await client.get("/api/v1/catalog", params={"groups": "backend", "includeArchived": "true"})
+            assert tags(archived) == ["payments", "ledger", "postgres", "legacy"]
+
+            owned = await client.get("/api/v1/catalog", params={"owners": "finance", "includeOwners": "true"})
+            assert owned.json()["entities"][0]["owners"]["teams"][1]["tag"] == "finance"
+
+        assert upstream.reads() == []
+        assert index.stats()["list_hits"] == 7
+
+    @pytest.mark.asyncio
+    async def test_pages(self, route_table, upstream):
+        """Test that listings are paged with Cortex's page fields."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+            response = await client.get("/api/v1/catalog", params={"pageSize": 3, "page": 1})
+
+        assert response.json() == {
+            "entities": [{k: v for k, v in upstream.entities[3].items() if k != "owners"}],
+            "page": 1,
+            "total": 4,
+            "totalPages": 2,
+        }
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("params", [
+        {"query": "payments"},
+        {"includeMetadata": "true"},
+        {"types": "library"},
+        {"pageSize": "5000"},
+        {"page": "first"},
+        {"owners": "jane@example.com"},
+        {"owners": "core,not-a-team"},
+    ])
+    async def test_unanswerable_params_go_upstream(self, route_table, upstream, params):
+        """Test that listings the index can't answer exactly are sent upstream."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+            response = await client.get("/api/v1/catalog", params=params)
+
+        assert "cortex_catalog_index" not in response.extensions
+        assert len(upstream.reads()) == 1
+        assert index.stats()["upstream"] == 1
+
+
+class TestCatalogDetails:
+    """Test suite for entity and team details kept with the index."""
+
+    @pytest.mark.asyncio
+    async def test_read_through_until_entity_changes(self, route_table, upstream):
+        """Test that details are read once and served until a sync sees the entity change."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+
+            first = await client.get("/api/v1/catalog/payments")
+            by_id = await client.get("/api/v1/catalog/en-payments")
+            assert [first.extensions["cortex_catalog_index"], by_id.extensions["cortex_catalog_index"]] == ["miss", "hit"]
+            assert by_id.json() == first.json()
+
+            upstream.entities[0] = entity("payments", groups=["tier-1"], updated="2024-02-01T00:00:00Z")
+            await index.sync()
+            changed = await client.get("/api/v1/catalog/payments")
+
+        assert changed.extensions["cortex_catalog_index"] == "miss"
+        assert changed.json()["lastUpdated"] == "2024-02-01T00:00:00Z"
+        assert len(upstream.reads()) == 2
+        assert index.stats()["changed"] == 7
+
+    @pytest.mark.asyncio
+    async def test_details_expire_after_refresh_interval(self, route_table, upstream):
+        """Test that details are kept no longer than the refresh interval."""
+        client, index = make_client(route_table, upstream, refresh_interval=60)
+        async with client:
+            await index.sync()
+            await client.get("/api/v1/catalog/payments")
+            with patch("src.clients.cache.time.monotonic", return_value=time.monotonic() + 61):
+                expired = await client.get("/api/v1/catalog/payments")
+
+        assert expired.extensions["cortex_catalog_index"] == "miss"
+        assert len(upstream.reads()) == 2
+
+    @pytest.mark.asyncio
+    async def test_teams_and_unknown_entities(self, route_table, upstream):
+        """Test that team details are indexed and anything unknown goes upstream."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+            for _ in range(2):
+                team = await client.get("/api/v1/teams/core")
+            not_a_team = await client.get("/api/v1/teams/payments")
+            unknown = await client.get("/api/v1/catalog/unknown")
+            descriptors = await client.get("/api/v1/catalog/descriptors")
+
+        assert team.extensions["cortex_catalog_index"] == "hit"
+        assert "cortex_catalog_index" not in not_a_team.extensions
+        assert unknown.status_code == 404
+        assert "cortex_catalog_index" not in descriptors.extensions
+        assert [r.url.path for r in upstream.reads()] == [
+            "/api/v1/teams/core", "/api/v1/teams/payments", "/api/v1/catalog/unknown", "/api/v1/catalog/descriptors"
+        ]
+
+
+class TestCatalogIndex:
+    """Test suite for syncing and when the index answers at all."""
+
+    @pytest.mark.asyncio
+    async def test_incremental_sync_counts_changes(self, route_table, upstream):
+        """Test that a sync keeps unchanged entities and counts changes and removals."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+            unchanged = index.snapshot.by_tag["web"]
+
+            del upstream.entities[1]
+            upstream.entities.append(entity("search", groups=["backend"]))
+            await index.sync()
+
+        stats = index.stats()
+        assert (stats["entities"], stats["syncs"], stats["changed"], stats["removed"]) == (6, 2, 7, 1)
+        assert index.snapshot.by_tag["web"].revision == unchanged.revision
+        assert "ledger" not in index.snapshot.by_tag
+        # Syncs page through the default listing and the teams
+        assert all(r.url.params["pageSize"] == "1000" for r in upstream.requests)
+
+    @pytest.mark.asyncio
+    async def test_sync_fetches_only_changed_entities(self, route_table, upstream):
+        """Test that a sync after the first fetches only what the audit log shows changed."""
+        upstream.audit = []
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+            unchanged = index.snapshot.by_tag["web"]
+            payments = index.snapshot.by_tag["payments"]
+            synced = len(upstream.requests)
+
+            upstream.entities[0] = entity("payments", groups=["tier-1"], owners=["finance"])
+            del upstream.entities[1]
+            upstream.entities.append(entity("search", groups=["backend"]))
+            for action, tag in [("UPDATE", "payments"), ("DELETE", "ledger"), ("CREATE", "search")]:
+                upstream.change(action, tag)
+            await index.sync()
+
+            listing = await client.get("/api/v1/catalog", params={"groups": "backend"})
+            owned = await client.get("/api/v1/catalog", params={"owners": "finance"})
+
+        assert sorted(r.url.path for r in upstream.requests[synced:]) == [
+            "/api/v1/audit-logs", "/api/v1/audit-logs",
+            "/api/v1/catalog/ledger", "/api/v1/catalog/payments", "/api/v1/catalog/search",
+        ]
+        stats = index.stats()
+        assert (stats["syncs"], stats["full_syncs"], stats["removed"]) == (2, 1, 1)
+        assert index.snapshot.by_tag["web"] is unchanged
+        assert index.snapshot.by_tag["payments"].revision > payments.revision
+        assert "n" not in index.snapshot.by_tag["payments"].summary
+        # New entities are listed after the ones the last full listing had
+        assert tags(listing) == ["postgres", "search"]
+        assert tags(owned) == ["payments"]
+
+    @pytest.mark.asyncio
+    async def test_lists_catalog_when_audit_log_cannot_tell(self, route_table, upstream):
+        """Test that a sync lists the whole catalog when the audit log is unreadable or shows a new type."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+            await index.sync()
+            assert index.stats()["full_syncs"] == 2
+
+            index._audit_log = True
+            upstream.audit = []
+            upstream.entities.append(entity("queue", type="infrastructure"))
+            upstream.change("CREATE", "queue")
+            await index.sync()
+
+            listing = await client.get("/api/v1/catalog", params={"types": "infrastructure"})
+
+        assert index.stats()["full_syncs"] == 3
+        assert tags(listing) == ["queue"]
+
+    @pytest.mark.asyncio
+    async def test_other_credentials_and_stale_index_go_upstream(self, route_table, upstream):
+        """Test that other tokens and a stale index are not answered from the index."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+            await client.get("/api/v1/catalog", headers={"Authorization": "Bearer caller-token"})
+            with patch("src.clients.catalog_index.time.monotonic", return_value=time.monotonic() + 3601):
+                await client.get("/api/v1/catalog")
+
+        assert len(upstream.reads()) == 2
+        assert index.stats()["list_hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_sync_keeps_serving_previous_snapshot(self, route_table, upstream):
+        """Test that a failed sync leaves the previous snapshot in use."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            await index.sync()
+            upstream.fail = True
+            with pytest.raises(httpx.HTTPStatusError):
+                await index.sync()
+
+            response = await client.get("/api/v1/catalog", params={"types": "resource"})
+
+        assert tags(response) == ["postgres"]
+        assert index.stats()["syncs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_first_request_starts_background_sync(self, route_table, upstream):
+        """Test that the first request starts the sync and closing the client stops it."""
+        client, index = make_client(route_table, upstream)
+        async with client:
+            first = await client.get("/api/v1/catalog")
+            for _ in range(100):
+                if index.snapshot is not None:
+                    break
+                await asyncio.sleep(0.01)
+            second = await client.get("/api/v1/catalog")
+
+        assert "cortex_catalog_index" not in first.extensions
+        assert second.extensions["cortex_catalog_index"] == "hit"
+        # Closing the client stops the sync
+        assert index._task is None
+
+    @pytest.mark.asyncio
+    async def test_lifespan_starts_and_stops_sync(self, route_table, upstream):
+        """Test that the app's lifespan starts the sync before any request and stops it at shutdown."""
+        client, index = make_client(route_table, upstream)
+
+        async def receive():
+            if index._task is None:
+                return {"type": "lifespan.startup"}
+            for _ in range(100):
+                if index.snapshot is not None:
+                    break
+                await asyncio.sleep(0.01)
+            return {"type": "lifespan.shutdown"}
+
+        async def send(message):
+            pass
+
+        async with client:
+            app = CatalogIndexLifespan(Starlette(), index=index)
+            await app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send)
+
+        assert index.snapshot is not None
+        assert upstream.reads() == []
+        assert index._task is None
+
+    def test_from_config(self):
+        """Test that the index is built from the config settings."""
+        with patch.multiple(Config, CATALOG_INDEX_REFRESH=60, CATALOG_INDEX_DETAIL_MAX_BYTES=0):
+            index = CatalogIndex.from_config()
+
+        assert index.refresh_interval == 60
+        assert index.details is None
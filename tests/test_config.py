@@ -45,6 +45,26 @@ class TestConfig:
         with patch.object(Config, 'OPENAPI_SPEC_PATH', str(spec_file)):
             Config.validate()
 
+    def test_validate_workers(self, tmp_path):
+        """Test validation fails without at least one worker."""
+        spec_file = tmp_path / "openapi.json"
+        spec_file.write_text("{}")
+
+        with patch.multiple(Config, OPENAPI_SPEC_PATH=str(spec_file), WORKERS=0):
+            with pytest.raises(ValueError, match="MCP_WORKERS must be at least 1"):
+                Config.validate()
+
+    def test_validate_catalog_index_refresh(self, tmp_path):
+        """Test validation fails when an enabled catalog index would never refresh."""
+        spec_file = tmp_path / "openapi.json"
+        spec_file.write_text("{}")
+
+        with patch.multiple(
+            Config, OPENAPI_SPEC_PATH=str(spec_file), CATALOG_INDEX_ENABLED=True, CATALOG_INDEX_REFRESH=0
+        ):
+            with pytest.raises(ValueError, match="CORTEX_CATALOG_INDEX_REFRESH must be positive"):
+                Config.validate()
+
     def test_get_masked_token_not_set(self):
         """Test token masking when token is not set."""
         with patch.object(Config, 'CORTEX_API_TOKEN', ''):
@@ -0,0 +1,84 @@
+"""Tests for deferred tool construction."""
+import threading
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastmcp import Client, FastMCP
+from mcp import McpError
+
+from src.components.deferred import DeferredTools
+from src.config import Config
+from src.server import create_mcp_server
+
+SPEC_PATH = str(Path(__file__).parent.parent / "swagger.json")
+
+
+def deferred_server(build):
+    """Server whose tools are added by build on DeferredTools' thread."""
+    server = FastMCP("deferred")
+    deferred = DeferredTools(lambda: build(server))
+    server.add_middleware(deferred)
+    return server, deferred
+
+
+class TestDeferredTools:
+    """Test suite for DeferredTools."""
+
+    @pytest.mark.asyncio
+    async def test_initialize_does_not_wait_for_tools(self):
+        """Test that sessions start before the tools exist and tools/list waits for them."""
+        release = threading.Event()
+
+        def build(server):
+            release.wait(5)
+
+            @server.tool
+            def ping() -> str:
+                return "pong"
+
+        server, deferred = deferred_server(build)
+        deferred.start()
+
+        async with Client(server) as client:
+            assert not deferred.ready
+            release.set()
+            tools = await client.list_tools()
+            result = await client.call_tool("ping", {})
+
+        assert [t.name for t in tools] == ["ping"]
+        assert result.data == "pong"
+        assert deferred.seconds is not None
+
+    @pytest.mark.asyncio
+    async def test_failed_build(self):
+        """Test that a failed build is reported to clients that list tools."""
+        def build(server):
+            raise RuntimeError("spec is broken")
+
+        server, deferred = deferred_server(build)
+        deferred.start()
+
+        async with Client(server) as client:
+            with pytest.raises(McpError, match="Tools are unavailable: spec is broken"):
+                await client.list_tools()
+
+
+class TestDeferredServer:
+    """Test suite for create_mcp_server(defer_tools=True)."""
+
+    @pytest.mark.asyncio
+    async def test_same_tools_as_a_full_build(self, tmp_path):
+        """Test that a deferred server ends up with the same tools as an eager one."""
+        # The deferred build reads the configuration on its own thread
+        with patch.multiple(Config, OPENAPI_SPEC_PATH=SPEC_PATH, OPENAPI_CACHE_DIR=str(tmp_path)):
+            eager = create_mcp_server()
+            deferred = create_mcp_server(defer_tools=True)
+
+            async with Client(eager) as client:
+                expected = await client.list_tools()
+            async with Client(deferred) as client:
+                tools = await client.list_tools()
+
+        assert len(tools) > 0
+        assert [t.model_dump() for t in tools] == [t.model_dump() for t in expected]
@@ -0,0 +1,160 @@
+"""Tests for the fake Cortex API."""
+import json
+import random
+from pathlib import Path
+
+import httpx
+import jsonschema
+import pytest
+
+from src.routes.mappers import is_mcp_enabled
+from src.utils.openapi_resolver import HTTP_METHODS, SCHEMA_REF_PREFIX
+from tests.fake_cortex import Delay, FakeCortexSettings, create_app
+from tests.fake_cortex.app import _response_schema
+
+SPEC = json.loads((Path(__file__).parent.parent / "swagger.json").read_text())
+
+OPERATIONS = [
+    (method.upper(), path, operation)
+    for path, path_item in SPEC["paths"].items()
+    for method, operation in path_item.items()
+    if method in HTTP_METHODS and is_mcp_enabled(operation)
+]
+
+# Required properties no finite value can have: the hierarchy nodes declare
+# their children/parents as a single node of the same type, not an array
+UNSATISFIABLE_REQUIRED = {"HierarchyChildNode": "children", "HierarchyParentNode": "parents"}
+
+
+def to_json_schema(obj, bases):
+    """
+    Translate OpenAPI 3.0 schema keywords into their JSON Schema equivalents.
+
+    nullable becomes a "null" type and oneOf becomes anyOf: the spec relies
+    on discriminators to pick a variant, and its variants are loose enough
+    that a value often matches several. allOf refs to a polymorphic base
+    point at the base without its subtype list.
+    """
+    if isinstance(obj, list):
+        return [to_json_schema(item, bases) for item in obj]
+    if not isinstance(obj, dict):
+        return obj
+    result = {k: to_json_schema(v, bases) for k, v in obj.items() if k not in ("nullable", "discriminator")}
+    if obj.get("nullable") and "type" in obj:
+        result["type"] = [obj["type"], "null"]
+    if "oneOf" in obj:
+        result["anyOf"] = result.pop("oneOf")
+    if "allOf" in obj:
+        result["allOf"] = [
+            {"$ref": part["$ref"] + ".base"} if part.get("$ref", "")[len(SCHEMA_REF_PREFIX):] in bases else part
+            for part in result["allOf"]
+        ]
+    return result
+
+
+def validator_for(schema):
+    schemas = SPEC["components"]["schemas"]
+    bases = {name for name, s in schemas.items() if "oneOf" in s and "discriminator" in s}
+    components = {name: to_json_schema(s, bases) for name, s in schemas.items()}
+    for name, prop in UNSATISFIABLE_REQUIRED.items():
+        components[name]["required"] = [r for r in components[name]["required"] if r != prop]
+    for name in bases:
+        components[f"{name}.base"] = {
+            k: v for k, v in components[name].items() if k not in ("anyOf", "oneOf")
+        }
+    root = {"allOf": [to_json_schema(schema, bases)], "components": {"schemas": components}}
+    return jsonschema.Draft7Validator(root)
+
+
+def client_for(settings=None):
+    app = create_app(SPEC, settings)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://fake-cortex")
+
+
+def concrete_path(template):
+    return template.replace("{", "p-").replace("}", "")
+
+
+class TestFakeCortex:
+    """Test suite for the fake Cortex API."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("method,template,operation", OPERATIONS, ids=[f"{m} {p}" for m, p, _ in OPERATIONS])
+    async def test_payloads_match_schema(self, method, template, operation):
+        """Test that every operation answers with a payload valid against its response schema."""
+        async with client_for(FakeCortexSettings(list_size=3, total_items=5)) as client:
+            response = await client.request(method, concrete_path(template))
+
+        assert response.status_code == 200
+        schema = _response_schema(operation)
+        if schema is not None:
+            errors = list(validator_for(schema).iter_errors(response.json()))
+            assert not errors, errors[0].message
+
+    @pytest.mark.asyncio
+    async def test_paging(self):
+        """Test that list pages split the configured items and report the totals."""
+        async with client_for(FakeCortexSettings(total_items=25)) as client:
+            pages = [
+                (await client.get("/api/v1/catalog", params={"page": page, "pageSize": 10})).json()
+                for page in range(4)
+            ]
+
+        assert [len(p["entities"]) for p in pages] == [10, 10, 5, 0]
+        assert {(p["total"], p["totalPages"]) for p in pages} == {(25, 3)}
+        assert [p["page"] for p in pages] == [0, 1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_payloads_are_reproducible(self):
+        """Test that the same seed produces the same payloads."""
+        bodies = []
+        for _ in range(2):
+            async with client_for(FakeCortexSettings(seed=7)) as client:
+                bodies.append((await client.get("/api/v1/scorecards/x")).content)
+        assert bodies[0] == bodies[1]
+
+    @pytest.mark.asyncio
+    async def test_injected_errors(self):
+        """Test that injected errors use the configured statuses and a Retry-After header."""
+        settings = FakeCortexSettings(error_rate=1.0, error_statuses=(429,))
+        async with client_for(settings) as client:
+            response = await client.get("/api/v1/teams/x")
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+
+    @pytest.mark.asyncio
+    async def test_unknown_route(self):
+        """Test that paths outside the spec return 404."""
+        async with client_for() as client:
+            response = await client.get("/api/v1/not-a-route")
+        assert response.status_code == 404
+
+
+class TestDelay:
+    """Test suite for latency distributions."""
+
+    @pytest.mark.parametrize("text,low,high", [
+        ("none", 0, 0),
+        ("constant:20", 0.02, 0.02),
+        ("uniform:10:30", 0.01, 0.03),
+        ("exponential:5", 0, float("inf")),
+        ("lognormal:40:0.5", 0, float("inf")),
+    ])
+    def test_samples(self, text, low, high):
+        """Test that each distribution samples delays within its bounds."""
+        rng = random.Random(0)
+        samples = [Delay.parse(text).sample(rng) for _ in range(200)]
+        assert all(low <= s <= high for s in samples)
+
+    def test_lognormal_median(self):
+        """Test that the lognormal distribution centres on its median."""
+        rng = random.Random(0)
+        samples = sorted(Delay.parse("lognormal:40:0.5").sample(rng) for _ in range(2001))
+        assert 0.035 < samples[1000] < 0.045
+
+    @pytest.mark.parametrize("text", ["", "constant", "uniform:1", "gamma:1:2", "constant:fast"])
+    def test_invalid(self, text):
+        """Test that malformed delay specifications are rejected."""
+        with pytest.raises(ValueError):
+            Delay.parse(text)
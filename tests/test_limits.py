@@ -0,0 +1,164 @@
+"""Tests for response size limits."""
+import gzip
+import json
+
+import httpx
+import pytest
+
+from src.clients.limits import TRUNCATION_KEY, ResponseLimitTransport
+
+CATALOG = {"entities": [{"tag": f"svc-{i}", "description": "x" * 100} for i in range(1000)], "total": 1000}
+
+
+class ChunkedStream(httpx.AsyncByteStream):
+    """Body delivered in fixed-size chunks, recording how much was read."""
+
+    def __init__(self, body, chunk_size=4096):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.sent = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for i in range(0, len(self.body), self.chunk_size):
+            self.sent += self.chunk_size
+            yield self.body[i:i + self.chunk_size]
+
+    async def aclose(self):
+        self.closed = True
+
+
+def make_client(body, max_bytes=0, max_items=0, headers=None, status_code=200):
+    stream = ChunkedStream(body)
+
+    def handler(request):
+        return httpx.Response(
+            status_code,
+            headers=headers or {"Content-Type": "application/json"},
+            stream=stream,
+        )
+
+    transport = ResponseLimitTransport(httpx.MockTransport(handler), max_bytes, max_items)
+    return httpx.AsyncClient(base_url="https://cortex.test", transport=transport), stream
+
+
+class TestResponseLimitTransport:
+    """Test suite for ResponseLimitTransport."""
+
+    @pytest.mark.asyncio
+    async def test_within_limits_passes_through(self):
+        """Test that a body within the limits comes back whole, and unchanged with only a byte limit."""
+        body = json.dumps(CATALOG).encode()
+        client, _ = make_client(body, max_bytes=len(body))
+        async with client:
+            response = await client.get("/api/v1/catalog")
+        assert response.content == body
+
+        client, _ = make_client(body, max_bytes=len(body), max_items=1000)
+        async with client:
+            response = await client.get("/api/v1/catalog")
+        assert response.json() == CATALOG
+
+    @pytest.mark.asyncio
+    async def test_byte_limit_truncates(self):
+        """Test that reading stops at the byte limit and the result is valid JSON."""
+        body = json.dumps(CATALOG).encode()
+        client, stream = make_client(body, max_bytes=20_000)
+        async with client:
+            response = await client.get("/api/v1/catalog")
+
+        result = response.json()
+        assert 0 < len(result["entities"]) < 1000
+        assert result["entities"] == CATALOG["entities"][:len(result["entities"])]
+        assert "bytes" in result[TRUNCATION_KEY]["reason"]
+        assert "fields" in result[TRUNCATION_KEY]["hint"]
+        assert stream.sent < 30_000
+        assert stream.closed
+
+    @pytest.mark.asyncio
+    async def test_item_limit_truncates(self):
+        """Test that a list is cut off at the item limit."""
+        body = json.dumps(CATALOG).encode()
+        client, stream = make_client(body, max_items=25)
+        async with client:
+            response = await client.get("/api/v1/catalog")
+
+        result = response.json()
+        assert len(result["entities"]) == 25
+        assert "items" in result[TRUNCATION_KEY]["reason"]
+        assert stream.sent < len(body)
+
+    @pytest.mark.asyncio
+    async def test_top_level_list_is_wrapped(self):
+        """Test that a truncated top-level list is wrapped in an object."""
+        body = json.dumps(list(range(100))).encode()
+        client, _ = make_client(body, max_items=10)
+        async with client:
+            result = (await client.get("/api/v1/catalog/svc/custom-data")).json()
+        assert result["result"] == list(range(10))
+        assert TRUNCATION_KEY in result
+
+    @pytest.mark.asyncio
+    async def test_compressed_body(self):
+        """Test that compressed bodies are decoded before the limits apply."""
+        body = gzip.compress(json.dumps(CATALOG).encode())
+        headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        client, _ = make_client(body, max_items=5, headers=headers)
+        async with client:
+            result = (await client.get("/api/v1/catalog")).json()
+        assert len(result["entities"]) == 5
+
+    @pytest.mark.asyncio
+    async def test_errors_untouched(self):
+        """Test that error responses are passed through unchanged."""
+        body = json.dumps(CATALOG).encode()
+        client, _ = make_client(body, max_items=5, status_code=500)
+        async with client:
+            response = await client.get("/api/v1/catalog")
+        assert response.content == body
+
+    @pytest.mark.asyncio
+    async def test_invalid_json(self):
+        """Test that invalid JSON passes through within the byte limit and fails without retries otherwise."""
+        body = b"{" + b"x" * 50_000
+        client, _ = make_client(body, max_bytes=100_000)
+        async with client:
+            assert (await client.get("/api/v1/catalog")).content == body
+
+        for max_bytes, max_items in ((10_000, 0), (0, 5)):
+            client, _ = make_client(body, max_bytes=max_bytes, max_items=max_items)
+            async with client:
+                with pytest.raises(httpx.DecodingError):
+                    await client.get("/api/v1/catalog")
+
+    @pytest.mark.asyncio
+    async def test_item_limit_applies_to_small_bodies(self):
+        """Test that bodies with a small Content-Length still have their lists counted."""
+        body = json.dumps({"items": list(range(500))}).encode()
+
+        def handler(request):
+            return httpx.Response(200, headers={"Content-Type": "application/json"}, content=body)
+
+        transport = ResponseLimitTransport(httpx.MockTransport(handler), max_bytes=16_000_000, max_items=100)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            result = (await client.get("/api/v1/catalog")).json()
+
+        assert result["items"] == list(range(100))
+        assert TRUNCATION_KEY in result
+
+    @pytest.mark.asyncio
+    async def test_truncated_page_names_next_page(self):
+        """Test that a cut-off page names the page that continues right after it, when one does."""
+        body = json.dumps(CATALOG).encode()
+        client, _ = make_client(body, max_items=20)
+        async with client:
+            paged = (await client.get("/api/v1/catalog", params={"page": 2, "pageSize": 50})).json()
+            unaligned = (await client.get("/api/v1/catalog", params={"page": 1, "pageSize": 30})).json()
+            unpaged = (await client.get("/api/v1/catalog")).json()
+
+        assert paged[TRUNCATION_KEY]["next"] == {"page": 6, "pageSize": 20}
+        assert paged[TRUNCATION_KEY]["itemsKept"] == 20
+        assert "page=6 and pageSize=20" in paged[TRUNCATION_KEY]["hint"]
+        assert "next" not in unaligned[TRUNCATION_KEY]
+        assert unaligned[TRUNCATION_KEY]["itemsKept"] == 20
+        assert "next" not in unpaged[TRUNCATION_KEY]
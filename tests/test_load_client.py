@@ -0,0 +1,132 @@
+"""Tests for the load generating MCP client."""
+import json
+
+import pytest
+from fastmcp import FastMCP
+from fastmcp.exceptions import ToolError
+
+from tests.manual.client import (
+    Call,
+    CallSource,
+    LoadReport,
+    Sample,
+    format_report,
+    load_mix,
+    load_trace,
+    main,
+    parse_rss,
+    run_load,
+)
+
+
+def make_server():
+    server = FastMCP("load-test")
+
+    @server.tool
+    def echo(text: str = "") -> str:
+        return text
+
+    @server.tool
+    def fail() -> str:
+        raise ToolError("always fails")
+
+    return server
+
+
+class TestRunLoad:
+    """Test suite for run_load."""
+
+    @pytest.mark.asyncio
+    async def test_weighted_mix(self):
+        """Test that a weighted mix is sampled and errors are counted by kind."""
+        # Failing calls are rare: the server logs a traceback for each
+        source = CallSource(mix=[(Call("echo", {"text": "a"}), 19), (Call("fail"), 1)], seed=1)
+        report = await run_load(make_server(), sessions=4, source=source, max_calls=200, sample_interval=0.01)
+
+        assert report.calls == 200
+        assert report.tools["echo"] + report.tools["fail"] == 200
+        assert 0 < report.tools["fail"] < 25
+        assert report.errors == {"tool_error": report.tools["fail"]}
+        assert report.timeline[-1].calls == 200
+
+    @pytest.mark.asyncio
+    async def test_trace_replay_and_record(self):
+        """Test that a trace is replayed on schedule and every call is recorded."""
+        trace = [Call("echo", {"text": str(i)}, at=i * 0.01) for i in range(10)]
+        record = []
+        report = await run_load(
+            make_server(), sessions=3, source=CallSource(trace=trace), record=record,
+        )
+
+        assert report.calls == 10
+        assert [c.arguments["text"] for c in record] == [str(i) for i in range(10)]
+        assert all(r.at >= t.at - 0.005 for r, t in zip(record, trace, strict=True))
+        assert report.elapsed >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_duration(self):
+        """Test that a run with a duration stops once it has passed."""
+        source = CallSource(mix=[(Call("echo"), 1)])
+        report = await run_load(make_server(), sessions=2, source=source, duration=0.2)
+        assert report.calls > 0
+        assert 0.2 <= report.elapsed < 1.0
+
+    @pytest.mark.asyncio
+    async def test_mix_needs_a_limit(self):
+        """Test that a mix without a call limit or duration is rejected."""
+        with pytest.raises(ValueError):
+            await run_load(make_server(), sessions=1, source=CallSource(mix=[(Call("echo"), 1)]))
+
+
+class TestReport:
+    """Test suite for load reports."""
+
+    def test_summary(self):
+        """Test that the summary reports throughput, error rate, latency percentiles and RSS."""
+        report = LoadReport(sessions=2, elapsed=2.0, latencies=[i / 1000 for i in range(1, 101)])
+        report.errors["tool_error"] = 5
+        report.timeline = [Sample(0.0, 0, 0, 100 * 2**20), Sample(2.0, 100, 5, 150 * 2**20)]
+
+        summary = report.summary()
+        assert summary["throughput_per_s"] == 50.0
+        assert summary["error_rate"] == 0.05
+        assert (summary["p50_ms"], summary["p95_ms"], summary["p99_ms"]) == (50.0, 95.0, 99.0)
+        assert (summary["rss_start_mib"], summary["rss_peak_mib"]) == (100.0, 150.0)
+
+        text = format_report(report)
+        assert "error tool_error" in text
+        assert "150.0" in text
+
+    def test_parse_rss(self):
+        """Test that resident memory is read from a metrics page."""
+        text = "# TYPE process_resident_memory_bytes gauge\nprocess_resident_memory_bytes 1.2345e+08\n"
+        assert parse_rss(text) == 123450000
+        assert parse_rss("cortex_mcp_x 1\n") is None
+
+
+class TestInputs:
+    """Test suite for mix and trace files."""
+
+    def test_load_mix(self, tmp_path):
+        """Test that a mix file is read with weights defaulting to 1."""
+        path = tmp_path / "mix.json"
+        path.write_text(json.dumps([{"tool": "a", "arguments": {"x": 1}, "weight": 2}, {"tool": "b"}]))
+        assert load_mix(str(path)) == [(Call("a", {"x": 1}), 2.0), (Call("b"), 1.0)]
+
+    def test_load_trace(self, tmp_path):
+        """Test that a trace file is read, skipping blank lines."""
+        path = tmp_path / "trace.jsonl"
+        path.write_text('{"at": 0.5, "tool": "a", "arguments": {"x": 1}}\n\n{"tool": "b"}\n')
+        assert load_trace(str(path)) == [Call("a", {"x": 1}, 0.5), Call("b")]
+
+    def test_source_needs_one_input(self):
+        """Test that a call source takes exactly one of a mix and a trace."""
+        with pytest.raises(ValueError):
+            CallSource()
+        with pytest.raises(ValueError):
+            CallSource(mix=[(Call("a"), 1)], trace=[Call("a")])
+
+    def test_sessions_need_calls(self, capsys):
+        """Test that the command line refuses sessions without a mix or trace."""
+        assert main(["localhost:8000/mcp", "--sessions", "2"]) == 2
+        assert "--mix or --trace" in capsys.readouterr().err
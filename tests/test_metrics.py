@@ -0,0 +1,172 @@
+"""Tests for Prometheus metrics."""
+import httpx
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from src.clients.metrics import UpstreamMetrics
+from src.middleware.metrics import MetricsMiddleware
+from src.routes.http import register_metrics_route
+from src.routes.table import RouteInfo, RouteTable
+from src.utils.metrics import MetricsRegistry
+
+
+def sample_lines(text, name):
+    return [line for line in text.splitlines() if line.startswith(name)]
+
+
+class TestMetricsRegistry:
+    """Test suite for MetricsRegistry."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets count every observation at or below their bound."""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/a")
+
+        lines = sample_lines(registry.render(), "cortex_mcp_latency_seconds")
+        assert lines == [
+            'cortex_mcp_latency_seconds_bucket{route="/a",le="0.1"} 2',
+            'cortex_mcp_latency_seconds_bucket{route="/a",le="1"} 3',
+            'cortex_mcp_latency_seconds_bucket{route="/a",le="+Inf"} 4',
+            'cortex_mcp_latency_seconds_sum{route="/a"} 3.65',
+            'cortex_mcp_latency_seconds_count{route="/a"} 4',
+        ]
+
+    def test_counters_and_gauges(self):
+        """Test that counters and gauges render with escaped label values."""
+        registry = MetricsRegistry()
+        counter = registry.counter("bytes_total", "Bytes.", ("route",))
+        counter.inc(10, 'a"b')
+        counter.inc(5, 'a"b')
+        gauge = registry.gauge("in_flight", "In flight.")
+
+        text = registry.render()
+        assert "# TYPE cortex_mcp_bytes_total counter" in text
+        assert 'cortex_mcp_bytes_total{route="a\\"b"} 15' in text
+        assert "cortex_mcp_in_flight 0" in text
+        gauge.inc()
+        assert "cortex_mcp_in_flight 1" in registry.render()
+
+    def test_stats_and_process_memory(self):
+        """Test that numeric stats are exported and nested values skipped."""
+        registry = MetricsRegistry()
+        registry.add_stats("cache", lambda: {"hits": 3, "ratio": 0.5, "routes": {"/a": {}}, "on": True})
+
+        text = registry.render()
+        assert "cortex_mcp_cache_hits 3" in text
+        assert "cortex_mcp_cache_ratio 0.5" in text
+        assert "routes" not in text
+        assert "cortex_mcp_cache_on" not in text
+        assert int(sample_lines(text, "process_resident_memory_bytes ")[0].split()[1]) > 0
+
+
+class TestUpstreamMetrics:
+    """Test suite for UpstreamMetrics."""
+
+    @pytest.mark.asyncio
+    async def test_records_by_route_template(self):
+        """Test that upstream requests are recorded under their route template."""
+        registry = MetricsRegistry()
+        table = RouteTable([RouteInfo("GET", "/api/v1/catalog/{tagOrId}")])
+        metrics = UpstreamMetrics(registry, table)
+
+        def handler(request):
+            return httpx.Response(404 if "gone" in request.url.path else 200, content=b"x" * 10)
+
+        async with httpx.AsyncClient(
+            base_url="https://cortex.test",
+            transport=httpx.MockTransport(handler),
+            event_hooks={"request": [metrics.on_request], "response": [metrics.on_response]},
+        ) as client:
+            await client.get("/api/v1/catalog/a")
+            await client.get("/api/v1/catalog/gone")
+            await client.post("/api/v1/unknown", content=b"abc")
+
+        text = registry.render()
+        route = '{route="/api/v1/catalog/{tagOrId}",method="GET",status="200"}'
+        assert f"cortex_mcp_upstream_request_duration_seconds_count{route} 1" in text
+        assert 'status="404"} 1' in text
+        assert 'cortex_mcp_upstream_response_bytes_total{route="/api/v1/catalog/{tagOrId}"} 20' in text
+        assert 'cortex_mcp_upstream_request_bytes_total{route="other"} 3' in text
+
+    @pytest.mark.asyncio
+    async def test_counts_streamed_bodies(self):
+        """Test that chunked bodies without Content-Length are counted as they stream."""
+        registry = MetricsRegistry()
+        metrics = UpstreamMetrics(registry)
+
+        class Chunks(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                for chunk in (b"a" * 5, b"b" * 7):
+                    yield chunk
+
+        async def handler(request):
+            await request.aread()
+            return httpx.Response(200, stream=Chunks())
+
+        async def body():
+            yield b"abcd"
+            yield b"ef"
+
+        async with httpx.AsyncClient(
+            base_url="https://cortex.test",
+            transport=httpx.MockTransport(handler),
+            event_hooks={"request": [metrics.on_request], "response": [metrics.on_response]},
+        ) as client:
+            response = await client.post("/api/v1/upload", content=body())
+
+        assert "content-length" not in response.headers
+        text = registry.render()
+        assert 'cortex_mcp_upstream_response_bytes_total{route="other"} 12' in text
+        assert 'cortex_mcp_upstream_request_bytes_total{route="other"} 6' in text
+
+
+class TestMetricsMiddleware:
+    """Test suite for MetricsMiddleware and the /metrics route."""
+
+    def make_server(self, registry):
+        server = FastMCP("test")
+        server.add_middleware(MetricsMiddleware(registry))
+
+        @server.tool
+        def ok() -> str:
+            return "ok"
+
+        @server.tool
+        def fails() -> str:
+            raise ToolError("no")
+
+        register_metrics_route(server, registry)
+        return server
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_recorded(self):
+        """Test that tool calls are recorded by tool and outcome, unknown tools under one label."""
+        registry = MetricsRegistry()
+        server = self.make_server(registry)
+        async with Client(server) as client:
+            await client.call_tool("ok", {})
+            await client.call_tool("fails", {}, raise_on_error=False)
+            for name in ("missing-1", "missing-2"):
+                await client.call_tool(name, {}, raise_on_error=False)
+
+        text = registry.render()
+        assert 'cortex_mcp_tool_call_duration_seconds_count{tool="unknown",outcome="error"} 2' in text
+        assert "missing" not in text
+        assert 'cortex_mcp_tool_call_duration_seconds_count{tool="ok",outcome="ok"} 1' in text
+        assert 'cortex_mcp_tool_call_duration_seconds_count{tool="fails",outcome="error"} 1' in text
+        assert "cortex_mcp_tool_calls_in_flight 0" in text
+
+    @pytest.mark.asyncio
+    async def test_metrics_route(self):
+        """Test that /metrics serves the Prometheus text format."""
+        registry = MetricsRegistry()
+        app = self.make_server(registry).http_app()
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://mcp") as client:
+            response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE cortex_mcp_tool_call_duration_seconds histogram" in response.text
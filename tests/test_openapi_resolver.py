@@ -1,7 +1,12 @@
 """Tests for OpenAPI $ref resolver."""
 import json
 
-from src.utils.openapi_resolver import resolve_refs, resolve_refs_with_defs
+from src.utils.openapi_resolver import (
+    filter_operations,
+    prune_components,
+    resolve_refs,
+    resolve_refs_with_defs,
+)
 
 
 class TestOpenAPIResolver:
@@ -281,3 +286,126 @@ class TestOpenAPIResolver:
 
         # Original should be unchanged
         assert json.dumps(spec, sort_keys=True) == original_json
+
+    def test_shared_schema_resolved_once(self):
+        """Test that a schema used in several places is resolved to one shared object."""
+        spec = {
+            "paths": {
+                "/api/a": {"get": {"schema": {"$ref": "#/components/schemas/Shared"}}},
+                "/api/b": {"get": {"schema": {"$ref": "#/components/schemas/Shared"}}},
+            },
+            "components": {
+                "schemas": {
+                    "Shared": {
+                        "type": "object",
+                        "properties": {"leaf": {"$ref": "#/components/schemas/Leaf"}},
+                    },
+                    "Leaf": {"type": "string"},
+                }
+            }
+        }
+
+        resolved = resolve_refs(spec)
+
+        a = resolved["paths"]["/api/a"]["get"]["schema"]
+        b = resolved["paths"]["/api/b"]["get"]["schema"]
+        assert a is b
+        assert a["properties"]["leaf"] == {"type": "string"}
+
+    def test_subtrees_without_refs_not_copied(self):
+        """Test that subtrees without refs are reused from the input."""
+        spec = {
+            "paths": {
+                "/api/plain": {"get": {"summary": "No refs here"}},
+                "/api/ref": {"get": {"schema": {"$ref": "#/components/schemas/Leaf"}}},
+            },
+            "components": {"schemas": {"Leaf": {"type": "string"}}}
+        }
+
+        resolved = resolve_refs(spec)
+
+        assert resolved["paths"]["/api/plain"] is spec["paths"]["/api/plain"]
+        assert resolved["paths"]["/api/ref"] is not spec["paths"]["/api/ref"]
+
+    def test_resolve_mutual_cycle(self):
+        """Test that a cycle spanning several schemas expands until it repeats."""
+        spec = {
+            "paths": {
+                "/api/test": {"get": {"schema": {"$ref": "#/components/schemas/Filter"}}}
+            },
+            "components": {
+                "schemas": {
+                    "Filter": {"oneOf": [{"$ref": "#/components/schemas/AndFilter"}]},
+                    "AndFilter": {
+                        "type": "object",
+                        "properties": {
+                            "filters": {
+                                "type": "array",
+                                "items": {"$ref": "#/components/schemas/Filter"}
+                            },
+                            "label": {"$ref": "#/components/schemas/Label"}
+                        }
+                    },
+                    "Label": {"type": "string"}
+                }
+            }
+        }
+
+        resolved = resolve_refs(spec)
+
+        schema = resolved["paths"]["/api/test"]["get"]["schema"]
+        and_filter = schema["oneOf"][0]
+        assert and_filter["properties"]["filters"]["items"] == {"$ref": "#/components/schemas/Filter"}
+        assert and_filter["properties"]["label"] == {"type": "string"}
+
+
+class TestFilterOperations:
+    """Test suite for pruning a spec before dereferencing."""
+
+    def test_excluded_operations_and_schemas_dropped(self):
+        """Test that excluded operations and the schemas only they reach are removed."""
+        spec = {
+            "paths": {
+                "/api/kept": {
+                    "parameters": [{"name": "shared", "in": "query"}],
+                    "get": {"keep": True, "schema": {"$ref": "#/components/schemas/Kept"}},
+                    "delete": {"schema": {"$ref": "#/components/schemas/Dropped"}},
+                },
+                "/api/dropped": {
+                    "get": {"schema": {"$ref": "#/components/schemas/Dropped"}}
+                },
+            },
+            "components": {
+                "schemas": {
+                    "Kept": {"properties": {"child": {"$ref": "#/components/schemas/Child"}}},
+                    "Child": {"type": "string"},
+                    "Dropped": {"type": "object"},
+                }
+            }
+        }
+
+        filtered = filter_operations(spec, lambda operation: operation.get("keep", False))
+
+        assert list(filtered["paths"]) == ["/api/kept"]
+        assert list(filtered["paths"]["/api/kept"]) == ["parameters", "get"]
+        assert sorted(filtered["components"]["schemas"]) == ["Child", "Kept"]
+        assert "Dropped" in spec["components"]["schemas"]
+
+    def test_prune_components_keeps_refs_from_other_components(self):
+        """Test that schemas referenced from shared responses are kept."""
+        spec = {
+            "paths": {},
+            "components": {
+                "responses": {
+                    "TooMany": {"content": {"application/json": {
+                        "schema": {"$ref": "#/components/schemas/Problem"}
+                    }}}
+                },
+                "schemas": {"Problem": {"type": "object"}, "Unused": {"type": "object"}},
+            }
+        }
+
+        pruned = prune_components(spec)
+
+        assert list(pruned["components"]["schemas"]) == ["Problem"]
+        assert "responses" in pruned["components"]
@@ -0,0 +1,274 @@
+"""Tests for auto-pagination of paged list tools."""
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastmcp import Client, FastMCP
+
+from src.clients.limits import TRUNCATION_KEY
+from src.components.customizers import customize_components
+from src.middleware.pagination import ALL_PAGES_ARGUMENT, PaginationMiddleware
+from src.routes.mappers import custom_route_mapper
+
+
+def paged_operation(operation_id, response_schema):
+    return {
+        "operationId": operation_id,
+        "x-cortex-mcp-enabled": "true",
+        "x-cortex-mcp-description": operation_id,
+        "parameters": [
+            {"name": "page", "in": "query", "required": True, "schema": {"type": "integer"}},
+            {"name": "pageSize", "in": "query", "required": True, "schema": {"type": "integer"}},
+        ],
+        "responses": {
+            "200": {
+                "description": "OK",
+                "content": {"application/json": {"schema": response_schema}},
+            }
+        },
+    }
+
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Test API", "version": "1.0.0"},
+    "paths": {
+        "/api/v1/initiatives": {
+            "get": paged_operation("listInitiatives", {"type": "object"}),
+        },
+        "/api/v1/catalog/{tagOrId}/custom-data": {
+            "get": {
+                **paged_operation("listCustomData", {"type": "array"}),
+                "parameters": [
+                    {"name": "tagOrId", "in": "path", "required": True, "schema": {"type": "string"}},
+                    {"name": "page", "in": "query", "required": True, "schema": {"type": "integer"}},
+                    {"name": "pageSize", "in": "query", "required": True, "schema": {"type": "integer"}},
+                ],
+            },
+        },
+        "/api/v1/scorecards/{tag}": {
+            "get": {
+                "operationId": "getScorecard",
+                "x-cortex-mcp-enabled": "true",
+                "parameters": [
+                    {"name": "tag", "in": "path", "required": True, "schema": {"type": "string"}},
+                ],
+                "responses": {"200": {"description": "OK"}},
+            },
+        },
+    },
+}
+
+
+class PagedUpstream:
+    """Cortex stand-in serving `total` items in pages, tracking concurrency."""
+
+    def __init__(
+        self, total, page_size=10, with_totals=True, failing_pages=(), malformed_pages=(), cut_pages=(), keep=3
+    ):
+        self.total = total
+        self.page_size = page_size
+        self.with_totals = with_totals
+        self.failing_pages = set(failing_pages)
+        self.malformed_pages = set(malformed_pages)
+        # Pages cut to `keep` items the way ResponseLimitTransport cuts them
+        self.cut_pages = set(cut_pages)
+        self.keep = keep
+        self.pages = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request):
+        page = int(request.url.params.get("page", 0))
+        self.pages.append(page)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        if page in self.failing_pages:
+            return httpx.Response(500, json={"message": "boom"})
+        if page in self.malformed_pages:
+            return httpx.Response(200, json={"page": page})
+        start = page * self.page_size
+        items = list(range(start, min(start + self.page_size, self.total)))
+        if not self.with_totals:
+            return httpx.Response(200, json=items)
+        total_pages = -(-self.total // self.page_size)
+        body = {"initiatives": items, "page": page, "total": self.total, "totalPages": total_pages}
+        if page in self.cut_pages:
+            body["initiatives"] = items[:self.keep]
+            body[TRUNCATION_KEY] = {"reason": "more than 3 items in a list", "next": {"page": page + 1}}
+        return httpx.Response(200, json=body)
+
+
+def make_server(upstream, **middleware_options):
+    client = httpx.AsyncClient(
+        base_url="https://cortex.test", transport=httpx.MockTransport(upstream)
+    )
+    server = FastMCP.from_openapi(
+        openapi_spec=SPEC,
+        client=client,
+        route_map_fn=custom_route_mapper,
+        mcp_component_fn=customize_components,
+    )
+    options = {"concurrency": 4, "max_items": 1000, "max_bytes": 1024 * 1024, **middleware_options}
+    server.add_middleware(PaginationMiddleware(**options))
+    return server
+
+
+async def call(server, name, arguments):
+    async with Client(server) as client:
+        result = await client.call_tool(name, arguments)
+    return result.structured_content
+
+
+class TestPaginationMiddleware:
+    """Test suite for PaginationMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_paged_tools_offer_all_pages(self):
+        """Test that only tools with page/pageSize get the argument, and page becomes optional."""
+        async with Client(make_server(PagedUpstream(0))) as client:
+            tools = {tool.name: tool for tool in await client.list_tools()}
+
+        schema = tools["listInitiatives"].inputSchema
+        assert schema["properties"][ALL_PAGES_ARGUMENT]["type"] == "boolean"
+        assert "page" not in schema.get("required", [])
+        assert ALL_PAGES_ARGUMENT not in tools["getScorecard"].inputSchema["properties"]
+
+    @pytest.mark.asyncio
+    async def test_fetches_remaining_pages_concurrently(self):
+        """Test that the pages after the first are fetched concurrently and merged in order."""
+        upstream = PagedUpstream(total=95)
+        result = await call(make_server(upstream, concurrency=3), "listInitiatives", {
+            "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+
+        assert result["initiatives"] == list(range(95))
+        assert result["pagesFetched"] == 10
+        assert result["truncated"] is False
+        assert result["total"] == 95
+        assert sorted(upstream.pages) == list(range(10))
+        assert upstream.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_item_limit_truncates(self):
+        """Test that merging stops at the item limit and marks the result truncated."""
+        upstream = PagedUpstream(total=95)
+        result = await call(make_server(upstream, max_items=25), "listInitiatives", {
+            "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+
+        assert result["initiatives"] == list(range(25))
+        assert result["truncated"] is True
+        assert sorted(upstream.pages) == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_byte_limit_stops_fetching(self):
+        """Test that fetching stops once the byte limit is reached."""
+        upstream = PagedUpstream(total=95)
+        result = await call(make_server(upstream, concurrency=1, max_bytes=100), "listInitiatives", {
+            "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+
+        assert result["truncated"] is True
+        assert result["pagesFetched"] < 10
+
+    @pytest.mark.asyncio
+    async def test_unknown_total_reads_until_short_page(self):
+        """Test that list responses without totals are read page by page."""
+        upstream = PagedUpstream(total=25, with_totals=False)
+        result = await call(make_server(upstream), "listCustomData", {
+            "tagOrId": "my-service", "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+
+        assert result["result"] == list(range(25))
+        assert result["truncated"] is False
+        assert upstream.pages == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_single_page_without_flag(self):
+        """Test that without allPages only the requested page is fetched."""
+        upstream = PagedUpstream(total=95)
+        result = await call(make_server(upstream), "listInitiatives", {
+            "page": 2, "pageSize": 10, ALL_PAGES_ARGUMENT: False,
+        })
+
+        assert result["initiatives"] == list(range(20, 30))
+        assert upstream.pages == [2]
+
+    @pytest.mark.asyncio
+    async def test_failed_page_returns_pages_before_it(self):
+        """Test that a failing page ends the merged list there instead of failing the call."""
+        upstream = PagedUpstream(total=95, failing_pages={4})
+        result = await call(make_server(upstream), "listInitiatives", {
+            "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+
+        assert result["initiatives"] == list(range(40))
+        assert result["pagesFetched"] == 4
+        assert result["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_failed_or_malformed_page_ends_the_list(self):
+        """Test that a page read one by one that fails, or a page without the list, ends the data."""
+        upstream = PagedUpstream(total=95, with_totals=False, failing_pages={2})
+        result = await call(make_server(upstream), "listCustomData", {
+            "tagOrId": "my-service", "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+        assert result["result"] == list(range(20))
+        assert result["truncated"] is True
+
+        upstream = PagedUpstream(total=95, malformed_pages={1})
+        result = await call(make_server(upstream), "listInitiatives", {
+            "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+        assert result["initiatives"] == list(range(10))
+        assert result["truncated"] is True
+
+    @pytest.mark.asyncio
+    async def test_unmergeable_first_page_returned_as_is(self):
+        """Test that a first page without a single list is returned unchanged, text included."""
+        upstream = PagedUpstream(total=95, malformed_pages={0})
+        async with Client(make_server(upstream)) as client:
+            result = await client.call_tool("listInitiatives", {"pageSize": 10, ALL_PAGES_ARGUMENT: True})
+
+        assert result.structured_content == {"page": 0}
+        assert result.content[0].text == '{"page":0}'
+        assert upstream.pages == [0]
+
+    @pytest.mark.asyncio
+    async def test_cut_off_page_ends_the_list(self):
+        """Test that a page cut off by the response limits ends the merged list, without its note."""
+        upstream = PagedUpstream(total=95, cut_pages={3, 6})
+        result = await call(make_server(upstream, concurrency=1), "listInitiatives", {
+            "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+        assert result["initiatives"] == list(range(33))
+        assert result["pagesFetched"] == 4
+        assert result["truncated"] is True
+        assert TRUNCATION_KEY not in result
+        assert 6 not in upstream.pages
+
+        upstream = PagedUpstream(total=95, cut_pages={0})
+        result = await call(make_server(upstream), "listInitiatives", {
+            "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+        assert result["initiatives"] == [0, 1, 2]
+        assert result["truncated"] is True
+        assert TRUNCATION_KEY not in result
+        assert upstream.pages == [0]
+
+    @pytest.mark.asyncio
+    async def test_merged_items_fit_the_byte_limit(self):
+        """Test that pages fetched concurrently are trimmed to the byte limit when merged."""
+        upstream = PagedUpstream(total=95)
+        result = await call(make_server(upstream, concurrency=4, max_bytes=120), "listInitiatives", {
+            "pageSize": 10, ALL_PAGES_ARGUMENT: True,
+        })
+
+        assert result["truncated"] is True
+        assert len(json.dumps(result["initiatives"], separators=(",", ":"))) <= 120
+        assert result["initiatives"] == list(range(len(result["initiatives"])))
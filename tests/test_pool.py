@@ -0,0 +1,147 @@
+"""Tests for per-token upstream connection pools."""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastmcp.exceptions import ToolError
+
+from src.clients.pool import TokenPoolTransport, apply_caller_token
+from src.config import Config
+
+
+class FakePoolTransport(httpx.AsyncBaseTransport):
+    """Stand-in for a pooled HTTP transport."""
+
+    def __init__(self, created, gate=None):
+        self.closed = False
+        self.gate = gate
+        created.append(self)
+
+    async def handle_async_request(self, request):
+        if self.gate is not None:
+            await self.gate.wait()
+        return httpx.Response(200, content=b"ok")
+
+    async def aclose(self):
+        self.closed = True
+
+
+def make_transport(created, gate=None, **kwargs):
+    """Build a TokenPoolTransport backed by fake pools."""
+    options = {"max_pools": 2, "idle_timeout": 300, "max_connections": 10}
+    options.update(kwargs)
+    return TokenPoolTransport(
+        limits=httpx.Limits(),
+        transport_factory=lambda limits: FakePoolTransport(created, gate),
+        **options,
+    )
+
+
+async def get(client, token):
+    """Send a GET as the given token and read the body."""
+    response = await client.get("/api/v1/catalog", headers={"Authorization": f"Bearer {token}"})
+    return response.content
+
+
+class TestTokenPoolTransport:
+    """Test suite for TokenPoolTransport."""
+
+    @pytest.mark.asyncio
+    async def test_one_pool_per_token(self):
+        """Test that each token reuses its own pool."""
+        created = []
+        transport = make_transport(created)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            await get(client, "a")
+            await get(client, "a")
+            await get(client, "b")
+            assert len(transport) == 2
+
+        assert len(created) == 2
+        assert all(pool.closed for pool in created)
+
+    @pytest.mark.asyncio
+    async def test_lru_pool_evicted(self):
+        """Test that the least recently used pool is closed past max_pools."""
+        created = []
+        transport = make_transport(created)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            await get(client, "a")
+            await get(client, "b")
+            await get(client, "a")
+            await get(client, "c")
+            await asyncio.sleep(0)
+
+            assert len(transport) == 2
+            assert created[1].closed
+            assert not created[0].closed
+
+    @pytest.mark.asyncio
+    async def test_idle_pool_evicted(self):
+        """Test that pools idle past the timeout are closed."""
+        created = []
+        transport = make_transport(created, idle_timeout=0, max_pools=10)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            await get(client, "a")
+            await asyncio.sleep(0.01)
+            await get(client, "b")
+            await asyncio.sleep(0)
+
+            assert len(transport) == 1
+            assert created[0].closed
+
+    @pytest.mark.asyncio
+    async def test_shared_connection_limit(self):
+        """Test that concurrent requests across tokens share one limit."""
+        created = []
+        gate = asyncio.Event()
+        transport = make_transport(created, gate=gate, max_connections=1)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            first = asyncio.create_task(get(client, "a"))
+            second = asyncio.create_task(get(client, "b"))
+            await asyncio.sleep(0.01)
+
+            assert len(created) == 1
+
+            gate.set()
+            assert await asyncio.gather(first, second) == [b"ok", b"ok"]
+            assert len(created) == 2
+
+
+class TestApplyCallerToken:
+    """Test suite for taking tokens from incoming MCP requests."""
+
+    @pytest.mark.asyncio
+    async def test_caller_bearer_token_used(self):
+        """Test that the caller's bearer token replaces the server token."""
+        request = httpx.Request("GET", "https://cortex.test", headers={"Authorization": "Bearer server"})
+        incoming = SimpleNamespace(headers={"authorization": "Bearer caller"})
+        with patch("src.clients.pool.get_http_request", return_value=incoming):
+            await apply_caller_token(request)
+
+        assert request.headers["Authorization"] == "Bearer caller"
+
+    @pytest.mark.asyncio
+    async def test_server_token_kept_outside_http_request(self):
+        """Test that the server token is kept outside of an HTTP request."""
+        request = httpx.Request("GET", "https://cortex.test", headers={"Authorization": "Bearer server"})
+        with patch("src.clients.pool.get_http_request", side_effect=RuntimeError("No active HTTP request found.")):
+            await apply_caller_token(request)
+
+        assert request.headers["Authorization"] == "Bearer server"
+
+    @pytest.mark.asyncio
+    async def test_http_caller_without_token_refused(self):
+        """Test that an HTTP caller without a token cannot use the server token unless allowed."""
+        request = httpx.Request("GET", "https://cortex.test", headers={"Authorization": "Bearer server"})
+        incoming = SimpleNamespace(headers={"authorization": "Basic abc"})
+        with patch("src.clients.pool.get_http_request", return_value=incoming):
+            with pytest.raises(ToolError, match="caller's own token"):
+                await apply_caller_token(request)
+
+            with patch.object(Config, "CALLER_TOKENS_FALLBACK", True):
+                await apply_caller_token(request)
+
+        assert request.headers["Authorization"] == "Bearer server"
@@ -0,0 +1,177 @@
+"""Tests for startup profiling."""
+import json
+import pstats
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from starlette.applications import Starlette
+
+from src.config import Config
+from src.utils import profiling
+from src.utils.profiling import (
+    StartupCompleteMiddleware,
+    StartupProfiler,
+    phase,
+    summarize,
+    timed,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_active_profiler():
+    """Clear the module's active profiler after each test."""
+    yield
+    profiling._active = None
+
+
+class TestStartupProfiler:
+    """Test suite for StartupProfiler."""
+
+    def test_phases_and_callbacks(self):
+        """Test that nested phases and timed callbacks are recorded."""
+        profiler = StartupProfiler().start()
+        with phase("load"):
+            with phase("parse"):
+                time.sleep(0.01)
+        mapper = timed("route_map_fn", lambda route: route.upper())
+        assert [mapper(r) for r in ("a", "b", "c")] == ["A", "B", "C"]
+
+        report = profiler.finish()
+        phases = {p["name"]: p for p in report["phases"]}
+        assert phases["parse"]["parent"] == "load"
+        assert phases["load"]["parent"] is None
+        assert phases["load"]["seconds"] >= phases["parse"]["seconds"] >= 0.01
+        assert report["total_seconds"] >= phases["load"]["seconds"]
+        assert report["callbacks"]["route_map_fn"]["calls"] == 3
+        assert "allocated_bytes" not in phases["load"]
+        assert "top_allocations" not in report
+
+    def test_inactive_is_a_no_op(self):
+        """Test that phases and timed callbacks do nothing without an active profiler."""
+        def fn():
+            return 1
+
+        assert timed("x", fn) is fn
+        with phase("anything"):
+            pass
+
+    def test_other_threads_are_ignored(self):
+        """Test that phases entered on other threads are not recorded."""
+        profiler = StartupProfiler().start()
+
+        def build():
+            with phase("deferred"):
+                pass
+
+        thread = threading.Thread(target=build)
+        thread.start()
+        thread.join()
+
+        assert profiler.finish()["phases"] == []
+
+    def test_finish_closes_open_phases_once(self):
+        """Test that finish closes open phases and returns the same report when called again."""
+        profiler = StartupProfiler().start()
+        profiler.begin("transport")
+        report = profiler.finish()
+
+        assert report["phases"][0]["name"] == "transport"
+        assert profiler.finish() is report
+        assert profiling._active is None
+
+    def test_end_closes_inner_phases(self):
+        """Test that ending a phase also ends the phases opened inside it."""
+        profiler = StartupProfiler().start()
+        outer = profiler.begin("outer")
+        profiler.begin("inner")
+        profiler.end(outer)
+
+        assert all(p.seconds is not None for p in profiler.phases)
+
+    def test_tracemalloc(self, tmp_path):
+        """Test that tracemalloc mode records allocations and peaks per phase."""
+        profiler = StartupProfiler("tracemalloc", str(tmp_path)).start()
+        with phase("outer"):
+            with phase("allocate"):
+                kept = [bytes(1000) for _ in range(1000)]
+            with phase("small"):
+                pass
+        report = profiler.finish()
+
+        phases = {p["name"]: p for p in report["phases"]}
+        assert phases["allocate"]["allocated_bytes"] >= 1_000_000
+        # The outer phase keeps the peak of its children although each child reset it
+        assert phases["outer"]["peak_bytes"] >= phases["allocate"]["peak_bytes"]
+        assert phases["small"]["peak_bytes"] < 100_000
+        assert report["top_allocations"][0]["bytes"] > 0
+        assert kept
+
+    def test_cprofile_and_report_file(self, tmp_path):
+        """Test that cprofile mode writes the report and profile stats."""
+        profiler = StartupProfiler("cprofile", str(tmp_path)).start()
+        with phase("work"):
+            sum(range(10000))
+        report = profiler.finish()
+
+        written = json.loads(next(tmp_path.glob("startup-*.json")).read_text())
+        assert written["phases"] == report["phases"]
+        assert pstats.Stats(report["cprofile"]).total_calls > 0
+
+    def test_summary(self):
+        """Test that the summary names the top-level phases and the RSS."""
+        report = {
+            "total_seconds": 0.25,
+            "before_start_seconds": 1.0,
+            "rss_bytes": 80 * 1024 * 1024,
+            "phases": [
+                {"name": "load_spec", "parent": None, "seconds": 0.1},
+                {"name": "parse_spec", "parent": "load_spec", "seconds": 0.05},
+            ],
+        }
+        assert summarize(report) == (
+            "Startup took 250.0 ms after 1000 ms of interpreter start and imports: "
+            "load_spec 100.0 ms; RSS 80.0 MiB"
+        )
+
+    def test_process_uptime(self):
+        """Test that the process uptime is unknown or non-negative."""
+        uptime = profiling.process_uptime()
+        assert uptime is None or uptime >= 0
+
+
+class TestStartupCompleteMiddleware:
+    """Test suite for StartupCompleteMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_called_after_lifespan_startup(self):
+        """Test that the callback runs once the app has started."""
+        events = []
+        incoming = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+
+        async def receive():
+            return next(incoming)
+
+        async def send(message):
+            events.append(message["type"])
+
+        app = StartupCompleteMiddleware(Starlette(), on_complete=lambda: events.append("complete"))
+        await app({"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}, receive, send)
+
+        assert events == ["lifespan.startup.complete", "complete", "lifespan.shutdown.complete"]
+
+
+class TestConfig:
+    """Test suite for the startup profile settings."""
+
+    def test_invalid_mode(self):
+        """Test that an unknown profile mode is rejected."""
+        with patch.object(Config, "STARTUP_PROFILE_MODE", "perf"), pytest.raises(ValueError, match="cprofile"):
+            Config.validate()
+
+    def test_mode_needs_directory(self):
+        """Test that a profile mode without a report directory is rejected."""
+        with patch.multiple(Config, STARTUP_PROFILE_MODE="cprofile", STARTUP_PROFILE_DIR=""):
+            with pytest.raises(ValueError, match="MCP_STARTUP_PROFILE_DIR"):
+                Config.validate()
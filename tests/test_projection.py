@@ -0,0 +1,203 @@
+"""Tests for response field projection."""
+import json
+
+import httpx
+import pytest
+from fastmcp import Client, FastMCP
+from fastmcp.exceptions import ToolError
+
+from src.clients.projection import ProjectionTransport, projecting
+from src.components.customizers import customize_components
+from src.middleware.pagination import PaginationMiddleware
+from src.middleware.projection import FIELDS_ARGUMENT, ProjectionMiddleware
+from src.routes.mappers import custom_route_mapper
+from src.utils.projection import parse_fields, project, project_json
+
+CATALOG = {
+    "entities": [
+        {
+            "tag": "payments",
+            "name": "Payments",
+            "description": "Takes \"money\" \\ [not] {braces}",
+            "hierarchy": {"parents": [{"tag": "platform", "definition": None}], "children": []},
+            "owners": {"teams": [{"tag": "team-a", "name": "A"}], "individuals": []},
+            "metadata": [{"key": "tier", "value": 1.5e3}, {"key": "pci", "value": True}],
+        },
+        {"tag": "ledger", "name": "Ledger", "owners": None, "metadata": []},
+    ],
+    "page": 0,
+    "total": 2,
+    "totalPages": 1,
+}
+
+
+class TestParseFields:
+    """Test suite for parse_fields."""
+
+    def test_dotted_paths(self):
+        """Test that dotted paths are merged into a tree."""
+        assert parse_fields("entities.tag, entities.owners.teams.tag,total") == {
+            "entities": {"tag": {}, "owners": {"teams": {"tag": {}}}},
+            "total": {},
+        }
+
+    def test_jsonpath_and_jmespath_spellings(self):
+        """Test that JSONPath and JMESPath spellings of a path are accepted."""
+        expected = {"entities": {"tag": {}}}
+        assert parse_fields("$.entities[*].tag") == expected
+        assert parse_fields("entities[].tag") == expected
+
+    def test_shorter_path_wins(self):
+        """Test that a path keeps its whole subtree whatever the order."""
+        assert parse_fields("owners,owners.teams") == {"owners": {}}
+        assert parse_fields("owners.teams,owners") == {"owners": {}}
+
+    def test_empty(self):
+        """Test that an empty field list selects nothing."""
+        assert parse_fields("") == {}
+
+    def test_invalid_path(self):
+        """Test that malformed paths are rejected."""
+        with pytest.raises(ValueError, match="Invalid field path"):
+            parse_fields("entities..tag")
+
+
+class TestProjectJson:
+    """Test suite for project_json."""
+
+    @pytest.mark.parametrize("fields", [
+        "entities.tag",
+        "entities.tag,entities.owners.teams.tag,total",
+        "entities.hierarchy",
+        "entities.metadata.value",
+        "total",
+        "missing.field",
+    ])
+    def test_matches_projecting_decoded_value(self, fields):
+        """Test that projecting while decoding equals decoding then projecting."""
+        projection = parse_fields(fields)
+        for text in (json.dumps(CATALOG), json.dumps(CATALOG, indent=2)):
+            assert project_json(text, projection) == project(json.loads(text), projection)
+
+    def test_top_level_list(self):
+        """Test that each item of a top-level list is projected."""
+        text = json.dumps([{"a": 1, "b": [1, 2]}, {"a": 2}])
+        assert project_json(text, parse_fields("a")) == [{"a": 1}, {"a": 2}]
+
+    def test_scalar_where_object_expected(self):
+        """Test that a scalar where an object was expected is kept as is."""
+        assert project_json('{"owners": null}', parse_fields("owners.teams")) == {"owners": None}
+
+    @pytest.mark.parametrize("text", ['{"a": 1', '{"a": [1, 2}', '{"a": 1} x', '{"a" 1}', '[1,,2]'])
+    def test_invalid_json(self, text):
+        """Test that invalid JSON raises a decode error."""
+        with pytest.raises(json.JSONDecodeError):
+            project_json(text, parse_fields("b"))
+
+
+class TestProjectionTransport:
+    """Test suite for ProjectionTransport."""
+
+    @staticmethod
+    def make_client(status_code=200, content_type="application/json"):
+        def handler(request):
+            return httpx.Response(
+                status_code, json=CATALOG, headers={"Content-Type": content_type}
+            )
+
+        transport = ProjectionTransport(httpx.MockTransport(handler))
+        return httpx.AsyncClient(base_url="https://cortex.test", transport=transport)
+
+    @pytest.mark.asyncio
+    async def test_projects_inside_block(self):
+        """Test that responses are projected only inside a projecting block."""
+        async with self.make_client() as client:
+            with projecting(parse_fields("total")):
+                response = await client.get("/api/v1/catalog")
+            unprojected = await client.get("/api/v1/catalog")
+
+        assert response.json() == {"total": 2}
+        assert response.headers["content-length"] == str(len(response.content))
+        assert unprojected.json() == CATALOG
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_projected(self):
+        """Test that error responses are returned whole."""
+        async with self.make_client(status_code=404) as client:
+            with projecting(parse_fields("total")):
+                response = await client.get("/api/v1/catalog")
+        assert response.json() == CATALOG
+
+
+class TestProjectionMiddleware:
+    """Test suite for the fields tool argument."""
+
+    SPEC = {
+        "openapi": "3.0.0",
+        "info": {"title": "Test API", "version": "1.0.0"},
+        "paths": {
+            "/api/v1/catalog": {
+                "get": {
+                    "operationId": "listAllEntities",
+                    "x-cortex-mcp-enabled": "true",
+                    "parameters": [
+                        {"name": "page", "in": "query", "required": True, "schema": {"type": "integer"}},
+                        {"name": "pageSize", "in": "query", "required": True, "schema": {"type": "integer"}},
+                    ],
+                    "responses": {"200": {"description": "OK"}},
+                },
+            },
+        },
+    }
+
+    @classmethod
+    def make_server(cls, pages=1):
+        def handler(request):
+            page = int(request.url.params.get("page", 0))
+            return httpx.Response(200, json={**CATALOG, "page": page, "totalPages": pages})
+
+        transport = ProjectionTransport(httpx.MockTransport(handler))
+        client = httpx.AsyncClient(base_url="https://cortex.test", transport=transport)
+        server = FastMCP.from_openapi(
+            openapi_spec=cls.SPEC,
+            client=client,
+            route_map_fn=custom_route_mapper,
+            mcp_component_fn=customize_components,
+        )
+        server.add_middleware(ProjectionMiddleware())
+        server.add_middleware(PaginationMiddleware(concurrency=2, max_items=100, max_bytes=2**20))
+        return server
+
+    @pytest.mark.asyncio
+    async def test_tools_offer_fields(self):
+        """Test that tools accept a fields argument."""
+        async with Client(self.make_server()) as client:
+            tools = await client.list_tools()
+        assert tools[0].inputSchema["properties"][FIELDS_ARGUMENT]["type"] == "string"
+
+    @pytest.mark.asyncio
+    async def test_fields_trim_response(self):
+        """Test that the fields argument trims the tool result."""
+        async with Client(self.make_server()) as client:
+            result = await client.call_tool("listAllEntities", {"pageSize": 10, "fields": "entities.tag,total"})
+        assert result.structured_content == {
+            "entities": [{"tag": "payments"}, {"tag": "ledger"}],
+            "total": 2,
+        }
+
+    @pytest.mark.asyncio
+    async def test_fields_with_all_pages(self):
+        """Test that projection keeps the page count so every page is fetched."""
+        async with Client(self.make_server(pages=3)) as client:
+            result = await client.call_tool(
+                "listAllEntities", {"pageSize": 10, "fields": "entities.tag", "allPages": True}
+            )
+        assert [e["tag"] for e in result.structured_content["entities"]] == ["payments", "ledger"] * 3
+        assert result.structured_content["truncated"] is False
+
+    @pytest.mark.asyncio
+    async def test_invalid_fields(self):
+        """Test that an invalid fields argument fails the call."""
+        async with Client(self.make_server()) as client:
+            with pytest.raises(ToolError, match="Invalid field path"):
+                await client.call_tool("listAllEntities", {"pageSize": 10, "fields": "entities..tag"})
@@ -0,0 +1,231 @@
+"""Tests for rate-limit-aware request scheduling."""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.clients.ratelimit import (
+    RATE_LIMIT_EXTENSION,
+    OutboundScheduler,
+    RateLimitTransport,
+    TokenBucket,
+    _retry_after,
+    open_bucket_state,
+)
+from src.routes.table import RouteInfo, RouteTable
+
+
+def make_table():
+    return RouteTable([
+        RouteInfo("GET", "/api/v1/catalog"),
+        RouteInfo("GET", "/api/v1/scorecards", {RATE_LIMIT_EXTENSION: 1}),
+    ])
+
+
+def make_client(handler, **scheduler_kwargs):
+    options = {"rate": 0, "burst": 1, **scheduler_kwargs}
+    scheduler = OutboundScheduler(make_table(), **options)
+    transport = RateLimitTransport(httpx.MockTransport(handler), scheduler)
+    client = httpx.AsyncClient(base_url="https://cortex.test", transport=transport)
+    return client, scheduler
+
+
+class TestTokenBucket:
+    """Test suite for TokenBucket."""
+
+    def test_burst_then_spacing(self):
+        """Test that reservations beyond the burst are spaced at the rate."""
+        bucket = TokenBucket(rate=10, burst=2)
+        now = bucket.updated
+        delays = [bucket.reserve(now) for _ in range(4)]
+        assert delays == pytest.approx([0, 0, 0.1, 0.2])
+
+    def test_unlimited_rate_honours_pause(self):
+        """Test that a rate of 0 never delays except while paused."""
+        bucket = TokenBucket(rate=0, burst=1)
+        now = time.monotonic()
+        assert bucket.reserve(now) == 0
+        bucket.pause(now + 2)
+        assert bucket.reserve(now) == pytest.approx(2)
+
+    def test_pause_delays_refill(self):
+        """Test that tokens only refill after the pause ends."""
+        bucket = TokenBucket(rate=10, burst=5)
+        now = bucket.updated
+        bucket.pause(now + 1)
+        assert bucket.reserve(now) == pytest.approx(1.1)
+
+
+class TestSharedTokenBucket:
+    """Test suite for buckets shared between processes through a state database."""
+
+    def test_schedulers_draw_from_one_bucket(self, tmp_path):
+        """Test that two schedulers on one state file share the token's burst and rate."""
+        state = str(tmp_path / "ratelimit.db")
+        first, second = (
+            OutboundScheduler(make_table(), rate=10, burst=2, state=open_bucket_state(state)) for _ in range(2)
+        )
+        request = httpx.Request("GET", "https://cortex.test/api/v1/catalog")
+        now = time.monotonic()
+
+        delays = [scheduler.buckets_for(request)[0].reserve(now) for scheduler in (first, second, first, second)]
+
+        assert delays == pytest.approx([0, 0, 0.1, 0.2], abs=0.01)
+
+    @pytest.mark.asyncio
+    async def test_pause_holds_every_scheduler(self, tmp_path):
+        """Test that a 429 seen by one scheduler pauses the token in another."""
+        state = str(tmp_path / "ratelimit.db")
+        first, second = (
+            OutboundScheduler(make_table(), rate=0, burst=1, state=open_bucket_state(state)) for _ in range(2)
+        )
+        request = httpx.Request("GET", "https://cortex.test/api/v1/catalog")
+
+        await first.observe(httpx.Response(429, headers={"Retry-After": "5"}), first.buckets_for(request))
+
+        assert second.buckets_for(request)[0].reserve(time.monotonic()) == pytest.approx(5, abs=0.1)
+        other = httpx.Request("GET", "https://cortex.test/api/v1/catalog", headers={"Authorization": "Bearer b"})
+        assert second.buckets_for(other)[0].reserve(time.monotonic()) == 0
+
+    @pytest.mark.asyncio
+    async def test_idle_rows_are_pruned(self, tmp_path):
+        """Test that rows no process has used for a while are deleted from the shared table."""
+        state = open_bucket_state(str(tmp_path / "ratelimit.db"))
+        scheduler = OutboundScheduler(make_table(), rate=10, burst=2, state=state)
+        with state.transaction() as db:
+            db.execute("INSERT INTO buckets VALUES ('old', 1, ?, 0)", (time.time() - 3600,))
+
+        request = httpx.Request("GET", "https://cortex.test/api/v1/catalog")
+        await scheduler.wait_turn(scheduler.buckets_for(request))
+
+        with state.read() as db:
+            keys = [row[0] for row in db.execute("SELECT key FROM buckets")]
+        assert len(keys) == 1 and keys != ["old"]
+
+    def test_unusable_state_limits_per_process(self, tmp_path):
+        """Test that without a usable state file the buckets stay in the process."""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+
+        assert open_bucket_state("") is None
+        assert open_bucket_state(str(blocker / "ratelimit.db")) is None
+
+
+class TestRetryAfter:
+    """Test suite for reading backoff hints from response headers."""
+
+    def test_seconds(self):
+        """Test that a Retry-After in seconds is read."""
+        assert _retry_after(httpx.Headers({"Retry-After": "3"})) == 3
+
+    def test_http_date(self):
+        """Test that a Retry-After date in the past means no wait."""
+        headers = httpx.Headers({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+        assert _retry_after(headers) == 0
+
+    def test_exhausted_remaining(self):
+        """Test that an empty rate-limit window asks for a pause until reset."""
+        headers = httpx.Headers({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "5"})
+        assert _retry_after(headers) == 5
+
+    def test_remaining_left(self):
+        """Test that no wait is taken while the rate limit has requests remaining."""
+        headers = httpx.Headers({"X-RateLimit-Remaining": "4", "X-RateLimit-Reset": "5"})
+        assert _retry_after(headers) is None
+
+
+class TestRateLimitTransport:
+    """Test suite for RateLimitTransport."""
+
+    @pytest.mark.asyncio
+    async def test_throttled_request_is_resent(self):
+        """Test that a 429 is queued for its Retry-After period and resent."""
+        calls = []
+
+        def handler(request):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0.05"})
+            return httpx.Response(200, json={"ok": True})
+
+        client, scheduler = make_client(handler)
+        async with client:
+            response = await client.get("/api/v1/catalog")
+
+        assert response.status_code == 200
+        assert len(calls) == 2
+        assert calls[1] - calls[0] >= 0.05
+        stats = scheduler.stats()
+        assert stats["throttled_responses"] == 1
+        assert stats["resent_requests"] == 1
+        assert stats["queued_requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_beyond_max_wait(self):
+        """Test that a 429 is returned when the backoff exceeds max_wait."""
+        def handler(request):
+            return httpx.Response(429, headers={"Retry-After": "120"})
+
+        client, scheduler = make_client(handler, max_wait=1)
+        async with client:
+            response = await client.get("/api/v1/catalog")
+
+        assert response.status_code == 429
+        assert scheduler.stats()["resent_requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_resends(self):
+        """Test that the last 429 is returned once the resends run out."""
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(429, headers={"Retry-After": "0"})
+
+        client, _ = make_client(handler, max_resends=2)
+        async with client:
+            response = await client.get("/api/v1/catalog")
+
+        assert response.status_code == 429
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_route_rate_queues_requests(self):
+        """Test that a route's own rate spaces out its requests and counts queue depth."""
+        client, scheduler = make_client(lambda request: httpx.Response(200), route_rates={})
+        scheduler._route_rates["/api/v1/catalog"] = 20
+        async with client:
+            started = time.monotonic()
+            await asyncio.gather(*(client.get("/api/v1/catalog") for _ in range(3)))
+            elapsed = time.monotonic() - started
+
+        assert elapsed >= 0.09
+        stats = scheduler.stats()
+        assert stats["queued_requests"] == 2
+        assert stats["max_queue_depth"] == 2
+        assert stats["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_tokens_are_limited_separately(self):
+        """Test that one token's pause does not hold back another token."""
+        def handler(request):
+            if request.headers["Authorization"] == "Bearer a":
+                return httpx.Response(429, headers={"Retry-After": "120"})
+            return httpx.Response(200)
+
+        client, scheduler = make_client(handler, max_wait=1)
+        async with client:
+            await client.get("/api/v1/catalog", headers={"Authorization": "Bearer a"})
+            started = time.monotonic()
+            response = await client.get("/api/v1/catalog", headers={"Authorization": "Bearer b"})
+
+        assert response.status_code == 200
+        assert time.monotonic() - started < 0.5
+
+    def test_extension_sets_route_rate(self):
+        """Test that the spec extension gives a route its own bucket."""
+        scheduler = OutboundScheduler(make_table(), rate=0, burst=1)
+        request = httpx.Request("GET", "https://cortex.test/api/v1/scorecards")
+        assert scheduler.route_rate(request) == ("/api/v1/scorecards", 1.0)
+        assert len(scheduler.buckets_for(request)) == 2
@@ -0,0 +1,205 @@
+"""Tests for retries and hedged requests."""
+import asyncio
+
+import httpx
+import pytest
+
+from src.clients.retry import (
+    HEDGE_EXTENSION,
+    RETRIES_EXTENSION,
+    RetryBudget,
+    RetryPolicy,
+    RetryTransport,
+)
+from src.routes.table import RouteInfo, RouteTable
+
+
+def make_policy(**kwargs):
+    table = RouteTable([
+        RouteInfo("GET", "/api/v1/catalog"),
+        RouteInfo("GET", "/api/v1/scorecards", {RETRIES_EXTENSION: 0, HEDGE_EXTENSION: 0.01}),
+        RouteInfo("POST", "/api/v1/eng-intel/metrics/point-in-time"),
+    ])
+    options = {
+        "retries": 2,
+        "base_delay": 0,
+        "max_delay": 0,
+        "attempt_timeout": 0,
+        "budget": RetryBudget(ratio=0.2),
+        **kwargs,
+    }
+    return RetryPolicy(table, **options)
+
+
+def make_client(upstream, policy):
+    transport = RetryTransport(upstream, policy)
+    return httpx.AsyncClient(base_url="https://cortex.test", transport=transport)
+
+
+class ScriptedUpstream(httpx.AsyncBaseTransport):
+    """Upstream that answers each call with the next scripted outcome."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def handle_async_request(self, request):
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        if isinstance(outcome, float):
+            await asyncio.sleep(outcome)
+            return httpx.Response(200, json={"call": self.calls})
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, json={"call": self.calls})
+
+
+class TestRetryBudget:
+    """Test suite for RetryBudget."""
+
+    def test_budget_refills_with_traffic(self):
+        """Test that the budget refills as requests are deposited."""
+        budget = RetryBudget(ratio=0.5, capacity=1)
+        assert budget.withdraw()
+        assert not budget.withdraw()
+        budget.deposit()
+        budget.deposit()
+        assert budget.withdraw()
+
+
+class TestRetryPolicy:
+    """Test suite for RetryPolicy."""
+
+    def test_route_overrides(self):
+        """Test precedence of config overrides, spec extensions and defaults."""
+        policy = make_policy(route_retries={"/api/v1/catalog": 5})
+        catalog = policy.for_request(httpx.Request("GET", "https://cortex.test/api/v1/catalog"))
+        scorecards = policy.for_request(httpx.Request("GET", "https://cortex.test/api/v1/scorecards"))
+        assert catalog.retries == 5
+        assert catalog.hedge_min_delay is None
+        assert scorecards.retries == 0
+        assert scorecards.hedge_min_delay == 0.01
+
+    def test_non_idempotent_requests_have_no_policy(self):
+        """Test that non-idempotent requests get no retry policy."""
+        request = httpx.Request("POST", "https://cortex.test/api/v1/eng-intel/metrics/point-in-time")
+        assert make_policy().for_request(request) is None
+
+    def test_backoff_is_bounded(self):
+        """Test that the jittered backoff never exceeds the maximum delay."""
+        policy = make_policy(base_delay=0.1, max_delay=0.3)
+        assert all(0 <= policy.backoff(attempt) <= 0.3 for attempt in range(10))
+
+
+class TestRetryTransport:
+    """Test suite for RetryTransport."""
+
+    @pytest.mark.asyncio
+    async def test_retries_server_errors(self):
+        """Test that 502 and 503 responses are retried until one succeeds."""
+        upstream = ScriptedUpstream(503, 502, 200)
+        policy = make_policy()
+        async with make_client(upstream, policy) as client:
+            response = await client.get("/api/v1/catalog")
+
+        assert response.status_code == 200
+        assert upstream.calls == 3
+        assert policy.stats()["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_transport_errors(self):
+        """Test that connection errors are retried."""
+        upstream = ScriptedUpstream(httpx.ConnectError("refused"), 200)
+        async with make_client(upstream, make_policy()) as client:
+            response = await client.get("/api/v1/catalog")
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_returns_last_error_response(self):
+        """Test that the final failed response is returned once retries run out."""
+        upstream = ScriptedUpstream(503)
+        async with make_client(upstream, make_policy(retries=1)) as client:
+            response = await client.get("/api/v1/catalog")
+        assert response.status_code == 503
+        assert upstream.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_post_is_not_retried(self):
+        """Test that POST requests are sent once."""
+        upstream = ScriptedUpstream(503, 200)
+        async with make_client(upstream, make_policy()) as client:
+            response = await client.post("/api/v1/eng-intel/metrics/point-in-time", json={})
+        assert response.status_code == 503
+        assert upstream.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_attempt_timeout_retries_stuck_call(self):
+        """Test that an attempt exceeding the attempt timeout is abandoned and retried."""
+        upstream = ScriptedUpstream(5.0, 200)
+        async with make_client(upstream, make_policy(attempt_timeout=0.05)) as client:
+            response = await client.get("/api/v1/catalog")
+        assert response.json() == {"call": 2}
+
+    @pytest.mark.asyncio
+    async def test_budget_stops_retries(self):
+        """Test that retries stop once the budget is spent."""
+        upstream = ScriptedUpstream(503)
+        policy = make_policy(budget=RetryBudget(ratio=0, capacity=1))
+        async with make_client(upstream, policy) as client:
+            await client.get("/api/v1/catalog")
+            await client.get("/api/v1/catalog")
+
+        assert upstream.calls == 3
+        assert policy.stats()["budget_exhausted"] == 2
+
+    @pytest.mark.asyncio
+    async def test_hedge_answers_slow_request(self):
+        """Test that a request slower than the route's p95 is hedged and the hedge wins."""
+        upstream = ScriptedUpstream(*([0.0] * 20), 5.0, 0.0)
+        policy = make_policy(budget=RetryBudget(ratio=1, capacity=10))
+        async with make_client(upstream, policy) as client:
+            for _ in range(20):
+                await client.get("/api/v1/scorecards")
+            response = await asyncio.wait_for(client.get("/api/v1/scorecards"), 1)
+
+        assert response.json() == {"call": 22}
+        stats = policy.stats()
+        assert stats["hedged_requests"] == 1
+        assert stats["hedge_wins"] == 1
+        assert "/api/v1/scorecards" in stats["p95_ms"]
+
+    @pytest.mark.asyncio
+    async def test_losing_response_is_closed_when_both_attempts_finish(self):
+        """Test that the losing response is closed when both hedged attempts finish together."""
+        closed = []
+
+        class Stream(httpx.AsyncByteStream):
+            def __init__(self, name):
+                self.name = name
+
+            async def __aiter__(self):
+                yield b"{}"
+
+            async def aclose(self):
+                closed.append(self.name)
+
+        transport = RetryTransport(ScriptedUpstream(200), make_policy())
+        first, second = asyncio.Future(), asyncio.Future()
+        first.set_result(httpx.Response(200, stream=Stream("first")))
+        second.set_result(httpx.Response(200, stream=Stream("second")))
+        response = await transport._first_success(first, second)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+        assert len(closed) == 1
+        assert response.stream.name not in closed
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_latency_history(self):
+        """Test that a route is not hedged before its latency is known."""
+        upstream = ScriptedUpstream(0.05)
+        policy = make_policy()
+        async with make_client(upstream, policy) as client:
+            await client.get("/api/v1/scorecards")
+        assert upstream.calls == 1
+        assert policy.stats()["hedged_requests"] == 0
@@ -1,9 +1,11 @@
 """Tests for route mapping logic."""
 from unittest.mock import Mock
 
+import pytest
 from fastmcp.server.openapi import MCPType
 
 from src.routes.mappers import custom_route_mapper
+from src.routes.table import RouteTable
 
 
 class TestCustomRouteMapper:
@@ -49,3 +51,70 @@ class TestCustomRouteMapper:
 
         assert "Evaluating route: GET /api/v1/resources" in caplog.text
         assert "Tags: ['api', 'resources']" in caplog.text
+
+
+class TestRouteTable:
+    """Test suite for matching request paths to route templates."""
+
+    @pytest.fixture
+    def route_table(self):
+        spec = {
+            "paths": {
+                "/api/v1/catalog/{tagOrId}": {
+                    "get": {"x-cortex-mcp-cache-ttl": 60},
+                    "parameters": [],
+                },
+                "/api/v1/catalog/descriptors": {"get": {}},
+                "/api/v1/catalog/{tagOrId}/deploys": {"get": {}, "post": {}},
+            }
+        }
+        return RouteTable.from_spec(spec)
+
+    def test_match_parameterized_route(self, route_table):
+        """Test that a concrete path resolves to its template and extensions."""
+        route = route_table.match("GET", "/api/v1/catalog/my-service")
+
+        assert route.template == "/api/v1/catalog/{tagOrId}"
+        assert route.extensions == {"x-cortex-mcp-cache-ttl": 60}
+
+    def test_literal_segment_wins(self, route_table):
+        """Test that literal segments take precedence over path parameters."""
+        route = route_table.match("GET", "/api/v1/catalog/descriptors")
+
+        assert route.template == "/api/v1/catalog/descriptors"
+
+    def test_method_and_depth_must_match(self, route_table):
+        """Test that method and segment count both participate in matching."""
+        assert route_table.match("DELETE", "/api/v1/catalog/my-service") is None
+        assert route_table.match("GET", "/api/v1/catalog/a/b") is None
+        assert route_table.match("POST", "/api/v1/catalog/a/deploys").method == "POST"
+
+    def test_base_path_stripped(self):
+        """Test that a base URL path prefix is ignored when matching."""
+        table = RouteTable.from_spec(
+            {"paths": {"/api/v1/teams/{tagOrId}": {"get": {}}}}, base_path="/cortex/"
+        )
+
+        route = table.match("GET", "/cortex/api/v1/teams/platform")
+
+        assert route.template == "/api/v1/teams/{tagOrId}"
+
+    def test_invalid_numeric_extensions_dropped(self, caplog):
+        """Test that policy extensions that are not numbers are logged and ignored."""
+        table = RouteTable.from_spec({
+            "paths": {
+                "/api/v1/catalog": {
+                    "get": {
+                        "x-cortex-mcp-cache-ttl": "five minutes",
+                        "x-cortex-mcp-rate-limit": None,
+                        "x-cortex-mcp-retries": "3",
+                        "x-cortex-mcp-description": "List entities",
+                    }
+                }
+            }
+        })
+
+        route = table.match("GET", "/api/v1/catalog")
+
+        assert route.extensions == {"x-cortex-mcp-retries": "3", "x-cortex-mcp-description": "List entities"}
+        assert "Ignoring x-cortex-mcp-cache-ttl='five minutes' on GET /api/v1/catalog" in caplog.text
@@ -0,0 +1,150 @@
+"""Tests for input schema minification."""
+import copy
+
+from src.utils.schema_minifier import (
+    collapse_schema,
+    format_schema_sizes,
+    input_size,
+    minify_operation,
+    minify_schema,
+    minify_spec,
+)
+
+
+def deep_body():
+    """Request body three objects deep, with a leaf array at the top."""
+    return {
+        "type": "object",
+        "required": ["outer"],
+        "properties": {
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "outer": {
+                "type": "object",
+                "description": "Outer",
+                "properties": {
+                    "inner": {
+                        "type": "object",
+                        "description": "Inner",
+                        "properties": {
+                            "value": {"type": "string", "description": "x" * 400},
+                        },
+                    },
+                },
+            },
+        },
+    }
+
+
+def operation(body):
+    return {
+        "operationId": "query",
+        "parameters": [{"name": "page", "in": "query", "schema": {"type": "integer", "format": "int32"}}],
+        "requestBody": {"content": {"application/json": {"schema": body}}},
+    }
+
+
+class TestMinifySchema:
+    """Test suite for keyword stripping."""
+
+    def test_strips_non_essential_keywords(self):
+        """Test that titles, examples, formats and similar keywords are removed."""
+        schema = {
+            "type": "object",
+            "title": "Query",
+            "discriminator": {"propertyName": "type"},
+            "example": {"limit": 1},
+            "properties": {
+                "limit": {"type": "integer", "format": "int64", "examples": [1]},
+                "start": {"type": "string", "format": "date-time"},
+                # A property may be called like a keyword
+                "title": {"type": "string"},
+            },
+        }
+
+        assert minify_schema(schema) == {
+            "type": "object",
+            "properties": {
+                "limit": {"type": "integer"},
+                "start": {"type": "string", "format": "date-time"},
+                "title": {"type": "string"},
+            },
+        }
+
+    def test_drops_item_description_repeating_the_array(self):
+        """Test that an item description repeating its array's is dropped."""
+        schema = {
+            "type": "array",
+            "description": "Sort order",
+            "items": {"type": "object", "description": "Sort order"},
+        }
+
+        assert minify_schema(schema)["items"] == {"type": "object"}
+
+    def test_keeps_refs_and_leaves_input_unchanged(self):
+        """Test that $ref nodes are kept and the input schema is not modified."""
+        schema = {"type": "object", "properties": {"child": {"$ref": "#/components/schemas/Node", "title": "x"}}}
+        original = copy.deepcopy(schema)
+
+        assert minify_schema(schema)["properties"]["child"] == schema["properties"]["child"]
+        assert schema == original
+
+
+class TestBudget:
+    """Test suite for collapsing deep schemas to a byte budget."""
+
+    def test_collapses_deepest_level_first(self):
+        """Test that an over-budget schema loses its deepest levels first."""
+        body = deep_body()
+        full = input_size(minify_operation(operation(body))[0])
+
+        minified, size = minify_operation(operation(body), max_bytes=full - 10)
+
+        schema = minified["requestBody"]["content"]["application/json"]["schema"]
+        assert schema["properties"]["outer"]["properties"]["inner"] == {"type": "object", "description": "Inner"}
+        assert size.collapsed_depth == 2
+        assert size.after == input_size(minified) <= full - 10
+
+    def test_never_collapses_top_level_arguments(self):
+        """Test that top-level arguments keep their type however small the budget."""
+        minified, size = minify_operation(operation(deep_body()), max_bytes=10)
+
+        schema = minified["requestBody"]["content"]["application/json"]["schema"]
+        assert schema["properties"]["outer"] == {"type": "object", "description": "Outer"}
+        # An array of scalars keeps its item type
+        assert schema["properties"]["tags"] == {"type": "array", "items": {"type": "string"}}
+        assert size.collapsed_depth == 1
+        assert "over budget" in format_schema_sizes([size], 10)
+
+    def test_under_budget_is_untouched(self):
+        """Test that a schema within the budget is not collapsed."""
+        minified, size = minify_operation(operation(deep_body()), max_bytes=100_000)
+
+        assert size.collapsed_depth is None
+        assert minified["requestBody"] == operation(deep_body())["requestBody"]
+
+    def test_collapse_keeps_leaves(self):
+        """Test that collapsing keeps the type of the collapsed node."""
+        schema = {"type": "object", "properties": {"a": {"type": "string", "enum": ["x"]}}}
+        assert collapse_schema(schema, limit=0, depth=1) == {"type": "object"}
+        assert collapse_schema(schema, limit=1) == schema
+
+
+class TestMinifySpec:
+    """Test suite for whole-spec minification."""
+
+    def test_reports_every_operation(self):
+        """Test that the spec minifier reports a size for every operation."""
+        spec = {
+            "paths": {
+                "/query": {"post": operation(deep_body()), "parameters": []},
+                "/items": {"get": {"parameters": []}},
+            }
+        }
+
+        minified, sizes = minify_spec(spec)
+
+        assert [s.tool for s in sizes] == ["query", "GET /items"]
+        assert sizes[0].after < sizes[0].before
+        assert minified["paths"]["/query"]["parameters"] == []
+        assert "format" in spec["paths"]["/query"]["post"]["parameters"][0]["schema"]
+        assert format_schema_sizes(sizes).splitlines()[-1].startswith("total")
@@ -0,0 +1,203 @@
+"""Tests for the response cache shared across processes."""
+import asyncio
+import multiprocessing
+import os
+import sqlite3
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.clients.cache import (
+    CachingTransport,
+    ResponseCache,
+    create_response_cache,
+    entry_size,
+)
+from src.clients.shared_cache import SharedResponseCache
+from src.config import Config
+from src.routes.table import RouteTable
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "responses.db")
+
+
+def key(path):
+    return ("GET", path, (), "")
+
+
+def fill(path, worker, count):
+    """Write count entries from a separate process."""
+    cache = SharedResponseCache(path, max_bytes=10_000_000, max_entry_bytes=10_000)
+    for n in range(count):
+        assert cache.put(key(f"/{worker}/{n}"), 200, [(b"x-n", str(n).encode())], b"x" * 100, ttl=60)
+        assert cache.get(key(f"/{worker}/{n}"), "/").headers == [(b"x-n", str(n).encode())]
+
+
+class TestSharedResponseCache:
+    """Test suite for SharedResponseCache."""
+
+    def test_entries_are_shared_and_expire(self, path):
+        """Test that a second instance sees entries until their TTL passes."""
+        writer = SharedResponseCache(path, max_bytes=10_000, max_entry_bytes=10_000)
+        reader = SharedResponseCache(path, max_bytes=10_000, max_entry_bytes=10_000)
+        writer.put(key("/a"), 200, [(b"content-type", b"application/json")], b'{"a":1}', ttl=10)
+
+        entry = reader.get(key("/a"), "/a")
+        assert (entry.status_code, entry.headers, entry.content) == (
+            200, [(b"content-type", b"application/json")], b'{"a":1}'
+        )
+        with patch("src.clients.shared_cache.time.time", return_value=time.time() + 11):
+            assert reader.get(key("/a"), "/a") is None
+
+        assert reader.stats()["routes"]["/a"] == {"hits": 1, "misses": 1}
+        assert writer.stats()["hits"] == 0
+        assert oct(os.stat(path).st_mode & 0o777) == "0o600"
+
+    def test_evicts_expired_then_least_recently_used(self, path):
+        """Test that the byte bound drops expired entries before live ones."""
+        cache = SharedResponseCache(path, max_bytes=1500, max_entry_bytes=1500)
+        now = time.time()
+        with patch("src.clients.shared_cache.time.time") as clock:
+            clock.return_value = now
+            cache.put(key("/a"), 200, [], b"x" * 200, ttl=60)
+            cache.put(key("/b"), 200, [], b"x" * 200, ttl=60)
+            cache.put(key("/short"), 200, [], b"x" * 100, ttl=1)
+
+            clock.return_value = now + 5
+            # A hit refreshes /a, so /b is now the least recently used
+            assert cache.get(key("/a"), "/a") is not None
+            cache.put(key("/c"), 200, [], b"x" * 400, ttl=60)
+
+            assert cache.get(key("/a"), "/a") is not None
+            assert cache.get(key("/b"), "/b") is None
+            assert cache.get(key("/c"), "/c") is not None
+
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] == cache.size <= 1500
+        assert stats["evictions"] == 1
+
+    def test_replacing_keeps_byte_count(self, path):
+        """Test that replacing an entry keeps the byte count exact."""
+        cache = SharedResponseCache(path, max_bytes=10_000, max_entry_bytes=10_000)
+        cache.put(key("/a"), 200, [], b"x" * 300, ttl=60)
+        cache.put(key("/a"), 200, [], b"x" * 100, ttl=60)
+
+        assert cache.size == entry_size([], b"x" * 100)
+        cache.clear()
+        assert cache.size == 0
+
+    def test_oversized_entry_rejected(self, path):
+        """Test that entries over the entry size limit are not stored."""
+        cache = SharedResponseCache(path, max_bytes=10_000, max_entry_bytes=500)
+
+        assert not cache.put(key("/a"), 200, [], b"x" * 1000, ttl=60)
+        assert len(cache) == 0
+
+    def test_concurrent_processes(self, path):
+        """Test that processes writing and reading at once neither fail nor lose entries."""
+        SharedResponseCache(path, max_bytes=10_000_000, max_entry_bytes=10_000)
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=fill, args=(path, worker, 50)) for worker in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+
+        assert [worker.exitcode for worker in workers] == [0] * 4
+        assert len(SharedResponseCache(path, max_bytes=10_000_000, max_entry_bytes=10_000)) == 200
+
+    def test_unreadable_cache_is_a_miss(self, path):
+        """Test that a cache that can't be read misses and stores nothing."""
+        cache = SharedResponseCache(path, max_bytes=10_000, max_entry_bytes=10_000)
+        cache.close()
+
+        assert cache.get(key("/a"), "/a") is None
+        assert not cache.put(key("/a"), 200, [], b"x", ttl=60)
+
+
+class TestSharedCaching:
+    """Test suite for caching transports sharing one file."""
+
+    @pytest.mark.asyncio
+    async def test_second_client_served_from_first_clients_entry(self, path):
+        """Test that a second process is served from an entry the first stored."""
+        route_table = RouteTable.from_spec({"paths": {"/api/v1/relationship-types": {"get": {}}}})
+        calls = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request)
+            return httpx.Response(200, json={"relationshipTypes": []})
+
+        responses = []
+        for _ in range(2):
+            transport = CachingTransport(
+                httpx.MockTransport(handler),
+                cache=SharedResponseCache(path, max_bytes=10_000, max_entry_bytes=10_000),
+                route_table=route_table,
+                default_ttl=300,
+            )
+            async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+                responses.append(await client.get("/api/v1/relationship-types"))
+
+        assert len(calls) == 1
+        assert [r.extensions["cortex_cache"] for r in responses] == ["miss", "hit"]
+        assert responses[1].json() == {"relationshipTypes": []}
+
+    @pytest.mark.asyncio
+    async def test_locked_file_does_not_block_event_loop(self, path):
+        """Test that waiting on another process's write lock leaves the event loop running."""
+        route_table = RouteTable.from_spec({"paths": {"/api/v1/relationship-types": {"get": {}}}})
+        with patch("src.utils.shared_db.BUSY_TIMEOUT", 0.5):
+            cache = SharedResponseCache(path, max_bytes=10_000, max_entry_bytes=10_000)
+        transport = CachingTransport(
+            httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+            cache=cache,
+            route_table=route_table,
+            default_ttl=300,
+        )
+
+        other = sqlite3.connect(path, isolation_level=None)
+        other.execute("BEGIN IMMEDIATE")
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.create_task(tick())
+        try:
+            async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+                response = await client.get("/api/v1/relationship-types")
+        finally:
+            ticker.cancel()
+            other.rollback()
+
+        # The store timed out on the lock, but the response was still returned
+        assert response.status_code == 200
+        assert len(cache) == 0
+        assert ticks >= 20
+
+
+class TestCreateResponseCache:
+    """Test suite for choosing the cache from configuration."""
+
+    def test_path_selects_shared_cache(self, path):
+        """Test that a cache path selects the shared cache."""
+        with patch.object(Config, "CACHE_PATH", path):
+            assert isinstance(create_response_cache(), SharedResponseCache)
+        with patch.object(Config, "CACHE_PATH", ""):
+            assert isinstance(create_response_cache(), ResponseCache)
+
+    def test_unusable_path_falls_back_to_memory(self, tmp_path):
+        """Test that an unusable cache path falls back to the in-memory cache."""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        with patch.object(Config, "CACHE_PATH", str(blocker / "responses.db")):
+            assert isinstance(create_response_cache(), ResponseCache)
@@ -0,0 +1,99 @@
+"""Tests for request coalescing."""
+import asyncio
+
+import httpx
+import pytest
+
+from src.clients.singleflight import SingleFlightTransport
+
+
+class SlowUpstream(httpx.AsyncBaseTransport):
+    """Upstream that holds every request until released."""
+
+    def __init__(self, status_code=200):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.status_code = status_code
+
+    async def handle_async_request(self, request):
+        self.calls.append(request)
+        await self.release.wait()
+        if self.status_code is None:
+            raise httpx.ConnectError("upstream down", request=request)
+        return httpx.Response(self.status_code, json={"n": len(self.calls)})
+
+
+async def gather_gets(client, count, path="/api/v1/catalog", **kwargs):
+    """Fire count concurrent GETs and wait until they reach the transport."""
+    tasks = [asyncio.create_task(client.get(path, **kwargs)) for _ in range(count)]
+    await asyncio.sleep(0.01)
+    return tasks
+
+
+class TestSingleFlightTransport:
+    """Test suite for SingleFlightTransport."""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self):
+        """Test that concurrent identical GETs produce a single upstream request."""
+        upstream = SlowUpstream()
+        transport = SingleFlightTransport(upstream)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            tasks = await gather_gets(client, 5, params={"types": "service"})
+            upstream.release.set()
+            responses = await asyncio.gather(*tasks)
+
+        assert len(upstream.calls) == 1
+        assert all(r.json() == {"n": 1} for r in responses)
+        assert transport.stats() == {"upstream": 1, "coalesced": 4, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_different_tokens_not_coalesced(self):
+        """Test that requests with different credentials go upstream separately."""
+        upstream = SlowUpstream()
+        transport = SingleFlightTransport(upstream)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            first = await gather_gets(client, 1, headers={"Authorization": "Bearer a"})
+            second = await gather_gets(client, 1, headers={"Authorization": "Bearer b"})
+            upstream.release.set()
+            await asyncio.gather(*first, *second)
+
+        assert len(upstream.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_writes_not_coalesced(self):
+        """Test that non-idempotent requests are never shared."""
+        upstream = SlowUpstream()
+        upstream.release.set()
+        transport = SingleFlightTransport(upstream)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            await asyncio.gather(*(client.post("/api/v1/metrics", json={}) for _ in range(3)))
+
+        assert len(upstream.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_errors_fan_out(self):
+        """Test that an upstream failure reaches every waiting caller."""
+        upstream = SlowUpstream(status_code=None)
+        transport = SingleFlightTransport(upstream)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            tasks = await gather_gets(client, 3)
+            upstream.release.set()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert all(isinstance(r, httpx.ConnectError) for r in results)
+        assert transport.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_fail_followers(self):
+        """Test that cancelling the first caller leaves the shared call running."""
+        upstream = SlowUpstream()
+        transport = SingleFlightTransport(upstream)
+        async with httpx.AsyncClient(base_url="https://cortex.test", transport=transport) as client:
+            leader, follower = await gather_gets(client, 2)
+            leader.cancel()
+            upstream.release.set()
+            response = await follower
+
+        assert response.status_code == 200
+        assert len(upstream.calls) == 1
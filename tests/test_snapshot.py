@@ -0,0 +1,126 @@
+"""Tests for tool registry snapshots."""
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastmcp import FastMCP
+
+from src.components import snapshot
+from src.config import Config
+from src.server import build_openapi_tools, compile_openapi_spec
+from src.utils.spec_compiler import hash_spec_file, load_compiled_spec
+
+SPEC_PATH = str(Path(__file__).parent.parent / "swagger.json")
+
+
+@pytest.fixture(scope="module")
+def compiled_spec():
+    """The compiled swagger.json, shared by the module's tests."""
+    return load_compiled_spec(SPEC_PATH, "")
+
+
+@pytest.fixture
+def build(compiled_spec, tmp_path):
+    """Build the tools of swagger.json with a snapshot cache in tmp_path."""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    client = httpx.AsyncClient(base_url="https://cortex.test", transport=httpx.MockTransport(handler))
+
+    def build():
+        with patch.object(Config, "OPENAPI_SPEC_PATH", SPEC_PATH):
+            return build_openapi_tools(compiled_spec, client, str(tmp_path))
+
+    build.requests = requests
+    return build
+
+
+def listed(tools):
+    """The tools as a tools/list response would describe them."""
+    return [tool.to_mcp_tool().model_dump() for tool in tools]
+
+
+class TestToolSnapshot:
+    """Test suite for tool snapshots."""
+
+    def test_restores_the_same_tools(self, build, tmp_path):
+        """Test that a second build restores the same tools from the snapshot."""
+        built = build()
+        assert (tmp_path / f"tools-{hash_spec_file(SPEC_PATH)[:16]}.json").exists()
+
+        with patch.object(FastMCP, "from_openapi", side_effect=AssertionError("rebuilt")):
+            restored = build()
+
+        assert len(restored) > 0
+        assert listed(restored) == listed(built)
+
+    @pytest.mark.asyncio
+    async def test_restored_tools_send_the_same_requests(self, build):
+        """Test that restored tools send the same requests as freshly built ones."""
+        built = {tool.name: tool for tool in build()}
+        restored = {tool.name: tool for tool in build()}
+
+        # Path, query and array parameters, and a JSON body
+        arguments = {
+            "getEntityDetails": {"tagOrId": "my-service", "includeOwners": True},
+            "listAllEntities": {"types": ["service", "domain"], "page": 1},
+            "queryPointInTimeMetrics": {"metricKeys": ["deploy-frequency"]},
+        }
+        for name, args in arguments.items():
+            await built[name].run(args)
+            await restored[name].run(args)
+
+        sent = [(r.method, str(r.url), r.content) for r in build.requests]
+        assert sent[0::2] == sent[1::2]
+
+    def test_stale_key_rebuilds(self, build, tmp_path):
+        """Test that a snapshot whose key no longer matches is rebuilt."""
+        build()
+
+        with patch.object(snapshot.fastmcp, "__version__", "0.0.0"):
+            with patch.object(FastMCP, "from_openapi", wraps=FastMCP.from_openapi) as from_openapi:
+                build()
+            from_openapi.assert_called_once()
+
+            # The rebuilt snapshot carries the new key
+            with patch.object(FastMCP, "from_openapi", side_effect=AssertionError("rebuilt")):
+                build()
+
+    def test_settings_are_part_of_the_key(self):
+        """Test that settings that shape the tools change the snapshot key."""
+        key = snapshot.snapshot_key("abc")
+        with patch.object(Config, "PAGINATION_MAX_ITEMS", Config.PAGINATION_MAX_ITEMS + 1):
+            assert snapshot.snapshot_key("abc") != key
+
+    def test_malformed_snapshot_rebuilds(self, build, tmp_path):
+        """Test that a snapshot with a malformed tool is rebuilt."""
+        build()
+        path = next(tmp_path.glob("tools-*.json"))
+        contents = json.loads(path.read_text())
+        del contents["tools"][0]["route"]
+        path.write_text(json.dumps(contents))
+
+        assert len(build()) == len(contents["tools"])
+
+    def test_unreadable_snapshot_rebuilds(self, build, tmp_path):
+        """Test that a snapshot that is not valid JSON is rebuilt."""
+        tools = build()
+        next(tmp_path.glob("tools-*.json")).write_text("{not json")
+
+        assert listed(build()) == listed(tools)
+
+    def test_compile_closes_its_client(self, tmp_path):
+        """Test that compile-spec closes the client it builds the snapshot with."""
+        with (
+            patch.object(Config, "OPENAPI_SPEC_PATH", SPEC_PATH),
+            patch("src.server.build_openapi_tools") as build_tools,
+        ):
+            compile_openapi_spec(str(tmp_path))
+
+        client = build_tools.call_args.args[1]
+        assert client.is_closed
@@ -0,0 +1,170 @@
+"""Tests for compiled OpenAPI spec artifacts."""
+import json
+import os
+
+import pytest
+
+from src.utils.spec_compiler import (
+    artifact_path,
+    compile_spec,
+    hash_spec_bytes,
+    load_compiled_spec,
+)
+
+
+@pytest.fixture
+def mixed_spec():
+    """Spec with one enabled, one disabled and one unmarked operation."""
+    return {
+        "openapi": "3.0.1",
+        "info": {"title": "Test API", "version": "1.0.0"},
+        "paths": {
+            "/api/v1/enabled": {
+                "post": {
+                    "x-cortex-mcp-enabled": "true",
+                    "requestBody": {
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Query"}
+                            }
+                        }
+                    },
+                },
+                "delete": {"x-cortex-mcp-enabled": "false"},
+            },
+            "/api/v1/unmarked": {
+                "get": {
+                    "responses": {
+                        "200": {
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/Unused"}
+                                }
+                            }
+                        }
+                    }
+                }
+            },
+        },
+        "components": {
+            "schemas": {
+                "Query": {
+                    "type": "object",
+                    "properties": {"filter": {"$ref": "#/components/schemas/Filter"}},
+                },
+                "Filter": {"type": "string"},
+                "Unused": {"type": "object"},
+            },
+            "securitySchemes": {"bearerAuth": {"type": "http", "scheme": "bearer"}},
+        },
+    }
+
+
+@pytest.fixture
+def spec_file(tmp_path, mixed_spec):
+    """Write the mixed spec to disk."""
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps(mixed_spec))
+    return path
+
+
+class TestCompileSpec:
+    """Test suite for spec compilation."""
+
+    def test_keeps_only_enabled_operations(self, mixed_spec):
+        """Test that only x-cortex-mcp-enabled operations survive compilation."""
+        compiled = compile_spec(mixed_spec)
+
+        assert list(compiled["paths"]) == ["/api/v1/enabled"]
+        assert list(compiled["paths"]["/api/v1/enabled"]) == ["post"]
+
+    def test_refs_resolved_and_schemas_dropped(self, mixed_spec):
+        """Test that refs are inlined and unreferenced schemas are removed."""
+        compiled = compile_spec(mixed_spec)
+
+        body = compiled["paths"]["/api/v1/enabled"]["post"]["requestBody"]
+        schema = body["content"]["application/json"]["schema"]
+        assert schema["properties"]["filter"] == {"type": "string"}
+        assert "schemas" not in compiled["components"]
+        assert "securitySchemes" in compiled["components"]
+
+    def test_circular_ref_targets_kept(self, mixed_spec):
+        """Test that schemas still referenced after resolution are retained."""
+        mixed_spec["components"]["schemas"]["Filter"] = {
+            "type": "object",
+            "properties": {"child": {"$ref": "#/components/schemas/Filter"}},
+        }
+
+        compiled = compile_spec(mixed_spec)
+
+        assert list(compiled["components"]["schemas"]) == ["Filter"]
+
+
+class TestLoadCompiledSpec:
+    """Test suite for hash-keyed artifact loading."""
+
+    def test_writes_artifact_on_first_load(self, spec_file, tmp_path):
+        """Test that a missing artifact is compiled and written."""
+        cache_dir = tmp_path / "cache"
+
+        compiled = load_compiled_spec(str(spec_file), str(cache_dir))
+
+        spec_hash = hash_spec_bytes(spec_file.read_bytes())
+        assert os.path.exists(artifact_path(str(cache_dir), spec_hash))
+        assert list(compiled["paths"]) == ["/api/v1/enabled"]
+
+    def test_uses_matching_artifact(self, spec_file, tmp_path):
+        """Test that a current artifact is served without recompiling."""
+        cache_dir = str(tmp_path / "cache")
+        load_compiled_spec(str(spec_file), cache_dir)
+
+        path = artifact_path(cache_dir, hash_spec_bytes(spec_file.read_bytes()))
+        with open(path) as f:
+            artifact = json.load(f)
+        artifact["spec"]["info"]["title"] = "From artifact"
+        with open(path, "w") as f:
+            json.dump(artifact, f)
+
+        compiled = load_compiled_spec(str(spec_file), cache_dir)
+
+        assert compiled["info"]["title"] == "From artifact"
+
+    def test_rebuilds_when_spec_changes(self, spec_file, tmp_path, mixed_spec):
+        """Test that editing the source spec produces a fresh artifact."""
+        cache_dir = str(tmp_path / "cache")
+        load_compiled_spec(str(spec_file), cache_dir)
+
+        mixed_spec["paths"]["/api/v1/unmarked"]["get"]["x-cortex-mcp-enabled"] = "true"
+        spec_file.write_text(json.dumps(mixed_spec))
+
+        compiled = load_compiled_spec(str(spec_file), cache_dir)
+
+        assert "/api/v1/unmarked" in compiled["paths"]
+        assert len(os.listdir(cache_dir)) == 2
+
+    def test_rebuilds_when_schema_budget_changes(self, spec_file, tmp_path):
+        """Test that an artifact compiled with another schema budget is not reused."""
+        cache_dir = str(tmp_path / "cache")
+        load_compiled_spec(str(spec_file), cache_dir)
+
+        path = artifact_path(cache_dir, hash_spec_bytes(spec_file.read_bytes()))
+        load_compiled_spec(str(spec_file), cache_dir, schema_max_bytes=100)
+
+        with open(path) as f:
+            assert json.load(f)["schema_max_bytes"] == 100
+
+    def test_unwritable_cache_dir(self, spec_file, tmp_path):
+        """Test that a cache dir that cannot be created does not fail loading."""
+        blocker = tmp_path / "blocker"
+        blocker.write_text("")
+
+        compiled = load_compiled_spec(str(spec_file), str(blocker / "cache"))
+
+        assert "/api/v1/enabled" in compiled["paths"]
+
+    def test_empty_cache_dir_disables_persistence(self, spec_file, tmp_path):
+        """Test that an empty cache dir compiles in memory only."""
+        compiled = load_compiled_spec(str(spec_file), "")
+
+        assert "/api/v1/enabled" in compiled["paths"]
+        assert os.listdir(tmp_path) == ["openapi.json"]
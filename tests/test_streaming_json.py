@@ -0,0 +1,88 @@
+"""Tests for incremental JSON decoding."""
+import json
+
+import pytest
+
+from src.utils.streaming_json import IncrementalDecoder
+
+DOCUMENTS = [
+    {
+        "entities": [
+            {"tag": f"svc-{i}", "text": 'quote " and \\ slash' * i, "n": [i, -1.5e3, 2e-2, None, True]}
+            for i in range(50)
+        ],
+        "page": 0,
+        "total": 12345,
+    },
+    [1, 2, 3, "abc", {"k": [{}], "": []}],
+    "a string",
+    -12.5e10,
+    {"nested": {"deeper": [[[]], {"x": False}]}},
+]
+
+
+def decode(text, chunk_size, **kwargs):
+    decoder = IncrementalDecoder(**kwargs)
+    for i in range(0, len(text), chunk_size):
+        decoder.feed(text[i:i + chunk_size])
+        if decoder.limited:
+            break
+    return decoder
+
+
+class TestIncrementalDecoder:
+    """Test suite for IncrementalDecoder."""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 64, 10**9])
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_round_trip(self, chunk_size, indent):
+        """Test that any chunking decodes to the same value as json.loads."""
+        for document in DOCUMENTS:
+            text = json.dumps(document, indent=indent)
+            assert decode(text, chunk_size).close() == document
+
+    def test_partial_value_is_well_formed(self):
+        """Test that a cut-off document only holds complete members."""
+        text = json.dumps(DOCUMENTS[0])
+        decoder = decode(text[:len(text) // 2], 100)
+
+        value = decoder.value
+        assert not decoder.done
+        assert 0 < len(value["entities"]) < 50
+        assert value["entities"] == DOCUMENTS[0]["entities"][:len(value["entities"])]
+        json.dumps(value)
+
+    @pytest.mark.parametrize("chunk_size", [7, 10**9])
+    def test_item_limit_stops_decoding(self, chunk_size):
+        """Test that a top-level list stops at max_items, in one chunk or many."""
+        decoder = decode(json.dumps(DOCUMENTS[0]), chunk_size, max_items=10)
+
+        assert decoder.limited
+        assert [e["tag"] for e in decoder.value["entities"]] == [f"svc-{i}" for i in range(10)]
+
+    def test_item_limit_trims_nested_lists(self):
+        """Test that nested lists are trimmed to the item limit."""
+        decoder = decode(json.dumps({"a": {"b": list(range(20))}}), 10**9, max_items=5)
+        assert decoder.close() == {"a": {"b": [0, 1, 2, 3, 4]}}
+        assert decoder.trimmed
+
+    def test_number_split_across_chunks(self):
+        """Test that a number split across chunks is decoded whole."""
+        decoder = IncrementalDecoder()
+        for part in ("[1", "2.", "5e", "3]"):
+            decoder.feed(part)
+        assert decoder.close() == [12.5e3]
+
+    def test_buffer_is_compacted(self):
+        """Test that consumed input does not stay buffered."""
+        text = json.dumps({"entities": [{"payload": "x" * 1000} for _ in range(500)]})
+        decoder = decode(text[:-100], 4096)
+        assert len(decoder._buffer) < 100 * 1024
+
+    @pytest.mark.parametrize("text", [
+        '{"a":1,}', "[1 2]", '{"a" 1}', "[1]]", '{"a":[1}', "[1,", "tru", '{"a":1} {}',
+    ])
+    def test_invalid_json(self, text):
+        """Test that invalid documents raise a decode error."""
+        with pytest.raises(json.JSONDecodeError):
+            decode(text, 1).close()
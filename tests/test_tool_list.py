@@ -0,0 +1,118 @@
+"""Tests for precomputed tools/list responses."""
+import httpx
+import mcp.types as mt
+import pytest
+from fastmcp import Client, FastMCP
+
+from src.components.tool_list import ToolListCache
+from src.routes.http import register_tools_route
+
+
+def make_server():
+    server = FastMCP("tools")
+
+    @server.tool
+    def ping() -> str:
+        """Answer pong."""
+        return "pong"
+
+    @server.tool
+    def echo(text: str) -> str:
+        return text
+
+    return server
+
+
+async def list_tools_result(client: Client, meta: dict | None = None) -> mt.ListToolsResult:
+    request = mt.ListToolsRequest(method="tools/list", params=mt.PaginatedRequestParams(_meta=meta) if meta else None)
+    return await client.session.send_request(mt.ClientRequest(request), mt.ListToolsResult)
+
+
+class TestToolListCache:
+    """Test suite for ToolListCache."""
+
+    @pytest.mark.asyncio
+    async def test_builds_once_and_lists_what_fastmcp_would(self):
+        """Test that the list is built once and matches FastMCP's own."""
+        async with Client(make_server()) as client:
+            expected = await client.list_tools()
+
+        server = make_server()
+        cache = ToolListCache(server).install()
+        async with Client(server) as client:
+            first = await list_tools_result(client)
+            second = await list_tools_result(client)
+
+        assert [t.model_dump() for t in first.tools] == [t.model_dump() for t in expected]
+        assert first.meta == second.meta == {"etag": cache.etag}
+        assert cache.stats()["builds"] == 1
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_registry_changes_rebuild(self):
+        """Test that adding or removing a tool rebuilds the list."""
+        server = make_server()
+        cache = ToolListCache(server).install()
+        async with Client(server) as client:
+            before = await list_tools_result(client)
+
+            server.tool(lambda: "late", name="late")
+            after = await list_tools_result(client)
+
+            server.remove_tool("late")
+            again = await list_tools_result(client)
+
+        assert [t.name for t in after.tools] == ["ping", "echo", "late"]
+        assert after.meta["etag"] != before.meta["etag"]
+        # The same tools hash to the same ETag
+        assert again.meta == before.meta
+        assert cache.stats()["builds"] == 3
+
+    @pytest.mark.asyncio
+    async def test_if_none_match(self):
+        """Test that a current ETag gets a not-modified result."""
+        server = make_server()
+        cache = ToolListCache(server).install()
+        async with Client(server) as client:
+            full = await list_tools_result(client)
+            current = await list_tools_result(client, {"ifNoneMatch": full.meta["etag"]})
+            stale = await list_tools_result(client, {"ifNoneMatch": "0000"})
+
+        assert current.tools == []
+        assert current.meta == {"etag": full.meta["etag"], "notModified": True}
+        assert len(stale.tools) == 2
+        assert cache.stats()["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_call_before_list(self):
+        """Test that a session calling a tool without listing first gets its arguments validated."""
+        server = make_server()
+        ToolListCache(server).install()
+        async with Client(server) as client:
+            result = await client.call_tool("echo", {"text": "hi"})
+            invalid = await client.call_tool("echo", {}, raise_on_error=False)
+
+        assert result.data == "hi"
+        assert invalid.is_error
+
+
+class TestToolsRoute:
+    """Test suite for GET /tools."""
+
+    @pytest.mark.asyncio
+    async def test_etag_and_not_modified(self):
+        """Test that GET /tools sends an ETag and answers a matching If-None-Match with 304."""
+        server = make_server()
+        register_tools_route(server, ToolListCache(server).install())
+
+        transport = httpx.ASGITransport(app=server.http_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            response = await http.get("/tools")
+            etag = response.headers["etag"]
+            cached = await http.get("/tools", headers={"If-None-Match": f'"other", W/{etag}'})
+
+        assert response.status_code == 200
+        assert [tool["name"] for tool in response.json()["tools"]] == ["ping", "echo"]
+        assert etag == f'"{response.json()["_meta"]["etag"]}"'
+        assert cached.status_code == 304
+        assert cached.content == b""
@@ -0,0 +1,152 @@
+"""Tests for tool call and upstream request tracing."""
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastmcp import Client, FastMCP
+
+from src.clients.tracing import TracingTransport
+from src.middleware.tracing import TracingMiddleware
+from src.routes.table import RouteInfo, RouteTable
+from src.utils.tracing import (
+    STATUS_ERROR,
+    FileSpanExporter,
+    Tracer,
+    parse_traceparent,
+)
+
+
+class MemoryExporter:
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(list(spans))
+
+
+class TestTracer:
+    """Test suite for Tracer."""
+
+    @pytest.mark.asyncio
+    async def test_children_share_trace_and_export_with_root(self):
+        """Test that spans in child tasks nest under the open span."""
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter)
+
+        async def child(name):
+            with tracer.span(name):
+                await asyncio.sleep(0)
+
+        with tracer.span("root") as root:
+            await asyncio.gather(child("a"), child("b"))
+            assert exporter.traces == []
+
+        [spans] = exporter.traces
+        assert {s.name for s in spans} == {"root", "a", "b"}
+        assert {s.trace_id for s in spans} == {root.trace_id}
+        assert all(s.parent_id == root.span_id for s in spans if s is not root)
+        assert root.parent_id is None
+
+    def test_remote_parent_and_errors(self):
+        """Test that a traceparent sets the parent and exceptions mark the span as failed."""
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter)
+        traceparent = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+        with pytest.raises(ValueError):
+            with tracer.span("root", traceparent=traceparent):
+                raise ValueError("boom")
+
+        [[span]] = exporter.traces
+        assert span.trace_id == "0af7651916cd43dd8448eb211c80319c"
+        assert span.parent_id == "b7ad6b7169203331"
+        assert span.status == STATUS_ERROR
+        assert span.status_message == "ValueError: boom"
+
+    @pytest.mark.parametrize("header", [
+        None, "", "garbage", "01-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01",
+        "00-00000000000000000000000000000000-b7ad6b7169203331-01",
+    ])
+    def test_invalid_traceparent_ignored(self, header):
+        """Test that malformed traceparent headers are ignored."""
+        assert parse_traceparent(header) is None
+
+    def test_file_exporter_writes_otlp_json(self, tmp_path):
+        """Test that the file exporter appends one OTLP JSON line per trace."""
+        path = tmp_path / "traces.jsonl"
+        exporter = FileSpanExporter(str(path), "test-service")
+        tracer = Tracer(exporter)
+        for _ in range(2):
+            with tracer.span("root", attributes={"n": 1, "ok": True, "s": "x"}):
+                with tracer.span("child"):
+                    pass
+        exporter.flush()
+
+        lines = path.read_text().splitlines()
+        assert len(lines) == 2
+        resource_spans = json.loads(lines[0])["resourceSpans"][0]
+        assert resource_spans["resource"]["attributes"] == [
+            {"key": "service.name", "value": {"stringValue": "test-service"}}
+        ]
+        child, root = resource_spans["scopeSpans"][0]["spans"]
+        assert child["parentSpanId"] == root["spanId"]
+        assert "parentSpanId" not in root
+        assert int(root["endTimeUnixNano"]) >= int(child["endTimeUnixNano"])
+        assert {"key": "n", "value": {"intValue": "1"}} in root["attributes"]
+        assert {"key": "ok", "value": {"boolValue": True}} in root["attributes"]
+
+    def test_export_failures_do_not_fail_the_call(self, tmp_path):
+        """Test that an unwritable trace file or a failing exporter is only logged."""
+        exporter = FileSpanExporter(str(tmp_path / "missing" / "traces.jsonl"), "test-service")
+        with Tracer(exporter).span("root") as span:
+            pass
+        exporter.flush()
+        assert span.end_ns is not None
+
+        class FailingExporter:
+            def export(self, spans):
+                raise OSError("disk full")
+
+        with Tracer(FailingExporter()).span("root"):
+            pass
+
+
+class TestToolCallTracing:
+    """Test suite for TracingMiddleware and TracingTransport together."""
+
+    @pytest.mark.asyncio
+    async def test_upstream_spans_are_children_of_tool_span(self):
+        """Test that upstream requests are traced as children of the tool call span."""
+        exporter = MemoryExporter()
+        tracer = Tracer(exporter)
+        sent = []
+
+        def handler(request):
+            sent.append(request.headers.get("traceparent"))
+            return httpx.Response(404 if request.url.path.endswith("gone") else 200, json={})
+
+        table = RouteTable([RouteInfo("GET", "/api/v1/catalog/{tagOrId}")])
+        transport = TracingTransport(httpx.MockTransport(handler), tracer, table)
+        cortex = httpx.AsyncClient(base_url="https://cortex.test", transport=transport)
+
+        server = FastMCP("test")
+        server.add_middleware(TracingMiddleware(tracer))
+
+        @server.tool
+        async def lookup(tags: list[str]) -> int:
+            responses = await asyncio.gather(*(cortex.get(f"/api/v1/catalog/{t}") for t in tags))
+            return len(responses)
+
+        async with Client(server) as client:
+            await client.call_tool("lookup", {"tags": ["a", "gone"]})
+
+        [spans] = exporter.traces
+        root = next(s for s in spans if s.parent_id is None)
+        upstream = [s for s in spans if s is not root]
+        assert root.name == "tools/call lookup"
+        assert root.attributes["mcp.tool.arguments"] == "tags"
+        assert [s.name for s in upstream] == ["GET /api/v1/catalog/{tagOrId}"] * 2
+        assert all(s.parent_id == root.span_id for s in upstream)
+        assert sorted(s.status for s in upstream) == [0, STATUS_ERROR]
+        assert sorted(sent) == sorted(s.traceparent for s in upstream)
@@ -0,0 +1,81 @@
+"""Tests for pre-fork worker processes."""
+import os
+import signal
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from src.config import Config
+from src.utils.workers import share_state
+from tests.benchmarks.suite import REPO_ROOT, free_port
+
+_SERVE_SCRIPT = """
+import os, sys
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from src.utils.workers import serve_workers
+
+app = Starlette(routes=[Route("/", lambda request: PlainTextResponse(str(os.getpid())))])
+serve_workers(app, "127.0.0.1", int(sys.argv[1]), workers=2, log_level="warning")
+"""
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return {int(child) for child in f.read().split()}
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            result = condition()
+            if result:
+                return result
+        except (httpx.HTTPError, OSError):
+            pass
+        time.sleep(0.1)
+    raise AssertionError("timed out")
+
+
+class TestShareState:
+    """Test suite for pointing shared state at files."""
+
+    def test_fills_in_unset_paths(self, tmp_path):
+        """Test that only unset state paths are pointed at the shared directory."""
+        with patch.multiple(Config, CACHE_ENABLED=True, CACHE_PATH="", RATE_LIMIT_STATE_PATH="/srv/limits.db"):
+            share_state(str(tmp_path))
+
+            assert Config.CACHE_PATH == str(tmp_path / "responses.db")
+            assert Config.RATE_LIMIT_STATE_PATH == "/srv/limits.db"
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/task"), reason="needs Linux /proc")
+class TestServeWorkers:
+    """Test suite for serve_workers."""
+
+    def test_serves_restarts_and_stops(self):
+        """Test that workers serve requests, are replaced when they die and stop with the parent."""
+        port = free_port()
+        parent = subprocess.Popen([sys.executable, "-c", _SERVE_SCRIPT, str(port)], cwd=REPO_ROOT)
+        try:
+            workers = wait_for(lambda: len(children(parent.pid)) == 2 and children(parent.pid))
+            answered = int(wait_for(lambda: httpx.get(f"http://127.0.0.1:{port}/").text))
+            assert answered in workers
+
+            # A worker that dies is replaced
+            os.kill(answered, signal.SIGKILL)
+            replaced = wait_for(lambda: len(children(parent.pid) - {answered}) == 2 and children(parent.pid))
+            assert answered not in replaced
+
+            parent.send_signal(signal.SIGTERM)
+            assert parent.wait(10) == 0
+            assert all(not os.path.exists(f"/proc/{pid}") for pid in replaced)
+        finally:
+            parent.kill()
+            parent.wait()